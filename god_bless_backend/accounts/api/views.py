@@ -12,7 +12,7 @@ from rest_framework.decorators import api_view, permission_classes, authenticati
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.authentication import TokenAuthentication
+from god_bless_pro.auth_backends import CachedTokenAuthentication
 from datetime import timedelta
 from django.utils import timezone
 
@@ -730,7 +730,7 @@ def is_valid_password(password):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def list_all_users_view(request):
     payload = {}
     data = {}
@@ -792,7 +792,7 @@ def list_all_users_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def list_all_archived_users_view(request):
     payload = {}
     data = {}
@@ -855,7 +855,7 @@ def list_all_archived_users_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def get_user_details_view(request):
     payload = {}
     data = {}
@@ -995,7 +995,7 @@ def get_user_details_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def archive_user_view(request):
     payload = {}
     data = {}
@@ -1040,7 +1040,7 @@ def archive_user_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def unarchive_user_view(request):
     payload = {}
     data = {}
@@ -1085,7 +1085,7 @@ def unarchive_user_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def delete_user_view(request):
     payload = {}
     data = {}
@@ -1128,7 +1128,7 @@ def delete_user_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def settings_view(request):
     payload = {}
     data = {}
@@ -1158,7 +1158,7 @@ def settings_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def subscribe_user(request):
     payload = {}
     errors = {}
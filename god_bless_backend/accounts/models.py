@@ -7,7 +7,7 @@ from django.conf import settings
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.db import models
 from django.db.models import Q
-from django.db.models.signals import post_save, pre_save
+from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
 
@@ -174,6 +174,20 @@ def pre_save_user_id_receiver(sender, instance, *args, **kwargs):
 pre_save.connect(pre_save_user_id_receiver, sender=User)
 
 
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_cached_user_auth(sender, instance=None, created=False, **kwargs):
+    # Covers archiving/deactivation as well as profile edits
+    if not created:
+        from god_bless_pro.auth_cache import invalidate_user
+        invalidate_user(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_cached_token_auth(sender, instance=None, **kwargs):
+    from god_bless_pro.auth_cache import invalidate_token
+    invalidate_token(instance.key)
+
+
 
 
 
@@ -13,7 +13,8 @@ import psutil
 import sys
 
 from django.conf import settings
-from rest_framework.authentication import TokenAuthentication
+from god_bless_pro.auth_backends import CachedTokenAuthentication
+from god_bless_pro.auth_cache import get_request_user, get_request_project
 
 from dashboard.api.serializers import PhoneNumberSerializer
 from phone_generator.api.serializers import AllPhoneNumbersSerializer
@@ -36,12 +37,12 @@ User = get_user_model()
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def dashboard_view(request):
     """
     Optimized dashboard view with caching and query optimization.
     """
-    from django.core.cache import cache
+    from god_bless_pro.cache_utils import get_or_compute
     from god_bless_pro.query_optimization import count_with_cache
     
     payload = {}
@@ -58,12 +59,12 @@ def dashboard_view(request):
         errors['project_id'] = ['Project ID is required.']
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except:
         errors['user_id'] = ['User does not exist.']
 
     try:
-        project = Project.objects.get(id=project_id)
+        project = get_request_project(request, project_id)
     except:
         errors['project_id'] = ['Project does not exist.']
 
@@ -75,65 +76,66 @@ def dashboard_view(request):
     # Generate cache key for this user/project combination
     cache_key = f"dashboard:user:{user_id}:project:{project_id}"
     
-    # Try to get cached dashboard data
-    cached_data = cache.get(cache_key)
-    if cached_data:
-        payload['message'] = "Successful"
-        payload['data'] = cached_data
-        payload['cached'] = True
-        return Response(payload, status=status.HTTP_200_OK)
-    
-    # Optimize queries with select_related
-    all_numbers_qs = PhoneNumber.objects.select_related('user', 'project').filter(
-        is_archived=False, project=project, user=user
-    ).order_by('-id')
+    computed = []
+
+    def compute_dashboard():
+        computed.append(True)
+        data = {}
+
+        # Optimize queries with select_related
+        all_numbers_qs = PhoneNumber.objects.select_related('user', 'project').filter(
+            is_archived=False, project=project, user=user
+        ).order_by('-id')
     
-    valid_numbers_qs = PhoneNumber.objects.select_related('user', 'project').filter(
-        is_archived=False, valid_number=True, type='Mobile', project=project, user=user
-    ).order_by('-id')
-
-    # Use cached counts
-    data['projects_count'] = count_with_cache(
-        Project.objects.filter(is_archived=False, user=user),
-        f"count:projects:user:{user_id}",
-        timeout=300
-    )
-    data['generated_count'] = count_with_cache(
-        all_numbers_qs,
-        f"count:generated:user:{user_id}:project:{project_id}",
-        timeout=60
-    )
-    data['validated_count'] = count_with_cache(
-        valid_numbers_qs,
-        f"count:validated:user:{user_id}:project:{project_id}",
-        timeout=60
-    )
-    data['loaded_smtps'] = count_with_cache(
-        SmtpManager.objects.filter(is_archived=False, user=user),
-        f"count:smtps:user:{user_id}",
-        timeout=300
-    )
+        valid_numbers_qs = PhoneNumber.objects.select_related('user', 'project').filter(
+            is_archived=False, valid_number=True, type='Mobile', project=project, user=user
+        ).order_by('-id')
+
+        # Use cached counts
+        data['projects_count'] = count_with_cache(
+            Project.objects.filter(is_archived=False, user=user),
+            f"count:projects:user:{user_id}",
+            timeout=300
+        )
+        data['generated_count'] = count_with_cache(
+            all_numbers_qs,
+            f"count:generated:user:{user_id}:project:{project_id}",
+            timeout=60
+        )
+        data['validated_count'] = count_with_cache(
+            valid_numbers_qs,
+            f"count:validated:user:{user_id}:project:{project_id}",
+            timeout=60
+        )
+        data['loaded_smtps'] = count_with_cache(
+            SmtpManager.objects.filter(is_archived=False, user=user),
+            f"count:smtps:user:{user_id}",
+            timeout=300
+        )
     
-    # Static counts (can be enhanced later)
-    data['sms_sent_count'] = 0
-    data['api_usage_count'] = 0
-    data['sent_email'] = 0
-    data['sent_sms'] = 0
-    data['email_templates'] = 0
+        # Static counts (can be enhanced later)
+        data['sms_sent_count'] = 0
+        data['api_usage_count'] = 0
+        data['sent_email'] = 0
+        data['sent_sms'] = 0
+        data['email_templates'] = 0
+
+        # Get recent items (only fetch 5)
+        all_numbers_serializer = PhoneNumberSerializer(all_numbers_qs[:5], many=True)
+        valid_numbers_serializer = PhoneNumberSerializer(valid_numbers_qs[:5], many=True)
 
-    # Get recent items (only fetch 5)
-    all_numbers_serializer = PhoneNumberSerializer(all_numbers_qs[:5], many=True)
-    valid_numbers_serializer = PhoneNumberSerializer(valid_numbers_qs[:5], many=True)
+        data['recent_generated'] = all_numbers_serializer.data
+        data['recent_validated'] = valid_numbers_serializer.data
 
-    data['recent_generated'] = all_numbers_serializer.data
-    data['recent_validated'] = valid_numbers_serializer.data
+        return data
 
-    # Cache the dashboard data for 60 seconds
-    cache.set(cache_key, data, 60)
+    # Recomputed by one request at a time; others get the previous data
+    # for up to a minute past expiry instead of piling onto the database
+    data = get_or_compute(cache_key, compute_dashboard, timeout=60, stale_ttl=60)
 
     payload['message'] = "Successful"
     payload['data'] = data
-    payload['cached'] = False
+    payload['cached'] = not computed
 
     return Response(payload, status=status.HTTP_200_OK)
 
@@ -141,7 +143,7 @@ def dashboard_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def dashboard_metrics(request):
     """
     Get comprehensive dashboard metrics for the frontend dashboard.
@@ -356,7 +358,7 @@ def dashboard_metrics(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def dashboard_overview(request):
     """
     Get dashboard overview statistics.
@@ -406,7 +408,7 @@ def dashboard_overview(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def dashboard_health(request):
     """
     Get system health information.
@@ -513,7 +515,7 @@ def dashboard_health(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def dashboard_tasks(request):
     """
     Get task history for dashboard.
@@ -582,7 +584,7 @@ def dashboard_tasks(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def dashboard_activity(request):
     """
     Get recent activity feed.
@@ -651,7 +653,7 @@ def dashboard_activity(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def dashboard_realtime(request):
     """
     Get real-time metrics (for WebSocket fallback).
@@ -707,7 +709,7 @@ def dashboard_realtime(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def dashboard_refresh(request):
     """
     Refresh dashboard data (trigger backend cache refresh).
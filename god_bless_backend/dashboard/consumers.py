@@ -9,7 +9,6 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from datetime import timedelta
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
@@ -155,36 +154,10 @@ class DashboardConsumer(AsyncWebsocketConsumer):
     
     @database_sync_to_async
     def get_dashboard_metrics(self):
-        """Get dashboard metrics from database"""
-        from phone_generator.models import PhoneNumber
-        from projects.models import Project
-        from tasks.models import TaskProgress, TaskStatus
+        """Get dashboard metrics from the shared cached snapshot"""
+        from .live_stats import DashboardMetricsBroadcaster
         
-        user = self.user
-        now = timezone.now()
-        last_24h = now - timedelta(hours=24)
-        
-        # Get basic metrics
-        metrics = {
-            'overview': {
-                'totalProjects': Project.objects.filter(user=user, is_archived=False).count(),
-                'activeProjects': Project.objects.filter(user=user, is_archived=False, active=True).count(),
-                'totalPhoneNumbers': PhoneNumber.objects.filter(user=user, is_archived=False).count(),
-                'validPhoneNumbers': PhoneNumber.objects.filter(user=user, is_archived=False, valid_number=True).count(),
-                'activeTasks': TaskProgress.objects.filter(
-                    user=user, 
-                    status__in=[TaskStatus.STARTED, TaskStatus.PROGRESS]
-                ).count(),
-                'completedTasks24h': TaskProgress.objects.filter(
-                    user=user, 
-                    status=TaskStatus.SUCCESS,
-                    completed_at__gte=last_24h
-                ).count(),
-            },
-            'lastUpdated': now.isoformat()
-        }
-        
-        return metrics
+        return DashboardMetricsBroadcaster(self.user.id).get_snapshot()
     
     # Group message handlers
     async def dashboard_update(self, event):
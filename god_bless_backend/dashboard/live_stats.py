@@ -0,0 +1,54 @@
+"""
+Shared dashboard metrics producer for dashboard WebSocket consumers
+"""
+from datetime import timedelta
+from typing import Any, Dict
+
+from django.utils import timezone
+
+from god_bless_pro.live_stats import LiveStatsBroadcaster
+
+
+class DashboardMetricsBroadcaster(LiveStatsBroadcaster):
+    """Per-user dashboard overview, fanned out to ``dashboard_user_<id>``"""
+
+    kind = 'dashboard'
+    interval = 10
+
+    def group_name(self) -> str:
+        return f"dashboard_user_{self.object_id}"
+
+    def compute(self) -> Dict[str, Any]:
+        from phone_generator.models import PhoneNumber
+        from projects.models import Project
+        from tasks.models import TaskProgress, TaskStatus
+
+        user_id = self.object_id
+        now = timezone.now()
+        last_24h = now - timedelta(hours=24)
+
+        return {
+            'overview': {
+                'totalProjects': Project.objects.filter(user_id=user_id, is_archived=False).count(),
+                'activeProjects': Project.objects.filter(user_id=user_id, is_archived=False, active=True).count(),
+                'totalPhoneNumbers': PhoneNumber.objects.filter(user_id=user_id, is_archived=False).count(),
+                'validPhoneNumbers': PhoneNumber.objects.filter(user_id=user_id, is_archived=False, valid_number=True).count(),
+                'activeTasks': TaskProgress.objects.filter(
+                    user_id=user_id,
+                    status__in=[TaskStatus.STARTED, TaskStatus.PROGRESS]
+                ).count(),
+                'completedTasks24h': TaskProgress.objects.filter(
+                    user_id=user_id,
+                    status=TaskStatus.SUCCESS,
+                    completed_at__gte=last_24h
+                ).count(),
+            },
+            'lastUpdated': now.isoformat()
+        }
+
+    def build_event(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'type': 'dashboard_update',
+            'data': snapshot,
+            'timestamp': timezone.now().isoformat()
+        }
@@ -0,0 +1,26 @@
+"""
+Celery tasks for dashboard live updates
+"""
+from celery import shared_task
+
+from tasks.models import TaskProgress, TaskStatus
+from .live_stats import DashboardMetricsBroadcaster
+
+
+@shared_task
+def broadcast_dashboard_metrics():
+    """
+    Periodic producer for live dashboard metrics.
+    Only users with running tasks have changing metrics, so only their
+    snapshots are refreshed; everyone else reads the cached copy.
+    """
+    user_ids = TaskProgress.objects.filter(
+        status__in=[TaskStatus.STARTED, TaskStatus.PROGRESS]
+    ).values_list('user_id', flat=True).distinct()
+    
+    refreshed = 0
+    for user_id in user_ids:
+        if DashboardMetricsBroadcaster(user_id).refresh() is not None:
+            refreshed += 1
+    
+    return {'refreshed': refreshed}
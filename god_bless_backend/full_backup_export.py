@@ -7,7 +7,6 @@ Exports ALL data from SQLite for seamless migration
 import os
 import sys
 import django
-import json
 from datetime import datetime
 
 # Add the project directory to Python path
@@ -17,10 +16,9 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'god_bless_pro.settings')
 django.setup()
 
-from django.core import serializers
-from django.apps import apps
+from god_bless_pro.backup import backup_database
 
-def export_all_data():
+def export_all_data(workers=4):
     """Export all data from all models for complete backup"""
     
     # Create output directory
@@ -31,51 +29,14 @@ def export_all_data():
     
     print(f"🔄 Starting complete database backup...")
     
-    # Get all models from all apps
-    all_models = []
-    for app_config in apps.get_app_configs():
-        if not app_config.name.startswith('django.'):  # Skip Django built-in apps
-            for model in app_config.get_models():
-                all_models.append(model)
-    
-    exported_data = {}
-    total_records = 0
-    
-    for model in all_models:
-        app_label = model._meta.app_label
-        model_name = model._meta.model_name
-        
-        try:
-            queryset = model.objects.all()
-            count = queryset.count()
-            
-            if count > 0:
-                # Export using Django serializer
-                serialized_data = serializers.serialize('json', queryset, indent=2)
-                
-                # Store in our backup structure
-                if app_label not in exported_data:
-                    exported_data[app_label] = {}
-                
-                exported_data[app_label][model_name] = {
-                    'count': count,
-                    'data': json.loads(serialized_data)
-                }
-                
-                total_records += count
-                print(f"✅ {app_label}.{model_name}: {count} records")
-            else:
-                print(f"⚠️  {app_label}.{model_name}: 0 records (skipped)")
-                
-        except Exception as e:
-            print(f"❌ Error exporting {app_label}.{model_name}: {e}")
-    
-    # Save complete backup
-    backup_filename = f'complete_backup_{timestamp}.json'
-    backup_filepath = os.path.join(output_dir, backup_filename)
-    
-    with open(backup_filepath, 'w', encoding='utf-8') as f:
-        json.dump(exported_data, f, indent=2, ensure_ascii=False)
+    # One gzip NDJSON stream per model, written as rows are read, so
+    # memory use does not grow with the size of the database
+    backup_dirname = f'complete_backup_{timestamp}'
+    manifest = backup_database(
+        os.path.join(output_dir, backup_dirname),
+        workers=workers,
+        log=lambda line: print(f"✅ {line}")
+    )
     
     # Create migration script
     migration_script = f'migrate_to_postgres_{timestamp}.py'
@@ -91,53 +52,26 @@ Created: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 import os
 import sys
 import django
-import json
-from datetime import datetime
 
 # Setup Django
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(here))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'god_bless_pro.settings')
 django.setup()
 
-from django.core import serializers
-from django.db import transaction
+from god_bless_pro.backup import BackupError, restore_database
 
 def migrate_data():
     """Import all data into PostgreSQL"""
     
-    backup_file = '{backup_filename}'
-    
-    if not os.path.exists(backup_file):
-        print(f"❌ Backup file not found: {{backup_file}}")
-        return
-    
-    print("🔄 Loading backup data...")
-    with open(backup_file, 'r', encoding='utf-8') as f:
-        backup_data = json.load(f)
-    
-    total_imported = 0
+    backup_dir = os.path.join(here, '{backup_dirname}')
     
-    with transaction.atomic():
-        print("🔄 Starting PostgreSQL import...")
-        
-        for app_label, models in backup_data.items():
-            print(f"\\n📦 Importing {{app_label}} app...")
-            
-            for model_name, model_data in models.items():
-                try:
-                    count = model_data['count']
-                    data = model_data['data']
-                    
-                    print(f"  🔄 Importing {{model_name}}: {{count}} records...")
-                    
-                    # Import using Django deserializer
-                    for obj in serializers.deserialize('json', json.dumps(data)):
-                        obj.save()
-                    
-                    total_imported += count
-                    print(f"  ✅ {{model_name}}: {{count}} records imported")
-                    
-                except Exception as e:
-                    print(f"  ❌ Error importing {{model_name}}: {{e}}")
+    print("🔄 Starting PostgreSQL import...")
+    try:
+        total_imported = restore_database(backup_dir, log=lambda line: print(f"  ✅ {{line}}"))
+    except BackupError as e:
+        print(f"❌ Import failed: {{e}}")
+        sys.exit(1)
     
     print(f"\\n🎉 Migration complete! Total records imported: {{total_imported}}")
 
@@ -146,10 +80,10 @@ if __name__ == '__main__':
 ''')
     
     print(f"\n🎉 Complete backup created!")
-    print(f"📄 Backup file: {backup_filename}")
+    print(f"📄 Backup directory: {backup_dirname}")
     print(f"🔧 Migration script: {migration_script}")
-    print(f"📊 Total records: {total_records}")
+    print(f"📊 Total records: {manifest['total_rows']}")
     print(f"📁 Location: {os.path.abspath(output_dir)}")
 
 if __name__ == '__main__':
-    export_all_data()
\ No newline at end of file
+    export_all_data()
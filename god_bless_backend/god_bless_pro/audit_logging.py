@@ -3,8 +3,12 @@ Audit logging system for security events and user actions.
 Tracks important security events for compliance and monitoring.
 """
 
+import atexit
 import json
 import logging
+import os
+import threading
+from collections import deque
 from datetime import datetime
 from typing import Optional, Dict, Any
 from django.conf import settings
@@ -68,6 +72,119 @@ class AuditEventType:
     CONFIGURATION_CHANGE = 'configuration_change'
 
 
+class AuditSink:
+    """
+    Buffered writer for activity records.
+    
+    Events are appended to a bounded in-process buffer and written with
+    bulk_create by a background thread, so requests never wait on the
+    insert. When the buffer is full, low-severity events are dropped and
+    high-severity ones evict the oldest low-severity entry instead.
+    """
+    
+    LOW_SEVERITIES = frozenset(['INFO', 'WARNING'])
+    
+    def __init__(self, capacity: int = 10000, batch_size: int = 500, flush_interval: float = 1.0):
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._buffer = deque()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._worker = None
+        self._worker_pid = None
+        self._buffer_pid = os.getpid()
+    
+    def enqueue(self, user_id: int, subject: str, body: str, severity: str = 'INFO') -> bool:
+        """Buffer an activity record; returns False if it was dropped"""
+        self._discard_inherited()
+        with self._lock:
+            if len(self._buffer) >= self.capacity:
+                if severity in self.LOW_SEVERITIES or not self._evict_low_severity():
+                    self.dropped += 1
+                    return False
+            self._buffer.append((user_id, subject, body, severity))
+            batch_ready = len(self._buffer) >= self.batch_size
+        
+        if not getattr(settings, 'AUDIT_LOG_ASYNC', True):
+            self.flush()
+            return True
+        
+        self._ensure_worker()
+        if batch_ready:
+            self._wakeup.set()
+        return True
+    
+    def _evict_low_severity(self) -> bool:
+        for index, event in enumerate(self._buffer):
+            if event[3] in self.LOW_SEVERITIES:
+                del self._buffer[index]
+                self.dropped += 1
+                return True
+        return False
+    
+    def flush(self) -> int:
+        """Write all buffered records; returns the number written"""
+        from activities.models import AllActivity
+        
+        self._discard_inherited()
+        written = 0
+        while True:
+            with self._lock:
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            if not batch:
+                return written
+            try:
+                AllActivity.objects.bulk_create([
+                    AllActivity(user_id=user_id, subject=subject, body=body)
+                    for user_id, subject, body, _ in batch
+                ])
+                written += len(batch)
+            except Exception as e:
+                # Don't fail if activity logging fails
+                logging.error(f"Failed to write {len(batch)} activity logs: {e}")
+    
+    def _discard_inherited(self) -> None:
+        # A forked process inherits the parent's pending records, which the parent writes itself
+        if self._buffer_pid == os.getpid():
+            return
+        with self._lock:
+            if self._buffer_pid != os.getpid():
+                self._buffer = deque()
+                self._buffer_pid = os.getpid()
+    
+    def _ensure_worker(self) -> None:
+        # A forked worker process inherits the buffer but not the thread
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == os.getpid():
+                return
+            self._worker_pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name='audit-sink', daemon=True)
+            self._worker.start()
+    
+    def _run(self) -> None:
+        from django.db import close_old_connections
+        
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                close_old_connections()
+
+
+audit_sink = AuditSink(
+    capacity=getattr(settings, 'AUDIT_BUFFER_SIZE', 10000),
+    batch_size=getattr(settings, 'AUDIT_BATCH_SIZE', 500),
+    flush_interval=getattr(settings, 'AUDIT_FLUSH_INTERVAL', 1.0),
+)
+atexit.register(audit_sink.flush)
+
+
 class AuditLogger:
     """Centralized audit logging"""
     
@@ -127,18 +244,14 @@ class AuditLogger:
         else:
             audit_logger.info(log_message)
         
-        # Store in database (optional - create AuditLog model if needed)
-        try:
-            from activities.models import AllActivity
-            if user:
-                AllActivity.objects.create(
-                    user=user,
-                    subject=event_type,
-                    body=json.dumps(details) if details else ''
-                )
-        except Exception as e:
-            # Don't fail if activity logging fails
-            logging.error(f"Failed to create activity log: {e}")
+        # Store in database (buffered, written in batches off the request path)
+        if user:
+            audit_sink.enqueue(
+                user.id,
+                event_type,
+                json.dumps(details) if details else '',
+                severity
+            )
     
     @staticmethod
     def log_authentication(event_type: str, user: Optional[User], request, success: bool = True, reason: Optional[str] = None):
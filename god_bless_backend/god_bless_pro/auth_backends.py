@@ -10,7 +10,11 @@ from django.contrib.auth import get_user_model
 from django.core.cache import cache
 from django.utils import timezone
 from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
 from god_bless_pro.audit_logging import AuditLogger, AuditEventType
+from god_bless_pro.auth_cache import get_token_entry, token_usage_buffer, get_client_ip
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -323,30 +327,50 @@ class TokenAuthenticationBackend:
         return timezone.now() > expiry_time
     
     def _record_token_usage(self, token_obj, request):
-        """Record token usage for monitoring."""
-        usage_cache_key = f"token_usage:{token_obj.key}"
-        usage_data = {
-            'last_used': timezone.now().isoformat(),
-            'ip': self._get_client_ip(request),
-            'user_agent': request.META.get('HTTP_USER_AGENT', '')[:200] if request else '',
-        }
-        cache.set(usage_cache_key, usage_data, timeout=86400)  # 24 hours
+        """Record token usage for monitoring (buffered, flushed in batches)."""
+        token_usage_buffer.record(token_obj.key, request)
     
     def _get_client_ip(self, request):
         """Get client IP address from request."""
-        if not request:
-            return 'unknown'
-        
-        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-        if x_forwarded_for:
-            ip = x_forwarded_for.split(',')[0].strip()
-        else:
-            ip = request.META.get('REMOTE_ADDR', 'unknown')
-        return ip
+        return get_client_ip(request)
     
     def get_user(self, user_id):
         """Get user by ID."""
         try:
             return User.objects.get(pk=user_id)
         except User.DoesNotExist:
-            return None
\ No newline at end of file
+            return None
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    DRF token authentication backed by the auth cache.
+    
+    Resolves the token to its user without a Token/User query on cache
+    hits, and exposes the user's projects as ``request.auth_projects`` for
+    get_request_project().
+    """
+    
+    def authenticate(self, request):
+        self._request = request
+        try:
+            return super().authenticate(request)
+        finally:
+            self._request = None
+    
+    def authenticate_credentials(self, key):
+        from rest_framework.authtoken.models import Token
+        
+        entry = get_token_entry(key)
+        if entry is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        
+        user = entry['user']
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        
+        request = getattr(self, '_request', None)
+        if request is not None:
+            request.auth_projects = entry['projects']
+            token_usage_buffer.record(key, request)
+        
+        return (user, Token(key=key, user=user))
@@ -0,0 +1,213 @@
+"""
+Cached token -> user resolution for API authentication.
+Keeps the authenticated user and their projects in a short-TTL in-process
+LRU, so authenticated requests skip the Token/User join and the per-view
+User/Project lookups. The shared cache only holds the token's user pk, the
+fields authentication checks and the project ids; a process that misses
+its LRU reloads the objects by primary key.
+"""
+import copy
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from god_bless_pro.cache import LocalLRUCache
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "auth_token:"
+
+
+_local_cache = LocalLRUCache(
+    maxsize=getattr(settings, 'AUTH_TOKEN_LOCAL_CACHE_SIZE', 1024),
+    ttl=getattr(settings, 'AUTH_TOKEN_LOCAL_CACHE_TTL', 5),
+)
+
+
+def _cache_key(token_key: str) -> str:
+    return CACHE_PREFIX + hashlib.sha256(token_key.encode()).hexdigest()
+
+
+def _load_entry(token_key: str) -> Optional[Dict[str, Any]]:
+    from rest_framework.authtoken.models import Token
+    from projects.models import Project
+
+    try:
+        token = Token.objects.select_related('user').get(key=token_key)
+    except Token.DoesNotExist:
+        return None
+    projects = {project.pk: project for project in Project.objects.filter(user=token.user)}
+    return {'user': token.user, 'projects': projects}
+
+
+def _shared_entry(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of an entry kept in the shared cache; no credentials or project data"""
+    user = entry['user']
+    return {
+        'user_pk': user.pk,
+        'user_id': user.user_id,
+        'is_active': user.is_active,
+        'project_ids': list(entry['projects']),
+    }
+
+
+def _rebuild_entry(shared: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    from django.contrib.auth import get_user_model
+    from projects.models import Project
+
+    User = get_user_model()
+    if not shared['is_active']:
+        # Authentication rejects the user, so there is nothing else to load
+        return {'user': User(pk=shared['user_pk'], user_id=shared['user_id'], is_active=False), 'projects': {}}
+    try:
+        user = User.objects.get(pk=shared['user_pk'])
+    except User.DoesNotExist:
+        return None
+    projects = {
+        project.pk: project
+        for project in Project.objects.filter(user=user, id__in=shared['project_ids'])
+    }
+    return {'user': user, 'projects': projects}
+
+
+def get_token_entry(token_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Cached ``{'user': User, 'projects': {id: Project}}`` for a token,
+    or None for an unknown token. Returned objects are copies, so views
+    may modify them freely.
+    """
+    key = _cache_key(token_key)
+    entry = _local_cache.get(key)
+    if entry is None:
+        try:
+            shared = cache.get(key)
+        except Exception as e:
+            # Authentication must keep working without the shared cache
+            logger.warning(f"Auth cache unavailable: {e}")
+            shared = None
+        entry = _rebuild_entry(shared) if shared is not None else None
+        if entry is None:
+            entry = _load_entry(token_key)
+            if entry is None:
+                return None
+            try:
+                cache.set(key, _shared_entry(entry), timeout=getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 60))
+            except Exception as e:
+                logger.warning(f"Auth cache unavailable: {e}")
+        _local_cache.set(key, entry)
+
+    return {
+        'user': copy.copy(entry['user']),
+        'projects': {pk: copy.copy(project) for pk, project in entry['projects'].items()},
+    }
+
+
+def invalidate_token(token_key: str) -> None:
+    """Drop a token's cached entry (token revoked or regenerated)"""
+    key = _cache_key(token_key)
+    _local_cache.delete(key)
+    try:
+        cache.delete(key)
+    except Exception as e:
+        logger.warning(f"Auth cache unavailable: {e}")
+
+
+def invalidate_user(user_pk: int) -> None:
+    """Drop cached entries for a user's tokens (user or project changed)"""
+    from rest_framework.authtoken.models import Token
+
+    for token_key in Token.objects.filter(user_id=user_pk).values_list('key', flat=True):
+        invalidate_token(token_key)
+
+
+def get_request_user(request, user_id):
+    """
+    The user with the given public ``user_id``, reusing the authenticated
+    user when it matches. Raises User.DoesNotExist like a direct lookup.
+    """
+    from django.contrib.auth import get_user_model
+
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and user_id and user.user_id == user_id:
+        return user
+    return get_user_model().objects.get(user_id=user_id)
+
+
+def get_request_project(request, project_id):
+    """
+    The project with the given id, served from the authenticated user's
+    cached projects when it is one of theirs. Raises Project.DoesNotExist
+    like a direct lookup.
+    """
+    from projects.models import Project
+
+    projects = getattr(request, 'auth_projects', None) or {}
+    try:
+        project = projects.get(int(project_id))
+    except (TypeError, ValueError):
+        project = None
+    if project is not None:
+        return project
+    return Project.objects.get(id=project_id)
+
+
+class TokenUsageBuffer:
+    """
+    Collects per-token usage records and writes them to the cache in one
+    set_many call at most once per flush interval.
+    """
+
+    def __init__(self, flush_interval: float = 10.0, clock=time.monotonic):
+        self.flush_interval = flush_interval
+        self.clock = clock
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._last_flush = clock()
+
+    def record(self, token_key: str, request) -> None:
+        usage_data = {
+            'last_used': timezone.now().isoformat(),
+            'ip': get_client_ip(request),
+            'user_agent': request.META.get('HTTP_USER_AGENT', '')[:200] if request else '',
+        }
+        with self._lock:
+            self._pending[f"token_usage:{token_key}"] = usage_data
+            due = self.clock() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self) -> int:
+        """Write pending usage records; returns how many were written"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = self.clock()
+        if pending:
+            try:
+                cache.set_many(pending, timeout=86400)  # 24 hours
+            except Exception as e:
+                logger.error(f"Failed to record token usage: {e}")
+        return len(pending)
+
+
+token_usage_buffer = TokenUsageBuffer(
+    flush_interval=getattr(settings, 'AUTH_TOKEN_USAGE_FLUSH_INTERVAL', 10)
+)
+
+
+def get_client_ip(request):
+    """Get client IP address from request."""
+    if not request:
+        return 'unknown'
+
+    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+    if x_forwarded_for:
+        ip = x_forwarded_for.split(',')[0].strip()
+    else:
+        ip = request.META.get('REMOTE_ADDR', 'unknown')
+    return ip
@@ -0,0 +1,442 @@
+"""
+End-to-end benchmarks for the phone number and SMS send pipelines.
+
+Each stage runs the real Celery task body in-process (Task.apply() with
+an in-memory result backend) against seeded data owned by a throwaway
+benchmark user, which is deleted afterwards. The send pipeline talks to a
+local aiosmtpd sink and a stub HTTP proxy, so no mail leaves the machine.
+
+Reported per stage: items processed, wall time, throughput and p50/p99
+latency. Latency is per task run for the phone stages and per message
+(SMSMessage.total_processing_time) for the campaign stage.
+"""
+import json
+import math
+import platform
+import smtplib
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test.utils import override_settings
+from django.utils import timezone
+
+User = get_user_model()
+
+GENERATE = 'generate'
+VALIDATE = 'validate'
+EXPORT = 'export'
+IMPORT = 'import'
+CAMPAIGN = 'campaign'
+
+STAGES = (GENERATE, VALIDATE, EXPORT, IMPORT, CAMPAIGN)
+
+# Area codes kept apart so stages never collide on the unique phone_number
+SEED_AREA_CODE = '201'
+GENERATE_AREA_CODE = '202'
+IMPORT_AREA_CODE = '203'
+
+# Fetched through the stub proxy; plain HTTP so the proxy can answer it itself
+PROXY_CHECK_URL = 'http://proxy-check.benchmark/ip'
+
+
+def percentile(samples: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = math.ceil(fraction * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def summarize(items: int, seconds: float, latencies: List[float], runs: int, latency_unit: str) -> dict:
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        'runs': runs,
+        'items': items,
+        'seconds': round(seconds, 3),
+        'throughput_per_sec': round(items / seconds, 2) if seconds > 0 else None,
+        'latency_unit': latency_unit,
+        'latency_ms': {
+            'p50': ms(percentile(latencies, 0.50)),
+            'p99': ms(percentile(latencies, 0.99)),
+            'mean': ms(sum(latencies) / len(latencies)) if latencies else None,
+            'max': ms(max(latencies)) if latencies else None,
+        },
+    }
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class SMTPSink:
+    """Local aiosmtpd server that accepts any login and discards messages."""
+
+    def __init__(self, host: str = '127.0.0.1'):
+        self.host = host
+        self.port = _free_port()
+        self.received = 0
+        self._controller = None
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return '250 Message accepted for delivery'
+
+    def __enter__(self):
+        from aiosmtpd.controller import Controller
+        from aiosmtpd.smtp import AuthResult
+
+        self._controller = Controller(
+            self,
+            hostname=self.host,
+            port=self.port,
+            authenticator=lambda *args: AuthResult(success=True),
+            auth_require_tls=False,
+        )
+        self._controller.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._controller.stop()
+        return False
+
+
+class _PlainSMTP(smtplib.SMTP):
+    """Stands in for SMTP_SSL; the sink speaks plain SMTP so TLS is not measured."""
+
+    def __init__(self, host='', port=0, context=None, **kwargs):
+        super().__init__(host, port, **kwargs)
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests += 1
+        body = b'{"origin": "127.0.0.1"}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubProxy:
+    """HTTP proxy that answers every request itself with 200."""
+
+    def __init__(self, host: str = '127.0.0.1'):
+        self._server = ThreadingHTTPServer((host, 0), _ProxyHandler)
+        self._server.requests = 0
+        self.host, self.port = self._server.server_address
+        self._thread = None
+
+    @property
+    def requests(self) -> int:
+        return self._server.requests
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name='stub-proxy', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._server.shutdown()
+        self._server.server_close()
+        return False
+
+
+@contextmanager
+def in_memory_results():
+    """Keep task state and results in memory; tasks are run with Task.apply()."""
+    from celery.backends.cache import CacheBackend
+    from god_bless_pro.celery import app
+
+    backend = CacheBackend(app=app, url='memory://')
+    with mock.patch.object(type(app), 'backend', new_callable=mock.PropertyMock, return_value=backend):
+        yield
+
+
+def isolated_services():
+    """Process-local cache and channel layer, for running without Redis."""
+    return override_settings(
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+        CHANNEL_LAYERS={'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}},
+    )
+
+
+class BenchmarkRunner:
+    """Seeds data for one benchmark run and times each pipeline stage."""
+
+    def __init__(self, numbers: int = 1000, messages: int = 100, iterations: int = 3,
+                 log: Callable[[str], None] = None):
+        self.numbers = numbers
+        self.messages = messages
+        self.iterations = iterations
+        self.log = log or (lambda message: None)
+        self.user = None
+        self.project = None
+        self.seeded_ids = []
+        self._created_prefixes = []
+        self._export_files = []
+
+    def seed(self) -> None:
+        from phone_generator.models import PhoneNumber
+        from phone_number_validator.models import PhonePrefix, prefix_cache
+        from projects.models import Project
+
+        suffix = uuid.uuid4().hex[:8]
+        self.user = User.objects.create_user(
+            email=f'benchmark-{suffix}@example.invalid',
+            username=f'benchmark_{suffix}',
+            password=uuid.uuid4().hex,
+        )
+        self.project = Project.objects.create(user=self.user, project_name=f'Benchmark {suffix}')
+
+        # Prefixes the validation stage resolves against; existing rows are reused
+        wanted = [f'{SEED_AREA_CODE}{exchange}' for exchange in range(200, 1000)]
+        existing = set(PhonePrefix.objects.filter(prefix__in=wanted).values_list('prefix', flat=True))
+        missing = [prefix for prefix in wanted if prefix not in existing]
+        PhonePrefix.objects.bulk_create([
+            PhonePrefix(prefix=prefix, carrier='Verizon', city='Newark', state='New Jersey', line_type='Mobile')
+            for prefix in missing
+        ], ignore_conflicts=True)
+        self._created_prefixes = missing
+        prefix_cache.clear()
+
+        PhoneNumber.objects.bulk_create([
+            PhoneNumber(
+                user=self.user,
+                project=self.project,
+                phone_number=self._number(SEED_AREA_CODE, index),
+                area_code=SEED_AREA_CODE,
+                status='pending',
+            )
+            for index in range(self.numbers)
+        ], batch_size=1000, ignore_conflicts=True)
+        self.seeded_ids = list(
+            PhoneNumber.objects.filter(project=self.project).order_by('id').values_list('id', flat=True)
+        )
+        self.log(f"Seeded {len(self.seeded_ids)} numbers for {self.user.username}")
+
+    @staticmethod
+    def _number(area_code: str, index: int) -> str:
+        exchange, line = divmod(index, 8000)
+        return f"1{area_code}{200 + exchange % 800}{2000 + line}"
+
+    def cleanup(self) -> None:
+        from phone_number_validator.models import PhonePrefix, prefix_cache
+
+        for path in self._export_files:
+            default_storage.delete(path)
+        if self._created_prefixes:
+            PhonePrefix.objects.filter(prefix__in=self._created_prefixes).delete()
+            prefix_cache.clear()
+        if self.user is not None:
+            self.user.delete()
+
+    def _time_runs(self, run: Callable[[int], int]) -> dict:
+        latencies = []
+        items = 0
+        for iteration in range(self.iterations):
+            start = time.perf_counter()
+            items += run(iteration)
+            latencies.append(time.perf_counter() - start)
+        return summarize(items, sum(latencies), latencies, self.iterations, 'run')
+
+    def bench_generate(self) -> dict:
+        from phone_generator.tasks import generate_phone_numbers_task
+
+        def run(iteration):
+            result = generate_phone_numbers_task.apply(kwargs={
+                'user_id': self.user.user_id,
+                'project_id': self.project.id,
+                'area_code': GENERATE_AREA_CODE,
+                'quantity': self.numbers,
+            }).get()
+            return result['total_generated']
+
+        return self._time_runs(run)
+
+    def bench_validate(self) -> dict:
+        from phone_generator.tasks import validate_phone_numbers_task
+
+        def run(iteration):
+            result = validate_phone_numbers_task.apply(kwargs={
+                'user_id': self.user.user_id,
+                'phone_ids': self.seeded_ids,
+            }).get()
+            return result['validated_count']
+
+        return self._time_runs(run)
+
+    def bench_export(self) -> dict:
+        from phone_generator.tasks import export_phone_numbers_task
+
+        def run(iteration):
+            result = export_phone_numbers_task.apply(kwargs={
+                'user_id': self.user.user_id,
+                'project_id': self.project.id,
+                'format': 'csv',
+                'filters': {'area_code': SEED_AREA_CODE},
+            }).get()
+            self._export_files.append(result['file_path'])
+            return result['total_records']
+
+        return self._time_runs(run)
+
+    def bench_import(self) -> dict:
+        from phone_generator.tasks import import_phone_numbers_task
+
+        def run(iteration):
+            offset = iteration * self.numbers
+            rows = '\n'.join(
+                f"{self._number(IMPORT_AREA_CODE, offset + index)},Verizon,mobile"
+                for index in range(self.numbers)
+            )
+            result = import_phone_numbers_task.apply(kwargs={
+                'user_id': self.user.user_id,
+                'project_id': self.project.id,
+                'file_content': 'phone_number,carrier,type\n' + rows,
+                'file_format': 'csv',
+            }).get()
+            return result['imported']
+
+        return self._time_runs(run)
+
+    def bench_campaign(self) -> dict:
+        from proxy_server.models import ProxyServer, RotationSettings
+        from sms_sender.enhanced_tasks import process_enhanced_sms_campaign_task
+        from sms_sender.models import SMSCampaign, SMSMessage
+        from smtps.models import SmtpManager
+
+        # The pipeline's pacing delays would dominate; measure the work only
+        RotationSettings.objects.update_or_create(user=self.user, defaults={'delivery_delay_enabled': False})
+
+        numbers = list(
+            self.project.user_projectss.order_by('id').values_list('phone_number', flat=True)[:self.messages]
+        )
+        latencies = []
+        items = 0
+        seconds = 0.0
+
+        with SMTPSink() as sink, StubProxy() as proxy, \
+                mock.patch.object(smtplib, 'SMTP_SSL', _PlainSMTP), \
+                override_settings(PROXY_CHECK_URL=PROXY_CHECK_URL):
+            SmtpManager.objects.create(
+                user=self.user, host=sink.host, port=str(sink.port), username='benchmark@example.invalid',
+                password='benchmark', ssl=True,
+            )
+            ProxyServer.objects.create(user=self.user, host=proxy.host, port=proxy.port)
+
+            for iteration in range(self.iterations):
+                campaign = SMSCampaign.objects.create(
+                    user=self.user,
+                    name=f'Benchmark campaign {iteration + 1}',
+                    message_template='Benchmark message',
+                    target_carrier='Verizon',
+                )
+                SMSMessage.objects.bulk_create([
+                    SMSMessage(campaign=campaign, phone_number=number, message_content='Benchmark message')
+                    for number in numbers
+                ])
+
+                start = time.perf_counter()
+                process_enhanced_sms_campaign_task.apply(kwargs={'campaign_id': campaign.id}).get()
+                seconds += time.perf_counter() - start
+
+                sent = campaign.messages.filter(delivery_status='sent')
+                items += sent.count()
+                latencies.extend(
+                    value for value in sent.values_list('total_processing_time', flat=True) if value is not None
+                )
+
+            self.log(f"SMTP sink accepted {sink.received} messages, proxy answered {proxy.requests} checks")
+
+        return summarize(items, seconds, latencies, self.iterations, 'message')
+
+    def run(self, stages=STAGES) -> Dict[str, dict]:
+        benches = {
+            GENERATE: self.bench_generate,
+            VALIDATE: self.bench_validate,
+            EXPORT: self.bench_export,
+            IMPORT: self.bench_import,
+            CAMPAIGN: self.bench_campaign,
+        }
+        results = {}
+        with in_memory_results():
+            for stage in STAGES:
+                if stage not in stages:
+                    continue
+                self.log(f"Running {stage}...")
+                results[stage] = benches[stage]()
+        return results
+
+
+def run_benchmarks(numbers: int = 1000, messages: int = 100, iterations: int = 3,
+                   stages=STAGES, keep_data: bool = False, log: Callable[[str], None] = None) -> dict:
+    """
+    Seed data, run the requested stages and return a JSON-serializable report.
+
+    Args:
+        numbers: Phone numbers seeded, generated and imported per run
+        messages: Messages per benchmark campaign
+        iterations: Runs per stage
+        stages: Subset of STAGES to run
+        keep_data: Leave the benchmark user and its data in place
+    """
+    runner = BenchmarkRunner(numbers=numbers, messages=messages, iterations=iterations, log=log)
+    started_at = timezone.now()
+    try:
+        runner.seed()
+        results = runner.run(stages)
+    finally:
+        if not keep_data:
+            runner.cleanup()
+
+    return {
+        'started_at': started_at.isoformat(),
+        'config': {'numbers': numbers, 'messages': messages, 'iterations': iterations},
+        'environment': {
+            'python': platform.python_version(),
+            'database': connection.vendor,
+            'cache': settings.CACHES['default']['BACKEND'],
+        },
+        'results': results,
+    }
+
+
+def compare_reports(baseline: dict, current: dict) -> Dict[str, dict]:
+    """Throughput and p99 change per stage, as percentages of the baseline."""
+    def change(old, new):
+        return round((new - old) / old * 100, 1) if old and new is not None else None
+
+    comparison = {}
+    for stage, result in current['results'].items():
+        previous = baseline.get('results', {}).get(stage)
+        if not previous:
+            continue
+        comparison[stage] = {
+            'throughput_change_pct': change(previous['throughput_per_sec'], result['throughput_per_sec']),
+            'p99_change_pct': change(previous['latency_ms']['p99'], result['latency_ms']['p99']),
+        }
+    return comparison
+
+
+def load_report(path: str) -> dict:
+    with open(path) as handle:
+        return json.load(handle)
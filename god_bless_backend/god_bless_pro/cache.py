@@ -1,13 +1,22 @@
 """
 Redis caching utilities for frequently accessed data.
 """
+import copy
 import json
 import hashlib
+import logging
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
 from functools import wraps
-from typing import Any, Optional, Callable
+from typing import Any, Optional, Callable, Iterable, Union
 from django.core.cache import cache
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
 
 class CacheManager:
     """Manager for Redis caching operations."""
@@ -65,7 +74,11 @@ class CacheManager:
     
     @staticmethod
     def delete_pattern(pattern: str) -> bool:
-        """Delete all keys matching pattern."""
+        """
+        Delete all keys matching pattern.
+        Scans the whole keyspace on Redis and does nothing on other backends;
+        prefer CacheNamespace.bump() for invalidating groups of keys.
+        """
         try:
             if hasattr(cache, 'delete_pattern'):
                 cache.delete_pattern(pattern)
@@ -85,6 +98,352 @@ class CacheManager:
             return False
 
 
+class CacheNamespace:
+    """
+    Generation counters for groups of cache keys.
+    
+    Every (resource, user, project) namespace has a version key whose value
+    is embedded in the keys stored under it. Invalidating a namespace is a
+    single INCR of its version; entries written under older versions are
+    never read again and simply expire. Bumping a user's namespace also
+    invalidates the project namespaces beneath it, and bumping a project
+    also invalidates the user's entries that span all of their projects.
+    
+    Usage:
+        key = CacheNamespace.make_key(CacheNamespace.PHONE_NUMBERS, "stats", user_id=1)
+        CacheNamespace.bump(CacheNamespace.PHONE_NUMBERS, user_id=1)
+    """
+    
+    PREFIX = "ns:"
+    
+    # Project slot of user-wide entries that aggregate every project
+    ALL_PROJECTS = "*"
+    
+    # Resources
+    PHONE_NUMBERS = "phone_numbers"
+    CAMPAIGNS = "campaigns"
+    SETTINGS = "settings"
+    
+    @classmethod
+    def version_key(cls, resource: str, user_id=None, project_id=None) -> str:
+        """Cache key holding the version of a namespace."""
+        parts = [resource]
+        if user_id is not None:
+            parts.append(f"u{user_id}")
+            if project_id is not None:
+                parts.append(f"p{project_id}")
+        return cls.PREFIX + ":".join(parts)
+    
+    @classmethod
+    def _scope_keys(cls, resource: str, user_id=None, project_id=None) -> list:
+        """Version keys from the resource-wide namespace down to the given scope."""
+        keys = [cls.version_key(resource)]
+        if user_id is not None:
+            keys.append(cls.version_key(resource, user_id))
+            keys.append(cls.version_key(
+                resource, user_id, cls.ALL_PROJECTS if project_id is None else project_id
+            ))
+        return keys
+    
+    @staticmethod
+    def _initial_version() -> int:
+        # Seeding from the clock keeps a version key that was evicted from
+        # resurrecting entries written under its previous values
+        return int(time.time() * 1000)
+    
+    @classmethod
+    def get_versions(cls, version_keys: Iterable[str]) -> dict:
+        """Current versions for the given version keys, creating missing ones."""
+        version_keys = list(version_keys)
+        try:
+            versions = cache.get_many(version_keys)
+            for key in version_keys:
+                if key not in versions:
+                    initial = cls._initial_version()
+                    if not cache.add(key, initial, timeout=None):
+                        initial = cache.get(key, initial)
+                    versions[key] = initial
+            return versions
+        except Exception as e:
+            print(f"Cache namespace error: {e}")
+            return {key: 0 for key in version_keys}
+    
+    @classmethod
+    def make_key(cls, resources: Union[str, Iterable[str]], key: str,
+                 user_id=None, project_id=None) -> str:
+        """
+        Cache key for ``key`` under the given resource namespaces. Pass
+        several resources for entries derived from more than one of them.
+        """
+        if isinstance(resources, str):
+            resources = (resources,)
+        version_keys = []
+        for resource in resources:
+            version_keys.extend(cls._scope_keys(resource, user_id, project_id))
+        versions = cls.get_versions(version_keys)
+        stamp = ".".join(str(versions[version_key]) for version_key in version_keys)
+        return f"{'+'.join(resources)}:{stamp}:{key}"
+    
+    @classmethod
+    def bump(cls, resource: str, user_id=None, project_id=None) -> bool:
+        """Invalidate every entry stored under a namespace."""
+        version_keys = [cls.version_key(resource, user_id, project_id)]
+        if user_id is not None and project_id is not None:
+            version_keys.append(cls.version_key(resource, user_id, cls.ALL_PROJECTS))
+        try:
+            for version_key in version_keys:
+                try:
+                    cache.incr(version_key)
+                except ValueError:
+                    # No version yet, so nothing can be cached under it
+                    cache.add(version_key, cls._initial_version(), timeout=None)
+            return True
+        except Exception as e:
+            print(f"Cache namespace error: {e}")
+            return False
+
+
+def get_redis_client():
+    """
+    Raw client behind Django's RedisCache, or None for other backends
+    (e.g. LocMemCache).
+    """
+    client = getattr(cache, '_cache', None)
+    if client is None or not hasattr(client, 'get_client') or not hasattr(cache, 'make_and_validate_key'):
+        return None
+    try:
+        return client.get_client(write=True)
+    except Exception:
+        return None
+
+
+class LocalLRUCache:
+    """Thread-safe in-process LRU with a per-entry TTL"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 5.0, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires <= self.clock():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = (self.clock() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheInvalidationListener:
+    """
+    Redis pub/sub channel that tells every process to drop entries from
+    their local tiers. The subscriber runs in a daemon thread, started
+    lazily in each (forked) process that uses a two-tier cache.
+    """
+    
+    CHANNEL = "cache_invalidation"
+    RETRY_DELAY = 5
+    
+    def __init__(self):
+        self._pid = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _origin() -> str:
+        return f"{socket.gethostname()}:{os.getpid()}"
+    
+    def publish(self, name: str, key: Optional[str]) -> None:
+        """Announce that ``key`` (or the whole cache when None) changed."""
+        client = get_redis_client()
+        if client is None:
+            return
+        try:
+            client.publish(self.CHANNEL, json.dumps({'cache': name, 'key': key, 'origin': self._origin()}))
+        except Exception as e:
+            logger.warning(f"Cache invalidation publish failed: {e}")
+    
+    def ensure_started(self) -> None:
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            if get_redis_client() is None:
+                return
+            thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+            thread.start()
+    
+    def handle(self, data) -> None:
+        try:
+            message = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        tier = _two_tier_caches.get(message.get('cache'))
+        if tier is None or message.get('origin') == self._origin():
+            # Our own writes were already applied locally
+            return
+        if message.get('key') is None:
+            tier.local.clear()
+        else:
+            tier.local.delete(message['key'])
+    
+    def _run(self) -> None:
+        while True:
+            try:
+                pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.CHANNEL)
+                # Anything could have changed while we were not listening
+                for tier in list(_two_tier_caches.values()):
+                    tier.local.clear()
+                for message in pubsub.listen():
+                    self.handle(message.get('data'))
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error: {e}")
+                time.sleep(self.RETRY_DELAY)
+
+
+invalidation_listener = CacheInvalidationListener()
+
+_two_tier_caches = {}
+
+
+class TwoTierCache:
+    """
+    Bounded per-process LRU in front of the shared (Redis) cache, for hot
+    reference data read on every message or request.
+    
+    Reads try the local tier, then the shared tier, then the loader.
+    Writes and deletes go to both tiers and are broadcast over pub/sub so
+    other processes drop their local copies; the local TTL bounds
+    staleness if a message is missed. None is a cacheable value, and
+    values are copied on read so callers may modify them freely.
+    
+    Usage:
+        prefixes = TwoTierCache("phone_prefix", local_ttl=300)
+        record = prefixes.get_or_set(prefix, lambda: load_prefix(prefix))
+        prefixes.delete(prefix)
+    """
+    
+    def __init__(self, name: str, local_maxsize: int = 1024, local_ttl: float = 30,
+                 timeout: int = CacheManager.TIMEOUT_MEDIUM, clock=time.monotonic):
+        self.name = name
+        self.timeout = timeout
+        self.local = LocalLRUCache(maxsize=local_maxsize, ttl=local_ttl, clock=clock)
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        _two_tier_caches[name] = self
+    
+    def _shared_key(self, key: str) -> str:
+        return CacheNamespace.make_key(f"two_tier:{self.name}", key)
+    
+    def _lookup(self, key: str):
+        """The cached ``(value,)`` for a key, or None on a miss in both tiers."""
+        invalidation_listener.ensure_started()
+        entry = self.local.get(key)
+        if entry is not None:
+            self.local_hits += 1
+            return entry
+        try:
+            entry = cache.get(self._shared_key(key))
+        except Exception as e:
+            logger.warning(f"Shared cache unavailable: {e}")
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.shared_hits += 1
+        self.local.set(key, entry)
+        return entry
+    
+    def get(self, key, default: Any = None) -> Any:
+        """Get a value from the nearest tier holding it."""
+        entry = self._lookup(str(key))
+        return default if entry is None else copy.copy(entry[0])
+    
+    def get_or_set(self, key, loader: Callable[[], Any]) -> Any:
+        """Get a value, loading and caching it on a miss."""
+        key = str(key)
+        entry = self._lookup(key)
+        if entry is None:
+            entry = (loader(),)
+            self._store(key, entry)
+        return copy.copy(entry[0])
+    
+    def set(self, key, value: Any) -> None:
+        """Replace a value in both tiers and in other processes."""
+        key = str(key)
+        self._store(key, (value,))
+        invalidation_listener.publish(self.name, key)
+    
+    def _store(self, key: str, entry) -> None:
+        self.local.set(key, entry)
+        try:
+            cache.set(self._shared_key(key), entry, self.timeout)
+        except Exception as e:
+            logger.warning(f"Shared cache unavailable: {e}")
+    
+    def delete(self, key) -> None:
+        """Drop a value from both tiers and from other processes."""
+        key = str(key)
+        self.local.delete(key)
+        try:
+            cache.delete(self._shared_key(key))
+        except Exception as e:
+            logger.warning(f"Shared cache unavailable: {e}")
+        invalidation_listener.publish(self.name, key)
+    
+    def clear(self) -> None:
+        """Drop every value, e.g. after a bulk load of the underlying data."""
+        self.local.clear()
+        CacheNamespace.bump(f"two_tier:{self.name}")
+        invalidation_listener.publish(self.name, None)
+    
+    def stats(self) -> dict:
+        """Hit counters and ratios for this process."""
+        hits = self.local_hits + self.shared_hits
+        lookups = hits + self.misses
+        return {
+            'name': self.name,
+            'local_hits': self.local_hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+            'local_hit_ratio': round(self.local_hits / lookups, 4) if lookups else 0.0,
+            'local_size': len(self.local),
+        }
+
+
+def two_tier_cache_stats() -> list:
+    """Hit-ratio metrics for every two-tier cache in this process."""
+    return [tier.stats() for tier in _two_tier_caches.values()]
+
+
 def cache_result(timeout: int = CacheManager.TIMEOUT_MEDIUM, key_prefix: str = ""):
     """
     Decorator to cache function results.
@@ -98,7 +457,10 @@ def cache_result(timeout: int = CacheManager.TIMEOUT_MEDIUM, key_prefix: str = "
         @wraps(func)
         def wrapper(*args, **kwargs):
             # Generate cache key
-            cache_key = f"{key_prefix}:{func.__name__}:{CacheManager.generate_key(*args, **kwargs)}"
+            cache_key = CacheNamespace.make_key(
+                key_prefix or func.__name__,
+                f"{func.__name__}:{CacheManager.generate_key(*args, **kwargs)}"
+            )
             
             # Try to get from cache
             cached_value = CacheManager.get(cache_key)
@@ -128,8 +490,8 @@ def invalidate_cache(key_prefix: str):
         @wraps(func)
         def wrapper(*args, **kwargs):
             result = func(*args, **kwargs)
-            # Invalidate cache pattern
-            CacheManager.delete_pattern(f"{key_prefix}:*")
+            # Invalidate everything cached under the prefix
+            CacheNamespace.bump(key_prefix)
             return result
         return wrapper
     return decorator
@@ -143,13 +505,13 @@ class PhoneNumberCache:
     @staticmethod
     def get_carrier_stats(user_id: int) -> Optional[dict]:
         """Get cached carrier statistics."""
-        key = f"{CacheManager.PREFIX_CARRIER}stats:{user_id}"
+        key = CacheNamespace.make_key(CacheNamespace.PHONE_NUMBERS, "carrier_stats", user_id)
         return CacheManager.get(key)
     
     @staticmethod
     def set_carrier_stats(user_id: int, stats: dict, timeout: int = CacheManager.TIMEOUT_MEDIUM):
         """Cache carrier statistics."""
-        key = f"{CacheManager.PREFIX_CARRIER}stats:{user_id}"
+        key = CacheNamespace.make_key(CacheNamespace.PHONE_NUMBERS, "carrier_stats", user_id)
         CacheManager.set(key, stats, timeout)
     
     @staticmethod
@@ -165,10 +527,9 @@ class PhoneNumberCache:
         CacheManager.set(key, result, timeout)
     
     @staticmethod
-    def invalidate_user_phones(user_id: int):
-        """Invalidate all phone-related cache for a user."""
-        CacheManager.delete_pattern(f"{CacheManager.PREFIX_PHONE}*:{user_id}:*")
-        CacheManager.delete_pattern(f"{CacheManager.PREFIX_CARRIER}*:{user_id}:*")
+    def invalidate_user_phones(user_id: int, project_id: Optional[int] = None):
+        """Invalidate all phone-related cache for a user, or one of their projects."""
+        CacheNamespace.bump(CacheNamespace.PHONE_NUMBERS, user_id, project_id)
 
 
 class UserCache:
@@ -177,39 +538,41 @@ class UserCache:
     @staticmethod
     def get_settings(user_id: int) -> Optional[dict]:
         """Get cached user settings."""
-        key = f"{CacheManager.PREFIX_SETTINGS}{user_id}"
+        key = CacheNamespace.make_key(CacheNamespace.SETTINGS, "settings", user_id)
         return CacheManager.get(key)
     
     @staticmethod
     def set_settings(user_id: int, settings: dict, timeout: int = CacheManager.TIMEOUT_LONG):
         """Cache user settings."""
-        key = f"{CacheManager.PREFIX_SETTINGS}{user_id}"
+        key = CacheNamespace.make_key(CacheNamespace.SETTINGS, "settings", user_id)
         CacheManager.set(key, settings, timeout)
     
     @staticmethod
     def invalidate_settings(user_id: int):
         """Invalidate user settings cache."""
-        key = f"{CacheManager.PREFIX_SETTINGS}{user_id}"
-        CacheManager.delete(key)
+        CacheNamespace.bump(CacheNamespace.SETTINGS, user_id)
 
 
 class StatsCache:
     """Cache helpers for statistics and dashboard data."""
     
+    # Dashboard figures are derived from both phone numbers and campaigns
+    DASHBOARD_RESOURCES = (CacheNamespace.PHONE_NUMBERS, CacheNamespace.CAMPAIGNS)
+    
     @staticmethod
     def get_dashboard_stats(user_id: int) -> Optional[dict]:
         """Get cached dashboard statistics."""
-        key = f"{CacheManager.PREFIX_STATS}dashboard:{user_id}"
+        key = CacheNamespace.make_key(StatsCache.DASHBOARD_RESOURCES, "dashboard", user_id)
         return CacheManager.get(key)
     
     @staticmethod
     def set_dashboard_stats(user_id: int, stats: dict, timeout: int = CacheManager.TIMEOUT_SHORT):
         """Cache dashboard statistics."""
-        key = f"{CacheManager.PREFIX_STATS}dashboard:{user_id}"
+        key = CacheNamespace.make_key(StatsCache.DASHBOARD_RESOURCES, "dashboard", user_id)
         CacheManager.set(key, stats, timeout)
     
     @staticmethod
     def invalidate_dashboard_stats(user_id: int):
         """Invalidate dashboard statistics cache."""
-        key = f"{CacheManager.PREFIX_STATS}dashboard:{user_id}"
+        key = CacheNamespace.make_key(StatsCache.DASHBOARD_RESOURCES, "dashboard", user_id)
         CacheManager.delete(key)
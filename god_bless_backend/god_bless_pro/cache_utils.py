@@ -6,8 +6,14 @@ from django.core.cache import cache
 from django.conf import settings
 import hashlib
 import json
+import math
+import random
+import time
+import uuid
 from typing import Any, Callable, Optional
 
+from god_bless_pro.cache import CacheNamespace
+
 
 def generate_cache_key(prefix: str, *args, **kwargs) -> str:
     """
@@ -65,7 +71,7 @@ def cache_result(timeout: int = 300, key_prefix: Optional[str] = None):
         def wrapper(*args, **kwargs):
             # Generate cache key
             prefix = key_prefix or f"func:{func.__module__}.{func.__name__}"
-            cache_key = generate_cache_key(prefix, *args, **kwargs)
+            cache_key = CacheNamespace.make_key(prefix, generate_cache_key(prefix, *args, **kwargs))
             
             # Try to get from cache
             cached_value = cache.get(cache_key)
@@ -101,7 +107,7 @@ def cache_queryset(timeout: int = 300, key_prefix: Optional[str] = None):
         def wrapper(*args, **kwargs):
             # Generate cache key
             prefix = key_prefix or f"qs:{func.__module__}.{func.__name__}"
-            cache_key = generate_cache_key(prefix, *args, **kwargs)
+            cache_key = CacheNamespace.make_key(prefix, generate_cache_key(prefix, *args, **kwargs))
             
             # Try to get from cache
             cached_value = cache.get(cache_key)
@@ -120,6 +126,134 @@ def cache_queryset(timeout: int = 300, key_prefix: Optional[str] = None):
     return decorator
 
 
+# Stampede protection
+#
+# Protected entries are stored as {'value', 'soft_expires', 'delta'}
+# envelopes that outlive their soft TTL by ``stale_ttl`` seconds. Past the
+# soft TTL (or earlier, with probability growing as it approaches, scaled
+# by how long the value took to compute) one caller takes a short lock and
+# recomputes while everyone else keeps getting the stale value.
+
+REFRESH_LOCK_PREFIX = "refresh_lock:"
+
+
+def read_entry(cache_key: str) -> Optional[dict]:
+    """The stored envelope for a protected key, or None."""
+    entry = cache.get(cache_key)
+    if isinstance(entry, dict) and 'soft_expires' in entry:
+        return entry
+    return None
+
+
+def write_entry(cache_key: str, value: Any, timeout: int, stale_ttl: int, delta: float = 0.0) -> None:
+    """Store a value that is fresh for ``timeout`` and servable stale for ``stale_ttl`` more."""
+    entry = {'value': value, 'soft_expires': time.time() + timeout, 'delta': delta}
+    cache.set(cache_key, entry, timeout + stale_ttl)
+
+
+def needs_refresh(entry: dict, beta: float = 1.0) -> bool:
+    """
+    Whether this caller should recompute the entry: always once the soft
+    TTL has passed, and probabilistically shortly before (XFetch).
+    """
+    jitter = entry.get('delta', 0.0) * beta * -math.log(1.0 - random.random())
+    return time.time() + jitter >= entry['soft_expires']
+
+
+def acquire_refresh_lock(cache_key: str, lock_timeout: int = 30) -> Optional[str]:
+    """Take the single-flight lock for a key; returns the lock token or None."""
+    token = uuid.uuid4().hex
+    if cache.add(REFRESH_LOCK_PREFIX + cache_key, token, lock_timeout):
+        return token
+    return None
+
+
+def release_refresh_lock(cache_key: str, token: Optional[str]) -> None:
+    """Release a lock taken by acquire_refresh_lock, unless it has expired and moved on."""
+    if token and cache.get(REFRESH_LOCK_PREFIX + cache_key) == token:
+        cache.delete(REFRESH_LOCK_PREFIX + cache_key)
+
+
+def wait_for_entry(cache_key: str, wait_timeout: float = 5.0, interval: float = 0.05) -> Optional[dict]:
+    """Poll for an entry another caller is computing."""
+    deadline = time.monotonic() + wait_timeout
+    while time.monotonic() < deadline:
+        time.sleep(interval)
+        entry = read_entry(cache_key)
+        if entry is not None:
+            return entry
+    return None
+
+
+def get_or_compute(cache_key: str, compute: Callable[[], Any], timeout: int = 300,
+                   stale_ttl: Optional[int] = None, lock_timeout: int = 30,
+                   beta: float = 1.0, wait_timeout: float = 5.0) -> Any:
+    """
+    Cached value for a key, recomputed by at most one caller at a time.
+    
+    Args:
+        cache_key: Cache key
+        compute: Callable producing the value
+        timeout: Seconds the value is fresh (soft TTL)
+        stale_ttl: Seconds a stale value may still be served while it is
+            being recomputed (defaults to ``timeout``)
+        lock_timeout: Upper bound on a recomputation holding the lock
+        beta: Early refresh aggressiveness; 0 disables it
+        wait_timeout: How long callers with nothing to serve wait for the
+            lock holder before computing themselves
+    """
+    if stale_ttl is None:
+        stale_ttl = timeout
+    
+    entry = read_entry(cache_key)
+    if entry is not None and not needs_refresh(entry, beta):
+        return entry['value']
+    
+    token = acquire_refresh_lock(cache_key, lock_timeout)
+    if token is None:
+        if entry is not None:
+            # Someone else is refreshing; serve what we have
+            return entry['value']
+        entry = wait_for_entry(cache_key, wait_timeout)
+        if entry is not None:
+            return entry['value']
+    
+    try:
+        start = time.monotonic()
+        value = compute()
+        write_entry(cache_key, value, timeout, stale_ttl, time.monotonic() - start)
+        return value
+    finally:
+        release_refresh_lock(cache_key, token)
+
+
+def cache_result_protected(timeout: int = 300, key_prefix: Optional[str] = None,
+                           stale_ttl: Optional[int] = None, beta: float = 1.0):
+    """
+    Decorator like cache_result, with single-flight recomputation,
+    stale-while-revalidate and probabilistic early refresh, so an expiring
+    key under traffic is recomputed once instead of by every caller.
+    
+    Usage:
+        @cache_result_protected(timeout=60, key_prefix='dashboard_stats')
+        def get_dashboard_stats(user_id, project_id):
+            # Expensive aggregate queries
+            return stats
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            prefix = key_prefix or f"func:{func.__module__}.{func.__name__}"
+            cache_key = CacheNamespace.make_key(prefix, generate_cache_key(prefix, *args, **kwargs))
+            return get_or_compute(
+                cache_key, lambda: func(*args, **kwargs),
+                timeout=timeout, stale_ttl=stale_ttl, beta=beta
+            )
+        
+        return wrapper
+    return decorator
+
+
 def invalidate_cache(key_prefix: str, *args, **kwargs):
     """
     Invalidate a specific cache entry.
@@ -129,32 +263,24 @@ def invalidate_cache(key_prefix: str, *args, **kwargs):
         *args: Positional arguments used in cache key
         **kwargs: Keyword arguments used in cache key
     """
-    cache_key = generate_cache_key(key_prefix, *args, **kwargs)
+    cache_key = CacheNamespace.make_key(key_prefix, generate_cache_key(key_prefix, *args, **kwargs))
     cache.delete(cache_key)
 
 
 def invalidate_cache_pattern(pattern: str):
     """
-    Invalidate all cache entries matching a pattern.
-    Note: This requires Redis backend with django-redis.
+    Invalidate all cache entries stored under a key prefix.
+    Bumps the prefix's namespace version instead of scanning for matching
+    keys, so the cost does not depend on the size of the keyspace.
     
     Args:
-        pattern: Pattern to match (e.g., 'user:*')
+        pattern: Key prefix, optionally with a trailing wildcard (e.g., 'user_stats*')
+    
+    Returns:
+        1 if the namespace was invalidated, otherwise 0
     """
-    try:
-        from django_redis import get_redis_connection
-        redis_conn = get_redis_connection("default")
-        
-        # Get all keys matching pattern
-        keys = redis_conn.keys(f"*{pattern}*")
-        
-        if keys:
-            redis_conn.delete(*keys)
-            return len(keys)
-        return 0
-    except Exception as e:
-        print(f"Error invalidating cache pattern: {e}")
-        return 0
+    prefix = pattern.rstrip('*:')
+    return 1 if CacheNamespace.bump(prefix) else 0
 
 
 class CacheManager:
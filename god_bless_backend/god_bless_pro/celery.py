@@ -25,6 +25,12 @@ app.autodiscover_tasks()
 @task_prerun.connect
 def task_prerun_handler(sender=None, task_id=None, task=None, args=None, kwargs=None, **extra):
     """Handle task start event"""
+    try:
+        from god_bless_pro.profiling import start_task_profile
+        start_task_profile(task_id)
+    except Exception as e:
+        logger.error(f"Error starting task profile: {e}")
+    
     try:
         from tasks.models import TaskProgress
         task_progress = TaskProgress.objects.filter(task_id=task_id).first()
@@ -38,6 +44,19 @@ def task_prerun_handler(sender=None, task_id=None, task=None, args=None, kwargs=
 @task_postrun.connect
 def task_postrun_handler(sender=None, task_id=None, task=None, args=None, kwargs=None, retval=None, state=None, **extra):
     """Handle task completion event"""
+    try:
+        from god_bless_pro.profiling import finish_task_profile
+        finish_task_profile(task_id, getattr(sender, 'name', None) or str(sender))
+    except Exception as e:
+        logger.error(f"Error recording task profile: {e}")
+    
+    try:
+        from god_bless_pro import metrics
+        # Prefork children may be recycled before the background flush runs
+        metrics.flush()
+    except Exception as e:
+        logger.error(f"Error flushing metrics: {e}")
+    
     try:
         from tasks.models import TaskProgress
         task_progress = TaskProgress.objects.filter(task_id=task_id).first()
@@ -121,5 +140,27 @@ app.conf.beat_schedule = {
         'task': 'sms_sender.tasks.cleanup_old_retry_attempts',
         'schedule': crontab(hour=4, minute=0),  # Run daily at 4 AM
     },
+    'maintain-sms-partitions': {
+        'task': 'sms_sender.tasks.maintain_sms_partitions',
+        'schedule': crontab(hour=4, minute=30),  # Run daily at 4:30 AM
+    },
+    # Proxy pool maintenance for external number lookups
+    'revalidate-proxies': {
+        'task': 'phone_number_validator.tasks.revalidate_proxies_task',
+        'schedule': crontab(minute='*/30'),  # Run every 30 minutes
+    },
+    'download-and-validate-proxies': {
+        'task': 'phone_number_validator.tasks.download_and_validate_proxies_task',
+        'schedule': crontab(minute=15, hour='*/6'),  # Run every 6 hours
+    },
+    # Live WebSocket stats producers (one computation per interval, fanned out)
+    'broadcast-live-campaign-stats': {
+        'task': 'sms_sender.tasks.broadcast_live_campaign_stats',
+        'schedule': 5.0,  # Every 5 seconds
+    },
+    'broadcast-dashboard-metrics': {
+        'task': 'dashboard.tasks.broadcast_dashboard_metrics',
+        'schedule': 10.0,  # Every 10 seconds
+    },
 }
 app.conf.timezone = 'UTC'
@@ -0,0 +1,91 @@
+"""
+Incremental parsing of large JSON import files.
+
+iter_json_items() yields the elements of a top-level JSON array (or the
+values of a top-level object) one at a time, reading the file in fixed
+size blocks, so a multi-gigabyte export is never held in memory at once.
+
+Usage:
+    with open('data.json', encoding='utf-8') as f:
+        for item in iter_json_items(f):
+            ...
+"""
+import json
+from typing import Any, Iterator, TextIO
+
+_WHITESPACE = ' \t\n\r'
+
+
+class _Reader:
+    def __init__(self, stream: TextIO, read_size: int):
+        self.stream = stream
+        self.read_size = read_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Append the next block, dropping the consumed part; False at end of file"""
+        if self.eof:
+            return False
+        block = self.stream.read(self.read_size)
+        if not block:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + block
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """The next non-whitespace character, or '' at end of file"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} in JSON stream, found {char or 'end of file'!r}")
+        self.pos += 1
+        return char
+
+    def value(self, decoder: json.JSONDecoder) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number at the end of the buffer may continue in the next block
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_items(stream: TextIO, read_size: int = 1 << 16) -> Iterator[Any]:
+    """
+    Yield each element of the top-level array in stream, or each value of
+    the top-level object, reading read_size characters at a time.
+    """
+    reader = _Reader(stream, read_size)
+    decoder = json.JSONDecoder()
+    opening = reader.expect('[{')
+    closing = ']' if opening == '[' else '}'
+
+    if reader.peek() == closing:
+        reader.pos += 1
+        return
+    while True:
+        if opening == '{':
+            reader.value(decoder)
+            reader.expect(':')
+        yield reader.value(decoder)
+        if reader.expect(',' + closing) == closing:
+            return
@@ -0,0 +1,96 @@
+"""
+Shared live statistics broadcasting
+Computes a stats snapshot once per interval, caches it and fans it out
+through the channel layer so WebSocket consumers never query per socket
+"""
+import logging
+from typing import Any, Dict, Optional
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+
+class LiveStatsBroadcaster:
+    """
+    Base class for a single-producer stats snapshot.
+
+    A lease key (``cache.add`` with the interval as timeout) elects one
+    producer per interval across all processes; everyone else reads the
+    cached snapshot. Subclasses define ``kind``, ``group_name()``,
+    ``compute()`` and ``build_event()``.
+    """
+
+    kind = None
+    interval = 5
+    snapshot_ttl = 60
+
+    def __init__(self, object_id):
+        self.object_id = object_id
+
+    @property
+    def cache_key(self) -> str:
+        return f"live_stats:{self.kind}:{self.object_id}"
+
+    @property
+    def lease_key(self) -> str:
+        return f"live_stats:lease:{self.kind}:{self.object_id}"
+
+    def group_name(self) -> str:
+        raise NotImplementedError
+
+    def compute(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def build_event(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def get_snapshot(self) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached snapshot.
+
+        On a cold cache the snapshot is computed once (under the lease) and
+        stored without broadcasting; concurrent readers that lose the lease
+        get whatever the winner has stored, or None.
+        """
+        snapshot = cache.get(self.cache_key)
+        if snapshot is None:
+            snapshot = self.refresh(broadcast=False)
+            if snapshot is None:
+                snapshot = cache.get(self.cache_key)
+        return snapshot
+
+    def refresh(self, broadcast: bool = True, force: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Recompute, cache and (optionally) broadcast the snapshot.
+
+        Returns None without doing any work if another producer already
+        refreshed within the current interval, unless ``force`` is set.
+        """
+        if force:
+            cache.set(self.lease_key, 1, timeout=self.interval)
+        elif not cache.add(self.lease_key, 1, timeout=self.interval):
+            return None
+
+        try:
+            snapshot = self.compute()
+        except Exception as e:
+            logger.error(f"Failed to compute {self.kind} stats for {self.object_id}: {e}")
+            return None
+
+        cache.set(self.cache_key, snapshot, timeout=self.snapshot_ttl)
+        if broadcast:
+            self._send(self.build_event(snapshot))
+        return snapshot
+
+    def _send(self, event: Dict[str, Any]) -> None:
+        channel_layer = get_channel_layer()
+        if not channel_layer:
+            return
+
+        try:
+            async_to_sync(channel_layer.group_send)(self.group_name(), event)
+        except Exception as e:
+            logger.error(f"Failed to broadcast {self.kind} stats to {self.group_name()}: {e}")
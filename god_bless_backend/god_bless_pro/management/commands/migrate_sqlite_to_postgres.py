@@ -0,0 +1,56 @@
+"""
+Django management command for moving data from SQLite to PostgreSQL.
+
+Copies every model table from a SQLite file into the configured PostgreSQL
+database with parallel COPY streams (see god_bless_pro.pg_migration).
+Run `manage.py migrate` against PostgreSQL first. An interrupted run
+resumes from its checkpoints when started again.
+"""
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from god_bless_pro import pg_migration
+
+
+class Command(BaseCommand):
+    help = 'Copy all data from a SQLite database into PostgreSQL with parallel COPY streams'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=str(settings.BASE_DIR / 'db.sqlite3'),
+                            help='SQLite database file (default: db.sqlite3)')
+        parser.add_argument('--models', nargs='+', metavar='APP_LABEL.MODEL',
+                            help='Models to copy (default: all installed models)')
+        parser.add_argument('--workers', type=int, default=4, help='Tables copied in parallel (default: 4)')
+        parser.add_argument('--chunk-size', type=int, default=50000,
+                            help='Rows per read and COPY transaction (default: 50000)')
+        parser.add_argument('--restart', action='store_true',
+                            help='Discard the progress of an interrupted run and start over')
+
+    def handle(self, *args, **options):
+        model_list = None
+        if options['models']:
+            try:
+                model_list = [apps.get_model(label) for label in options['models']]
+            except (LookupError, ValueError) as e:
+                raise CommandError(str(e))
+
+        try:
+            summary = pg_migration.migrate_sqlite_to_postgres(
+                options['source'],
+                model_list=model_list,
+                workers=options['workers'],
+                chunk_size=options['chunk_size'],
+                restart=options['restart'],
+                log=self.stdout.write,
+            )
+        except pg_migration.MigrationError as e:
+            raise CommandError(str(e))
+
+        if summary['mismatched']:
+            self.stdout.write(self.style.WARNING(
+                f"Row counts differ from SQLite for: {', '.join(summary['mismatched'])}"
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f"Copied {summary['rows']} rows in {summary['tables']} tables in {summary['seconds']}s"
+        ))
@@ -0,0 +1,57 @@
+"""
+Django management command for the request/task profiling report.
+
+Prints the aggregated query and latency profiles collected by
+god_bless_pro.profiling, hottest endpoints and tasks first.
+"""
+
+from django.core.management.base import BaseCommand
+
+from god_bless_pro import profiling
+
+
+class Command(BaseCommand):
+    help = 'Show aggregated query/latency profiles of sampled requests and Celery tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--kind', choices=[profiling.REQUEST, profiling.TASK],
+                            help='Only show requests or only tasks')
+        parser.add_argument('--order-by', default='avg_wall_ms',
+                            choices=['avg_wall_ms', 'p95_wall_ms', 'avg_queries', 'avg_sql_ms', 'samples'],
+                            help='Sort field (default: avg_wall_ms)')
+        parser.add_argument('--limit', type=int, default=20, help='Number of rows to show')
+        parser.add_argument('--duplicates', type=int, default=3,
+                            help='Repeated statements to list per endpoint/task')
+        parser.add_argument('--reset', action='store_true', help='Clear collected profiles')
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            profiling.reset_profiles()
+            self.stdout.write(self.style.SUCCESS('Profiles cleared'))
+            return
+
+        report = profiling.get_report(
+            kind=options['kind'],
+            order_by=options['order_by'],
+            limit=options['limit'],
+            duplicates=options['duplicates'],
+        )
+        if not report:
+            self.stdout.write(
+                f"No profiles collected yet (PROFILING_SAMPLE_RATE={profiling.get_sample_rate()})"
+            )
+            return
+
+        self.stdout.write(
+            f"{'kind':<8}{'name':<56}{'samples':>8}{'queries':>9}{'sql ms':>9}"
+            f"{'wall ms':>9}{'p95 ms':>9}"
+        )
+        for row in report:
+            self.stdout.write(
+                f"{row['kind']:<8}{row['name'][:55]:<56}{row['samples']:>8}{row['avg_queries']:>9}"
+                f"{row['avg_sql_ms']:>9}{row['avg_wall_ms']:>9}{row['p95_wall_ms']:>9}"
+            )
+            for duplicate in row['duplicate_queries']:
+                self.stdout.write(self.style.WARNING(
+                    f"{'':<8}x{duplicate['count']:<6} {duplicate['sql'][:120]}"
+                ))
@@ -0,0 +1,34 @@
+"""
+Django management command for restoring a backup written by backup_data.
+
+Verifies the manifest checksums, then bulk loads each model in chunks in
+foreign-key dependency order (see god_bless_pro.backup).
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from god_bless_pro import backup
+
+
+class Command(BaseCommand):
+    help = 'Restore model data from a backup_data directory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='Backup directory')
+        parser.add_argument('--flush', action='store_true',
+                            help='Delete the existing rows of the backed up models first')
+        parser.add_argument('--skip-verify', action='store_true', help='Do not check file checksums first')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Rows per bulk insert (default: 2000)')
+
+    def handle(self, *args, **options):
+        try:
+            total = backup.restore_database(
+                options['directory'],
+                flush=options['flush'],
+                verify=not options['skip_verify'],
+                chunk_size=options['chunk_size'],
+                log=self.stdout.write,
+            )
+        except backup.BackupError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f"Restored {total} rows from {options['directory']}"))
@@ -0,0 +1,77 @@
+"""
+Django management command for the end-to-end pipeline benchmarks.
+
+Runs generation, validation, export, import and campaign sending against
+seeded data (see god_bless_pro.benchmarks) and reports throughput and
+p50/p99 latency, optionally as JSON for comparing runs.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from god_bless_pro import benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the phone number and SMS send pipelines end to end'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--stages', nargs='+', choices=benchmarks.STAGES, default=list(benchmarks.STAGES),
+                            help='Stages to run (default: all)')
+        parser.add_argument('--numbers', type=int, default=1000,
+                            help='Phone numbers seeded, generated and imported per run (default: 1000)')
+        parser.add_argument('--messages', type=int, default=100,
+                            help='Messages per benchmark campaign (default: 100)')
+        parser.add_argument('--iterations', type=int, default=3, help='Runs per stage (default: 3)')
+        parser.add_argument('--output', help='Write the JSON report to this file')
+        parser.add_argument('--compare', help='Baseline JSON report to compare against')
+        parser.add_argument('--isolated', action='store_true',
+                            help='Use an in-process cache and channel layer instead of Redis')
+        parser.add_argument('--keep-data', action='store_true',
+                            help='Keep the benchmark user and its data after the run')
+
+    def handle(self, *args, **options):
+        if benchmarks.CAMPAIGN in options['stages']:
+            try:
+                import aiosmtpd  # noqa: F401
+            except ImportError:
+                raise CommandError('The campaign stage needs aiosmtpd (pip install -r requirements-test.txt)')
+
+        baseline = benchmarks.load_report(options['compare']) if options['compare'] else None
+
+        run = lambda: benchmarks.run_benchmarks(
+            numbers=options['numbers'],
+            messages=options['messages'],
+            iterations=options['iterations'],
+            stages=options['stages'],
+            keep_data=options['keep_data'],
+            log=self.stdout.write,
+        )
+        if options['isolated']:
+            with benchmarks.isolated_services():
+                report = run()
+        else:
+            report = run()
+
+        if baseline is not None:
+            report['comparison'] = benchmarks.compare_reports(baseline, report)
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+
+        self.stdout.write(
+            f"{'stage':<10}{'items':>9}{'seconds':>10}{'per sec':>11}{'p50 ms':>10}{'p99 ms':>10}  latency per"
+        )
+        for stage, result in report['results'].items():
+            latency = result['latency_ms']
+            self.stdout.write(
+                f"{stage:<10}{result['items']:>9}{result['seconds']:>10}{result['throughput_per_sec']!s:>11}"
+                f"{latency['p50']!s:>10}{latency['p99']!s:>10}  {result['latency_unit']}"
+            )
+
+        for stage, change in report.get('comparison', {}).items():
+            self.stdout.write(
+                f"{stage:<10}throughput {change['throughput_change_pct']!s:>7}%  p99 {change['p99_change_pct']!s:>7}%"
+            )
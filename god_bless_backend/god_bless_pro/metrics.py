@@ -0,0 +1,392 @@
+"""
+Process-shared metrics registry with Prometheus text exposition.
+
+Counters, gauges and histograms are updated in memory and flushed in the
+background to one Redis hash per metric, so every web and Celery prefork
+worker process adds to the same series. Without Redis (development, tests)
+the values are kept per process.
+
+Each hash field is the sample as it appears in the exposition, e.g.
+``sms_messages_sent_total{carrier="Verizon",server="smtp.example.com:465"}``,
+so rendering is a straight dump of the stored values.
+
+Settings:
+    METRICS_FLUSH_INTERVAL: seconds between background flushes (default 1.0)
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from god_bless_pro.cache import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "metrics:"
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; covers sub-millisecond cache hits up to slow SMTP handshakes
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Pending operations per sample
+_INC = 'inc'
+_SET = 'set'
+_DELETE = 'delete'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if bound == float('inf') else repr(float(bound))
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def sample_name(name: str, labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return name
+    return name + '{' + ','.join(f'{label}="{_escape(value)}"' for label, value in labels) + '}'
+
+
+class MetricsRegistry:
+    """Buffers updates from this process and flushes them to the store."""
+
+    def __init__(self, flush_interval: float = 1.0):
+        self.flush_interval = flush_interval
+        self._metrics = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+    def register(self, metric: 'Metric') -> 'Metric':
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def metrics(self) -> List['Metric']:
+        return [self._metrics[name] for name in sorted(self._metrics)]
+
+    def update(self, metric: str, sample: str, op: str, value: float = 0.0) -> None:
+        with self._lock:
+            pending = self._pending.setdefault(metric, {})
+            current = pending.get(sample)
+            if op == _INC and current is not None:
+                # An increment after a set or delete keeps the value absolute
+                pending[sample] = (_SET, value) if current[0] == _DELETE else (current[0], current[1] + value)
+            else:
+                pending[sample] = (op, value)
+        self._ensure_worker()
+
+    def flush(self) -> None:
+        """Apply this process's buffered updates; never raises."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            get_store().apply(pending)
+        except Exception as e:
+            logger.warning(f"Failed to flush metrics: {e}")
+
+    def collect(self) -> Dict[str, Dict[str, float]]:
+        self.flush()
+        return get_store().read(list(self._metrics))
+
+    def render(self) -> str:
+        """All registered metrics in the Prometheus text exposition format."""
+        values = self.collect()
+        lines = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for sample, value in sorted(values.get(metric.name, {}).items(), key=lambda item: _sort_key(item[0])):
+                lines.append(f"{sample} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending.clear()
+        get_store().reset(list(self._metrics))
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None and self._worker_pid == os.getpid():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == os.getpid():
+                return
+            if self._worker_pid is not None:
+                # A forked worker inherits the parent's buffer, which the parent flushes itself
+                self._pending = {}
+            self._worker_pid = os.getpid()
+            self._worker = threading.Thread(target=self._run, name='metrics-flush', daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+
+_SUFFIX_ORDER = {'_bucket': 0, '_sum': 1, '_count': 2}
+
+
+def _sort_key(sample: str) -> tuple:
+    # Groups each histogram series as buckets (ascending "le"), _sum, _count
+    name, _, labels = sample.rstrip('}').partition('{')
+    pairs = labels.split(',') if labels else []
+    bound = 0.0
+    if pairs and pairs[-1].startswith('le="'):
+        raw = pairs.pop()[4:-1]
+        bound = float('inf') if raw == '+Inf' else float(raw)
+    suffix = next((suffix for suffix in _SUFFIX_ORDER if name.endswith(suffix)), '')
+    return (','.join(pairs), name[:len(name) - len(suffix)], _SUFFIX_ORDER.get(suffix, 0), bound)
+
+
+class RedisMetricStore:
+    """Series shared by every process, one hash per metric."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _key(self, metric: str) -> str:
+        return cache.make_key(KEY_PREFIX + metric)
+
+    def apply(self, pending: Dict[str, Dict[str, tuple]]) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for metric, samples in pending.items():
+            key = self._key(metric)
+            for sample, (op, value) in samples.items():
+                if op == _INC:
+                    pipe.hincrbyfloat(key, sample, value)
+                elif op == _SET:
+                    pipe.hset(key, sample, value)
+                else:
+                    pipe.hdel(key, sample)
+        pipe.execute()
+
+    def read(self, metrics: List[str]) -> Dict[str, Dict[str, float]]:
+        pipe = self.client.pipeline(transaction=False)
+        for metric in metrics:
+            pipe.hgetall(self._key(metric))
+        return {
+            metric: {
+                (field.decode() if isinstance(field, bytes) else field): float(value)
+                for field, value in raw.items()
+            }
+            for metric, raw in zip(metrics, pipe.execute())
+        }
+
+    def reset(self, metrics: List[str]) -> None:
+        if metrics:
+            self.client.delete(*[self._key(metric) for metric in metrics])
+
+
+class LocalMetricStore:
+    """Per-process series for cache backends without Redis (development, tests)."""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def apply(self, pending: Dict[str, Dict[str, tuple]]) -> None:
+        with self._lock:
+            for metric, samples in pending.items():
+                values = self._values.setdefault(metric, {})
+                for sample, (op, value) in samples.items():
+                    if op == _INC:
+                        values[sample] = values.get(sample, 0.0) + value
+                    elif op == _SET:
+                        values[sample] = value
+                    else:
+                        values.pop(sample, None)
+
+    def read(self, metrics: List[str]) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {metric: dict(self._values.get(metric, {})) for metric in metrics}
+
+    def reset(self, metrics: List[str]) -> None:
+        with self._lock:
+            for metric in metrics:
+                self._values.pop(metric, None)
+
+
+_local_store = LocalMetricStore()
+
+
+def get_store():
+    client = get_redis_client()
+    return RedisMetricStore(client) if client is not None else _local_store
+
+
+class Metric:
+    type = None
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 registry: Optional[MetricsRegistry] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry if registry is not None else REGISTRY
+        self.registry.register(self)
+
+    def labels(self, **labels) -> 'BoundMetric':
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return BoundMetric(self, tuple((label, labels[label]) for label in self.labelnames))
+
+    def _bound(self) -> 'BoundMetric':
+        if self.labelnames:
+            raise ValueError(f"{self.name} requires labels {self.labelnames}")
+        return BoundMetric(self, ())
+
+
+class BoundMetric:
+    """A metric with its label values filled in."""
+
+    def __init__(self, metric: Metric, labels: Tuple[Tuple[str, str], ...]):
+        self.metric = metric
+        self.labels = labels
+
+    def _update(self, suffix: str, op: str, value: float = 0.0, extra=()) -> None:
+        self.metric.registry.update(
+            self.metric.name, sample_name(self.metric.name + suffix, self.labels + tuple(extra)), op, value
+        )
+
+    def inc(self, amount: float = 1) -> None:
+        if self.metric.type == 'counter' and amount < 0:
+            raise ValueError("Counters can only increase")
+        self._update('_total' if self.metric.type == 'counter' else '', _INC, amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self._update('', _INC, -amount)
+
+    def set(self, value: float) -> None:
+        self._update('', _SET, value)
+
+    def remove(self) -> None:
+        """Drop this label set from the exposition (e.g. a finished campaign)."""
+        self._update('', _DELETE)
+
+    def observe(self, value: float) -> None:
+        for bound in self.metric.buckets:
+            if value <= bound:
+                self._update('_bucket', _INC, 1, (('le', _format_bound(bound)),))
+        self._update('_sum', _INC, value)
+        self._update('_count', _INC, 1)
+
+    @contextmanager
+    def time(self):
+        """Observe the duration of the block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Counter(Metric):
+    """Monotonic count; exposed with a _total suffix."""
+    type = 'counter'
+
+    def inc(self, amount: float = 1) -> None:
+        self._bound().inc(amount)
+
+
+class Gauge(Metric):
+    """Value that can go up and down; updates from different processes overwrite each other."""
+    type = 'gauge'
+
+    def inc(self, amount: float = 1) -> None:
+        self._bound().inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self._bound().dec(amount)
+
+    def set(self, value: float) -> None:
+        self._bound().set(value)
+
+
+class Histogram(Metric):
+    """Cumulative bucket counts plus _sum and _count."""
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS, registry: Optional[MetricsRegistry] = None):
+        self.buckets = tuple(sorted(float(bound) for bound in buckets)) + (float('inf'),)
+        super().__init__(name, documentation, labelnames, registry)
+
+    def observe(self, value: float) -> None:
+        self._bound().observe(value)
+
+    def time(self):
+        return self._bound().time()
+
+
+REGISTRY = MetricsRegistry(flush_interval=getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0))
+atexit.register(REGISTRY.flush)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+def flush() -> None:
+    REGISTRY.flush()
+
+
+# Send pipeline
+
+SMS_MESSAGES_SENT = Counter(
+    'sms_messages_sent', 'SMS messages accepted by the SMTP server', ['carrier', 'server']
+)
+SMS_MESSAGES_FAILED = Counter(
+    'sms_messages_failed', 'SMS messages that failed to send', ['carrier', 'server']
+)
+SMTP_HANDSHAKE_SECONDS = Histogram(
+    'smtp_handshake_seconds', 'Time to connect and log in to the SMTP server', ['server']
+)
+SMTP_SEND_SECONDS = Histogram(
+    'smtp_send_seconds', 'Time for the SMTP server to accept a message', ['server']
+)
+RATE_LIMIT_WAIT_SECONDS = Histogram(
+    'sms_rate_limit_wait_seconds', 'Time spent waiting on carrier rate limits before a send', ['carrier'],
+    buckets=(0, 0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0),
+)
+CAMPAIGN_QUEUE_DEPTH = Gauge(
+    'sms_campaign_queue_depth', 'Messages still waiting to be sent per running campaign', ['campaign']
+)
+
+# Phone number generation and validation
+
+PHONE_ROWS_PROCESSED = Counter(
+    'phone_rows_processed', 'Phone number rows written by generation/validation tasks', ['operation']
+)
+PHONE_ROWS_PER_SECOND = Gauge(
+    'phone_rows_per_second', 'Throughput of the most recent generation/validation batch', ['operation']
+)
+
+PHONE_LOOKUP_CACHE = Counter(
+    'phone_lookup_cache', 'External number lookups by how they were answered', ['result']
+)
+
+
+def record_phone_batch(operation: str, rows: int, seconds: float) -> None:
+    """Count a generation/validation batch and publish its throughput."""
+    if rows <= 0:
+        return
+    PHONE_ROWS_PROCESSED.labels(operation=operation).inc(rows)
+    if seconds > 0:
+        PHONE_ROWS_PER_SECOND.labels(operation=operation).set(round(rows / seconds, 2))
@@ -3,29 +3,47 @@ Custom middleware for caching and performance optimization.
 """
 import hashlib
 import json
-from django.core.cache import cache
+import time
 from django.utils.deprecation import MiddlewareMixin
 from django.http import JsonResponse
 
+from god_bless_pro.cache import CacheNamespace
+from god_bless_pro.cache_utils import (
+    acquire_refresh_lock, needs_refresh, read_entry, release_refresh_lock,
+    wait_for_entry, write_entry,
+)
+
 
 class APICacheMiddleware(MiddlewareMixin):
     """
     Middleware to cache API responses for GET requests.
     Only caches responses for specific endpoints marked as cacheable.
+    
+    An expiring response is regenerated by one request at a time (see
+    cache_utils.get_or_compute); concurrent requests are served the stale
+    copy, or wait briefly for the first one when there is none.
     """
     
-    # Endpoints to cache (path patterns)
-    CACHEABLE_ENDPOINTS = [
-        '/api/settings/',
-        '/api/carriers/',
-        '/api/phone-types/',
-        '/api/area-codes/',
-        '/api/dashboard/stats/',
-    ]
+    # Endpoints to cache (path patterns) and the cache namespaces their
+    # responses are derived from; writes to those namespaces invalidate them
+    CACHEABLE_ENDPOINTS = {
+        '/api/settings/': (CacheNamespace.SETTINGS,),
+        '/api/carriers/': (CacheNamespace.PHONE_NUMBERS,),
+        '/api/phone-types/': (CacheNamespace.PHONE_NUMBERS,),
+        '/api/area-codes/': (CacheNamespace.PHONE_NUMBERS,),
+        '/api/dashboard/stats/': (CacheNamespace.PHONE_NUMBERS, CacheNamespace.CAMPAIGNS),
+    }
     
     # Cache timeout in seconds
     CACHE_TIMEOUT = 300  # 5 minutes
     
+    # How long a stale response may be served while it is regenerated
+    STALE_TIMEOUT = 300
+    
+    # Upper bound on regenerating a response, and on waiting for one
+    LOCK_TIMEOUT = 30
+    WAIT_TIMEOUT = 5
+    
     def process_request(self, request):
         """Check if we have a cached response for this request."""
         # Only cache GET requests
@@ -40,19 +58,40 @@ class APICacheMiddleware(MiddlewareMixin):
         cache_key = self._generate_cache_key(request)
         
         # Try to get cached response
-        cached_response = cache.get(cache_key)
-        if cached_response:
-            # Return cached response
-            response = JsonResponse(cached_response, safe=False)
-            response['X-Cache'] = 'HIT'
-            return response
+        entry = read_entry(cache_key)
+        if entry is not None and not needs_refresh(entry):
+            return self._cached_response(entry, 'HIT')
+        
+        # Only one request regenerates the response
+        token = acquire_refresh_lock(cache_key, self.LOCK_TIMEOUT)
+        if token is None:
+            if entry is None:
+                entry = wait_for_entry(cache_key, self.WAIT_TIMEOUT)
+                if entry is not None:
+                    return self._cached_response(entry, 'HIT')
+            else:
+                return self._cached_response(entry, 'STALE')
         
         # Store cache key in request for later use
         request._cache_key = cache_key
+        request._cache_lock = token
+        request._cache_started = time.monotonic()
         return None
     
+    def _cached_response(self, entry, state):
+        response = JsonResponse(entry['value'], safe=False)
+        response['X-Cache'] = state
+        return response
+    
     def process_response(self, request, response):
         """Cache the response if applicable."""
+        try:
+            return self._store_response(request, response)
+        finally:
+            if hasattr(request, '_cache_key'):
+                release_refresh_lock(request._cache_key, request._cache_lock)
+    
+    def _store_response(self, request, response):
         # Only cache successful GET requests
         if request.method != 'GET' or response.status_code != 200:
             return response
@@ -79,7 +118,10 @@ class APICacheMiddleware(MiddlewareMixin):
                 content = json.loads(response.content.decode('utf-8'))
             
             # Cache the response
-            cache.set(request._cache_key, content, self.CACHE_TIMEOUT)
+            write_entry(
+                request._cache_key, content, self.CACHE_TIMEOUT, self.STALE_TIMEOUT,
+                time.monotonic() - request._cache_started
+            )
             response['X-Cache'] = 'MISS'
         except Exception as e:
             # Don't fail if caching fails
@@ -89,18 +131,34 @@ class APICacheMiddleware(MiddlewareMixin):
     
     def _is_cacheable(self, path):
         """Check if the path should be cached."""
-        return any(path.startswith(endpoint) for endpoint in self.CACHEABLE_ENDPOINTS)
+        return self._resources_for(path) is not None
+    
+    def _resources_for(self, path):
+        """Cache namespaces backing the endpoint, or None if it is not cacheable."""
+        for endpoint, resources in self.CACHEABLE_ENDPOINTS.items():
+            if path.startswith(endpoint):
+                return resources
+        return None
     
     def _generate_cache_key(self, request):
-        """Generate a unique cache key for the request."""
+        """
+        Generate a unique cache key for the request, versioned by the
+        user's (and requested project's) namespaces for the endpoint.
+        """
         # Include path, query params, and user ID
+        user_id = request.user.id if request.user.is_authenticated else None
         key_parts = [
             request.path,
             request.GET.urlencode(),
-            str(request.user.id if request.user.is_authenticated else 'anonymous')
+            str(user_id if user_id is not None else 'anonymous')
         ]
         key_string = ':'.join(key_parts)
-        return f"api_cache:{hashlib.md5(key_string.encode()).hexdigest()}"
+        return CacheNamespace.make_key(
+            self._resources_for(request.path),
+            f"api_cache:{hashlib.md5(key_string.encode()).hexdigest()}",
+            user_id=user_id,
+            project_id=request.GET.get('project_id') if user_id is not None else None,
+        )
 
 
 class QueryCountMiddleware(MiddlewareMixin):
@@ -3,7 +3,7 @@ Monitoring and health check views for comprehensive system monitoring
 Provides detailed health status, metrics, and alerting endpoints
 """
 
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
@@ -20,6 +20,15 @@ import subprocess
 from datetime import datetime, timedelta
 from typing import Dict, Any, List
 
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+from god_bless_pro import metrics, profiling
+from god_bless_pro.auth_backends import CachedTokenAuthentication
+from god_bless_pro.cache import two_tier_cache_stats
+
 logger = logging.getLogger(__name__)
 
 
@@ -229,6 +238,42 @@ def alerts_endpoint(request):
         }, status=500)
 
 
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
+def profiling_report_endpoint(request):
+    """
+    Aggregated query/latency profiles of sampled requests and Celery tasks.
+    Query params: kind (request|task), order_by, limit
+    """
+    try:
+        limit = int(request.query_params.get('limit', 20))
+    except ValueError:
+        limit = 20
+    
+    report = profiling.get_report(
+        kind=request.query_params.get('kind') or None,
+        order_by=request.query_params.get('order_by', 'avg_wall_ms'),
+        limit=limit,
+    )
+    return Response({
+        'sample_rate': profiling.get_sample_rate(),
+        'profiles': report,
+        'timestamp': timezone.now().isoformat()
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+@authentication_classes([CachedTokenAuthentication, SessionAuthentication])
+def prometheus_metrics_endpoint(request):
+    """
+    Send pipeline and phone task metrics in the Prometheus text exposition
+    format, aggregated across all web and Celery worker processes.
+    """
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
+
+
 def check_all_services() -> Dict[str, Dict[str, Any]]:
     """Check health of all system services"""
     services = {}
@@ -364,6 +409,7 @@ def check_cache_health() -> Dict[str, Any]:
             return {
                 'status': 'healthy',
                 'response_time_ms': round(response_time * 1000, 2),
+                'two_tier_caches': two_tier_cache_stats(),
                 'last_check': timezone.now().isoformat()
             }
         else:
@@ -0,0 +1,344 @@
+"""
+Parallel SQLite to PostgreSQL data migration.
+
+Copies every model table from a SQLite database file into the default
+PostgreSQL database. The PostgreSQL schema must already exist, so run
+`manage.py migrate` against it first.
+
+Each table is read in primary-key order, one keyset chunk at a time, and
+each chunk is written with a single COPY ... FROM STDIN. Several tables
+are copied at once, each by its own worker process with its own SQLite
+and PostgreSQL connections. Secondary indexes and foreign keys are
+dropped before loading and recreated at the end, and sequences are moved
+past the copied primary keys.
+
+Progress is stored in the sqlite_migration_checkpoint table of the
+target database. Each chunk's checkpoint is written in the same
+transaction as its COPY, so an interrupted run resumes exactly where it
+stopped. The dropped index and constraint definitions are kept there
+too. The table is dropped once the migration has finished.
+
+Usage:
+    migrate_sqlite_to_postgres('db.sqlite3', workers=4)
+"""
+import io
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator, List, Optional
+
+from django.apps import apps
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_TABLE = 'sqlite_migration_checkpoint'
+
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+class MigrationError(Exception):
+    """The migration cannot start or could not be completed"""
+
+
+def default_models() -> List[type]:
+    """Every installed model with a table of its own, including many-to-many tables"""
+    return [
+        model for model in apps.get_models(include_auto_created=True)
+        if model._meta.managed and not model._meta.proxy
+    ]
+
+
+def quote(name: str) -> str:
+    return '"%s"' % name.replace('"', '""')
+
+
+def copy_value(value) -> str:
+    """A SQLite value in COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, str):
+        return value.translate(_COPY_ESCAPES)
+    if isinstance(value, bytes):
+        # bytea hex input; the backslash itself is escaped for COPY
+        return '\\\\x' + value.hex()
+    # Integers (booleans are stored as 0/1, which PostgreSQL accepts) and floats
+    return str(value)
+
+
+def copy_line(row) -> str:
+    return '\t'.join(map(copy_value, row)) + '\n'
+
+
+def open_source(path: str) -> sqlite3.Connection:
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def iter_chunks(source: sqlite3.Connection, spec: dict, chunk_size: int, after=None) -> Iterator[list]:
+    """
+    Rows of spec['table'] in primary-key order, chunk_size rows at a time,
+    starting after primary key value `after`.
+    """
+    columns = ', '.join(quote(column) for column in spec['columns'])
+    pk = quote(spec['pk'])
+    query = f"SELECT {columns} FROM {quote(spec['table'])}"
+    pk_index = spec['columns'].index(spec['pk'])
+
+    while True:
+        if after is None:
+            rows = source.execute(f"{query} ORDER BY {pk} LIMIT ?", (chunk_size,)).fetchall()
+        else:
+            rows = source.execute(f"{query} WHERE {pk} > ? ORDER BY {pk} LIMIT ?", (after, chunk_size)).fetchall()
+        if not rows:
+            return
+        yield rows
+        after = rows[-1][pk_index]
+
+
+def build_plan(source_path: str, model_list: Optional[Iterable[type]] = None) -> List[dict]:
+    """
+    One spec per model table: table, columns, pk and the SQLite row count.
+    Tables are ordered largest first so the long copies start first.
+    Tables missing from SQLite get source_rows=None and are only emptied.
+    """
+    source = open_source(source_path)
+    try:
+        specs = {}
+        for model in model_list or default_models():
+            table = model._meta.db_table
+            if table in specs:
+                continue
+            columns = [field.column for field in model._meta.concrete_fields]
+            spec = {'table': table, 'columns': columns, 'pk': model._meta.pk.column, 'source_rows': None}
+
+            source_columns = {row[1] for row in source.execute(f"PRAGMA table_info({quote(table)})")}
+            if source_columns:
+                missing = [column for column in columns if column not in source_columns]
+                if missing:
+                    raise MigrationError(
+                        f"SQLite table {table} has no columns {missing}; run migrate against SQLite first"
+                    )
+                spec['source_rows'] = source.execute(f"SELECT COUNT(*) FROM {quote(table)}").fetchone()[0]
+            specs[table] = spec
+    finally:
+        source.close()
+
+    return sorted(specs.values(), key=lambda spec: spec['source_rows'] or 0, reverse=True)
+
+
+def _pg_params(settings_dict: dict) -> dict:
+    """psycopg2.connect() arguments for a Django DATABASES entry"""
+    params = {key: value for key, value in settings_dict.get('OPTIONS', {}).items()
+              if key not in ('pool', 'server_side_binding', 'assume_role', 'isolation_level')}
+    params['dbname'] = settings_dict['NAME']
+    for setting, param in (('USER', 'user'), ('PASSWORD', 'password'), ('HOST', 'host'), ('PORT', 'port')):
+        if settings_dict.get(setting):
+            params[param] = settings_dict[setting]
+    return params
+
+
+def copy_table(source_path: str, pg_params: dict, spec: dict, chunk_size: int) -> dict:
+    """
+    Worker process entry point: copy one table, resuming from its checkpoint.
+    Uses plain sqlite3 and psycopg2 connections, not the Django ORM.
+    """
+    import psycopg2
+
+    started = time.monotonic()
+    source = open_source(source_path)
+    target = psycopg2.connect(**pg_params)
+    try:
+        with target.cursor() as cursor:
+            # Django stores SQLite datetimes as naive UTC
+            cursor.execute("SET TIME ZONE 'UTC'")
+            cursor.execute(
+                f"SELECT last_pk, rows FROM {CHECKPOINT_TABLE} WHERE table_name = %s", (spec['table'],)
+            )
+            last_pk, copied = cursor.fetchone()
+        target.commit()
+
+        after = None if last_pk is None else json.loads(last_pk)
+        pk_index = spec['columns'].index(spec['pk'])
+        copy_sql = "COPY {} ({}) FROM STDIN".format(
+            quote(spec['table']), ', '.join(quote(column) for column in spec['columns'])
+        )
+
+        for rows in iter_chunks(source, spec, chunk_size, after):
+            buffer = io.StringIO(''.join(copy_line(row) for row in rows))
+            with target.cursor() as cursor:
+                cursor.copy_expert(copy_sql, buffer)
+                cursor.execute(
+                    f"UPDATE {CHECKPOINT_TABLE} SET last_pk = %s, rows = rows + %s WHERE table_name = %s",
+                    (json.dumps(rows[-1][pk_index]), len(rows), spec['table'])
+                )
+            target.commit()
+            copied += len(rows)
+
+        with target.cursor() as cursor:
+            cursor.execute(f"UPDATE {CHECKPOINT_TABLE} SET done = TRUE WHERE table_name = %s", (spec['table'],))
+        target.commit()
+    finally:
+        source.close()
+        target.close()
+
+    return {'table': spec['table'], 'rows': copied, 'seconds': round(time.monotonic() - started, 2)}
+
+
+def _deferred_ddl(cursor, table: str) -> dict:
+    """Foreign keys and plain (non-constraint) indexes of a table, as drop and create statements"""
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f'",
+        [quote(table)]
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        "SELECT ic.relname, pg_get_indexdef(x.indexrelid) FROM pg_index x "
+        "JOIN pg_class ic ON ic.oid = x.indexrelid "
+        "WHERE x.indrelid = %s::regclass AND NOT EXISTS ("
+        "  SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid AND c.conrelid = x.indrelid"
+        ")",
+        [quote(table)]
+    )
+    indexes = cursor.fetchall()
+    return {
+        'drop_constraints': [f"ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(name)}" for name, _ in constraints],
+        'drop_indexes': [f"DROP INDEX {quote(name)}" for name, _ in indexes],
+        'indexes': [definition for _, definition in indexes],
+        'constraints': [
+            f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}" for name, definition in constraints
+        ],
+    }
+
+
+def _prepare(cursor, specs: List[dict], restart: bool) -> dict:
+    """
+    Create the checkpoint table and start every table that has no
+    checkpoint yet: drop its foreign keys and indexes, empty it, and record
+    the statements that recreate them. Returns the checkpoints by table.
+    """
+    cursor.execute(
+        f"CREATE TABLE IF NOT EXISTS {CHECKPOINT_TABLE} ("
+        " table_name text PRIMARY KEY, last_pk text, rows bigint NOT NULL DEFAULT 0,"
+        " done boolean NOT NULL DEFAULT FALSE, deferred jsonb)"
+    )
+    cursor.execute(f"SELECT table_name, rows, done FROM {CHECKPOINT_TABLE}")
+    checkpoints = {table: {'rows': rows, 'done': done} for table, rows, done in cursor.fetchall()}
+
+    if restart and checkpoints:
+        cursor.execute("TRUNCATE {}".format(', '.join(quote(table) for table in checkpoints)))
+        cursor.execute(f"UPDATE {CHECKPOINT_TABLE} SET last_pk = NULL, rows = 0, done = FALSE")
+        checkpoints = {table: {'rows': 0, 'done': False} for table in checkpoints}
+
+    new_tables = [spec['table'] for spec in specs if spec['table'] not in checkpoints]
+    if new_tables:
+        deferred = {table: _deferred_ddl(cursor, table) for table in new_tables}
+        # All foreign keys go before any table is emptied or loaded
+        for table in new_tables:
+            for statement in deferred[table]['drop_constraints']:
+                cursor.execute(statement)
+        for table in new_tables:
+            for statement in deferred[table]['drop_indexes']:
+                cursor.execute(statement)
+        cursor.execute("TRUNCATE {}".format(', '.join(quote(table) for table in new_tables)))
+        for table in new_tables:
+            recreate = {'indexes': deferred[table]['indexes'], 'constraints': deferred[table]['constraints']}
+            cursor.execute(
+                f"INSERT INTO {CHECKPOINT_TABLE} (table_name, deferred) VALUES (%s, %s)",
+                [table, json.dumps(recreate)]
+            )
+            checkpoints[table] = {'rows': 0, 'done': False}
+    return checkpoints
+
+
+def _finish(model_list: List[type], log: Callable[[str], None]) -> None:
+    """Recreate deferred indexes and foreign keys, reset sequences and drop the checkpoints"""
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT table_name, deferred FROM {CHECKPOINT_TABLE} WHERE deferred IS NOT NULL")
+        pending = cursor.fetchall()
+
+    for table, deferred in pending:
+        if isinstance(deferred, str):
+            deferred = json.loads(deferred)
+        log(f"{table}: recreating {len(deferred['indexes'])} indexes, {len(deferred['constraints'])} foreign keys")
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                for statement in deferred['indexes'] + deferred['constraints']:
+                    cursor.execute(statement)
+                cursor.execute(f"UPDATE {CHECKPOINT_TABLE} SET deferred = NULL WHERE table_name = %s", [table])
+        except Exception as e:
+            raise MigrationError(f"Could not recreate indexes or foreign keys of {table}: {e}") from e
+
+    statements = connection.ops.sequence_reset_sql(no_style(), model_list)
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+        for table in {model._meta.db_table for model in model_list}:
+            cursor.execute(f"ANALYZE {quote(table)}")
+        cursor.execute(f"DROP TABLE {CHECKPOINT_TABLE}")
+
+
+def migrate_sqlite_to_postgres(source_path: str, model_list: Optional[Iterable[type]] = None, workers: int = 4,
+                               chunk_size: int = 50000, restart: bool = False,
+                               log: Optional[Callable[[str], None]] = None) -> dict:
+    """
+    Copy all model tables from a SQLite file into the default PostgreSQL
+    database and return a summary.
+
+    Args:
+        source_path: SQLite database file
+        model_list: Models to copy (default: default_models())
+        workers: Tables copied at once, one process each
+        chunk_size: Rows per SQLite read and COPY transaction
+        restart: Empty the tables and start over instead of resuming
+        log: Called with progress lines
+    """
+    log = log or logger.info
+    if connection.vendor != 'postgresql':
+        raise MigrationError(f"The default database must be PostgreSQL, not {connection.vendor}")
+    if not os.path.exists(source_path):
+        raise MigrationError(f"SQLite database {source_path} does not exist")
+
+    started = time.monotonic()
+    model_list = list(model_list or default_models())
+    specs = build_plan(source_path, model_list)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        checkpoints = _prepare(cursor, specs, restart)
+
+    pending = [spec for spec in specs if spec['source_rows'] and not checkpoints[spec['table']]['done']]
+    log(f"Copying {len(pending)} of {len(specs)} tables with {workers} workers")
+
+    copied = {table: checkpoint['rows'] for table, checkpoint in checkpoints.items()}
+    pg_params = _pg_params(connection.settings_dict)
+    # spawn keeps the workers free of inherited Django connections on every platform
+    with ProcessPoolExecutor(max_workers=max(1, workers), mp_context=multiprocessing.get_context('spawn')) as pool:
+        futures = {pool.submit(copy_table, source_path, pg_params, spec, chunk_size): spec for spec in pending}
+        for future in as_completed(futures):
+            spec = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                raise MigrationError(f"Copying {spec['table']} failed, rerun to resume: {e}") from e
+            copied[spec['table']] = result['rows']
+            log(f"{spec['table']}: {result['rows']} rows in {result['seconds']}s")
+
+    mismatched = [
+        spec['table'] for spec in specs
+        if spec['source_rows'] is not None and copied.get(spec['table'], 0) != spec['source_rows']
+    ]
+    if mismatched:
+        logger.warning(f"Row counts differ from SQLite for {', '.join(mismatched)}")
+
+    _finish(model_list, log)
+    return {
+        'tables': len(specs),
+        'rows': sum(copied.get(spec['table'], 0) for spec in specs),
+        'mismatched': mismatched,
+        'seconds': round(time.monotonic() - started, 2),
+    }
@@ -0,0 +1,153 @@
+"""
+Integer E.164 phone number encoding.
+
+Phone numbers are stored as text in several formats ('2015550100',
+'12015550100', '+1 (201) 555-0100'). Models with a phone_number column
+also keep its normalized E.164 digits as a BIGINT column named e164
+(12015550100). Equality, dedup and prefix lookups use that column: it
+compares as one integer, has a smaller index than the text column, and
+a prefix becomes a range scan.
+
+E164QuerySet keeps e164 in step with phone_number for bulk writes; the
+models set it in save().
+"""
+import re
+from typing import Callable, Iterable, Optional, Set, Tuple
+
+from django.db import models
+
+_NON_DIGITS = re.compile(r'\D')
+
+# E.164 allows at most 15 digits, which fits a signed 64-bit integer
+E164_MAX_DIGITS = 15
+NANP_DIGITS = 11
+
+
+def digits_only(value) -> str:
+    return _NON_DIGITS.sub('', str(value))
+
+
+def to_e164(value) -> Optional[int]:
+    """
+    The E.164 integer for a phone number, or None if it has no usable
+    digits. Ten-digit numbers are North American and get country code 1.
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value or None
+    digits = digits_only(value)
+    if len(digits) == 10:
+        digits = '1' + digits
+    if not digits or len(digits) > E164_MAX_DIGITS or digits[0] == '0':
+        return None
+    return int(digits)
+
+
+def national_number(value) -> str:
+    """The ten-digit North American number for a phone number or E.164 integer"""
+    digits = str(value) if isinstance(value, int) else digits_only(value)
+    if len(digits) == NANP_DIGITS and digits[0] == '1':
+        return digits[1:]
+    return digits
+
+
+def e164_prefix_range(prefix, length: int = NANP_DIGITS) -> Tuple[int, int]:
+    """
+    The half-open [low, high) e164 range of the length-digit numbers that
+    start with prefix, a leading part of the E.164 digits ('1201555').
+    """
+    digits = digits_only(prefix)[:length]
+    if not digits:
+        raise ValueError(f"Phone number prefix {prefix!r} has no digits")
+    padding = length - len(digits)
+    low = int(digits) * 10 ** padding
+    return low, low + 10 ** padding
+
+
+def fill_e164(model, chunk_size: int = 5000, dedupe: bool = False,
+              log: Optional[Callable[[str], None]] = None) -> Tuple[int, int, int]:
+    """
+    Set e164 on the rows of model that lack it, in primary-key chunks.
+
+    Works on historical models too, so migrations can call it. With dedupe,
+    a row whose number another row already holds (after normalization) is
+    deleted rather than updated; rows that already have e164 and then the
+    lowest primary key win. Returns (filled, skipped, deleted), where
+    skipped counts rows without a usable number.
+    """
+    manager = model._base_manager
+    filled = skipped = deleted = 0
+    last_pk = 0
+
+    while True:
+        rows = list(
+            manager.filter(e164__isnull=True, pk__gt=last_pk)
+            .order_by('pk').values_list('pk', 'phone_number')[:chunk_size]
+        )
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+
+        values = {}
+        for pk, phone_number in rows:
+            e164 = to_e164(phone_number)
+            if e164 is None:
+                skipped += 1
+            else:
+                values[pk] = e164
+
+        duplicates = []
+        if dedupe:
+            taken = set(
+                manager.filter(e164__in=set(values.values())).values_list('e164', flat=True)
+            )
+            for pk, e164 in list(values.items()):
+                if e164 in taken:
+                    duplicates.append(pk)
+                    del values[pk]
+                else:
+                    taken.add(e164)
+            if duplicates:
+                manager.filter(pk__in=duplicates).delete()
+                deleted += len(duplicates)
+
+        manager.bulk_update([model(pk=pk, e164=e164) for pk, e164 in values.items()], ['e164'])
+        filled += len(values)
+
+        if log:
+            log(f'{model._meta.label}: up to id {last_pk}, {filled} filled, {deleted} duplicates removed')
+
+    return filled, skipped, deleted
+
+
+class E164QuerySet(models.QuerySet):
+    """QuerySet for models with phone_number and e164 columns"""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.e164 = to_e164(obj.phone_number)
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        if 'phone_number' in fields:
+            objs = list(objs)
+            for obj in objs:
+                obj.e164 = to_e164(obj.phone_number)
+            if 'e164' not in fields:
+                fields = [*fields, 'e164']
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def for_numbers(self, numbers: Iterable):
+        """Rows whose number equals any of numbers, in any format"""
+        return self.filter(e164__in={to_e164(number) for number in numbers} - {None})
+
+    def existing_e164(self, numbers: Iterable) -> Set[int]:
+        """The e164 values of numbers that already have a row"""
+        return set(self.for_numbers(numbers).values_list('e164', flat=True))
+
+    def with_prefix(self, prefix, length: int = NANP_DIGITS):
+        """Rows whose E.164 digits start with prefix, as a range scan"""
+        low, high = e164_prefix_range(prefix, length)
+        return self.filter(e164__gte=low, e164__lt=high)
@@ -0,0 +1,329 @@
+"""
+Sampled query and latency profiling for requests and Celery tasks.
+
+For a sampled request or task every SQL statement is timed through a
+database execute wrapper. The query count, total SQL time, wall time and
+repeated statements (N+1 candidates) are then aggregated per endpoint or
+task name into Redis. Wall times go into fixed histogram buckets, so
+percentiles can be reported without keeping raw samples.
+
+Settings:
+    PROFILING_SAMPLE_RATE: fraction of requests/tasks profiled (default 0.01)
+    PROFILING_RETENTION: seconds aggregates are kept after the last sample
+"""
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from god_bless_pro.cache import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "profile:"
+
+REQUEST = "request"
+TASK = "task"
+
+# Profile name shared by all requests that matched no URL pattern
+UNRESOLVED = "<unresolved>"
+
+# Upper bounds (ms) of the wall time histogram buckets; tasks can run for minutes
+WALL_TIME_BUCKETS = (
+    5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 300000, 900000, float('inf')
+)
+
+# Statements executed at least this many times in one request are reported
+DUPLICATE_THRESHOLD = 2
+
+MAX_FINGERPRINT_LENGTH = 300
+
+_IN_LIST_PATTERN = re.compile(r'\bIN\s*\((?:\s*%s\s*,)*\s*%s\s*\)', re.IGNORECASE)
+_LITERAL_PATTERN = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def fingerprint(sql: str) -> str:
+    """Normalize a statement so repeats with different parameters compare equal."""
+    sql = _IN_LIST_PATTERN.sub('IN (...)', sql)
+    sql = _LITERAL_PATTERN.sub('?', sql)
+    return _WHITESPACE_PATTERN.sub(' ', sql).strip()[:MAX_FINGERPRINT_LENGTH]
+
+
+def get_sample_rate() -> float:
+    return getattr(settings, 'PROFILING_SAMPLE_RATE', 0.01)
+
+
+def should_sample() -> bool:
+    rate = get_sample_rate()
+    return rate > 0 and random.random() < rate
+
+
+def wall_time_bucket(wall_ms: float) -> float:
+    for bound in WALL_TIME_BUCKETS:
+        if wall_ms <= bound:
+            return bound
+    return WALL_TIME_BUCKETS[-1]
+
+
+class QueryProfile:
+    """Collects SQL statistics for one unit of work while active."""
+
+    def __init__(self):
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.fingerprints = Counter()
+        self.wall_time = 0.0
+        self._stack = None
+        self._start = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_count += 1
+            self.sql_time += time.perf_counter() - start
+            self.fingerprints[fingerprint(sql)] += 1
+
+    def start(self) -> 'QueryProfile':
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        self._start = time.perf_counter()
+        return self
+
+    def stop(self) -> 'QueryProfile':
+        self.wall_time = time.perf_counter() - self._start
+        self._stack.close()
+        return self
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        return False
+
+    def duplicates(self) -> Dict[str, int]:
+        return {sql: count for sql, count in self.fingerprints.items() if count >= DUPLICATE_THRESHOLD}
+
+
+class RedisProfileStore:
+    """Aggregates shared by every process, updated in one pipeline per sample."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def _key(self, *parts) -> str:
+        return cache.make_key(KEY_PREFIX + ":".join(parts))
+
+    def record(self, kind: str, name: str, profile: QueryProfile) -> None:
+        entry = f"{kind}|{name}"
+        stats_key = self._key('stats', entry)
+        dups_key = self._key('dups', entry)
+        retention = getattr(settings, 'PROFILING_RETENTION', 7 * 86400)
+
+        pipe = self.client.pipeline()
+        pipe.sadd(self._key('index'), entry)
+        pipe.hincrby(stats_key, 'samples', 1)
+        pipe.hincrby(stats_key, 'queries', profile.query_count)
+        pipe.hincrbyfloat(stats_key, 'sql_ms', profile.sql_time * 1000)
+        pipe.hincrbyfloat(stats_key, 'wall_ms', profile.wall_time * 1000)
+        pipe.hincrby(stats_key, f"bucket:{wall_time_bucket(profile.wall_time * 1000)}", 1)
+        for sql, count in profile.duplicates().items():
+            pipe.zincrby(dups_key, count, sql)
+        pipe.expire(stats_key, retention)
+        pipe.expire(dups_key, retention)
+        pipe.expire(self._key('index'), retention)
+        pipe.execute()
+
+    def entries(self) -> List[str]:
+        return sorted(member.decode() if isinstance(member, bytes) else member
+                      for member in self.client.smembers(self._key('index')))
+
+    def stats(self, entry: str) -> Dict[str, float]:
+        raw = self.client.hgetall(self._key('stats', entry))
+        return {
+            (field.decode() if isinstance(field, bytes) else field): float(value)
+            for field, value in raw.items()
+        }
+
+    def duplicates(self, entry: str, limit: int) -> List[tuple]:
+        return [
+            (sql.decode() if isinstance(sql, bytes) else sql, int(score))
+            for sql, score in self.client.zrevrange(self._key('dups', entry), 0, limit - 1, withscores=True)
+        ]
+
+    def reset(self) -> None:
+        for entry in self.entries():
+            self.client.delete(self._key('stats', entry), self._key('dups', entry))
+        self.client.delete(self._key('index'))
+
+
+class LocalProfileStore:
+    """Per-process aggregates for cache backends without Redis (development, tests)."""
+
+    def __init__(self):
+        self._stats = {}
+        self._dups = {}
+        self._lock = threading.Lock()
+
+    def record(self, kind: str, name: str, profile: QueryProfile) -> None:
+        entry = f"{kind}|{name}"
+        with self._lock:
+            stats = self._stats.setdefault(entry, Counter())
+            stats['samples'] += 1
+            stats['queries'] += profile.query_count
+            stats['sql_ms'] += profile.sql_time * 1000
+            stats['wall_ms'] += profile.wall_time * 1000
+            stats[f"bucket:{wall_time_bucket(profile.wall_time * 1000)}"] += 1
+            self._dups.setdefault(entry, Counter()).update(profile.duplicates())
+
+    def entries(self) -> List[str]:
+        return sorted(self._stats)
+
+    def stats(self, entry: str) -> Dict[str, float]:
+        return {field: float(value) for field, value in self._stats.get(entry, {}).items()}
+
+    def duplicates(self, entry: str, limit: int) -> List[tuple]:
+        return self._dups.get(entry, Counter()).most_common(limit)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._dups.clear()
+
+
+_local_store = LocalProfileStore()
+
+
+def get_store():
+    client = get_redis_client()
+    return RedisProfileStore(client) if client is not None else _local_store
+
+
+def record_profile(kind: str, name: str, profile: QueryProfile) -> None:
+    """Add one sample to the aggregates; never raises."""
+    try:
+        get_store().record(kind, name, profile)
+    except Exception as e:
+        logger.warning(f"Failed to record profile for {name}: {e}")
+
+
+def percentile(buckets: Dict[float, float], fraction: float) -> Optional[float]:
+    """
+    Upper bound of the histogram bucket containing the given fraction of
+    samples. The overflow bucket reports the largest finite bound.
+    """
+    total = sum(buckets.values())
+    if not total:
+        return None
+    seen = 0
+    for bound in sorted(buckets):
+        seen += buckets[bound]
+        if seen >= total * fraction:
+            return min(bound, WALL_TIME_BUCKETS[-2])
+    return None
+
+
+def summarize(entry: str, stats: Dict[str, float], duplicates: List[tuple]) -> dict:
+    kind, name = entry.split('|', 1)
+    samples = stats.get('samples', 0) or 1
+    buckets = {
+        float(field.split(':', 1)[1]): count
+        for field, count in stats.items() if field.startswith('bucket:')
+    }
+    return {
+        'kind': kind,
+        'name': name,
+        'samples': int(stats.get('samples', 0)),
+        'avg_queries': round(stats.get('queries', 0) / samples, 1),
+        'avg_sql_ms': round(stats.get('sql_ms', 0) / samples, 2),
+        'avg_wall_ms': round(stats.get('wall_ms', 0) / samples, 2),
+        'p50_wall_ms': percentile(buckets, 0.50),
+        'p95_wall_ms': percentile(buckets, 0.95),
+        'p99_wall_ms': percentile(buckets, 0.99),
+        'duplicate_queries': [{'sql': sql, 'count': count} for sql, count in duplicates],
+    }
+
+
+def get_report(kind: Optional[str] = None, order_by: str = 'avg_wall_ms',
+               limit: int = 20, duplicates: int = 5) -> List[dict]:
+    """
+    Aggregated profiles, hottest first.
+
+    Args:
+        kind: 'request' or 'task' to restrict the report
+        order_by: Summary field to sort on (e.g. 'avg_queries', 'p95_wall_ms')
+        limit: Maximum number of endpoints/tasks returned
+        duplicates: Repeated statements listed per endpoint/task
+    """
+    store = get_store()
+    report = []
+    for entry in store.entries():
+        if kind and not entry.startswith(f"{kind}|"):
+            continue
+        stats = store.stats(entry)
+        if not stats:
+            continue
+        report.append(summarize(entry, stats, store.duplicates(entry, duplicates)))
+    report.sort(key=lambda item: item.get(order_by) or 0, reverse=True)
+    return report[:limit]
+
+
+def reset_profiles() -> None:
+    get_store().reset()
+
+
+class ProfilingMiddleware:
+    """Profiles a sample of requests, aggregated per resolved URL route."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not should_sample():
+            return self.get_response(request)
+
+        profile = QueryProfile().start()
+        try:
+            response = self.get_response(request)
+        finally:
+            profile.stop()
+        record_profile(REQUEST, self._endpoint_name(request), profile)
+        return response
+
+    @staticmethod
+    def _endpoint_name(request) -> str:
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            # Raw paths of 404s would add a profile per junk URL
+            return UNRESOLVED
+        return f"{request.method} /{match.route}"
+
+
+# Profiles of tasks running in this worker process, by task id
+_task_profiles = {}
+
+
+def start_task_profile(task_id: str) -> None:
+    """Begin profiling a task if it is sampled (task_prerun)."""
+    if task_id and should_sample():
+        _task_profiles[task_id] = QueryProfile().start()
+
+
+def finish_task_profile(task_id: str, task_name: str) -> None:
+    """Record a sampled task's profile (task_postrun)."""
+    profile = _task_profiles.pop(task_id, None)
+    if profile is not None:
+        profile.stop()
+        record_profile(TASK, task_name, profile)
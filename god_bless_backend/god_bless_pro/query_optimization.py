@@ -2,7 +2,7 @@
 Database query optimization utilities.
 """
 from django.db.models import QuerySet, Prefetch, Count, Q
-from typing import List, Optional
+from typing import Iterable, List, Optional
 from functools import wraps
 
 
@@ -96,6 +96,119 @@ def bulk_update_optimized(objects: List, fields: List[str], batch_size: int = 10
     return total_updated
 
 
+def _has_unique_constraint(model_class, unique_fields: List[str]) -> bool:
+    """Whether the database enforces uniqueness of exactly these fields"""
+    from django.db.models import UniqueConstraint
+
+    opts = model_class._meta
+    wanted = {opts.get_field(name).name for name in unique_fields}
+    if len(wanted) == 1:
+        field = opts.get_field(next(iter(wanted)))
+        if field.unique:
+            return True
+    if any(set(fields) == wanted for fields in opts.unique_together):
+        return True
+    return any(
+        isinstance(constraint, UniqueConstraint) and set(constraint.fields) == wanted
+        and constraint.condition is None and not constraint.expressions
+        for constraint in opts.constraints
+    )
+
+
+def _upsert_key(fields: List, obj) -> tuple:
+    return tuple(field.to_python(getattr(obj, field.attname)) for field in fields)
+
+
+def _upsert_batch_by_lookup(model_class, batch: dict, unique_fields: List[str], update_fields: List[str]):
+    """
+    Upsert one batch without ON CONFLICT: fetch the stored rows for the
+    batch keys in one query, bulk update those and bulk insert the rest.
+    """
+    fields = [model_class._meta.get_field(name) for name in unique_fields]
+    attnames = [model_class._meta.get_field(name).attname for name in update_fields]
+
+    updated = []
+    matched = set()
+    for row in model_class._base_manager.filter(**{f'{fields[0].attname}__in': {key[0] for key in batch}}):
+        key = _upsert_key(fields, row)
+        obj = batch.get(key)
+        if obj is None:
+            continue
+        for attname in attnames:
+            setattr(row, attname, getattr(obj, attname))
+        updated.append(row)
+        matched.add(key)
+
+    if updated and update_fields:
+        model_class._base_manager.bulk_update(updated, update_fields)
+    model_class._base_manager.bulk_create([obj for key, obj in batch.items() if key not in matched])
+
+
+def bulk_upsert(model_class, objects: Iterable, unique_fields: List[str],
+                update_fields: Optional[List[str]] = None, batch_size: int = 1000) -> int:
+    """
+    Insert objects, updating the stored rows that have the same unique_fields
+    values instead of failing or duplicating them.
+
+    Uses INSERT ... ON CONFLICT DO UPDATE (bulk_create(update_conflicts=True))
+    when the backend supports it and the database has a unique constraint on
+    unique_fields. Otherwise each batch is matched against the stored rows
+    with one query and split into a bulk update and a bulk insert. objects
+    may be any iterable, including a generator; it is consumed one batch at
+    a time. Within a batch the last object with a given key wins.
+
+    Args:
+        model_class: Django model class
+        objects: Unsaved model instances
+        unique_fields: Fields identifying a row
+        update_fields: Fields overwritten on existing rows (default: every
+            concrete field except the primary key, unique_fields and
+            auto_now_add fields)
+        batch_size: Number of objects per statement
+
+    Returns:
+        Number of objects written
+    """
+    from django.db import connection, transaction
+
+    if update_fields is None:
+        update_fields = [
+            field.name for field in model_class._meta.concrete_fields
+            if not field.primary_key and field.name not in unique_fields
+            and not getattr(field, 'auto_now_add', False)
+        ]
+    key_fields = [model_class._meta.get_field(name) for name in unique_fields]
+    native = (
+        connection.features.supports_update_conflicts_with_target
+        and _has_unique_constraint(model_class, unique_fields)
+    )
+
+    def write(batch):
+        with transaction.atomic():
+            if not native:
+                _upsert_batch_by_lookup(model_class, batch, unique_fields, update_fields)
+            elif update_fields:
+                model_class._base_manager.bulk_create(
+                    list(batch.values()), update_conflicts=True,
+                    unique_fields=unique_fields, update_fields=update_fields,
+                )
+            else:
+                model_class._base_manager.bulk_create(list(batch.values()), ignore_conflicts=True)
+        return len(batch)
+
+    written = 0
+    batch = {}
+    for obj in objects:
+        # ON CONFLICT cannot touch the same row twice in one statement
+        batch[_upsert_key(key_fields, obj)] = obj
+        if len(batch) >= batch_size:
+            written += write(batch)
+            batch = {}
+    if batch:
+        written += write(batch)
+    return written
+
+
 def paginate_queryset(queryset: QuerySet, page: int = 1, page_size: int = 100):
     """
     Efficiently paginate a queryset.
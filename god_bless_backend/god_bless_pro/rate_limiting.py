@@ -4,15 +4,42 @@ Prevents abuse and ensures fair usage of the platform.
 """
 
 import time
-from typing import Optional, Tuple
+from typing import NamedTuple, Optional, Tuple
 from django.core.cache import cache
 from django.conf import settings
 from rest_framework.throttling import SimpleRateThrottle
 from rest_framework.exceptions import Throttled
 
+from god_bless_pro.cache import get_redis_client
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of a single rate limit hit"""
+    allowed: bool
+    count: int
+    limit: int
+    remaining: int
+    reset_time: float
+    retry_after: Optional[int]
+    
+    def as_usage(self) -> dict:
+        """Same shape as BaseRateLimiter.get_usage()"""
+        return {
+            'count': self.count,
+            'limit': self.limit,
+            'remaining': self.remaining,
+            'reset_time': self.reset_time
+        }
+
 
 class BaseRateLimiter:
-    """Base rate limiter using Redis/cache backend"""
+    """
+    Fixed-window rate limiter using Redis/cache backend.
+    
+    Each window has its own counter key, incremented atomically: on Redis
+    with an INCR + EXPIRE pipeline (one round trip), elsewhere with
+    cache.add + cache.incr. Limits are exact across worker processes.
+    """
     
     def __init__(self, key_prefix: str, rate: int, period: int):
         """
@@ -31,6 +58,48 @@ class BaseRateLimiter:
         """Generate cache key for identifier"""
         return f"rate_limit:{self.key_prefix}:{identifier}"
     
+    def _window(self, current_time: float) -> Tuple[str, float]:
+        """Counter key suffix and reset time of the window containing current_time"""
+        window = int(current_time // self.period)
+        return str(window), (window + 1) * self.period
+    
+    def _increment(self, key: str, ttl: int) -> int:
+        """Atomically increment a window counter and return the new count"""
+        client = get_redis_client()
+        if client is not None:
+            redis_key = cache.make_and_validate_key(key)
+            pipe = client.pipeline()
+            pipe.incr(redis_key)
+            pipe.expire(redis_key, ttl)
+            count, _ = pipe.execute()
+            return int(count)
+        
+        if cache.add(key, 1, ttl):
+            return 1
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Expired between add and incr
+            cache.set(key, 1, ttl)
+            return 1
+    
+    def hit(self, identifier: str) -> RateLimitResult:
+        """Count a request and report whether it is allowed, in one call"""
+        current_time = time.time()
+        window, reset_time = self._window(current_time)
+        ttl = max(1, int(reset_time - current_time) + 1)
+        count = self._increment(f"{self.get_cache_key(identifier)}:{window}", ttl)
+        
+        allowed = count <= self.rate
+        return RateLimitResult(
+            allowed=allowed,
+            count=min(count, self.rate),
+            limit=self.rate,
+            remaining=max(0, self.rate - count),
+            reset_time=reset_time,
+            retry_after=None if allowed else max(1, int(reset_time - current_time)),
+        )
+    
     def is_allowed(self, identifier: str) -> Tuple[bool, Optional[int]]:
         """
         Check if request is allowed
@@ -38,47 +107,15 @@ class BaseRateLimiter:
         Returns:
             Tuple of (is_allowed, retry_after_seconds)
         """
-        cache_key = self.get_cache_key(identifier)
-        
-        # Get current request data
-        request_data = cache.get(cache_key)
-        current_time = time.time()
-        
-        if request_data is None:
-            # First request
-            cache.set(cache_key, {
-                'count': 1,
-                'reset_time': current_time + self.period
-            }, self.period)
-            return True, None
-        
-        # Check if period has expired
-        if current_time >= request_data['reset_time']:
-            # Reset counter
-            cache.set(cache_key, {
-                'count': 1,
-                'reset_time': current_time + self.period
-            }, self.period)
-            return True, None
-        
-        # Check if rate limit exceeded
-        if request_data['count'] >= self.rate:
-            retry_after = int(request_data['reset_time'] - current_time)
-            return False, retry_after
-        
-        # Increment counter
-        request_data['count'] += 1
-        remaining_time = int(request_data['reset_time'] - current_time)
-        cache.set(cache_key, request_data, remaining_time)
-        
-        return True, None
+        result = self.hit(identifier)
+        return result.allowed, result.retry_after
     
     def get_usage(self, identifier: str) -> dict:
         """Get current usage statistics"""
-        cache_key = self.get_cache_key(identifier)
-        request_data = cache.get(cache_key)
+        window, reset_time = self._window(time.time())
+        count = cache.get(f"{self.get_cache_key(identifier)}:{window}")
         
-        if request_data is None:
+        if count is None:
             return {
                 'count': 0,
                 'limit': self.rate,
@@ -86,11 +123,12 @@ class BaseRateLimiter:
                 'reset_time': None
             }
         
+        count = min(int(count), self.rate)
         return {
-            'count': request_data['count'],
+            'count': count,
             'limit': self.rate,
-            'remaining': max(0, self.rate - request_data['count']),
-            'reset_time': request_data['reset_time']
+            'remaining': max(0, self.rate - count),
+            'reset_time': reset_time
         }
 
 
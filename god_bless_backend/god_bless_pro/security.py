@@ -46,6 +46,23 @@ class InputValidator:
         r"<object",
     ]
     
+    # All patterns compiled once into single alternations so each value is
+    # scanned in one pass
+    SQL_INJECTION_REGEX = re.compile('|'.join(SQL_INJECTION_PATTERNS), re.IGNORECASE)
+    XSS_REGEX = re.compile('|'.join(XSS_PATTERNS), re.IGNORECASE)
+    THREAT_REGEX = re.compile(
+        '(?P<sql_injection>' + '|'.join(SQL_INJECTION_PATTERNS) + ')|(?P<xss>' + '|'.join(XSS_PATTERNS) + ')',
+        re.IGNORECASE
+    )
+    
+    # Values that cannot match any pattern: bare identifiers/numbers, and
+    # digit strings with single separators (phone numbers, dates)
+    SAFE_VALUE_PATTERN = re.compile(r'\w*|[\d\s().+/]*(?:-[\d\s().+/]+)*')
+    
+    # Values longer than this are rejected rather than scanned, since the
+    # patterns can backtrack badly on very long input
+    MAX_SCAN_LENGTH = 65536
+    
     @classmethod
     def validate_email(cls, email: str) -> str:
         """Validate and sanitize email address"""
@@ -219,19 +236,31 @@ class InputValidator:
     @classmethod
     def _contains_sql_injection(cls, text: str) -> bool:
         """Check if text contains SQL injection patterns"""
-        text_upper = text.upper()
-        for pattern in cls.SQL_INJECTION_PATTERNS:
-            if re.search(pattern, text_upper, re.IGNORECASE):
-                return True
-        return False
+        return cls.SQL_INJECTION_REGEX.search(text) is not None
     
     @classmethod
     def _contains_xss(cls, text: str) -> bool:
         """Check if text contains XSS patterns"""
-        for pattern in cls.XSS_PATTERNS:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
-        return False
+        return cls.XSS_REGEX.search(text) is not None
+    
+    @classmethod
+    def scan(cls, text: str, check_xss: bool = True) -> Optional[str]:
+        """
+        Scan a request value in a single pass.
+        
+        Returns 'sql_injection' or 'xss' for the first threat found, or None.
+        Values that cannot contain a threat are skipped. Values longer than
+        MAX_SCAN_LENGTH return 'oversized' and should be rejected.
+        """
+        if not text or cls.SAFE_VALUE_PATTERN.fullmatch(text):
+            return None
+        if len(text) > cls.MAX_SCAN_LENGTH:
+            return 'oversized'
+        
+        if not check_xss:
+            return 'sql_injection' if cls.SQL_INJECTION_REGEX.search(text) else None
+        match = cls.THREAT_REGEX.search(text)
+        return match.lastgroup if match else None
     
     @classmethod
     def validate_json_field(cls, data: Dict, required_fields: List[str]) -> Dict:
@@ -100,43 +100,35 @@ class InputSanitizationMiddleware(MiddlewareMixin):
         
         # Check for SQL injection patterns in query parameters
         for key, value in request.GET.items():
-            if isinstance(value, str) and self._contains_sql_injection(value):
-                log_sql_injection_attempt(request, value)
-                return JsonResponse({
-                    'message': 'Invalid request',
-                    'errors': {'security': ['Invalid input detected']}
-                }, status=status.HTTP_400_BAD_REQUEST)
+            if isinstance(value, str):
+                threat = InputValidator.scan(value, check_xss=False)
+                if threat:
+                    return self._reject(request, key, value, threat)
         
         # Check POST data for SQL injection and XSS
         if request.method in ['POST', 'PUT', 'PATCH']:
             if hasattr(request, 'data'):
                 for key, value in request.data.items():
                     if isinstance(value, str):
-                        if self._contains_sql_injection(value):
-                            log_sql_injection_attempt(request, value)
-                            return JsonResponse({
-                                'message': 'Invalid request',
-                                'errors': {'security': ['Invalid input detected']}
-                            }, status=status.HTTP_400_BAD_REQUEST)
-                        
-                        if self._contains_xss(value):
-                            log_xss_attempt(request, value)
-                            return JsonResponse({
-                                'message': 'Invalid request',
-                                'errors': {'security': ['Invalid input detected']}
-                            }, status=status.HTTP_400_BAD_REQUEST)
+                        threat = InputValidator.scan(value)
+                        if threat:
+                            return self._reject(request, key, value, threat)
         
         return None
     
     @staticmethod
-    def _contains_sql_injection(text: str) -> bool:
-        """Check for SQL injection patterns"""
-        return InputValidator._contains_sql_injection(text)
-    
-    @staticmethod
-    def _contains_xss(text: str) -> bool:
-        """Check for XSS patterns"""
-        return InputValidator._contains_xss(text)
+    def _reject(request, key, value, threat):
+        """Log the threat InputValidator.scan found and reject the request"""
+        if threat == 'sql_injection':
+            log_sql_injection_attempt(request, value)
+        elif threat == 'xss':
+            log_xss_attempt(request, value)
+        else:
+            log_suspicious_activity(request, 'oversized_input', {'field': key, 'length': len(value)})
+        return JsonResponse({
+            'message': 'Invalid request',
+            'errors': {'security': ['Invalid input detected']}
+        }, status=status.HTTP_400_BAD_REQUEST)
 
 
 class RateLimitMiddleware(MiddlewareMixin):
@@ -184,10 +176,10 @@ class RateLimitMiddleware(MiddlewareMixin):
             identifier = get_client_ip(request)
             limiter = self.ip_limiter
         
-        # Check rate limit
-        is_allowed, retry_after = limiter.is_allowed(identifier)
+        # Check rate limit (counts the request and returns usage in one call)
+        result = limiter.hit(identifier)
         
-        if not is_allowed:
+        if not result.allowed:
             # Log rate limit exceeded
             AuditLogger.log_rate_limit(
                 user=request.user if hasattr(request, 'user') and request.user.is_authenticated else None,
@@ -198,19 +190,18 @@ class RateLimitMiddleware(MiddlewareMixin):
             
             response = JsonResponse({
                 'message': 'Rate limit exceeded',
-                'errors': {'rate_limit': [f'Too many requests. Please try again in {retry_after} seconds.']}
+                'errors': {'rate_limit': [f'Too many requests. Please try again in {result.retry_after} seconds.']}
             }, status=status.HTTP_429_TOO_MANY_REQUESTS)
             
-            response['Retry-After'] = str(retry_after)
+            response['Retry-After'] = str(result.retry_after)
             response['X-RateLimit-Limit'] = str(limiter.rate)
             response['X-RateLimit-Remaining'] = '0'
-            response['X-RateLimit-Reset'] = str(retry_after)
+            response['X-RateLimit-Reset'] = str(result.retry_after)
             
             return response
         
         # Add rate limit headers to response
-        usage = limiter.get_usage(identifier)
-        request._rate_limit_usage = usage
+        request._rate_limit_usage = result.as_usage()
         
         return None
     
@@ -57,13 +57,15 @@ INSTALLED_APPS = [
     "smtps",
     "proxy_server",
     "projects",
-    "tasks"
+    "tasks",
+    "god_bless_pro",  # project-level management commands
 ]
 
 AUTH_USER_MODEL = "accounts.User"
 
 
 MIDDLEWARE = [
+    "god_bless_pro.profiling.ProfilingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -255,7 +257,7 @@ if csrf_trusted_origins:
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'god_bless_pro.auth_backends.CachedTokenAuthentication',
     ),
     'DEFAULT_RENDERER_CLASSES': (
         'rest_framework.renderers.JSONRenderer',
@@ -36,7 +36,8 @@ INSTALLED_APPS = [
     'smtps',
     'proxy_server',
     'projects',
-    'tasks'
+    'tasks',
+    'god_bless_pro',  # project-level management commands
 ]
 
 AUTH_USER_MODEL = 'accounts.User'
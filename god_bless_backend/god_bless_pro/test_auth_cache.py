@@ -0,0 +1,130 @@
+"""
+Tests for cached token authentication.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, SimpleTestCase, RequestFactory, override_settings
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+
+from god_bless_pro import auth_cache
+from god_bless_pro.auth_backends import CachedTokenAuthentication
+from projects.models import Project
+
+User = get_user_model()
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class LocalLRUCacheTests(SimpleTestCase):
+    """Test the in-process LRU"""
+
+    def test_expires_and_evicts(self):
+        clock = FakeClock()
+        lru = auth_cache.LocalLRUCache(maxsize=2, ttl=5, clock=clock)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), 1)
+
+        clock.now = 5
+        self.assertIsNone(lru.get('a'))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CachedTokenAuthenticationTests(TestCase):
+    """Test query savings and signal-driven invalidation"""
+
+    def setUp(self):
+        cache.clear()
+        auth_cache._local_cache.clear()
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            username='testuser',
+            password='testpass123'
+        )
+        self.token = Token.objects.get(user=self.user)
+        self.project = Project.objects.create(user=self.user, project_name='Test Project')
+        self.factory = RequestFactory()
+
+    def _authenticate(self):
+        request = self.factory.get('/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        user, _ = CachedTokenAuthentication().authenticate(request)
+        request.user = user
+        return request, user
+
+    def test_cache_hit_runs_no_queries(self):
+        self._authenticate()
+        with self.assertNumQueries(0):
+            request, user = self._authenticate()
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertIs(auth_cache.get_request_user(request, self.user.user_id), user)
+            project = auth_cache.get_request_project(request, str(self.project.id))
+            self.assertEqual(project.project_name, 'Test Project')
+
+    def test_shared_cache_holds_no_user_data(self):
+        self._authenticate()
+        shared = cache.get(auth_cache._cache_key(self.token.key))
+        self.assertEqual(shared, {
+            'user_pk': self.user.pk,
+            'user_id': self.user.user_id,
+            'is_active': True,
+            'project_ids': [self.project.id],
+        })
+
+        # Another process rebuilds the objects by primary key, without the token join
+        auth_cache._local_cache.clear()
+        with self.assertNumQueries(2):
+            request, user = self._authenticate()
+        self.assertEqual(user.email, 'test@example.com')
+        self.assertEqual(request.auth_projects[self.project.id].project_name, 'Test Project')
+
+    def test_archiving_user_invalidates(self):
+        self._authenticate()
+        self.user.is_active = False
+        self.user.is_archived = True
+        self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self._authenticate()
+
+    def test_revoking_token_invalidates(self):
+        self._authenticate()
+        self.token.delete()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self._authenticate()
+
+    def test_project_changes_refresh_acl(self):
+        self._authenticate()
+        new_project = Project.objects.create(user=self.user, project_name='Second Project')
+        request, _ = self._authenticate()
+        self.assertIn(new_project.id, request.auth_projects)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TokenUsageBufferTests(SimpleTestCase):
+    """Test batched usage recording"""
+
+    def test_flushes_once_per_interval(self):
+        cache.clear()
+        clock = FakeClock()
+        buffer = auth_cache.TokenUsageBuffer(flush_interval=10, clock=clock)
+        request = RequestFactory().get('/')
+
+        buffer.record('abc', request)
+        buffer.record('def', request)
+        self.assertIsNone(cache.get('token_usage:abc'))
+
+        clock.now = 10
+        buffer.record('abc', request)
+        self.assertIsNotNone(cache.get('token_usage:abc'))
+        self.assertIsNotNone(cache.get('token_usage:def'))
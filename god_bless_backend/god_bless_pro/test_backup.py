@@ -0,0 +1,73 @@
+"""
+Tests for the streaming backup and restore engine.
+"""
+import gzip
+import json
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from god_bless_pro import backup
+from phone_generator.models import PhoneNumber
+from projects.models import Project
+
+User = get_user_model()
+
+
+class BackupRestoreTests(TestCase):
+    """Test round trips, manifests and dependency ordering"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmpdir.name, 'backup')
+        self.user = User.objects.create_user(email='backup@example.com', username='backupuser', password='testpass123')
+        self.project = Project.objects.create(user=self.user, project_name='Backup Project')
+        PhoneNumber.objects.bulk_create([
+            PhoneNumber(user=self.user, project=self.project, phone_number=f'1201555{i:04d}', carrier='Verizon')
+            for i in range(25)
+        ])
+        self.models = [PhoneNumber, Project, User]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_dependency_order(self):
+        ordered = backup.dependency_order(self.models)
+        self.assertLess(ordered.index(User), ordered.index(Project))
+        self.assertLess(ordered.index(Project), ordered.index(PhoneNumber))
+
+    def test_backup_writes_streams_and_manifest(self):
+        manifest = backup.backup_database(self.directory, model_list=self.models, chunk_size=10)
+
+        entries = {entry['model']: entry for entry in manifest['models']}
+        self.assertEqual(entries['phone_generator.phonenumber']['rows'], 25)
+        self.assertEqual(manifest['total_rows'], 27)
+
+        entry = entries['phone_generator.phonenumber']
+        with gzip.open(os.path.join(self.directory, entry['file']), 'rt') as stream:
+            rows = [json.loads(line) for line in stream]
+        ids = [row[entry['columns'].index('id')] for row in rows]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(backup.load_manifest(self.directory)['models'], manifest['models'])
+
+    def test_round_trip(self):
+        original = list(PhoneNumber.objects.order_by('pk').values())
+        original_user = User.objects.values().get(pk=self.user.pk)
+        backup.backup_database(self.directory, model_list=self.models)
+
+        total = backup.restore_database(self.directory, flush=True, chunk_size=7)
+
+        self.assertEqual(total, 27)
+        self.assertEqual(list(PhoneNumber.objects.order_by('pk').values()), original)
+        # auto_now_add timestamps and hashed passwords come back unchanged
+        self.assertEqual(User.objects.values().get(pk=self.user.pk), original_user)
+
+    def test_corrupt_file_is_rejected(self):
+        manifest = backup.backup_database(self.directory, model_list=self.models)
+        with open(os.path.join(self.directory, manifest['models'][0]['file']), 'ab') as handle:
+            handle.write(b'x')
+
+        with self.assertRaises(backup.BackupError):
+            backup.restore_database(self.directory)
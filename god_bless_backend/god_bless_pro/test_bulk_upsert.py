@@ -0,0 +1,62 @@
+"""
+Tests for bulk upserts and streaming JSON parsing
+"""
+import io
+import json
+
+from django.test import SimpleTestCase, TestCase
+
+from god_bless_pro.json_stream import iter_json_items
+from god_bless_pro.query_optimization import bulk_upsert
+from phone_number_validator.models import PhonePrefix, Proxy
+
+
+class BulkUpsertTests(TestCase):
+    """Test the ON CONFLICT path and the lookup fallback"""
+
+    def test_upsert_on_unique_field(self):
+        PhonePrefix.objects.create(prefix='201200', carrier='Sprint', city='Newark', state='NJ', line_type='Mobile')
+
+        written = bulk_upsert(PhonePrefix, (
+            PhonePrefix(prefix=prefix, carrier=carrier, city='Newark', state='NJ', line_type='Mobile')
+            for prefix, carrier in [('201200', 'Verizon'), ('201201', 'AT&T'), ('201201', 'T-Mobile')]
+        ), unique_fields=['prefix'], batch_size=2)
+
+        self.assertEqual(written, 3)
+        self.assertEqual(
+            dict(PhonePrefix.objects.values_list('prefix', 'carrier')),
+            {'201200': 'Verizon', '201201': 'T-Mobile'}
+        )
+
+    def test_upsert_without_unique_constraint(self):
+        existing = Proxy.objects.create(ip_address='10.0.0.1', port=8080, valid=False)
+
+        bulk_upsert(Proxy, [
+            Proxy(ip_address='10.0.0.1', port='8080', valid=True),
+            Proxy(ip_address='10.0.0.1', port=3128, valid=True),
+        ], unique_fields=['ip_address', 'port'])
+
+        self.assertEqual(Proxy.objects.count(), 2)
+        existing.refresh_from_db()
+        self.assertTrue(existing.valid)
+        # auto_now_add fields keep their stored value
+        self.assertEqual(Proxy.objects.get(pk=existing.pk).created_at, existing.created_at)
+
+
+class JsonStreamTests(SimpleTestCase):
+    """Test item-by-item parsing across small read blocks"""
+
+    def test_array_items(self):
+        data = [{'prefix': '201200', 'city': 'Newark, "NJ"'}, 12345, 'x' * 50, [1, 2], None]
+        items = list(iter_json_items(io.StringIO(json.dumps(data, indent=2)), read_size=7))
+        self.assertEqual(items, data)
+
+    def test_object_values(self):
+        data = {'201200': {'prefix': '201200'}, '201201': {'prefix': '201201'}}
+        items = list(iter_json_items(io.StringIO(json.dumps(data)), read_size=5))
+        self.assertEqual(items, list(data.values()))
+
+    def test_empty_and_invalid(self):
+        self.assertEqual(list(iter_json_items(io.StringIO(' [ ] '))), [])
+        with self.assertRaises(ValueError):
+            list(iter_json_items(io.StringIO('[1, 2')))
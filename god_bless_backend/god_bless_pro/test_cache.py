@@ -0,0 +1,198 @@
+"""
+Tests for versioned cache namespaces, the two-tier cache and stampede
+protection.
+"""
+import json
+import threading
+import time
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from god_bless_pro.cache import (
+    CacheNamespace, PhoneNumberCache, StatsCache, TwoTierCache, invalidation_listener
+)
+from god_bless_pro.cache_utils import (
+    acquire_refresh_lock, cache_result, cache_result_protected, get_or_compute,
+    invalidate_cache_pattern, write_entry,
+)
+from phone_number_validator.models import PhonePrefix, get_phone_prefix, prefix_cache
+from sms_sender.models import SMSCampaign
+
+User = get_user_model()
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CacheNamespaceTests(SimpleTestCase):
+    """Test generation-counter invalidation"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_bump_changes_only_the_affected_keys(self):
+        project_a = CacheNamespace.make_key(CacheNamespace.PHONE_NUMBERS, 'list', 1, 10)
+        project_b = CacheNamespace.make_key(CacheNamespace.PHONE_NUMBERS, 'list', 1, 20)
+        user_wide = CacheNamespace.make_key(CacheNamespace.PHONE_NUMBERS, 'stats', 1)
+        other_user = CacheNamespace.make_key(CacheNamespace.PHONE_NUMBERS, 'stats', 2)
+
+        CacheNamespace.bump(CacheNamespace.PHONE_NUMBERS, 1, 10)
+        self.assertNotEqual(CacheNamespace.make_key(CacheNamespace.PHONE_NUMBERS, 'list', 1, 10), project_a)
+        self.assertEqual(CacheNamespace.make_key(CacheNamespace.PHONE_NUMBERS, 'list', 1, 20), project_b)
+        self.assertNotEqual(CacheNamespace.make_key(CacheNamespace.PHONE_NUMBERS, 'stats', 1), user_wide)
+        self.assertEqual(CacheNamespace.make_key(CacheNamespace.PHONE_NUMBERS, 'stats', 2), other_user)
+
+        CacheNamespace.bump(CacheNamespace.PHONE_NUMBERS, 1)
+        self.assertNotEqual(CacheNamespace.make_key(CacheNamespace.PHONE_NUMBERS, 'list', 1, 20), project_b)
+
+    def test_helpers_miss_after_invalidation(self):
+        PhoneNumberCache.set_carrier_stats(1, {'verizon': 3})
+        self.assertEqual(PhoneNumberCache.get_carrier_stats(1), {'verizon': 3})
+        PhoneNumberCache.invalidate_user_phones(1, 10)
+        self.assertIsNone(PhoneNumberCache.get_carrier_stats(1))
+
+    def test_invalidate_cache_pattern_bumps_prefix(self):
+        calls = []
+
+        @cache_result(timeout=60, key_prefix='user_stats')
+        def compute(user_id):
+            calls.append(user_id)
+            return user_id * 2
+
+        compute(3)
+        compute(3)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(invalidate_cache_pattern('user_stats*'), 1)
+        compute(3)
+        self.assertEqual(len(calls), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class CampaignInvalidationTests(TestCase):
+    """Test campaign writes invalidate dashboard stats"""
+
+    def test_campaign_save_invalidates_dashboard(self):
+        cache.clear()
+        user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        StatsCache.set_dashboard_stats(user.id, {'campaigns': 0})
+        SMSCampaign.objects.create(user=user, name='Test Campaign', message_template='Hello!')
+        self.assertIsNone(StatsCache.get_dashboard_stats(user.id))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class TwoTierCacheTests(SimpleTestCase):
+    """Test local/shared lookups, invalidation and metrics"""
+
+    def setUp(self):
+        cache.clear()
+        self.tier = TwoTierCache('test_tier', local_maxsize=10, local_ttl=60)
+
+    def test_reads_fall_through_tiers(self):
+        loads = []
+        load = lambda: loads.append(1) or {'value': 1}
+
+        self.assertEqual(self.tier.get_or_set('a', load), {'value': 1})
+        self.assertEqual(self.tier.get_or_set('a', load), {'value': 1})
+        # Another process only has the shared tier
+        self.tier.local.clear()
+        self.assertEqual(self.tier.get_or_set('a', load), {'value': 1})
+        self.assertEqual(len(loads), 1)
+
+        stats = self.tier.stats()
+        self.assertEqual((stats['local_hits'], stats['shared_hits'], stats['misses']), (1, 1, 1))
+        self.assertAlmostEqual(stats['hit_ratio'], 0.6667)
+
+    def test_none_is_cached(self):
+        loads = []
+        self.tier.get_or_set('missing', lambda: loads.append(1))
+        self.tier.get_or_set('missing', lambda: loads.append(1))
+        self.assertEqual(len(loads), 1)
+
+    def test_delete_and_clear(self):
+        self.tier.set('a', 1)
+        self.tier.set('b', 2)
+        self.tier.delete('a')
+        self.assertIsNone(self.tier.get('a'))
+        self.tier.clear()
+        self.tier.local.clear()
+        self.assertIsNone(self.tier.get('b'))
+
+    def test_remote_invalidation_drops_local_entry(self):
+        self.tier.local.set('a', (1,))
+        invalidation_listener.handle(json.dumps({'cache': 'test_tier', 'key': 'a', 'origin': 'other:1'}))
+        self.assertIsNone(self.tier.local.get('a'))
+
+        self.tier.local.set('b', (2,))
+        invalidation_listener.handle(json.dumps({'cache': 'test_tier', 'key': None, 'origin': 'other:1'}))
+        self.assertIsNone(self.tier.local.get('b'))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PhonePrefixCacheTests(TestCase):
+    """Test cached prefix lookups follow PhonePrefix writes"""
+
+    def test_lookup_is_invalidated_on_save(self):
+        cache.clear()
+        prefix_cache.local.clear()
+        with self.assertRaises(PhonePrefix.DoesNotExist):
+            get_phone_prefix('201200')
+
+        PhonePrefix.objects.create(
+            prefix='201200', carrier='Sprint', city='Newark', state='New Jersey', line_type='Mobile'
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(get_phone_prefix('201200').carrier, 'Sprint')
+            self.assertEqual(get_phone_prefix('201200').carrier, 'Sprint')
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class StampedeProtectionTests(SimpleTestCase):
+    """Test single-flight recomputation and stale serving"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+
+        @cache_result_protected(timeout=60, key_prefix='slow_stats')
+        def slow_stats():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'count': 42}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(slow_stats())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'count': 42}] * 8)
+
+    def test_stale_value_served_while_refreshing(self):
+        write_entry('stats', 'old', timeout=-1, stale_ttl=60)
+        acquire_refresh_lock('stats')
+        # Another caller holds the lock, so this one gets the stale value
+        self.assertEqual(get_or_compute('stats', lambda: 'new'), 'old')
+
+    def test_expired_value_is_refreshed_by_lock_holder(self):
+        write_entry('stats', 'old', timeout=-1, stale_ttl=60)
+        self.assertEqual(get_or_compute('stats', lambda: 'new'), 'new')
+        self.assertEqual(get_or_compute('stats', lambda: 'newer'), 'new')
+
+    def test_early_refresh_before_expiry(self):
+        write_entry('stats', 'old', timeout=5, stale_ttl=60, delta=2.0)
+        with patch('god_bless_pro.cache_utils.random.random', return_value=0.0):
+            self.assertEqual(get_or_compute('stats', lambda: 'new'), 'old')
+        # A draw far in the tail refreshes ahead of the soft TTL
+        with patch('god_bless_pro.cache_utils.random.random', return_value=0.99):
+            self.assertEqual(get_or_compute('stats', lambda: 'new'), 'new')
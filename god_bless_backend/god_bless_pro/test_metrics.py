@@ -0,0 +1,95 @@
+"""
+Tests for the metrics registry and its text exposition.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from god_bless_pro import metrics
+from god_bless_pro.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+User = get_user_model()
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class MetricsRegistryTests(SimpleTestCase):
+    """Test buffering, aggregation and exposition"""
+
+    def setUp(self):
+        self.registry = MetricsRegistry(flush_interval=60)
+        self.sent = Counter('test_sent', 'Messages sent', ['carrier'], registry=self.registry)
+        self.depth = Gauge('test_depth', 'Queue depth', ['campaign'], registry=self.registry)
+        self.latency = Histogram('test_latency_seconds', 'Send latency', buckets=(0.1, 1.0),
+                                 registry=self.registry)
+        self.registry.reset()
+
+    def test_render_exposition(self):
+        self.sent.labels(carrier='Verizon').inc()
+        self.sent.labels(carrier='Verizon').inc(2)
+        self.sent.labels(carrier='AT&T "x"').inc()
+        self.depth.labels(campaign='7').set(40)
+        self.depth.labels(campaign='7').dec(5)
+        self.latency.observe(0.05)
+        self.latency.observe(0.5)
+        self.latency.observe(3)
+
+        output = self.registry.render()
+        self.assertIn('# TYPE test_sent counter', output)
+        self.assertIn('test_sent_total{carrier="Verizon"} 3', output)
+        self.assertIn('test_sent_total{carrier="AT&T \\"x\\""} 1', output)
+        self.assertIn('test_depth{campaign="7"} 35', output)
+        self.assertIn(
+            'test_latency_seconds_bucket{le="0.1"} 1\n'
+            'test_latency_seconds_bucket{le="1.0"} 2\n'
+            'test_latency_seconds_bucket{le="+Inf"} 3\n'
+            'test_latency_seconds_sum 3.55\n'
+            'test_latency_seconds_count 3',
+            output
+        )
+
+    def test_updates_are_buffered_until_flush(self):
+        self.sent.labels(carrier='Verizon').inc()
+        self.assertEqual(metrics.get_store().read(['test_sent']), {'test_sent': {}})
+        self.registry.flush()
+        self.assertEqual(
+            metrics.get_store().read(['test_sent']),
+            {'test_sent': {'test_sent_total{carrier="Verizon"}': 1.0}}
+        )
+
+    def test_removed_gauge_is_not_exposed(self):
+        self.depth.labels(campaign='7').set(10)
+        self.registry.flush()
+        self.depth.labels(campaign='7').remove()
+        self.assertNotIn('test_depth{campaign="7"}', self.registry.render())
+
+    def test_label_validation(self):
+        with self.assertRaises(ValueError):
+            self.sent.labels(server='smtp')
+        with self.assertRaises(ValueError):
+            self.sent.inc()
+        with self.assertRaises(ValueError):
+            self.sent.labels(carrier='Verizon').inc(-1)
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PrometheusEndpointTests(TestCase):
+    """Test the exposition endpoint"""
+
+    def test_admin_gets_text_exposition(self):
+        cache.clear()
+        admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='Test@123!')
+        metrics.SMS_MESSAGES_SENT.labels(carrier='Verizon', server='smtp.example.com:465').inc()
+
+        client = APIClient()
+        client.force_authenticate(admin)
+        response = client.get('/api/monitoring/prometheus/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn(
+            'sms_messages_sent_total{carrier="Verizon",server="smtp.example.com:465"}',
+            response.content.decode()
+        )
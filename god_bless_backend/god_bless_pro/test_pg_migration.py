@@ -0,0 +1,65 @@
+"""
+Tests for the SQLite side of the SQLite to PostgreSQL migration
+"""
+import os
+import sqlite3
+import tempfile
+
+from django.test import SimpleTestCase
+
+from god_bless_pro import pg_migration
+from phone_generator.models import PhoneNumber
+from projects.models import Project
+
+
+class PgMigrationTests(SimpleTestCase):
+    """Test COPY encoding, chunked reads and planning against a SQLite file"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'source.sqlite3')
+        self.columns = [field.column for field in Project._meta.concrete_fields]
+        with sqlite3.connect(self.path) as db:
+            db.execute('CREATE TABLE "projects_project" ({})'.format(', '.join(f'"{c}"' for c in self.columns)))
+            db.executemany(
+                'INSERT INTO "projects_project" ("id", "project_name") VALUES (?, ?)',
+                [(i, f'Project {i}') for i in range(1, 8)]
+            )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_copy_line_escapes_values(self):
+        line = pg_migration.copy_line([1, None, 'a\tb\\c\nd', b'\x00\xff', 1.5])
+        self.assertEqual(line, '1\t\\N\ta\\tb\\\\c\\nd\t\\\\x00ff\t1.5\n')
+
+    def test_chunks_resume_after_primary_key(self):
+        spec = {'table': 'projects_project', 'columns': ['id', 'project_name'], 'pk': 'id'}
+        source = pg_migration.open_source(self.path)
+        try:
+            chunks = list(pg_migration.iter_chunks(source, spec, 3))
+            resumed = list(pg_migration.iter_chunks(source, spec, 3, after=5))
+        finally:
+            source.close()
+
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 1])
+        self.assertEqual([row[0] for row in chunks[1]], [4, 5, 6])
+        self.assertEqual(resumed, [[(6, 'Project 6'), (7, 'Project 7')]])
+
+    def test_plan_counts_rows_and_marks_missing_tables(self):
+        plan = pg_migration.build_plan(self.path, [PhoneNumber, Project])
+
+        self.assertEqual([spec['table'] for spec in plan], ['projects_project', 'phone_generator_phonenumber'])
+        self.assertEqual(plan[0]['source_rows'], 7)
+        self.assertEqual(plan[0]['columns'], self.columns)
+        self.assertIsNone(plan[1]['source_rows'])
+
+    def test_plan_rejects_outdated_sqlite_schema(self):
+        with sqlite3.connect(self.path) as db:
+            db.execute('ALTER TABLE "projects_project" RENAME COLUMN "project_name" TO "name"')
+        with self.assertRaises(pg_migration.MigrationError):
+            pg_migration.build_plan(self.path, [Project])
+
+    def test_requires_postgresql_target(self):
+        with self.assertRaises(pg_migration.MigrationError):
+            pg_migration.migrate_sqlite_to_postgres(self.path)
@@ -0,0 +1,28 @@
+"""
+Tests for integer E.164 phone number encoding
+"""
+from django.test import SimpleTestCase
+
+from god_bless_pro.phone_numbers import e164_prefix_range, national_number, to_e164
+
+
+class PhoneNumberEncodingTests(SimpleTestCase):
+    def test_to_e164(self):
+        self.assertEqual(to_e164('+1 (201) 555-0100'), 12015550100)
+        self.assertEqual(to_e164('2015550100'), 12015550100)
+        self.assertEqual(to_e164('12015550100'), 12015550100)
+        self.assertEqual(to_e164('+44 20 7946 0958'), 442079460958)
+        self.assertIsNone(to_e164(''))
+        self.assertIsNone(to_e164('0201555'))
+        self.assertIsNone(to_e164('1' * 16))
+
+    def test_national_number(self):
+        self.assertEqual(national_number('+1 201-555-0100'), '2015550100')
+        self.assertEqual(national_number(12015550100), '2015550100')
+        self.assertEqual(national_number('2015550100'), '2015550100')
+
+    def test_prefix_range(self):
+        self.assertEqual(e164_prefix_range('1201'), (12010000000, 12020000000))
+        self.assertEqual(e164_prefix_range('+1 201 555'), (12015550000, 12015560000))
+        with self.assertRaises(ValueError):
+            e164_prefix_range('')
@@ -0,0 +1,86 @@
+"""
+Tests for request/task query profiling.
+"""
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, RequestFactory, override_settings
+from django.urls import ResolverMatch
+
+from god_bless_pro import profiling
+
+User = get_user_model()
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class FingerprintTests(SimpleTestCase):
+    """Test statement normalization"""
+
+    def test_parameters_and_literals_are_normalized(self):
+        self.assertEqual(
+            profiling.fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s) AND  x = 5'),
+            'SELECT * FROM t WHERE id IN (...) AND x = ?'
+        )
+        self.assertEqual(
+            profiling.fingerprint("SELECT * FROM t WHERE name = 'a'"),
+            profiling.fingerprint("SELECT * FROM t WHERE name = 'b'")
+        )
+
+    def test_percentile_uses_bucket_bounds(self):
+        buckets = {10.0: 90, 250.0: 9, float('inf'): 1}
+        self.assertEqual(profiling.percentile(buckets, 0.5), 10.0)
+        self.assertEqual(profiling.percentile(buckets, 0.95), 250.0)
+        self.assertEqual(profiling.percentile(buckets, 1.0), profiling.WALL_TIME_BUCKETS[-2])
+
+
+@override_settings(CACHES=LOCMEM_CACHE, PROFILING_SAMPLE_RATE=1.0)
+class ProfilingMiddlewareTests(TestCase):
+    """Test sampled requests are aggregated per endpoint"""
+
+    def setUp(self):
+        profiling.reset_profiles()
+        for i in range(3):
+            User.objects.create_user(username=f'user{i}', email=f'user{i}@example.com', password='pass')
+
+    def test_records_queries_and_duplicates(self):
+        def view(request):
+            # N+1: one query per user
+            for user_id in User.objects.values_list('id', flat=True):
+                User.objects.get(id=user_id)
+            return HttpResponse('ok')
+
+        def request(path, route):
+            request = RequestFactory().get(path)
+            request.resolver_match = ResolverMatch(view, (), {}, route=route)
+            return request
+
+        middleware = profiling.ProfilingMiddleware(view)
+        middleware(request('/api/users/', 'api/users/'))
+        middleware(request('/api/users/', 'api/users/'))
+
+        report = profiling.get_report(kind=profiling.REQUEST)
+        self.assertEqual(len(report), 1)
+        row = report[0]
+        self.assertEqual(row['name'], 'GET /api/users/')
+        self.assertEqual(row['samples'], 2)
+        self.assertEqual(row['avg_queries'], 4.0)
+        self.assertEqual(row['duplicate_queries'][0]['count'], 6)
+        self.assertIsNotNone(row['p95_wall_ms'])
+
+    def test_unresolved_paths_share_one_profile(self):
+        middleware = profiling.ProfilingMiddleware(lambda request: HttpResponse(status=404))
+        middleware(RequestFactory().get('/wp-login.php'))
+        middleware(RequestFactory().get('/.env'))
+
+        report = profiling.get_report(kind=profiling.REQUEST)
+        self.assertEqual([row['name'] for row in report], [profiling.UNRESOLVED])
+        self.assertEqual(report[0]['samples'], 2)
+
+    def test_tasks_are_profiled_between_signals(self):
+        profiling.start_task_profile('task-1')
+        User.objects.count()
+        profiling.finish_task_profile('task-1', 'phone_generator.tasks.validate_phone_numbers_task')
+
+        report = profiling.get_report(kind=profiling.TASK)
+        self.assertEqual(report[0]['name'], 'phone_generator.tasks.validate_phone_numbers_task')
+        self.assertEqual(report[0]['avg_queries'], 1.0)
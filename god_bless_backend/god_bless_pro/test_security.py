@@ -3,7 +3,8 @@ Tests for security features.
 """
 
 import pytest
-from django.test import TestCase, RequestFactory
+from unittest.mock import patch
+from django.test import TestCase, RequestFactory, override_settings
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from rest_framework.test import APITestCase
@@ -12,7 +13,8 @@ from rest_framework import status
 from god_bless_pro.security import InputValidator, SecurityHeaders
 from god_bless_pro.rate_limiting import UserRateLimiter, IPRateLimiter
 from god_bless_pro.session_security import SessionManager
-from god_bless_pro.audit_logging import AuditLogger, AuditEventType
+from god_bless_pro.audit_logging import AuditLogger, AuditEventType, AuditSink
+from activities.models import AllActivity
 
 User = get_user_model()
 
@@ -108,6 +110,19 @@ class InputValidatorTests(TestCase):
         malicious_input = "<script>alert('xss')</script>"
         self.assertTrue(InputValidator._contains_xss(malicious_input))
 
+    def test_scan_classifies_threats(self):
+        """Test single-pass scanning of request values"""
+        self.assertEqual(InputValidator.scan("'; DROP TABLE users; --"), 'sql_injection')
+        self.assertEqual(InputValidator.scan("<img src=x onerror=alert(1)>"), 'xss')
+        self.assertIsNone(InputValidator.scan("<iframe>", check_xss=False))
+        self.assertIsNone(InputValidator.scan("Hello, see you at 5pm"))
+        # Phone numbers and ids are skipped without scanning
+        self.assertIsNone(InputValidator.scan("+1 (201) 555-1234"))
+        self.assertIsNone(InputValidator.scan("12345"))
+        # A payload past the scan limit is rejected, not hidden by padding
+        padded = 'a b ' * InputValidator.MAX_SCAN_LENGTH + "' OR 1=1"
+        self.assertEqual(InputValidator.scan(padded), 'oversized')
+
 
 class RateLimitingTests(TestCase):
     """Test rate limiting functionality"""
@@ -151,6 +166,26 @@ class RateLimitingTests(TestCase):
         self.assertEqual(usage['limit'], 5)
         self.assertEqual(usage['remaining'], 2)
 
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_rate_limit_hit_reports_usage(self):
+        """Test a single hit returns allowance, remaining count and reset time"""
+        identifier = "test_user_4"
+
+        with patch('god_bless_pro.rate_limiting.time.time', return_value=1000.0):
+            for i in range(3):
+                result = self.ip_limiter.hit(identifier)
+            self.assertTrue(result.allowed)
+            self.assertEqual(result.remaining, 0)
+            self.assertEqual(result.reset_time, 1020.0)
+
+            result = self.ip_limiter.hit(identifier)
+            self.assertFalse(result.allowed)
+            self.assertEqual(result.retry_after, 20)
+
+        # A new window starts a fresh count
+        with patch('god_bless_pro.rate_limiting.time.time', return_value=1020.0):
+            self.assertTrue(self.ip_limiter.hit(identifier).allowed)
+
 
 class SessionSecurityTests(TestCase):
     """Test session security functionality"""
@@ -189,6 +224,7 @@ class SessionSecurityTests(TestCase):
         self.assertIn('last_activity', session_data)
 
 
+@override_settings(AUDIT_LOG_ASYNC=False)
 class AuditLoggingTests(TestCase):
     """Test audit logging functionality"""
     
@@ -240,6 +276,53 @@ class AuditLoggingTests(TestCase):
         )
 
 
+class AuditSinkTests(TestCase):
+    """Test buffered activity writes"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='Test@123!'
+        )
+        self.sink = AuditSink(capacity=3, batch_size=2)
+    
+    def test_flush_writes_in_batches(self):
+        """Test buffered events are written on flush"""
+        with patch.object(self.sink, '_ensure_worker'):
+            for i in range(3):
+                self.sink.enqueue(self.user.id, 'event', str(i))
+        
+        self.assertEqual(AllActivity.objects.count(), 0)
+        self.assertEqual(self.sink.flush(), 3)
+        self.assertEqual(AllActivity.objects.filter(user=self.user).count(), 3)
+    
+    def test_backpressure_drops_low_severity(self):
+        """Test a full buffer drops low-severity events first"""
+        with patch.object(self.sink, '_ensure_worker'):
+            self.sink.enqueue(self.user.id, 'info', '', 'INFO')
+            self.sink.enqueue(self.user.id, 'error', '', 'ERROR')
+            self.sink.enqueue(self.user.id, 'warning', '', 'WARNING')
+            
+            self.assertFalse(self.sink.enqueue(self.user.id, 'dropped', '', 'INFO'))
+            self.assertTrue(self.sink.enqueue(self.user.id, 'critical', '', 'CRITICAL'))
+        
+        self.sink.flush()
+        subjects = list(AllActivity.objects.order_by('id').values_list('subject', flat=True))
+        self.assertEqual(subjects, ['error', 'warning', 'critical'])
+        self.assertEqual(self.sink.dropped, 2)
+    
+    def test_forked_process_discards_inherited_events(self):
+        """Test a forked child does not write the parent's pending events again"""
+        with patch.object(self.sink, '_ensure_worker'):
+            self.sink.enqueue(self.user.id, 'parent', '')
+            with patch('god_bless_pro.audit_logging.os.getpid', return_value=self.sink._buffer_pid + 1):
+                self.sink.enqueue(self.user.id, 'child', '')
+                self.assertEqual(self.sink.flush(), 1)
+        
+        self.assertEqual(list(AllActivity.objects.values_list('subject', flat=True)), ['child'])
+
+
 class SecurityHeadersTests(TestCase):
     """Test security headers"""
     
@@ -40,6 +40,8 @@ urlpatterns = [
     path('api/monitoring/service/<str:service_name>/', monitoring_views.service_health_details, name='service_health_details'),
     path('api/monitoring/metrics/', monitoring_views.health_metrics_endpoint, name='health_metrics'),
     path('api/monitoring/alerts/', monitoring_views.alerts_endpoint, name='alerts_endpoint'),
+    path('api/monitoring/profiles/', monitoring_views.profiling_report_endpoint, name='profiling_report'),
+    path('api/monitoring/prometheus/', monitoring_views.prometheus_metrics_endpoint, name='prometheus_metrics'),
     
     # API endpoints
     path('api/accounts/', include('accounts.api.urls', 'accounts_api')),
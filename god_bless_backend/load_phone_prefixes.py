@@ -1,25 +1,35 @@
 # management/commands/load_phone_prefixes.py
-import json
 from django.core.management.base import BaseCommand
 
-from phone_number_validator.models import PhonePrefix
+from god_bless_pro.json_stream import iter_json_items
+from god_bless_pro.query_optimization import bulk_upsert
+from phone_number_validator.models import PhonePrefix, prefix_cache
+from phone_number_validator.prefix_db import build_prefix_db
 
 class Command(BaseCommand):
     help = 'Load phone prefixes from data.json'
 
     def handle(self, *args, **kwargs):
-        # Load the data from the data.json file
+        # Stream the entries from data.json and upsert them in batches
         with open('data.json', 'r') as f:
-            data = json.load(f)
-        
-        # Loop through the data and create entries in the database
-        for prefix, info in data.items():
-            PhonePrefix.objects.create(
-                prefix=info['prefix'],
-                carrier=info['carrier'],
-                city=info['city'],
-                state=info['state'],
-                line_type=info['type']
+            bulk_upsert(
+                PhonePrefix,
+                (
+                    PhonePrefix(
+                        prefix=info['prefix'],
+                        carrier=info['carrier'],
+                        city=info['city'],
+                        state=info['state'],
+                        line_type=info['type']
+                    )
+                    for info in iter_json_items(f)
+                ),
+                unique_fields=['prefix'],
+                batch_size=5000
             )
+        prefix_cache.clear()
+        build_prefix_db(
+            PhonePrefix.objects.values('prefix', 'carrier', 'city', 'state', 'line_type').iterator()
+        )
         
         self.stdout.write(self.style.SUCCESS('Successfully loaded phone prefixes'))
@@ -2,8 +2,8 @@
 echo 🚀 Starting PostgreSQL Migration...
 echo.
 
-echo 📊 Step 1: Creating complete backup from SQLite...
-python full_backup_export.py
+echo 📊 Step 1: Saving a copy of the SQLite database...
+copy /Y db.sqlite3 db.sqlite3.premigration.bak
 if %errorlevel% neq 0 (
     echo ❌ Backup failed! Aborting migration.
     pause
@@ -33,9 +33,9 @@ if %errorlevel% neq 0 (
 echo.
 
 echo 📥 Step 5: Importing data to PostgreSQL...
-docker-compose exec backend python full_backup/migrate_to_postgres_*.py
+docker-compose exec backend python manage.py migrate_sqlite_to_postgres --source db.sqlite3
 if %errorlevel% neq 0 (
-    echo ❌ Data import failed! Check the logs.
+    echo ❌ Data import failed! Check the logs, then run this step again to resume.
     pause
     exit /b 1
 )
@@ -11,7 +11,10 @@ from django.utils import timezone
 from django.db import models
 
 from django.conf import settings
-from rest_framework.authentication import TokenAuthentication
+from god_bless_pro.auth_backends import CachedTokenAuthentication
+from god_bless_pro.auth_cache import get_request_user, get_request_project
+from god_bless_pro.cache import CacheNamespace, PhoneNumberCache
+from god_bless_pro.phone_numbers import to_e164
 
 from phone_generator.api.serializers import AllPhoneNumbersSerializer, PhoneGenerationTaskSerializer
 from phone_generator.models import PhoneNumber, PhoneGenerationTask
@@ -20,7 +23,13 @@ from rest_framework.permissions import IsAuthenticated
 
 from projects.models import Project
 from sms_sender.api.etext.providers import PROVIDERS_LIST
-from phone_generator.tasks import generate_phone_numbers_task, validate_phone_numbers_task
+from phone_generator.purge import (
+    SCOPE_ALL, SCOPE_FILTERED, SCOPE_INVALID, SCOPE_SELECTED, SCOPE_WIPE,
+    build_purge_queryset, get_sync_limit, purge_queryset,
+)
+from phone_generator.tasks import (
+    generate_phone_numbers_task, validate_phone_numbers_task, purge_phone_numbers_task, lookup_phone_numbers_task,
+)
 from tasks.models import TaskProgress
 
 ### Twilio, NumVerify, or Nexmo , apilayer , phonenumbers
@@ -58,7 +67,7 @@ def generate_numbers_viewwww(request, area_code):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def generate_numbers_view(request):
     """Legacy endpoint - kept for backward compatibility"""
     payload = {}
@@ -87,12 +96,12 @@ def generate_numbers_view(request):
             errors['size'] = ['Phone numbers size is required.']
 
         try:
-            user = User.objects.get(user_id=user_id)
+            user = get_request_user(request, user_id)
         except User.DoesNotExist:
             errors['user_id'] = ['User does not exist.']
 
         try:
-            project = Project.objects.get(id=project_id)
+            project = get_request_project(request, project_id)
         except:
             errors['project_id'] = ['Project does not exist.']
 
@@ -107,13 +116,10 @@ def generate_numbers_view(request):
             phone_numbers = generate_phone_numbers(area_code, size)
 
             # Check for existing phone numbers in the database
-            existing_phone_numbers = set(
-                PhoneNumber.objects.filter(phone_number__in=phone_numbers)
-                .values_list('phone_number', flat=True)
-            )
+            existing_phone_numbers = PhoneNumber.objects.existing_e164(phone_numbers)
 
             # Filter out any phone numbers that already exist in the database
-            unique_phone_numbers = [num for num in phone_numbers if num not in existing_phone_numbers]
+            unique_phone_numbers = [num for num in phone_numbers if to_e164(num) not in existing_phone_numbers]
 
             # Prepare PhoneNumber instances for bulk creation
             phone_number_objects = [
@@ -125,6 +131,7 @@ def generate_numbers_view(request):
                 batch_size = 1000  # Adjust this value if necessary
                 for i in range(0, len(phone_number_objects), batch_size):
                     PhoneNumber.objects.bulk_create(phone_number_objects[i:i+batch_size])
+                PhoneNumberCache.invalidate_user_phones(user.id, project.id)
 
             # Return the list of generated numbers
             data['numbers'] = unique_phone_numbers
@@ -150,7 +157,7 @@ def generate_numbers_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def generate_numbers_enhanced_view(request):
     """Enhanced phone number generation with background processing and progress tracking"""
     payload = {}
@@ -181,12 +188,12 @@ def generate_numbers_enhanced_view(request):
             errors['quantity'] = ['Maximum quantity is 1,000,000 numbers.']
 
         try:
-            user = User.objects.get(user_id=user_id)
+            user = get_request_user(request, user_id)
         except User.DoesNotExist:
             errors['user_id'] = ['User does not exist.']
 
         try:
-            project = Project.objects.get(id=project_id)
+            project = get_request_project(request, project_id)
         except:
             errors['project_id'] = ['Project does not exist.']
 
@@ -240,7 +247,7 @@ def generate_phone_numbers(area_code, size):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def get_all_numbers_view(request):
     payload = {}
     data = {}
@@ -268,11 +275,11 @@ def get_all_numbers_view(request):
         errors['project_id'] = ['Project ID is required.']
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except:
         errors['user_id'] = ['User does not exist.']
     try:
-        project = Project.objects.get(id=project_id)
+        project = get_request_project(request, project_id)
     except:
         errors['project_id'] = ['Project does not exist.']
 
@@ -350,7 +357,7 @@ def get_all_numbers_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def get_valid_numbers(request):
     payload = {}
     data = {}
@@ -370,11 +377,11 @@ def get_valid_numbers(request):
         errors['project_id'] = ['Project ID is required.']
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except:
         errors['user_id'] = ['User does not exist.']
     try:
-        project = Project.objects.get(id=project_id)
+        project = get_request_project(request, project_id)
     except:
         errors['project_id'] = ['Project does not exist.']
 
@@ -428,7 +435,7 @@ def get_valid_numbers(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def download_csv_view(request):
     payload = {}
     data = {}
@@ -444,7 +451,7 @@ def download_csv_view(request):
         errors['user_id'] = ['User ID is required.']
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except User.DoesNotExist:
         errors['user_id'] = ['User does not exist.']
 
@@ -493,9 +500,48 @@ def download_csv_view(request):
 
 
 
+def _purge_numbers(scope, user=None, project=None, filters=None, ids=None, task_user_id=None):
+    """
+    Delete the numbers of a purge scope in chunks.
+
+    Purges up to PHONE_PURGE_SYNC_LIMIT rows run inside the request; larger
+    ones are handed to purge_phone_numbers_task. Returns (data, started)
+    where started is True when a background task was queued.
+    """
+    queryset = build_purge_queryset(scope, user=user, project=project, filters=filters, ids=ids)
+    total_count = queryset.count()
+    data = {}
+
+    if total_count > get_sync_limit():
+        task = purge_phone_numbers_task.delay(
+            user_id=task_user_id or (user.user_id if user else None),
+            scope=scope,
+            project_id=project.id if project else None,
+            filters=filters,
+            ids=ids
+        )
+        data['task_id'] = task.id
+        data['total_count'] = total_count
+        data['message'] = f'Deletion of {total_count} numbers started in background. Use task_id to track progress.'
+        return data, True
+
+    deleted_count = purge_queryset(queryset) if total_count else 0
+    if scope == SCOPE_WIPE:
+        CacheNamespace.bump(CacheNamespace.PHONE_NUMBERS)
+    else:
+        PhoneNumberCache.invalidate_user_phones(user.id, project.id if project else None)
+
+    data['deleted_count'] = deleted_count
+    return data, False
+
+
+def _purge_started_response(data):
+    return Response({'message': "Task Started", 'data': data}, status=status.HTTP_202_ACCEPTED)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def clear_numbers_view(request):
     payload = {}
     data = {}
@@ -511,11 +557,11 @@ def clear_numbers_view(request):
             errors['project_id'] = ['Project ID is required.']
 
         try:
-            user = User.objects.get(user_id=user_id)
+            user = get_request_user(request, user_id)
         except User.DoesNotExist:
             errors['user_id'] = ['User does not exist.']
         try:
-            project = Project.objects.get(id=project_id)
+            project = get_request_project(request, project_id)
         except:
             errors['project_id'] = ['Project does not exist.']
 
@@ -524,11 +570,10 @@ def clear_numbers_view(request):
             payload['errors'] = errors
             return Response(payload, status=status.HTTP_400_BAD_REQUEST)
 
-        # Delete invalid numbers (valid_number=False)
-        PhoneNumber.objects.filter(user=user, project=project, valid_number=False).delete()
-
-        # Delete valid numbers where type is not "mobile"
-        PhoneNumber.objects.filter(user=user, project=project, valid_number=True).exclude(type="Mobile").exclude(type='mobile').delete()
+        # Delete invalid numbers and valid numbers whose type is not "mobile"
+        data, started = _purge_numbers(SCOPE_INVALID, user=user, project=project)
+        if started:
+            return _purge_started_response(data)
 
         payload['message'] = "Successful"
         payload['data'] = data
@@ -541,7 +586,7 @@ def clear_numbers_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def delete_all_view(request):
     payload = {}
     data = {}
@@ -557,11 +602,11 @@ def delete_all_view(request):
             errors['project_id'] = ['Project ID is required.']
 
         try:
-            user = User.objects.get(user_id=user_id)
+            user = get_request_user(request, user_id)
         except User.DoesNotExist:
             errors['user_id'] = ['User does not exist.']
         try:
-            project = Project.objects.get(id=project_id)
+            project = get_request_project(request, project_id)
         except:
             errors['project_id'] = ['Project does not exist.']
 
@@ -570,7 +615,9 @@ def delete_all_view(request):
             payload['errors'] = errors
             return Response(payload, status=status.HTTP_400_BAD_REQUEST)
 
-        PhoneNumber.objects.filter(user=user, project=project).delete()
+        data, started = _purge_numbers(SCOPE_ALL, user=user, project=project)
+        if started:
+            return _purge_started_response(data)
 
         payload['message'] = "Successful"
         payload['data'] = data
@@ -588,11 +635,13 @@ def total_wipe_view(request):
 
     if request.method == 'GET':
         try:
-            # Bulk delete all records in one query
-            phone_numbers = PhoneNumber.objects.all()
-            deleted_count, _ = phone_numbers.delete()
+            # Progress for a background wipe is tracked against the requesting user
+            task_user_id = request.user.user_id if request.user.is_authenticated else None
+            data, started = _purge_numbers(SCOPE_WIPE, task_user_id=task_user_id)
+            if started:
+                return _purge_started_response(data)
 
-            payload['message'] = "Successfully deleted {} phone numbers".format(deleted_count)
+            payload['message'] = "Successfully deleted {} phone numbers".format(data['deleted_count'])
 
         except Exception as e:
             payload['message'] = "Error occurred"
@@ -604,7 +653,7 @@ def total_wipe_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def delete_numbers_view(request):
     payload = {}
     data = {}
@@ -621,7 +670,7 @@ def delete_numbers_view(request):
             errors['selected_numbers'] = ['Selected Numbers is required.']
 
         try:
-            user = User.objects.get(user_id=user_id)
+            user = get_request_user(request, user_id)
         except:
             errors['user_id'] = ['User does not exist.']
 
@@ -632,7 +681,9 @@ def delete_numbers_view(request):
             return Response(payload, status=status.HTTP_400_BAD_REQUEST)
 
  
-        PhoneNumber.objects.filter(id__in=selected_numbers, user=user).delete()
+        data, started = _purge_numbers(SCOPE_SELECTED, user=user, ids=list(selected_numbers))
+        if started:
+            return _purge_started_response(data)
 
 
         payload['message'] = "Successful"
@@ -645,7 +696,7 @@ def delete_numbers_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def validate_numbers_view(request):
     """Legacy validation endpoint - kept for backward compatibility"""
     payload = {}
@@ -659,7 +710,7 @@ def validate_numbers_view(request):
             errors['user_id'] = ['User ID is required.']
 
         try:
-            user = User.objects.get(user_id=user_id)
+            user = get_request_user(request, user_id)
         except:
             errors['user_id'] = ['User does not exist.']
 
@@ -680,7 +731,7 @@ def validate_numbers_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def delete_filtered_numbers_view(request):
     """Delete phone numbers based on applied filters"""
     payload = {}
@@ -691,12 +742,11 @@ def delete_filtered_numbers_view(request):
         user_id = request.data.get('user_id', None)
         project_id = request.data.get('project_id', None)
 
-        # Get filter parameters (same as list-numbers endpoint)
-        search_query = request.data.get('search', '')
-        valid_number = request.data.get('valid_number', '')
-        carrier = request.data.get('carrier', '')
-        phone_type = request.data.get('type', '')
-        country_name = request.data.get('country_name', '')
+        # Filter parameters (same as list-numbers endpoint)
+        filters = {
+            key: request.data.get(key, '')
+            for key in ('search', 'valid_number', 'carrier', 'type', 'country_name')
+        }
 
         if not user_id:
             errors['user_id'] = ['User ID is required.']
@@ -704,12 +754,12 @@ def delete_filtered_numbers_view(request):
             errors['project_id'] = ['Project ID is required.']
 
         try:
-            user = User.objects.get(user_id=user_id)
+            user = get_request_user(request, user_id)
         except User.DoesNotExist:
             errors['user_id'] = ['User does not exist.']
 
         try:
-            project = Project.objects.get(id=project_id)
+            project = get_request_project(request, project_id)
         except Project.DoesNotExist:
             errors['project_id'] = ['Project does not exist.']
 
@@ -718,48 +768,14 @@ def delete_filtered_numbers_view(request):
             payload['errors'] = errors
             return Response(payload, status=status.HTTP_400_BAD_REQUEST)
 
-        # Build the base query for numbers to delete
-        numbers_to_delete = PhoneNumber.objects.filter(user=user, project=project, is_archived=False)
+        data, started = _purge_numbers(SCOPE_FILTERED, user=user, project=project, filters=filters)
+        if started:
+            return _purge_started_response(data)
 
-        # Apply the same filters as the list-numbers endpoint
-        if search_query:
-            numbers_to_delete = numbers_to_delete.filter(
-                Q(phone_number__icontains=search_query)
-            )
-
-        # Filter by validation status
-        if valid_number:
-            if valid_number.lower() == 'true':
-                numbers_to_delete = numbers_to_delete.filter(valid_number=True)
-            elif valid_number.lower() == 'false':
-                numbers_to_delete = numbers_to_delete.filter(valid_number=False)
-            elif valid_number.lower() == 'null':
-                numbers_to_delete = numbers_to_delete.filter(valid_number__isnull=True)
-
-        # Filter by carrier
-        if carrier:
-            numbers_to_delete = numbers_to_delete.filter(carrier__icontains=carrier)
-
-        # Filter by phone type
-        if phone_type:
-            numbers_to_delete = numbers_to_delete.filter(type__iexact=phone_type)
-
-        # Filter by country name
-        if country_name:
-            numbers_to_delete = numbers_to_delete.filter(country_name__icontains=country_name)
-
-        # Count how many numbers will be deleted before deleting
-        count_to_delete = numbers_to_delete.count()
-
-        if count_to_delete == 0:
+        if data['deleted_count'] == 0:
             data['message'] = 'No numbers match the specified filters'
-            data['deleted_count'] = 0
         else:
-            # Perform the deletion
-            deleted_count, _ = numbers_to_delete.delete()
-
-            data['message'] = f'Successfully deleted {deleted_count} phone numbers'
-            data['deleted_count'] = deleted_count
+            data['message'] = f"Successfully deleted {data['deleted_count']} phone numbers"
 
         payload['message'] = "Successful"
         payload['data'] = data
@@ -769,7 +785,7 @@ def delete_filtered_numbers_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def validate_numbers_enhanced_view(request):
     """Enhanced phone number validation with background processing"""
     payload = {}
@@ -781,18 +797,22 @@ def validate_numbers_enhanced_view(request):
         project_id = request.data.get('project_id', None)
         phone_ids = request.data.get('phone_ids', None)  # Optional: specific phone IDs to validate
         batch_size = request.data.get('batch_size', 1000)
+        # internal: prefix database; external: number lookup API through the proxy pool
+        source = request.data.get('source', 'internal')
 
         if not user_id:
             errors['user_id'] = ['User ID is required.']
+        if source not in ('internal', 'external'):
+            errors['source'] = ['Source must be internal or external.']
 
         try:
-            user = User.objects.get(user_id=user_id)
+            user = get_request_user(request, user_id)
         except User.DoesNotExist:
             errors['user_id'] = ['User does not exist.']
 
         if project_id:
             try:
-                project = Project.objects.get(id=project_id)
+                project = get_request_project(request, project_id)
             except:
                 errors['project_id'] = ['Project does not exist.']
 
@@ -802,12 +822,19 @@ def validate_numbers_enhanced_view(request):
             return Response(payload, status=status.HTTP_400_BAD_REQUEST)
 
         # Start background task for phone number validation
-        task = validate_phone_numbers_task.delay(
-            user_id=user.user_id,
-            project_id=project_id,
-            phone_ids=phone_ids,
-            batch_size=batch_size
-        )
+        if source == 'external':
+            task = lookup_phone_numbers_task.delay(
+                user_id=user.user_id,
+                project_id=project_id,
+                phone_ids=phone_ids
+            )
+        else:
+            task = validate_phone_numbers_task.delay(
+                user_id=user.user_id,
+                project_id=project_id,
+                phone_ids=phone_ids,
+                batch_size=batch_size
+            )
 
         data['task_id'] = task.id
         data['message'] = 'Phone number validation started in background'
@@ -834,7 +861,7 @@ def is_valid_number(phone_number):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def send_sms_view222(request):
     payload = {}
     data = {}
@@ -866,7 +893,7 @@ def send_sms_view222(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def get_generation_tasks_view(request):
     """Get phone generation tasks for a user"""
     payload = {}
@@ -883,7 +910,7 @@ def get_generation_tasks_view(request):
         errors['user_id'] = ['User ID is required.']
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except User.DoesNotExist:
         errors['user_id'] = ['User does not exist.']
 
@@ -931,7 +958,7 @@ def get_generation_tasks_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def get_task_progress_view(request, task_id):
     """Get progress of a specific task"""
     payload = {}
@@ -944,7 +971,7 @@ def get_task_progress_view(request, task_id):
         errors['user_id'] = ['User ID is required.']
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except User.DoesNotExist:
         errors['user_id'] = ['User does not exist.']
 
@@ -1002,7 +1029,7 @@ def get_task_progress_view(request, task_id):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def cancel_task_view(request, task_id):
     """Cancel a running task"""
     payload = {}
@@ -1015,7 +1042,7 @@ def cancel_task_view(request, task_id):
         errors['user_id'] = ['User ID is required.']
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except User.DoesNotExist:
         errors['user_id'] = ['User does not exist.']
 
@@ -1066,7 +1093,7 @@ def cancel_task_view(request, task_id):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def bulk_validate_numbers_view(request):
     """Bulk validate specific phone numbers"""
     payload = {}
@@ -1085,7 +1112,7 @@ def bulk_validate_numbers_view(request):
             errors['phone_ids'] = ['Phone IDs list is required.']
 
         try:
-            user = User.objects.get(user_id=user_id)
+            user = get_request_user(request, user_id)
         except User.DoesNotExist:
             errors['user_id'] = ['User does not exist.']
 
@@ -1115,7 +1142,7 @@ def bulk_validate_numbers_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def get_phone_statistics_view(request):
     """Get phone number statistics for a user/project"""
     payload = {}
@@ -1129,13 +1156,13 @@ def get_phone_statistics_view(request):
         errors['user_id'] = ['User ID is required.']
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except User.DoesNotExist:
         errors['user_id'] = ['User does not exist.']
 
     if project_id:
         try:
-            project = Project.objects.get(id=project_id)
+            project = get_request_project(request, project_id)
         except:
             errors['project_id'] = ['Project does not exist.']
 
@@ -1192,7 +1219,7 @@ def get_phone_statistics_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def get_active_tasks_view(request):
     """Get all active tasks for a user"""
     payload = {}
@@ -1205,7 +1232,7 @@ def get_active_tasks_view(request):
         errors['user_id'] = ['User ID is required.']
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except User.DoesNotExist:
         errors['user_id'] = ['User does not exist.']
 
@@ -1285,7 +1312,7 @@ def send_sms(to, body):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def generate_numbers_with_config_view(request):
     """Generate phone numbers with advanced configuration options"""
     payload = {}
@@ -1323,12 +1350,12 @@ def generate_numbers_with_config_view(request):
             errors['batch_size'] = ['Batch size must be between 100 and 10,000.']
 
         try:
-            user = User.objects.get(user_id=user_id)
+            user = get_request_user(request, user_id)
         except User.DoesNotExist:
             errors['user_id'] = ['User does not exist.']
 
         try:
-            project = Project.objects.get(id=project_id)
+            project = get_request_project(request, project_id)
         except:
             errors['project_id'] = ['Project does not exist.']
 
@@ -1377,7 +1404,7 @@ def generate_numbers_with_config_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def bulk_validate_numbers_view(request):
     """Bulk validate specific phone numbers by IDs"""
     payload = {}
@@ -1396,7 +1423,7 @@ def bulk_validate_numbers_view(request):
             errors['phone_ids'] = ['Phone IDs list is required.']
 
         try:
-            user = User.objects.get(user_id=user_id)
+            user = get_request_user(request, user_id)
         except User.DoesNotExist:
             errors['user_id'] = ['User does not exist.']
 
@@ -1427,7 +1454,7 @@ def bulk_validate_numbers_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def get_phone_statistics_view(request):
     """Get phone number statistics for a user/project"""
     payload = {}
@@ -1441,7 +1468,7 @@ def get_phone_statistics_view(request):
         errors['user_id'] = ['User ID is required.']
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except User.DoesNotExist:
         errors['user_id'] = ['User does not exist.']
 
@@ -1454,7 +1481,7 @@ def get_phone_statistics_view(request):
     filters = {'user': user, 'is_archived': False}
     if project_id:
         try:
-            project = Project.objects.get(id=project_id)
+            project = get_request_project(request, project_id)
             filters['project'] = project
         except:
             errors['project_id'] = ['Project does not exist.']
@@ -1511,7 +1538,7 @@ def get_phone_statistics_view(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def get_active_tasks_view(request):
     """Get all active tasks for a user"""
     payload = {}
@@ -1524,7 +1551,7 @@ def get_active_tasks_view(request):
         errors['user_id'] = ['User ID is required.']
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except User.DoesNotExist:
         errors['user_id'] = ['User does not exist.']
 
@@ -1578,7 +1605,7 @@ def get_active_tasks_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def generate_numbers_with_config_view(request):
     """
     Advanced phone number generation with comprehensive configuration options
@@ -1617,12 +1644,12 @@ def generate_numbers_with_config_view(request):
             errors['batch_size'] = ['Batch size must be between 100 and 10,000.']
 
         try:
-            user = User.objects.get(user_id=user_id)
+            user = get_request_user(request, user_id)
         except User.DoesNotExist:
             errors['user_id'] = ['User does not exist.']
 
         try:
-            project = Project.objects.get(id=project_id)
+            project = get_request_project(request, project_id)
         except:
             errors['project_id'] = ['Project does not exist.']
 
@@ -1671,7 +1698,7 @@ def generate_numbers_with_config_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def export_phone_numbers_view(request):
     """Export phone numbers with optional filtering"""
     from phone_generator.tasks import export_phone_numbers_task
@@ -1698,13 +1725,13 @@ def export_phone_numbers_view(request):
         errors['format'] = ['Invalid format. Must be csv, txt, json, or doc.']
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except User.DoesNotExist:
         errors['user_id'] = ['User does not exist.']
 
     if project_id:
         try:
-            project = Project.objects.get(id=project_id)
+            project = get_request_project(request, project_id)
         except:
             errors['project_id'] = ['Project does not exist.']
 
@@ -1800,7 +1827,7 @@ def export_phone_numbers_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def import_phone_numbers_view(request):
     """Import phone numbers from file"""
     from phone_generator.tasks import import_phone_numbers_task
@@ -1828,12 +1855,12 @@ def import_phone_numbers_view(request):
         errors['format'] = ['Invalid format. Must be csv, txt, or json.']
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except User.DoesNotExist:
         errors['user_id'] = ['User does not exist.']
 
     try:
-        project = Project.objects.get(id=project_id)
+        project = get_request_project(request, project_id)
     except:
         errors['project_id'] = ['Project does not exist.']
 
@@ -1872,7 +1899,7 @@ def import_phone_numbers_view(request):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def import_sms_recipients_view(request):
     """Import SMS recipients for a campaign"""
     from phone_generator.tasks import import_sms_recipients_task
@@ -1899,7 +1926,7 @@ def import_sms_recipients_view(request):
         errors['format'] = ['Invalid format. Must be csv, txt, or json.']
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except User.DoesNotExist:
         errors['user_id'] = ['User does not exist.']
 
@@ -0,0 +1,53 @@
+"""
+Management command to fill the e164 column of phone numbers.
+
+Migrations fill e164 for existing rows and new rows get it on write; this
+catches rows changed without save() (e.g. QuerySet.update(phone_number=...)).
+A PhoneNumber that normalizes to a number another row already holds is a
+duplicate and is removed, keeping the existing row.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from god_bless_pro.phone_numbers import fill_e164
+from phone_generator.models import PhoneNumber
+from sms_sender.models import SMSMessage
+
+MODELS = {
+    'phonenumber': PhoneNumber,
+    'smsmessage': SMSMessage,
+}
+
+
+class Command(BaseCommand):
+    help = 'Backfill the integer E.164 column of PhoneNumber and SMSMessage rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--models',
+            nargs='+',
+            choices=list(MODELS),
+            default=list(MODELS),
+            help='Models to backfill (default: all)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Rows per update (default: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        for name in options['models']:
+            model = MODELS[name]
+            with transaction.atomic():
+                filled, skipped, deleted = fill_e164(
+                    model,
+                    chunk_size=options['chunk_size'],
+                    dedupe=model._meta.get_field('e164').unique,
+                    log=self.stdout.write,
+                )
+            self.stdout.write(self.style.SUCCESS(
+                f'{name}: filled {filled} rows, {skipped} without a usable number, '
+                f'{deleted} duplicates removed'
+            ))
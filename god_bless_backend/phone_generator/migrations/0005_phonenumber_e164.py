@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+from god_bless_pro.phone_numbers import fill_e164
+
+
+def backfill_e164(apps, schema_editor):
+    """Fill e164 and remove numbers that duplicate another once normalized"""
+    fill_e164(apps.get_model('phone_generator', 'PhoneNumber'), dedupe=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('phone_generator', '0004_remove_phonegenerationtask_task_user_created_idx_and_more'),
+        ('projects', '0002_project_budget_project_collaborators_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='phonenumber',
+            name='phone_gener_user_id_881e0c_idx',
+        ),
+        migrations.AddField(
+            model_name='phonenumber',
+            name='e164',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_e164, migrations.RunPython.noop),
+        # phone_number stays unique until every row has its e164
+        migrations.AlterField(
+            model_name='phonenumber',
+            name='e164',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='phonenumber',
+            name='phone_number',
+            field=models.CharField(max_length=15),
+        ),
+        migrations.AddIndex(
+            model_name='phonenumber',
+            index=models.Index(fields=['user', 'project', 'valid_number', 'type'], name='phone_list_filter_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 
+from god_bless_pro.phone_numbers import E164QuerySet, to_e164
 from projects.models import Project
 
 User = get_user_model()
@@ -21,7 +22,9 @@ class PhoneNumber(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='user_numbers')
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='user_projectss')
 
-    phone_number = models.CharField(max_length=15, unique=True)
+    phone_number = models.CharField(max_length=15)
+    # Normalized E.164 digits of phone_number; uniqueness and lookups use this
+    e164 = models.BigIntegerField(null=True, blank=True, unique=True, editable=False)
     valid_number = models.BooleanField(null=True)
 
     # Enhanced carrier and type information
@@ -55,9 +58,19 @@ class PhoneNumber(models.Model):
         indexes = [
             models.Index(fields=['carrier', 'type']),
             models.Index(fields=['area_code', 'valid_number']),
-            models.Index(fields=['user', 'project']),
+            # Covers the number list filters, so counts need no table reads
+            models.Index(fields=['user', 'project', 'valid_number', 'type'], name='phone_list_filter_idx'),
         ]
 
+    objects = E164QuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        self.e164 = to_e164(self.phone_number)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'phone_number' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'e164'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.phone_number
 
@@ -0,0 +1,136 @@
+"""
+Chunked purge engine for bulk phone number deletion.
+
+Rows are deleted in primary-key ranges of at most PHONE_PURGE_CHUNK_SIZE
+rows, each in its own short statement, with a pause between chunks so
+generation and other writers can take the table in between. PhoneNumber
+has no dependent rows or delete signals, so Django runs every chunk as a
+single raw DELETE without loading the rows.
+
+Settings:
+    PHONE_PURGE_CHUNK_SIZE: rows per DELETE statement (default 5000)
+    PHONE_PURGE_PAUSE: seconds to sleep between chunks (default 0.05)
+    PHONE_PURGE_SYNC_LIMIT: purges up to this many rows run inside the
+        request; larger ones are handed to purge_phone_numbers_task
+"""
+import time
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.db.models import Q
+
+from phone_generator.models import PhoneNumber
+
+# What a purge removes
+SCOPE_ALL = 'all'              # every number in a project
+SCOPE_INVALID = 'invalid'      # invalid numbers and valid non-mobile numbers in a project
+SCOPE_FILTERED = 'filtered'    # a project's numbers matching the list filters
+SCOPE_SELECTED = 'selected'    # explicit ids
+SCOPE_WIPE = 'wipe'            # every number of every user
+
+SCOPES = (SCOPE_ALL, SCOPE_INVALID, SCOPE_FILTERED, SCOPE_SELECTED, SCOPE_WIPE)
+
+
+def get_chunk_size() -> int:
+    return getattr(settings, 'PHONE_PURGE_CHUNK_SIZE', 5000)
+
+
+def get_sync_limit() -> int:
+    return getattr(settings, 'PHONE_PURGE_SYNC_LIMIT', 10000)
+
+
+def apply_number_filters(queryset, filters: dict):
+    """Apply the phone number list filters (search, valid_number, carrier, type, country_name)."""
+    if filters.get('search'):
+        queryset = queryset.filter(phone_number__icontains=filters['search'])
+
+    valid_number = str(filters.get('valid_number') or '').lower()
+    if valid_number == 'true':
+        queryset = queryset.filter(valid_number=True)
+    elif valid_number == 'false':
+        queryset = queryset.filter(valid_number=False)
+    elif valid_number == 'null':
+        queryset = queryset.filter(valid_number__isnull=True)
+
+    if filters.get('carrier'):
+        queryset = queryset.filter(carrier__icontains=filters['carrier'])
+
+    if filters.get('type'):
+        queryset = queryset.filter(type__iexact=filters['type'])
+
+    if filters.get('country_name'):
+        queryset = queryset.filter(country_name__icontains=filters['country_name'])
+
+    area_code = str(filters.get('area_code') or '')
+    if len(area_code) == 3 and area_code.isdigit():
+        # Range scan on the integer e164 column: +1 <area code> xxx xxxx
+        queryset = queryset.with_prefix(f"1{area_code}")
+    elif area_code:
+        queryset = queryset.filter(area_code=area_code)
+
+    return queryset
+
+
+def build_purge_queryset(scope: str, user=None, project=None, filters: Optional[dict] = None, ids=None):
+    """
+    The numbers a purge of the given scope removes.
+
+    Raises:
+        ValueError: for an unknown scope
+    """
+    if scope == SCOPE_WIPE:
+        return PhoneNumber.objects.all()
+    if scope == SCOPE_SELECTED:
+        return PhoneNumber.objects.filter(user=user, id__in=ids or [])
+
+    queryset = PhoneNumber.objects.filter(user=user, project=project)
+    if scope == SCOPE_ALL:
+        return queryset
+    if scope == SCOPE_INVALID:
+        return queryset.filter(
+            Q(valid_number=False) | (Q(valid_number=True) & ~Q(type__in=['Mobile', 'mobile']))
+        )
+    if scope == SCOPE_FILTERED:
+        return apply_number_filters(queryset.filter(is_archived=False), filters or {})
+    raise ValueError(f"Unknown purge scope: {scope}")
+
+
+def purge_queryset(queryset, chunk_size: Optional[int] = None, pause: Optional[float] = None,
+                   on_chunk: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Delete every row of the queryset in primary-key-range chunks.
+
+    Each chunk's upper bound is the chunk_size-th remaining primary key,
+    so sparse id ranges cost nothing and no statement touches more than
+    chunk_size rows.
+
+    Args:
+        queryset: Rows to delete
+        chunk_size: Maximum rows per DELETE statement
+        pause: Seconds to sleep between chunks
+        on_chunk: Called with the running deleted count after each chunk
+
+    Returns:
+        Number of rows deleted
+    """
+    chunk_size = chunk_size or get_chunk_size()
+    pause = getattr(settings, 'PHONE_PURGE_PAUSE', 0.05) if pause is None else pause
+    queryset = queryset.order_by()
+
+    deleted = 0
+    lower = None
+    while True:
+        remaining = queryset if lower is None else queryset.filter(pk__gt=lower)
+        upper = next(iter(remaining.order_by('pk').values_list('pk', flat=True)[chunk_size - 1:chunk_size]), None)
+        chunk = remaining if upper is None else remaining.filter(pk__lte=upper)
+
+        count, _ = chunk.delete()
+        deleted += count
+
+        if on_chunk is not None:
+            on_chunk(deleted)
+        if upper is None:
+            return deleted
+        lower = upper
+        if pause > 0:
+            time.sleep(pause)
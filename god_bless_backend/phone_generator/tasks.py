@@ -2,7 +2,7 @@
 Celery tasks for phone number generation and validation
 """
 import random
-import re
+import time
 from celery import shared_task
 from celery.utils.log import get_task_logger
 from django.contrib.auth import get_user_model
@@ -10,10 +10,13 @@ from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
 
+from god_bless_pro import metrics
+from god_bless_pro.cache import CacheNamespace, PhoneNumberCache
+from god_bless_pro.phone_numbers import national_number, to_e164
 from tasks.base import ProgressTrackingTask, BatchProcessingTask
 from tasks.models import TaskCategory
 from phone_generator.models import PhoneNumber, PhoneGenerationTask
-from phone_number_validator.models import PhonePrefix
+from phone_number_validator.models import PhonePrefix, get_phone_prefix
 from projects.models import Project
 
 logger = get_task_logger(__name__)
@@ -85,6 +88,7 @@ def generate_phone_numbers_task(self, user_id, project_id, area_code, quantity,
             )
             
             # Generate batch of unique numbers
+            batch_start = time.perf_counter()
             batch_numbers = _generate_unique_numbers_batch(
                 area_code, current_batch_size, generated_numbers
             )
@@ -94,15 +98,11 @@ def generate_phone_numbers_task(self, user_id, project_id, area_code, quantity,
                 logger.warning(f"Could not generate unique numbers for batch {batch_count}. Attempt {failed_attempts}/{max_failed_attempts}")
                 continue
             
-            # Check for existing numbers in database
-            existing_numbers = set(
-                PhoneNumber.objects.filter(
-                    phone_number__in=batch_numbers
-                ).values_list('phone_number', flat=True)
-            )
+            # Check for existing numbers in database (integer e164 lookup)
+            existing_numbers = PhoneNumber.objects.existing_e164(batch_numbers)
             
             # Filter out existing numbers
-            unique_batch = [num for num in batch_numbers if num not in existing_numbers]
+            unique_batch = [num for num in batch_numbers if to_e164(num) not in existing_numbers]
             
             if unique_batch:
                 # Prepare PhoneNumber objects for bulk creation
@@ -131,6 +131,7 @@ def generate_phone_numbers_task(self, user_id, project_id, area_code, quantity,
                 
                 total_generated += created_count
                 generated_numbers.update(unique_batch)
+                metrics.record_phone_batch('generate', created_count, time.perf_counter() - batch_start)
                 
                 # Update generation task
                 generation_task.processed_items = total_generated
@@ -147,6 +148,8 @@ def generate_phone_numbers_task(self, user_id, project_id, area_code, quantity,
                 failed_attempts += 1
                 logger.warning(f"No unique numbers in batch {batch_count}. Attempt {failed_attempts}/{max_failed_attempts}")
         
+        PhoneNumberCache.invalidate_user_phones(user.id, project.id)
+        
         # Mark task as completed
         generation_task.status = 'completed'
         generation_task.completed_at = timezone.now()
@@ -310,10 +313,8 @@ def validate_phone_numbers_task(self, user_id, project_id=None, phone_ids=None,
             
             for phone_number in batch:
                 try:
-                    # Clean the phone number (remove non-numeric characters)
-                    cleaned_number = re.sub(r'\D', '', phone_number.phone_number)
-                    if cleaned_number.startswith('1'):
-                        cleaned_number = cleaned_number[1:]  # Remove country code
+                    # Ten-digit national number, from the stored e164 when present
+                    cleaned_number = national_number(phone_number.e164 or phone_number.phone_number)
                     
                     # Extract the prefix (first 6 digits)
                     if len(cleaned_number) >= 6:
@@ -321,7 +322,7 @@ def validate_phone_numbers_task(self, user_id, project_id=None, phone_ids=None,
                         
                         try:
                             # Look up the PhonePrefix for validation
-                            record = PhonePrefix.objects.get(prefix=prefix)
+                            record = get_phone_prefix(prefix)
                             
                             # Update phone number with validation data
                             phone_number.valid_number = True
@@ -372,6 +373,7 @@ def validate_phone_numbers_task(self, user_id, project_id=None, phone_ids=None,
                     
                     batch_duration = (timezone.now() - batch_start_time).total_seconds()
                     logger.info(f"Validated batch of {len(updated_phones)} numbers in {batch_duration:.2f}s")
+                    metrics.record_phone_batch('validate', len(updated_phones), batch_duration)
                     
                 except Exception as e:
                     logger.error(f"Error bulk updating phone numbers: {e}")
@@ -404,6 +406,8 @@ def validate_phone_numbers_task(self, user_id, project_id=None, phone_ids=None,
             validate_batch(batch)
             processed += len(batch)
         
+        PhoneNumberCache.invalidate_user_phones(user.id, project_id if not phone_ids else None)
+        
         # Final progress update
         self.update_progress(
             progress=100,
@@ -566,19 +570,18 @@ def bulk_validate_phone_numbers_task(self, user_id, phone_ids,
             )
             
             updated_phones = []
+            batch_start = time.perf_counter()
             
             for phone_number in batch:
                 try:
-                    # Clean the phone number
-                    cleaned_number = re.sub(r'\D', '', phone_number.phone_number)
-                    if cleaned_number.startswith('1'):
-                        cleaned_number = cleaned_number[1:]
+                    # Ten-digit national number, from the stored e164 when present
+                    cleaned_number = national_number(phone_number.e164 or phone_number.phone_number)
                     
                     if len(cleaned_number) >= 6:
                         prefix = cleaned_number[:6]
                         
                         try:
-                            record = PhonePrefix.objects.get(prefix=prefix)
+                            record = get_phone_prefix(prefix)
                             
                             phone_number.valid_number = True
                             phone_number.carrier = record.carrier
@@ -621,6 +624,9 @@ def bulk_validate_phone_numbers_task(self, user_id, phone_ids,
                     ['valid_number', 'carrier', 'state', 'type', 'location', 
                      'country_name', 'prefix', 'validation_attempted', 'validation_date', 'status']
                 )
+                metrics.record_phone_batch('validate', len(updated_phones), time.perf_counter() - batch_start)
+        
+        PhoneNumberCache.invalidate_user_phones(user.id)
         
         # Final progress update
         self.update_progress(
@@ -799,13 +805,10 @@ def import_phone_numbers_task(self, user_id, project_id, file_content, file_form
         # Check for existing phone numbers
         self.update_progress(50, "Checking for duplicates")
         phone_numbers = [r['phone_number'] for r in valid_records]
-        existing_numbers = set(
-            PhoneNumber.objects.filter(phone_number__in=phone_numbers)
-            .values_list('phone_number', flat=True)
-        )
+        existing_numbers = PhoneNumber.objects.existing_e164(phone_numbers)
         
         # Filter out existing numbers
-        new_records = [r for r in valid_records if r['phone_number'] not in existing_numbers]
+        new_records = [r for r in valid_records if to_e164(r['phone_number']) not in existing_numbers]
         duplicate_count = len(valid_records) - len(new_records)
         
         if duplicate_count > 0:
@@ -849,13 +852,18 @@ def import_phone_numbers_task(self, user_id, project_id, file_content, file_form
                 for record in batch
             ]
             
+            batch_start = time.perf_counter()
             with transaction.atomic():
                 PhoneNumber.objects.bulk_create(phone_objects, ignore_conflicts=True)
+            metrics.record_phone_batch('import', len(batch), time.perf_counter() - batch_start)
             
             imported_count += len(batch)
             progress = 60 + int((imported_count / len(new_records)) * 30)
             self.update_progress(progress, f"Imported {imported_count}/{len(new_records)} records")
         
+        if imported_count > 0:
+            PhoneNumberCache.invalidate_user_phones(user.id, project.id)
+        
         # Optionally validate imported numbers
         if validate_on_import and imported_count > 0:
             self.update_progress(95, "Queuing validation task")
@@ -920,12 +928,9 @@ def import_sms_recipients_task(self, user_id, campaign_id, file_content, file_fo
         # Check for existing recipients in campaign
         self.update_progress(50, "Checking for duplicates")
         phone_numbers = [r['phone_number'] for r in valid_records]
-        existing_numbers = set(
-            SMSMessage.objects.filter(campaign=campaign, phone_number__in=phone_numbers)
-            .values_list('phone_number', flat=True)
-        )
+        existing_numbers = SMSMessage.objects.filter(campaign=campaign).existing_e164(phone_numbers)
         
-        new_records = [r for r in valid_records if r['phone_number'] not in existing_numbers]
+        new_records = [r for r in valid_records if to_e164(r['phone_number']) not in existing_numbers]
         duplicate_count = len(valid_records) - len(new_records)
         
         if not new_records:
@@ -979,3 +984,137 @@ def import_sms_recipients_task(self, user_id, campaign_id, file_content, file_fo
         self.mark_failed(error_message=str(e))
         raise
 
+
+
+@shared_task(bind=True, base=ProgressTrackingTask)
+def purge_phone_numbers_task(self, user_id, scope, project_id=None, filters=None, ids=None,
+                             category=TaskCategory.GENERAL):
+    """
+    Delete phone numbers in primary-key-range chunks with progress tracking
+    """
+    from phone_generator.purge import SCOPE_WIPE, build_purge_queryset, purge_queryset
+    
+    try:
+        user = User.objects.get(user_id=user_id) if user_id else None
+        project = Project.objects.get(id=project_id) if project_id else None
+        
+        self.mark_started()
+        queryset = build_purge_queryset(scope, user=user, project=project, filters=filters, ids=ids)
+        total_count = queryset.count()
+        logger.info(f"Starting phone number purge: scope={scope}, {total_count} numbers")
+        self.update_progress(0, f"Deleting {total_count} numbers", processed_items=0, total_items=total_count)
+        
+        last_chunk = [0, time.perf_counter()]
+        
+        def on_chunk(deleted):
+            metrics.record_phone_batch('purge', deleted - last_chunk[0], time.perf_counter() - last_chunk[1])
+            last_chunk[:] = [deleted, time.perf_counter()]
+            progress = int(deleted / total_count * 100) if total_count else 100
+            self.update_progress(
+                progress,
+                f"Deleted {deleted}/{total_count} numbers",
+                processed_items=deleted,
+                total_items=total_count
+            )
+        
+        deleted_count = purge_queryset(queryset, on_chunk=on_chunk)
+        
+        if scope == SCOPE_WIPE:
+            CacheNamespace.bump(CacheNamespace.PHONE_NUMBERS)
+        else:
+            PhoneNumberCache.invalidate_user_phones(user.id, project_id)
+        
+        result_data = {'deleted_count': deleted_count, 'scope': scope}
+        self.mark_completed(result_data=result_data)
+        logger.info(f"Phone number purge completed: {deleted_count} numbers deleted")
+        
+        return {'success': True, **result_data}
+        
+    except Exception as e:
+        logger.error(f"Phone number purge failed: {str(e)}", exc_info=True)
+        self.mark_failed(error_message=str(e))
+        raise
+
+
+@shared_task(bind=True, base=ProgressTrackingTask)
+def lookup_phone_numbers_task(self, user_id, project_id=None, phone_ids=None, proxies=None,
+                              category=TaskCategory.PHONE_VALIDATION):
+    """
+    Validate phone numbers against the external number lookup API through the proxy pool
+    """
+    from phone_number_validator.lookup_cache import lookup_cache
+    from phone_number_validator.lookup_engine import run_lookups
+    from phone_number_validator.models import Proxy
+    
+    try:
+        user = User.objects.get(user_id=user_id)
+        
+        self.mark_started()
+        
+        query_filters = {'user': user}
+        if project_id:
+            query_filters['project_id'] = project_id
+        if phone_ids:
+            query_filters['id__in'] = phone_ids
+        else:
+            query_filters['validation_attempted'] = False
+        
+        phone_by_number = {phone.phone_number: phone for phone in PhoneNumber.objects.filter(**query_filters)}
+        total_count = len(phone_by_number)
+        
+        if proxies is None:
+            proxies = [f"{proxy.ip_address}:{proxy.port}" for proxy in Proxy.objects.filter(valid=True)]
+        
+        logger.info(f"Starting external lookup of {total_count} phone numbers through {len(proxies)} proxies")
+        
+        processed = 0
+        batch_started = time.perf_counter()
+        
+        def save_batch(results):
+            nonlocal processed, batch_started
+            
+            updated_phones = []
+            for result in results:
+                if result.valid is None:
+                    continue
+                phone_number = phone_by_number[result.number]
+                phone_number.valid_number = result.valid
+                if result.valid:
+                    phone_number.carrier = result.carrier
+                    phone_number.type = result.line_type or phone_number.type
+                phone_number.validation_attempted = True
+                phone_number.validation_date = timezone.now()
+                phone_number.validation_source = 'external'
+                phone_number.status = 'active' if result.valid else 'inactive'
+                updated_phones.append(phone_number)
+            
+            if updated_phones:
+                PhoneNumber.objects.bulk_update(
+                    updated_phones,
+                    ['valid_number', 'carrier', 'type', 'validation_attempted',
+                     'validation_date', 'validation_source', 'status']
+                )
+            
+            metrics.record_phone_batch('lookup', len(results), time.perf_counter() - batch_started)
+            batch_started = time.perf_counter()
+            processed += len(results)
+            self.update_progress(
+                progress=int(processed / total_count * 100),
+                current_step=f"Looked up {processed}/{total_count} numbers",
+                processed_items=processed,
+                total_items=total_count
+            )
+        
+        stats = run_lookups(list(phone_by_number), proxies, save_batch, cache=lookup_cache) if total_count else {'total': 0}
+        
+        PhoneNumberCache.invalidate_user_phones(user.id, project_id if not phone_ids else None)
+        
+        self.mark_completed(result_data=stats)
+        logger.info(f"External lookup completed: {stats}")
+        
+        return stats
+        
+    except Exception as e:
+        logger.error(f"External phone number lookup failed: {str(e)}", exc_info=True)
+        self.mark_failed(error_message=str(e))
+        raise
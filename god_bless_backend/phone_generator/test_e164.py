@@ -0,0 +1,78 @@
+"""
+Tests for the e164 column of phone numbers and SMS messages
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+
+from phone_generator.models import PhoneNumber
+from projects.models import Project
+from sms_sender.models import SMSCampaign, SMSMessage
+
+User = get_user_model()
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class E164ColumnTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='e164@example.com', username='e164user', password='testpass123')
+        self.project = Project.objects.create(user=self.user, project_name='E164 Project')
+
+    def test_populated_on_save_and_bulk_create(self):
+        number = PhoneNumber.objects.create(user=self.user, project=self.project, phone_number='(201) 555-0100')
+        PhoneNumber.objects.bulk_create([
+            PhoneNumber(user=self.user, project=self.project, phone_number='12015550101'),
+        ])
+        self.assertEqual(number.e164, 12015550100)
+        self.assertEqual(PhoneNumber.objects.get(phone_number='12015550101').e164, 12015550101)
+
+        number.phone_number = '2015550199'
+        number.save(update_fields=['phone_number'])
+        number.refresh_from_db()
+        self.assertEqual(number.e164, 12015550199)
+
+    def test_uniqueness_and_lookups_use_e164(self):
+        PhoneNumber.objects.create(user=self.user, project=self.project, phone_number='12015550100')
+        PhoneNumber.objects.create(user=self.user, project=self.project, phone_number='12025550100')
+
+        self.assertEqual(
+            PhoneNumber.objects.existing_e164(['+1 201 555 0100', '2015550999']), {12015550100}
+        )
+        self.assertEqual(PhoneNumber.objects.with_prefix('1201').count(), 1)
+        with self.assertRaises(IntegrityError):
+            PhoneNumber.objects.create(user=self.user, project=self.project, phone_number='2015550100')
+
+    def test_campaign_recipient_lookup(self):
+        campaign = SMSCampaign.objects.create(user=self.user, name='E164 Campaign', message_template='Hi')
+        SMSMessage.objects.create(campaign=campaign, phone_number='2015550100', message_content='Hi')
+
+        self.assertEqual(
+            SMSMessage.objects.filter(campaign=campaign).existing_e164(['12015550100']), {12015550100}
+        )
+
+    def test_backfill_command(self):
+        PhoneNumber.objects.bulk_create([
+            PhoneNumber(user=self.user, project=self.project, phone_number=number)
+            for number in ['12015550100', '12015550199', 'unknown', '12015550102']
+        ])
+        # Simulate rows written before the column existed, including a
+        # number that only duplicates another once normalized
+        PhoneNumber.objects.update(e164=None)
+        PhoneNumber.objects.filter(phone_number='12015550199').update(phone_number='2015550100')
+        PhoneNumber.objects.create(user=self.user, project=self.project, phone_number='2015550101')
+        PhoneNumber.objects.filter(phone_number='2015550101').update(e164=None)
+
+        out = StringIO()
+        call_command('backfill_e164', '--models', 'phonenumber', '--chunk-size', '2', stdout=out)
+
+        self.assertIn('filled 3 rows, 1 without a usable number, 1 duplicates removed', out.getvalue())
+        self.assertEqual(
+            set(PhoneNumber.objects.exclude(e164=None).values_list('phone_number', 'e164')),
+            {('12015550100', 12015550100), ('2015550101', 12015550101), ('12015550102', 12015550102)}
+        )
+        self.assertFalse(PhoneNumber.objects.filter(phone_number='2015550100').exists())
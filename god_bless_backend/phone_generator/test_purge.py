@@ -0,0 +1,120 @@
+"""
+Tests for the chunked phone number purge engine
+"""
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from phone_generator.models import PhoneNumber
+from phone_generator.purge import (
+    SCOPE_ALL, SCOPE_FILTERED, SCOPE_INVALID, SCOPE_WIPE, build_purge_queryset, purge_queryset,
+)
+from phone_generator.tasks import purge_phone_numbers_task
+from projects.models import Project
+from tasks.models import TaskProgress, TaskStatus
+
+User = get_user_model()
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+IN_MEMORY_CHANNELS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE, CHANNEL_LAYERS=IN_MEMORY_CHANNELS, PHONE_PURGE_PAUSE=0)
+class PurgeTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='purge@example.com',
+            username='purgeuser',
+            password='testpass123'
+        )
+        self.project = Project.objects.create(user=self.user, project_name='Purge Project')
+        PhoneNumber.objects.bulk_create([
+            PhoneNumber(
+                user=self.user,
+                project=self.project,
+                phone_number=f'1201555{i:04d}',
+                valid_number=i % 2 == 0,
+                type='Mobile' if i % 4 == 0 else 'Landline',
+                carrier='Verizon' if i < 10 else 'AT&T',
+            )
+            for i in range(25)
+        ])
+
+    def test_purge_queryset_deletes_in_chunks(self):
+        """Every row goes in chunk_size-row DELETE statements"""
+        progress = []
+        with CaptureQueriesContext(connection) as queries:
+            deleted = purge_queryset(PhoneNumber.objects.all(), chunk_size=10, on_chunk=progress.append)
+
+        self.assertEqual(deleted, 25)
+        self.assertEqual(progress, [10, 20, 25])
+        self.assertEqual(PhoneNumber.objects.count(), 0)
+        deletes = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 3)
+
+    def test_purge_queryset_exact_chunk_multiple(self):
+        deleted = purge_queryset(PhoneNumber.objects.all(), chunk_size=5)
+        self.assertEqual(deleted, 25)
+        self.assertEqual(PhoneNumber.objects.count(), 0)
+
+    def test_scopes(self):
+        self.assertEqual(build_purge_queryset(SCOPE_ALL, self.user, self.project).count(), 25)
+        # Invalid numbers plus valid non-mobile numbers
+        self.assertEqual(build_purge_queryset(SCOPE_INVALID, self.user, self.project).count(), 18)
+        filtered = build_purge_queryset(SCOPE_FILTERED, self.user, self.project, filters={'carrier': 'verizon'})
+        self.assertEqual(filtered.count(), 10)
+        self.assertEqual(build_purge_queryset(SCOPE_WIPE).count(), 25)
+
+        with self.assertRaises(ValueError):
+            build_purge_queryset('everything', self.user, self.project)
+
+    @override_settings(PHONE_PURGE_CHUNK_SIZE=4)
+    def test_task_tracks_progress(self):
+        result = purge_phone_numbers_task.apply(kwargs={
+            'user_id': self.user.user_id,
+            'scope': SCOPE_INVALID,
+            'project_id': self.project.id,
+        }).get()
+
+        self.assertEqual(result['deleted_count'], 18)
+        self.assertEqual(PhoneNumber.objects.count(), 7)
+        task_progress = TaskProgress.objects.get(user=self.user)
+        self.assertEqual(task_progress.status, TaskStatus.SUCCESS)
+        self.assertEqual(task_progress.processed_items, 18)
+        self.assertEqual(task_progress.total_items, 18)
+
+    def _client(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get(user=self.user).key}')
+        return client
+
+    def test_view_deletes_small_purge_inline(self):
+        response = self._client().get(
+            '/api/phone-generator/delete-all/',
+            {'user_id': self.user.user_id, 'project_id': self.project.id}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['data']['deleted_count'], 25)
+        self.assertEqual(PhoneNumber.objects.count(), 0)
+
+    @override_settings(PHONE_PURGE_SYNC_LIMIT=10)
+    def test_view_hands_large_purge_to_task(self):
+        with mock.patch('phone_generator.api.views.purge_phone_numbers_task') as task:
+            task.delay.return_value.id = 'purge-task'
+            response = self._client().post(
+                '/api/phone-generator/delete-filtered/',
+                {'user_id': self.user.user_id, 'project_id': self.project.id, 'carrier': 'AT&T'},
+                format='json'
+            )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['data']['task_id'], 'purge-task')
+        self.assertEqual(response.data['data']['total_count'], 15)
+        self.assertEqual(task.delay.call_args.kwargs['scope'], SCOPE_FILTERED)
+        self.assertEqual(PhoneNumber.objects.count(), 25)
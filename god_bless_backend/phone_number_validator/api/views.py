@@ -1,5 +1,4 @@
 import json
-import re
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.response import Response
 from rest_framework import status
@@ -7,9 +6,11 @@ from django.contrib.auth import get_user_model
 from rest_framework.permissions import IsAuthenticated
 from django.http import JsonResponse
 from phone_generator.models import PhoneNumber
-from phone_number_validator.models import PhonePrefix
+from phone_number_validator.models import PhonePrefix, get_phone_prefix
 from projects.models import Project
 from rest_framework.authentication import TokenAuthentication
+from god_bless_pro.cache import PhoneNumberCache
+from god_bless_pro.phone_numbers import national_number
 
 
 User = get_user_model()
@@ -105,15 +106,15 @@ def validate_phone_number_free(request):
         payload['errors'] = errors
         return Response(payload, status=status.HTTP_400_BAD_REQUEST)
 
-    # Clean the phone number (remove non-numeric characters)
-    cleaned_number = re.sub(r'\D', '', phone_number.phone_number)[1:]
+    # Ten-digit national number, from the stored e164 when present
+    cleaned_number = national_number(phone_number.e164 or phone_number.phone_number)
 
     # Extract the prefix (first 6 digits)
     prefix = cleaned_number[:6]
 
     try:
         # Look up the PhoneRecord for the prefix in the database
-        record = PhonePrefix.objects.get(prefix=prefix)
+        record = get_phone_prefix(prefix)
 
         # Map the PhoneRecord data to the PhoneNumber model
         phone_number.valid_number = True  # Mark it as a valid number
@@ -205,15 +206,15 @@ def validate_all_phone_numbers_free(request):
         # Start a database transaction for batch processing
         with transaction.atomic():
             for phone_number in batch:
-                # Clean the phone number (remove non-numeric characters)
-                cleaned_number = re.sub(r'\D', '', phone_number.phone_number)[1:]  # Remove the country code (assuming it starts with +1)
+                # Ten-digit national number, from the stored e164 when present
+                cleaned_number = national_number(phone_number.e164 or phone_number.phone_number)
                 
                 # Extract the prefix (first 6 digits)
                 prefix = cleaned_number[:6]
 
                 try:
                     # Look up the PhoneRecord for the prefix in the database
-                    record = PhonePrefix.objects.get(prefix=prefix)
+                    record = get_phone_prefix(prefix)
 
                     # Update the phone number with the validated data
                     phone_number.valid_number = True  # Mark it as a valid number
@@ -242,6 +243,8 @@ def validate_all_phone_numbers_free(request):
                 PhoneNumber.objects.bulk_update(batch_error_numbers, ['valid_number', 'validation_attempted'])
                 total_failed += len(batch_error_numbers)
 
+    PhoneNumberCache.invalidate_user_phones(user.id, project.id)
+
     # Return a summary response
     payload['message'] = "Validation completed successfully"
     payload['data'] = {
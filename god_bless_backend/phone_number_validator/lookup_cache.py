@@ -0,0 +1,159 @@
+"""
+Cache of external number lookup results.
+
+Two layers sit in the shared cache in front of the lookup API:
+
+    number  the answer for an exact number, valid or not
+    block   carrier and line type learned per NPA-NXX-X thousands block
+
+Numbers in a thousands block are assigned to one carrier, so once a block
+has answered PHONE_LOOKUP_BLOCK_MIN_SAMPLES lookups with the same carrier,
+the rest of the block is answered locally. A block that reports a second
+carrier (ported numbers) is marked mixed and always goes to the API.
+
+Every lookup counts towards the phone_lookup_cache metric as number_hit,
+block_hit or miss.
+
+Settings:
+    PHONE_LOOKUP_NUMBER_TTL: seconds an exact answer is kept (default 30 days)
+    PHONE_LOOKUP_BLOCK_TTL: seconds a learned block is kept (default 7 days)
+    PHONE_LOOKUP_BLOCK_MIN_SAMPLES: agreeing answers before a block is
+        trusted (default 2)
+"""
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from god_bless_pro import metrics
+from god_bless_pro.phone_numbers import national_number as to_national_number
+from god_bless_pro.cache import CacheNamespace
+from phone_number_validator.lookup_engine import LookupResult
+
+logger = logging.getLogger(__name__)
+
+NUMBER_HIT = 'number_hit'
+BLOCK_HIT = 'block_hit'
+MISS = 'miss'
+
+
+def national_number(number: str) -> Optional[str]:
+    """The 10-digit NANP number, or None if the number is not one"""
+    digits = to_national_number(number)
+    return digits if len(digits) == 10 else None
+
+
+class LookupResultCache:
+    """Exact-number and learned thousands-block answers for external lookups"""
+
+    NAMESPACE = 'phone_lookup'
+
+    def __init__(self, number_ttl: Optional[int] = None, block_ttl: Optional[int] = None,
+                 min_block_samples: Optional[int] = None):
+        self.number_ttl = number_ttl or getattr(settings, 'PHONE_LOOKUP_NUMBER_TTL', 60 * 60 * 24 * 30)
+        self.block_ttl = block_ttl or getattr(settings, 'PHONE_LOOKUP_BLOCK_TTL', 60 * 60 * 24 * 7)
+        self.min_block_samples = min_block_samples or getattr(settings, 'PHONE_LOOKUP_BLOCK_MIN_SAMPLES', 2)
+
+    def _key_prefix(self) -> str:
+        # One namespace version read per batch rather than per key
+        return CacheNamespace.make_key(self.NAMESPACE, '')
+
+    @staticmethod
+    def _number_key(prefix: str, national: str) -> str:
+        return f"{prefix}number:{national}"
+
+    @staticmethod
+    def _block_key(prefix: str, national: str) -> str:
+        return f"{prefix}block:{national[:7]}"
+
+    def _read(self, keys: List[str]) -> dict:
+        try:
+            return cache.get_many(keys)
+        except Exception as e:
+            logger.warning(f"Shared cache unavailable: {e}")
+            return {}
+
+    def _write(self, entries: dict, timeout: int) -> None:
+        try:
+            cache.set_many(entries, timeout)
+        except Exception as e:
+            logger.warning(f"Shared cache unavailable: {e}")
+
+    def get_many(self, numbers: Iterable[str]) -> Dict[str, LookupResult]:
+        """
+        Answers for the numbers the cache can settle, keyed by number.
+        Numbers missing from the result need an external lookup.
+        """
+        nationals = {number: national_number(number) for number in numbers}
+        nationals = {number: national for number, national in nationals.items() if national}
+        if not nationals:
+            return {}
+
+        prefix = self._key_prefix()
+        number_keys = {number: self._number_key(prefix, national) for number, national in nationals.items()}
+        block_keys = {number: self._block_key(prefix, national) for number, national in nationals.items()}
+        cached = self._read(list(set(number_keys.values()) | set(block_keys.values())))
+
+        answers = {}
+        counts = {NUMBER_HIT: 0, BLOCK_HIT: 0, MISS: 0}
+        for number in nationals:
+            entry = cached.get(number_keys[number])
+            if entry is not None:
+                answers[number] = LookupResult(number, entry['valid'], entry.get('carrier'), entry.get('line_type'))
+                counts[NUMBER_HIT] += 1
+                continue
+
+            block = cached.get(block_keys[number])
+            if block and not block.get('mixed') and block['samples'] >= self.min_block_samples:
+                answers[number] = LookupResult(number, True, block['carrier'], block.get('line_type'))
+                counts[BLOCK_HIT] += 1
+                continue
+
+            counts[MISS] += 1
+
+        for result, count in counts.items():
+            if count:
+                metrics.PHONE_LOOKUP_CACHE.labels(result=result).inc(count)
+        return answers
+
+    def store(self, results: Iterable[LookupResult]) -> None:
+        """Remember fresh answers from the lookup API and learn their blocks"""
+        prefix = self._key_prefix()
+        numbers = {}
+        learned = {}
+        for result in results:
+            national = national_number(result.number)
+            if result.valid is None or not national:
+                continue
+            numbers[self._number_key(prefix, national)] = {
+                'valid': result.valid,
+                'carrier': result.carrier,
+                'line_type': result.line_type,
+            }
+            if result.valid and result.carrier and result.carrier != 'Unknown':
+                learned.setdefault(self._block_key(prefix, national), []).append(result)
+
+        if numbers:
+            self._write(numbers, self.number_ttl)
+        if not learned:
+            return
+
+        blocks = self._read(list(learned))
+        for key, block_results in learned.items():
+            block = blocks.get(key)
+            for result in block_results:
+                if block is None:
+                    block = {'carrier': result.carrier, 'line_type': result.line_type, 'samples': 0, 'mixed': False}
+                if (result.carrier, result.line_type) != (block['carrier'], block.get('line_type')):
+                    block['mixed'] = True
+                block['samples'] += 1
+            blocks[key] = block
+        self._write({key: blocks[key] for key in learned}, self.block_ttl)
+
+    def clear(self) -> None:
+        """Forget every cached answer and learned block"""
+        CacheNamespace.bump(self.NAMESPACE)
+
+
+lookup_cache = LookupResultCache()
@@ -0,0 +1,324 @@
+"""
+Concurrent external number lookups through a shared proxy pool.
+
+LookupEngine runs lookups on an asyncio event loop with aiohttp. Every
+proxy in the ProxyPool serves up to PHONE_LOOKUP_PROXY_CONCURRENCY
+requests at once, so throughput grows with the number of healthy proxies.
+The pool tracks each proxy's latency (EWMA) and failures. A proxy that
+fails PHONE_LOOKUP_FAILURE_THRESHOLD times in a row is benched for
+PHONE_LOOKUP_COOLDOWN seconds, so one dead proxy costs one timeout
+instead of one timeout per number.
+
+Results are handed back in batches of PHONE_LOOKUP_BATCH_SIZE for bulk
+writes. run_lookups() drives the loop on a helper thread and calls
+on_batch on the caller's thread, so the callback may use the ORM.
+
+Settings:
+    PHONE_LOOKUP_URL: lookup URL template with a {number} placeholder
+    PHONE_LOOKUP_TIMEOUT: seconds per request (default 5)
+    PHONE_LOOKUP_MAX_ATTEMPTS: proxies tried per number (default 3)
+"""
+import asyncio
+import logging
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional
+
+import aiohttp
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOOKUP_URL = 'https://api.telnyx.com/anonymous/v2/number_lookup/{number}'
+
+# Answers that settle a number; anything else is blamed on the proxy
+NOT_FOUND_STATUSES = (400, 404, 422)
+
+
+@dataclass
+class LookupResult:
+    """Outcome of looking up one number"""
+    number: str
+    valid: Optional[bool]          # None when no proxy got an answer
+    carrier: Optional[str] = None
+    line_type: Optional[str] = None
+    proxy: Optional[str] = None
+    error: Optional[str] = None
+
+
+def parse_lookup_response(payload: dict) -> dict:
+    """Carrier name and line type from a number_lookup response body"""
+    carrier = (payload.get('data') or {}).get('carrier') or {}
+    return {'carrier': carrier.get('name') or 'Unknown', 'line_type': carrier.get('type')}
+
+
+def load_proxy_file(path: str) -> List[str]:
+    """Proxies from a host:port per line file such as valid_proxies.txt"""
+    with open(path, 'r') as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+class ProxyState:
+    """Health and load of one proxy. url None means a direct connection."""
+
+    def __init__(self, url: Optional[str], concurrency: int):
+        if url and '://' not in url:
+            url = f'http://{url}'
+        self.url = url
+        self.concurrency = concurrency
+        self.in_flight = 0
+        self.successes = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.latency = None
+        self.benched_until = 0.0
+
+    def available(self, now: float) -> bool:
+        return self.benched_until <= now and self.in_flight < self.concurrency
+
+    def as_dict(self) -> dict:
+        return {
+            'proxy': self.url,
+            'successes': self.successes,
+            'failures': self.failures,
+            'latency_ms': round(self.latency * 1000, 1) if self.latency is not None else None,
+            'benched': self.benched_until > time.monotonic(),
+        }
+
+
+class ProxyPool:
+    """
+    Proxies shared by every lookup worker.
+
+    acquire() hands out the least loaded available proxy, preferring lower
+    latency, and waits while every proxy is busy or benched.
+    """
+
+    LATENCY_SMOOTHING = 0.3
+
+    def __init__(self, proxies: Iterable[Optional[str]], concurrency: Optional[int] = None,
+                 failure_threshold: Optional[int] = None, cooldown: Optional[float] = None):
+        concurrency = concurrency or getattr(settings, 'PHONE_LOOKUP_PROXY_CONCURRENCY', 4)
+        self.proxies = [ProxyState(url, concurrency) for url in proxies] or [ProxyState(None, concurrency)]
+        self.failure_threshold = failure_threshold or getattr(settings, 'PHONE_LOOKUP_FAILURE_THRESHOLD', 3)
+        self.cooldown = getattr(settings, 'PHONE_LOOKUP_COOLDOWN', 60) if cooldown is None else cooldown
+        self._changed = None
+
+    @property
+    def capacity(self) -> int:
+        return sum(proxy.concurrency for proxy in self.proxies)
+
+    def _condition(self) -> asyncio.Condition:
+        # Created lazily so it binds to the loop the engine runs on
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    def _pick(self, now: float, exclude) -> Optional[ProxyState]:
+        candidates = [proxy for proxy in self.proxies if proxy.available(now)]
+        preferred = [proxy for proxy in candidates if proxy not in exclude] or candidates
+        if not preferred:
+            return None
+        return min(preferred, key=lambda proxy: (proxy.in_flight / proxy.concurrency, proxy.latency or 0.0))
+
+    async def acquire(self, exclude=()) -> ProxyState:
+        changed = self._condition()
+        async with changed:
+            while True:
+                now = time.monotonic()
+                proxy = self._pick(now, exclude)
+                if proxy is not None:
+                    proxy.in_flight += 1
+                    return proxy
+                # Busy proxies free up on release; benched ones on a timer
+                benched = [p.benched_until for p in self.proxies if p.benched_until > now]
+                timeout = min(benched) - now if benched and len(benched) == len(self.proxies) else None
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def release(self, proxy: ProxyState, latency: Optional[float] = None, failed: bool = False):
+        changed = self._condition()
+        async with changed:
+            proxy.in_flight -= 1
+            if failed:
+                proxy.failures += 1
+                proxy.consecutive_failures += 1
+                if proxy.consecutive_failures >= self.failure_threshold:
+                    proxy.benched_until = time.monotonic() + self.cooldown
+                    # One more failure after the cooldown benches it again
+                    proxy.consecutive_failures = self.failure_threshold - 1
+                    logger.warning(f"Proxy {proxy.url} benched for {self.cooldown}s after repeated failures")
+            else:
+                proxy.successes += 1
+                proxy.consecutive_failures = 0
+                if latency is not None:
+                    proxy.latency = latency if proxy.latency is None else (
+                        self.LATENCY_SMOOTHING * latency + (1 - self.LATENCY_SMOOTHING) * proxy.latency
+                    )
+            changed.notify_all()
+
+    def stats(self) -> List[dict]:
+        return [proxy.as_dict() for proxy in self.proxies]
+
+
+class LookupEngine:
+    """Looks numbers up concurrently through a ProxyPool"""
+
+    def __init__(self, pool: ProxyPool, url_template: Optional[str] = None, timeout: Optional[float] = None,
+                 max_attempts: Optional[int] = None, batch_size: Optional[int] = None,
+                 on_batch: Optional[Callable[[List[LookupResult]], None]] = None):
+        self.pool = pool
+        self.url_template = url_template or getattr(settings, 'PHONE_LOOKUP_URL', DEFAULT_LOOKUP_URL)
+        self.timeout = timeout or getattr(settings, 'PHONE_LOOKUP_TIMEOUT', 5)
+        self.max_attempts = max_attempts or getattr(settings, 'PHONE_LOOKUP_MAX_ATTEMPTS', 3)
+        self.batch_size = batch_size or getattr(settings, 'PHONE_LOOKUP_BATCH_SIZE', 500)
+        self.on_batch = on_batch
+        self.stopping = False
+        self._pending = []
+        self._counts = {'total': 0, 'valid': 0, 'invalid': 0, 'unresolved': 0}
+
+    def stop(self):
+        """Finish the lookups in flight and skip the rest"""
+        self.stopping = True
+
+    async def run(self, numbers: Iterable[str]) -> dict:
+        started = time.perf_counter()
+        work = asyncio.Queue(maxsize=self.pool.capacity * 2)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        connector = aiohttp.TCPConnector(limit=self.pool.capacity)
+
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            workers = [asyncio.create_task(self._worker(session, work)) for _ in range(self.pool.capacity)]
+            for number in numbers:
+                if self.stopping:
+                    break
+                await work.put(number)
+            for _ in workers:
+                await work.put(None)
+            await asyncio.gather(*workers)
+
+        self._flush()
+        seconds = time.perf_counter() - started
+        return {
+            **self._counts,
+            'seconds': round(seconds, 3),
+            'per_second': round(self._counts['total'] / seconds, 1) if seconds else None,
+            'proxies': self.pool.stats(),
+        }
+
+    async def _worker(self, session, work):
+        while True:
+            number = await work.get()
+            if number is None:
+                return
+            if self.stopping:
+                continue
+            result = await self.lookup(session, number)
+            self._record(result)
+
+    async def lookup(self, session, number: str) -> LookupResult:
+        url = self.url_template.format(number=number)
+        tried = []
+        error = None
+
+        for _ in range(self.max_attempts):
+            proxy = await self.pool.acquire(exclude=tried)
+            tried.append(proxy)
+            started = time.monotonic()
+            try:
+                async with session.get(url, proxy=proxy.url) as response:
+                    if response.status == 200:
+                        payload = await response.json(content_type=None)
+                        await self.pool.release(proxy, latency=time.monotonic() - started)
+                        return LookupResult(number, True, proxy=proxy.url, **parse_lookup_response(payload))
+                    if response.status in NOT_FOUND_STATUSES:
+                        await self.pool.release(proxy, latency=time.monotonic() - started)
+                        return LookupResult(number, False, proxy=proxy.url)
+                    error = f"HTTP {response.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                error = str(e) or type(e).__name__
+            await self.pool.release(proxy, failed=True)
+
+        return LookupResult(number, None, error=error)
+
+    def _record(self, result: LookupResult):
+        self._counts['total'] += 1
+        if result.valid:
+            self._counts['valid'] += 1
+        elif result.valid is False:
+            self._counts['invalid'] += 1
+        else:
+            self._counts['unresolved'] += 1
+
+        self._pending.append(result)
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+        if self._pending and self.on_batch is not None:
+            self.on_batch(self._pending)
+        self._pending = []
+
+
+def run_lookups(numbers: Iterable[str], proxies: Iterable[Optional[str]],
+                on_batch: Callable[[List[LookupResult]], None], cache=None, **options) -> dict:
+    """
+    Look numbers up through the proxies and pass each batch of results to
+    on_batch on the calling thread. Returns the run's counts, throughput and
+    per-proxy stats.
+
+    With a cache (see lookup_cache.LookupResultCache), numbers it can answer
+    are handed over without a request, and fresh answers are stored in it.
+
+    Options are LookupEngine's (url_template, timeout, max_attempts,
+    batch_size) and ProxyPool's (concurrency, failure_threshold, cooldown).
+    """
+    # Materialised here: a queryset must not be evaluated on the loop thread
+    numbers = list(numbers)
+    pool_options = {key: options.pop(key) for key in ('concurrency', 'failure_threshold', 'cooldown') if key in options}
+    batches = queue.Queue()
+    engine = LookupEngine(ProxyPool(proxies, **pool_options), on_batch=batches.put, **options)
+
+    cached = cache.get_many(numbers) if cache is not None else {}
+    if cached:
+        numbers = [number for number in numbers if number not in cached]
+        answered = list(cached.values())
+        for start in range(0, len(answered), engine.batch_size):
+            on_batch(answered[start:start + engine.batch_size])
+
+    outcome = {}
+
+    def drive():
+        try:
+            outcome['stats'] = asyncio.run(engine.run(numbers))
+        except BaseException as e:
+            outcome['error'] = e
+        finally:
+            batches.put(None)
+
+    thread = threading.Thread(target=drive, name='number-lookups', daemon=True)
+    thread.start()
+    try:
+        while (batch := batches.get()) is not None:
+            if cache is not None:
+                cache.store(batch)
+            on_batch(batch)
+    except BaseException:
+        engine.stop()
+        raise
+    finally:
+        thread.join()
+
+    if 'error' in outcome:
+        raise outcome['error']
+
+    stats = outcome['stats']
+    stats['cached'] = len(cached)
+    for result in cached.values():
+        stats['total'] += 1
+        stats['valid' if result.valid else 'invalid'] += 1
+    return stats
@@ -0,0 +1,26 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from phone_number_validator.models import PhonePrefix
+from phone_number_validator.prefix_db import build_prefix_db, get_prefix_db_path
+
+
+class Command(BaseCommand):
+    help = 'Compile the phone prefix data into the memory-mapped binary prefix database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--json', help='Build from a data.json file instead of the PhonePrefix table')
+        parser.add_argument('--output', help='Output file (default: PHONE_PREFIX_DB_PATH)')
+
+    def handle(self, *args, **options):
+        if options['json']:
+            with open(options['json'], 'r') as file:
+                records = json.load(file).values()
+        else:
+            records = PhonePrefix.objects.values('prefix', 'carrier', 'city', 'state', 'line_type').iterator()
+
+        path = options['output'] or get_prefix_db_path()
+        count = build_prefix_db(records, path)
+
+        self.stdout.write(self.style.SUCCESS(f'Wrote {count} prefixes to {path}'))
@@ -6,5 +6,9 @@ from phone_number_validator.utils import download_and_validate_proxies
 class Command(BaseCommand):
     help = 'Download and validate proxies, then store them in the database'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, help='Proxies checked at once (default: PROXY_CHECK_CONCURRENCY)')
+
     def handle(self, *args, **kwargs):
-        download_and_validate_proxies()
+        options = {'concurrency': kwargs['concurrency']} if kwargs['concurrency'] else {}
+        download_and_validate_proxies(**options)
@@ -1,30 +1,39 @@
-import json
 from django.core.management.base import BaseCommand
-from phone_number_validator.models import PhonePrefix
+
+from god_bless_pro.json_stream import iter_json_items
+from god_bless_pro.query_optimization import bulk_upsert
+from phone_number_validator.models import PhonePrefix, prefix_cache
+from phone_number_validator.prefix_db import build_prefix_db
 
 class Command(BaseCommand):
     help = 'Imports phone data from a JSON file into the database'
 
     def handle(self, *args, **kwargs):
-        # Load the JSON file
+        # Stream the JSON file and upsert it in batches, so re-importing
+        # refreshes existing prefixes instead of failing on the unique prefix
         with open('data.json', 'r') as file:
-            data = json.load(file)
-
-        # Use bulk_create for faster insertion
-        phone_records = []
-
-        for prefix, record in data.items():
-            phone_records.append(
-                PhonePrefix(
-                    carrier=record['carrier'],
-                    city=record['city'],
-                    prefix=record['prefix'],
-                    state=record['state'],
-                    line_type=record['type']
-                )
+            imported = bulk_upsert(
+                PhonePrefix,
+                (
+                    PhonePrefix(
+                        carrier=record['carrier'],
+                        city=record['city'],
+                        prefix=record['prefix'],
+                        state=record['state'],
+                        line_type=record['type']
+                    )
+                    for record in iter_json_items(file)
+                ),
+                unique_fields=['prefix'],
+                batch_size=5000,
             )
+        # Bulk writes skip signals, so drop every cached lookup
+        prefix_cache.clear()
 
-        # Insert records in bulk
-        PhonePrefix.objects.bulk_create(phone_records)
+        # Recompile the binary prefix database from the full table
+        count = build_prefix_db(
+            PhonePrefix.objects.values('prefix', 'carrier', 'city', 'state', 'line_type').iterator()
+        )
+        self.stdout.write(f'Rebuilt binary prefix database ({count} prefixes)')
 
-        self.stdout.write(self.style.SUCCESS('Successfully imported phone records'))
+        self.stdout.write(self.style.SUCCESS(f'Successfully imported {imported} phone records'))
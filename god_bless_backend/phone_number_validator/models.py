@@ -1,4 +1,10 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from god_bless_pro.cache import CacheManager, TwoTierCache
+from phone_number_validator.prefix_db import get_prefix_db
 
 class PhonePrefix(models.Model):
     prefix = models.CharField(max_length=6, unique=True)  # Store the prefix (e.g., '201200')
@@ -14,6 +20,44 @@ class PhonePrefix(models.Model):
         ordering = ['prefix']
 
 
+# Prefix records are read once per validated number and rarely change
+prefix_cache = TwoTierCache(
+    'phone_prefix',
+    local_maxsize=getattr(settings, 'PHONE_PREFIX_LOCAL_CACHE_SIZE', 20000),
+    local_ttl=300,
+    timeout=CacheManager.TIMEOUT_VERY_LONG,
+)
+
+
+def get_phone_prefix(prefix):
+    """
+    The record for a 6-digit prefix. Raises PhonePrefix.DoesNotExist like a
+    direct lookup.
+
+    When the compiled prefix database has been built (build_prefix_db) a
+    prefix found there is returned as a PrefixRecord with the same fields.
+    Prefixes missing from it, such as rows added since the last build, are
+    served from the PhonePrefix table through the two-tier cache.
+    """
+    prefix_db = get_prefix_db()
+    record = prefix_db.lookup(prefix) if prefix_db is not None else None
+    if record is None:
+        record = prefix_cache.get_or_set(prefix, lambda: PhonePrefix.objects.filter(prefix=prefix).first())
+    if record is None:
+        raise PhonePrefix.DoesNotExist(f"No PhonePrefix for {prefix}")
+    return record
+
+
+@receiver(post_save, sender=PhonePrefix)
+@receiver(post_delete, sender=PhonePrefix)
+def invalidate_phone_prefix(sender, instance, **kwargs):
+    prefix_cache.delete(instance.prefix)
+    if get_prefix_db() is not None:
+        # The compiled file still has the old row; rebuild it once the change is committed
+        from phone_number_validator.tasks import schedule_prefix_db_rebuild
+        transaction.on_commit(schedule_prefix_db_rebuild)
+
+
 
 class Proxy(models.Model):
     ip_address = models.CharField(max_length=15)
@@ -0,0 +1,235 @@
+"""
+Compact binary prefix database with memory-mapped lookups.
+
+build_prefix_db() compiles the PhonePrefix dataset into one read-only file:
+
+    header   magic b'GBPX', version, record count, string count (<4sIII)
+    records  sorted by NPA-NXX, one fixed-width struct per prefix
+             (<IIIII: key, carrier id, city id, state id, line type id)
+    offsets  string count + 1 uint32 byte offsets into the string blob
+    strings  UTF-8 blob of the interned carrier/city/state/type values
+
+PrefixDatabase maps the file and binary searches the record section, so
+every web and worker process shares the page-cache copy and a lookup is a
+handful of unpack_from() calls with no database round trip.
+
+Settings:
+    PHONE_PREFIX_DB_PATH: location of the compiled file
+        (default <BASE_DIR>/data/phone_prefixes.bin)
+    PHONE_PREFIX_DB_CHECK_INTERVAL: seconds between checks for a rebuilt
+        file (default 5)
+"""
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Iterable, NamedTuple, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'GBPX'
+VERSION = 1
+
+HEADER = struct.Struct('<4sIII')
+RECORD = struct.Struct('<IIIII')
+KEY = struct.Struct('<I')
+OFFSET = struct.Struct('<I')
+
+
+class PrefixRecord(NamedTuple):
+    """A prefix as stored in the binary database, with PhonePrefix's field names"""
+    prefix: str
+    carrier: str
+    city: str
+    state: str
+    line_type: str
+
+
+def get_prefix_db_path() -> str:
+    return str(getattr(settings, 'PHONE_PREFIX_DB_PATH', os.path.join(settings.BASE_DIR, 'data', 'phone_prefixes.bin')))
+
+
+def _field(record, name):
+    if isinstance(record, dict):
+        if name == 'line_type' and name not in record:
+            # data.json rows name the line type 'type'
+            return record['type']
+        return record[name]
+    return getattr(record, name)
+
+
+def build_prefix_db(records: Iterable, path: Optional[str] = None) -> int:
+    """
+    Compile prefix records into the binary database.
+
+    Args:
+        records: PhonePrefix instances or dicts with prefix, carrier, city,
+            state and line_type (or type) keys
+        path: Output file (default PHONE_PREFIX_DB_PATH)
+
+    Returns:
+        Number of prefixes written
+
+    The file is written beside the target and renamed over it, so
+    processes with the old file mapped keep reading a consistent copy.
+    Rows whose prefix is not six digits are skipped; for duplicate
+    prefixes the last row wins.
+    """
+    path = path or get_prefix_db_path()
+
+    strings = []
+    string_ids = {}
+
+    def intern(value):
+        value = value or ''
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    rows = {}
+    for record in records:
+        prefix = str(_field(record, 'prefix')).strip()
+        if len(prefix) != 6 or not prefix.isdigit():
+            continue
+        rows[int(prefix)] = (
+            intern(_field(record, 'carrier')),
+            intern(_field(record, 'city')),
+            intern(_field(record, 'state')),
+            intern(_field(record, 'line_type')),
+        )
+
+    blob = bytearray()
+    offsets = [0]
+    for value in strings:
+        blob += value.encode('utf-8')
+        offsets.append(len(blob))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as handle:
+            handle.write(HEADER.pack(MAGIC, VERSION, len(rows), len(strings)))
+            for key in sorted(rows):
+                handle.write(RECORD.pack(key, *rows[key]))
+            for offset in offsets:
+                handle.write(OFFSET.pack(offset))
+            handle.write(blob)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    logger.info(f"Built prefix database {path}: {len(rows)} prefixes, {len(strings)} strings")
+    return len(rows)
+
+
+class PrefixDatabase:
+    """Read-only, memory-mapped view of a compiled prefix database"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as handle:
+            stat = os.fstat(handle.fileno())
+            self._identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self._count, string_count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a version {VERSION} prefix database")
+
+        offsets_start = HEADER.size + self._count * RECORD.size
+        blob_start = offsets_start + (string_count + 1) * OFFSET.size
+        offsets = [
+            OFFSET.unpack_from(self._mmap, offsets_start + i * OFFSET.size)[0]
+            for i in range(string_count + 1)
+        ]
+        # The interned strings are few; decode them once rather than per lookup
+        self._strings = [
+            self._mmap[blob_start + offsets[i]:blob_start + offsets[i + 1]].decode('utf-8')
+            for i in range(string_count)
+        ]
+
+    def __len__(self):
+        return self._count
+
+    def lookup(self, prefix) -> Optional[PrefixRecord]:
+        """The record for a 6-digit NPA-NXX prefix, or None"""
+        prefix = str(prefix)
+        if len(prefix) != 6 or not prefix.isdigit():
+            return None
+        key = int(prefix)
+
+        low, high = 0, self._count - 1
+        while low <= high:
+            mid = (low + high) // 2
+            offset = HEADER.size + mid * RECORD.size
+            found = KEY.unpack_from(self._mmap, offset)[0]
+            if found < key:
+                low = mid + 1
+            elif found > key:
+                high = mid - 1
+            else:
+                _, carrier, city, state, line_type = RECORD.unpack_from(self._mmap, offset)
+                strings = self._strings
+                return PrefixRecord(prefix, strings[carrier], strings[city], strings[state], strings[line_type])
+        return None
+
+    def is_current(self) -> bool:
+        """False once the file on disk has been rebuilt or removed"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size) == self._identity
+
+    def close(self):
+        self._mmap.close()
+
+
+_db = None
+_db_next_check = 0.0
+_db_lock = threading.Lock()
+
+
+def get_prefix_db() -> Optional[PrefixDatabase]:
+    """
+    The shared PrefixDatabase for PHONE_PREFIX_DB_PATH, or None if it has
+    not been built. A rebuilt file is picked up within
+    PHONE_PREFIX_DB_CHECK_INTERVAL seconds.
+    """
+    global _db, _db_next_check
+    now = time.monotonic()
+    if now < _db_next_check:
+        return _db
+
+    with _db_lock:
+        if now < _db_next_check:
+            return _db
+        path = get_prefix_db_path()
+        if _db is None or _db.path != path or not _db.is_current():
+            # A replaced map is left to the garbage collector, since other
+            # threads may still be reading it
+            try:
+                _db = PrefixDatabase(path)
+            except FileNotFoundError:
+                _db = None
+            except (OSError, ValueError, struct.error) as e:
+                logger.error(f"Could not open prefix database {path}: {e}")
+                _db = None
+        _db_next_check = now + getattr(settings, 'PHONE_PREFIX_DB_CHECK_INTERVAL', 5)
+        return _db
+
+
+def reset_prefix_db():
+    """Forget the open database so the next get_prefix_db() reopens it"""
+    global _db, _db_next_check
+    with _db_lock:
+        _db = None
+        _db_next_check = 0.0
@@ -0,0 +1,170 @@
+"""
+Concurrent proxy list validation.
+
+Each proxy gets a bare TCP connect with a short timeout first, which
+weeds out the dead majority of a free proxy list in about a second. The
+proxies that accept a connection are then probed with an HTTP request to
+PROXY_CHECK_URL through the proxy. Up to PROXY_CHECK_CONCURRENCY proxies
+are checked at once on one event loop, and the results are written with
+one bulk update and one bulk insert.
+
+Settings:
+    PROXY_CHECK_URL: URL fetched through each proxy (default https://httpbin.org/ip)
+    PROXY_CHECK_CONCURRENCY: proxies checked at once (default 200)
+    PROXY_CONNECT_TIMEOUT: seconds for the TCP pre-check (default 2)
+    PROXY_CHECK_TIMEOUT: seconds for the HTTP probe (default 8)
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+import aiohttp
+from django.conf import settings
+from django.db import transaction
+
+from phone_number_validator.models import Proxy
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_PROTOCOLS = ('http', 'https')
+
+
+@dataclass
+class ProxyCheck:
+    """Outcome of checking one proxy"""
+    protocol: str
+    ip_address: str
+    port: int
+    valid: bool = False
+    latency: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def url(self) -> str:
+        # HTTPS proxies listed by the free lists are spoken to in plain HTTP
+        return f"http://{self.ip_address}:{self.port}"
+
+
+def parse_proxy(value: str, default_protocol: str = 'http') -> Optional[ProxyCheck]:
+    """A ProxyCheck for 'protocol://ip:port' or 'ip:port', or None if malformed"""
+    value = value.strip()
+    protocol, _, address = value.rpartition('://')
+    protocol = (protocol or default_protocol).lower()
+    host, _, port = address.partition(':')
+    if protocol not in SUPPORTED_PROTOCOLS or not host or not port.isdigit():
+        return None
+    return ProxyCheck(protocol, host, int(port))
+
+
+class ProxyChecker:
+    """Checks many proxies at once: TCP connect first, then an HTTP probe"""
+
+    def __init__(self, check_url: Optional[str] = None, concurrency: Optional[int] = None,
+                 connect_timeout: Optional[float] = None, timeout: Optional[float] = None):
+        self.check_url = check_url or getattr(settings, 'PROXY_CHECK_URL', 'https://httpbin.org/ip')
+        self.concurrency = concurrency or getattr(settings, 'PROXY_CHECK_CONCURRENCY', 200)
+        self.connect_timeout = connect_timeout or getattr(settings, 'PROXY_CONNECT_TIMEOUT', 2)
+        self.timeout = timeout or getattr(settings, 'PROXY_CHECK_TIMEOUT', 8)
+
+    async def _connects(self, check: ProxyCheck) -> bool:
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(check.ip_address, check.port), self.connect_timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            check.error = f"connect: {str(e) or type(e).__name__}"
+            return False
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    async def _probe(self, session, check: ProxyCheck) -> None:
+        started = time.monotonic()
+        try:
+            async with session.get(self.check_url, proxy=check.url) as response:
+                await response.read()
+                if response.status == 200:
+                    check.valid = True
+                    check.latency = time.monotonic() - started
+                else:
+                    check.error = f"HTTP {response.status}"
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            check.error = str(e) or type(e).__name__
+
+    async def _check(self, session, slots, check: ProxyCheck) -> ProxyCheck:
+        async with slots:
+            if await self._connects(check):
+                await self._probe(session, check)
+        return check
+
+    async def check_async(self, checks: List[ProxyCheck]) -> List[ProxyCheck]:
+        slots = asyncio.Semaphore(self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, force_close=True)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            return list(await asyncio.gather(*(self._check(session, slots, check) for check in checks)))
+
+    def check(self, proxies: Iterable[str]) -> List[ProxyCheck]:
+        """Check 'protocol://ip:port' or 'ip:port' strings; malformed and duplicate entries are skipped"""
+        checks = {}
+        for value in proxies:
+            check = parse_proxy(value)
+            if check is not None:
+                checks.setdefault((check.ip_address, check.port), check)
+        return asyncio.run(self.check_async(list(checks.values())))
+
+
+def save_proxy_checks(checks: Iterable[ProxyCheck]) -> dict:
+    """
+    Upsert check results into Proxy: existing rows get their new validity in
+    one bulk update, and newly found valid proxies are inserted in one bulk
+    insert. Proxies that failed and were never stored are not added.
+    """
+    checks = {(check.ip_address, check.port): check for check in checks}
+    ip_addresses = {ip_address for ip_address, _ in checks}
+
+    with transaction.atomic():
+        existing = {}
+        for proxy in Proxy.objects.filter(ip_address__in=ip_addresses).order_by('id'):
+            key = (proxy.ip_address, proxy.port)
+            if key in checks:
+                existing.setdefault(key, []).append(proxy)
+
+        updated = []
+        for key, proxies in existing.items():
+            for proxy in proxies:
+                proxy.valid = checks[key].valid
+                proxy.ssl = checks[key].protocol == 'https'
+                updated.append(proxy)
+        Proxy.objects.bulk_update(updated, ['valid', 'ssl'], batch_size=1000)
+
+        created = Proxy.objects.bulk_create([
+            Proxy(ip_address=check.ip_address, port=check.port, ssl=check.protocol == 'https', valid=True)
+            for key, check in checks.items()
+            if check.valid and key not in existing
+        ], batch_size=1000)
+
+    return {
+        'checked': len(checks),
+        'valid': sum(1 for check in checks.values() if check.valid),
+        'updated': len(updated),
+        'created': len(created),
+    }
+
+
+def validate_proxy_list(proxies: Iterable[str], **options) -> dict:
+    """Check a proxy list concurrently and save the results; returns a summary"""
+    started = time.perf_counter()
+    checks = ProxyChecker(**options).check(proxies)
+    summary = save_proxy_checks(checks)
+    summary['seconds'] = round(time.perf_counter() - started, 2)
+    logger.info(
+        f"Checked {summary['checked']} proxies in {summary['seconds']}s: {summary['valid']} valid, "
+        f"{summary['created']} new"
+    )
+    return summary
@@ -0,0 +1,64 @@
+"""
+Celery tasks for proxy list ingestion and validation, and for keeping the
+binary prefix database in step with the PhonePrefix table
+"""
+from celery import shared_task
+from django.core.cache import cache
+import logging
+
+from .models import PhonePrefix, Proxy
+from .prefix_db import build_prefix_db
+from .proxy_checker import validate_proxy_list
+from .utils import download_and_validate_proxies
+
+logger = logging.getLogger(__name__)
+
+PREFIX_DB_REBUILD_KEY = 'phone_prefix:db_rebuild_pending'
+# Seconds to wait before rebuilding, so a burst of prefix edits costs one build
+PREFIX_DB_REBUILD_DELAY = 60
+
+
+@shared_task(bind=True)
+def revalidate_proxies_task(self):
+    """
+    Periodic task to re-check every stored proxy so the valid flags stay current
+    """
+    proxies = [
+        f"{'https' if ssl else 'http'}://{ip_address}:{port}"
+        for ip_address, port, ssl in Proxy.objects.values_list('ip_address', 'port', 'ssl')
+    ]
+    logger.info(f"Re-validating {len(proxies)} stored proxies")
+    return validate_proxy_list(proxies)
+
+
+@shared_task(bind=True)
+def download_and_validate_proxies_task(self):
+    """
+    Periodic task to pull a fresh free proxy list and store the working proxies
+    """
+    logger.info("Downloading and validating the free proxy list")
+    return download_and_validate_proxies()
+
+
+@shared_task(bind=True)
+def rebuild_prefix_db_task(self):
+    """
+    Recompile the binary prefix database from the PhonePrefix table
+    """
+    # Changes from here on schedule another build
+    cache.delete(PREFIX_DB_REBUILD_KEY)
+    records = PhonePrefix.objects.values('prefix', 'carrier', 'city', 'state', 'line_type').iterator()
+    count = build_prefix_db(records)
+    logger.info(f"Rebuilt prefix database with {count} prefixes")
+    return {'prefixes': count}
+
+
+def schedule_prefix_db_rebuild():
+    """Queue one rebuild of the prefix database for any number of PhonePrefix changes"""
+    if not cache.add(PREFIX_DB_REBUILD_KEY, True, PREFIX_DB_REBUILD_DELAY * 10):
+        return
+    try:
+        rebuild_prefix_db_task.apply_async(countdown=PREFIX_DB_REBUILD_DELAY)
+    except Exception as e:
+        cache.delete(PREFIX_DB_REBUILD_KEY)
+        logger.error(f"Could not schedule prefix database rebuild: {e}")
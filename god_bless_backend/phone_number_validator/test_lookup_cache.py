@@ -0,0 +1,89 @@
+"""
+Tests for the exact-number and thousands-block lookup result cache
+"""
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from god_bless_pro import metrics
+from phone_number_validator.lookup_cache import LookupResultCache
+from phone_number_validator.lookup_engine import LookupResult, run_lookups
+from phone_number_validator.test_lookup_engine import FakeLookupServer
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class LookupResultCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.cache = LookupResultCache(min_block_samples=2)
+
+    def test_exact_numbers_are_cached(self):
+        self.cache.store([
+            LookupResult('+1 (201) 555-0001', True, 'Verizon', 'mobile'),
+            LookupResult('12015550000', False),
+            LookupResult('12015550002', None, error='timeout'),
+        ])
+
+        answers = self.cache.get_many(['2015550001', '12015550000', '12015550002'])
+
+        self.assertEqual(answers['2015550001'].carrier, 'Verizon')
+        self.assertFalse(answers['12015550000'].valid)
+        # Unanswered lookups are retried, not cached
+        self.assertNotIn('12015550002', answers)
+
+    def test_block_is_learned_after_agreeing_samples(self):
+        self.cache.store([LookupResult('12015550001', True, 'Verizon', 'mobile')])
+        self.assertEqual(self.cache.get_many(['12015550999']), {})
+
+        self.cache.store([LookupResult('12015550002', True, 'Verizon', 'mobile')])
+        answer = self.cache.get_many(['12015550999'])['12015550999']
+        self.assertEqual((answer.valid, answer.carrier, answer.line_type), (True, 'Verizon', 'mobile'))
+
+        # Another thousands block is unaffected
+        self.assertEqual(self.cache.get_many(['12015551999']), {})
+
+    def test_mixed_block_is_never_trusted(self):
+        self.cache.store([
+            LookupResult('12015550001', True, 'Verizon', 'mobile'),
+            LookupResult('12015550002', True, 'Verizon', 'mobile'),
+            LookupResult('12015550003', True, 'T-Mobile', 'mobile'),
+        ])
+        self.assertEqual(self.cache.get_many(['12015550999']), {})
+
+    def test_hits_and_misses_are_counted(self):
+        self.cache.store([
+            LookupResult('12015550001', True, 'Verizon', 'mobile'),
+            LookupResult('12015550002', True, 'Verizon', 'mobile'),
+        ])
+
+        with mock.patch.object(metrics.PHONE_LOOKUP_CACHE, 'labels') as labels:
+            self.cache.get_many(['12015550001', '12015550500', '12015551500', '12015551501'])
+
+        self.assertEqual(
+            sorted((call.kwargs['result'], labels.return_value.inc.call_args_list[i].args[0])
+                   for i, call in enumerate(labels.call_args_list)),
+            [('block_hit', 1), ('miss', 2), ('number_hit', 1)]
+        )
+
+    def test_run_lookups_only_asks_for_unknown_blocks(self):
+        self.cache.store([
+            LookupResult('12015550001', True, 'Verizon', 'mobile'),
+            LookupResult('12015550002', True, 'Verizon', 'mobile'),
+        ])
+        numbers = [f'1201555{i:04d}' for i in range(990, 1010)]
+        results = []
+
+        with FakeLookupServer() as api:
+            stats = run_lookups(
+                numbers, [], results.extend, cache=self.cache,
+                url_template=f'http://{api.address}/lookup/{{number}}'
+            )
+
+        # 2015550990-0999 come from the learned block; 2015551000-1009 are looked up
+        self.assertEqual(api.server.requests, 10)
+        self.assertEqual((stats['total'], stats['cached']), (20, 10))
+        self.assertEqual(sorted(result.number for result in results), numbers)
+        self.assertEqual(len(self.cache.get_many(numbers)), 20)
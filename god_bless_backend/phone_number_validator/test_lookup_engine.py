@@ -0,0 +1,153 @@
+"""
+Tests for the concurrent lookup engine against a local fake lookup API
+"""
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from phone_generator.models import PhoneNumber
+from phone_generator.tasks import lookup_phone_numbers_task
+from phone_number_validator.lookup_engine import run_lookups
+from projects.models import Project
+
+User = get_user_model()
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+IN_MEMORY_CHANNELS = {'default': {'BACKEND': 'channels.layers.InMemoryChannelLayer'}}
+
+
+class FakeLookupHandler(BaseHTTPRequestHandler):
+    """Answers number_lookup requests, directly or as an HTTP proxy; numbers ending 0000 do not exist"""
+
+    def do_GET(self):
+        self.server.requests += 1
+        number = urlsplit(self.path).path.rsplit('/', 1)[-1]
+        if number.endswith('0000'):
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = json.dumps({'data': {'carrier': {'name': 'Verizon', 'type': 'mobile'}}}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeLookupServer:
+    def __init__(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), FakeLookupHandler)
+        self.server.requests = 0
+        self.address = '127.0.0.1:%d' % self.server.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def closed_port_address():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return '127.0.0.1:%d' % sock.getsockname()[1]
+
+
+class LookupEngineTestCase(SimpleTestCase):
+    def test_direct_lookups_are_batched(self):
+        numbers = [f'1201555{i:04d}' for i in range(25)]
+        batches = []
+
+        with FakeLookupServer() as api:
+            stats = run_lookups(
+                numbers, [], batches.append,
+                url_template=f'http://{api.address}/lookup/{{number}}', batch_size=10
+            )
+
+        self.assertEqual([len(batch) for batch in batches], [10, 10, 5])
+        results = {result.number: result for batch in batches for result in batch}
+        self.assertEqual(set(results), set(numbers))
+        self.assertFalse(results['12015550000'].valid)
+        self.assertTrue(results['12015550001'].valid)
+        self.assertEqual(results['12015550001'].carrier, 'Verizon')
+        self.assertEqual(results['12015550001'].line_type, 'mobile')
+        self.assertEqual((stats['valid'], stats['invalid'], stats['unresolved']), (24, 1, 0))
+
+    def test_dead_proxy_is_benched_and_work_moves_to_healthy_ones(self):
+        numbers = [f'1201555{i:04d}' for i in range(1, 61)]
+        dead = closed_port_address()
+        results = []
+
+        with FakeLookupServer() as first, FakeLookupServer() as second:
+            stats = run_lookups(
+                numbers, [dead, first.address, second.address], results.extend,
+                url_template='http://lookup.test/lookup/{number}',
+                failure_threshold=2, cooldown=60
+            )
+
+        self.assertEqual(stats['valid'], 60)
+        self.assertEqual(first.server.requests + second.server.requests, 60)
+        self.assertTrue(first.server.requests and second.server.requests)
+        proxies = {proxy['proxy']: proxy for proxy in stats['proxies']}
+        self.assertTrue(proxies[f'http://{dead}']['benched'])
+        self.assertEqual(proxies[f'http://{dead}']['successes'], 0)
+        self.assertTrue(all(result.proxy != f'http://{dead}' for result in results))
+
+    def test_unreachable_numbers_are_unresolved(self):
+        stats = run_lookups(
+            ['12015550001'], [closed_port_address()], lambda batch: None,
+            url_template='http://lookup.test/lookup/{number}', max_attempts=2, cooldown=0
+        )
+        self.assertEqual(stats['unresolved'], 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHE, CHANNEL_LAYERS=IN_MEMORY_CHANNELS)
+class LookupTaskTestCase(TestCase):
+    def test_task_bulk_updates_numbers(self):
+        user = User.objects.create_user(email='lookup@example.com', username='lookupuser', password='testpass123')
+        project = Project.objects.create(user=user, project_name='Lookup Project')
+        PhoneNumber.objects.bulk_create([
+            PhoneNumber(user=user, project=project, phone_number=f'1201555{i:04d}') for i in range(5)
+        ])
+
+        with FakeLookupServer() as proxy, override_settings(PHONE_LOOKUP_URL='http://lookup.test/lookup/{number}'):
+            stats = lookup_phone_numbers_task.apply(kwargs={
+                'user_id': user.user_id,
+                'project_id': project.id,
+                'proxies': [proxy.address],
+            }).get()
+
+        self.assertEqual((stats['valid'], stats['invalid']), (4, 1))
+        self.assertEqual(PhoneNumber.objects.filter(valid_number=True, carrier='Verizon', validation_source='external').count(), 4)
+        self.assertFalse(PhoneNumber.objects.get(phone_number='12015550000').valid_number)
+        self.assertFalse(PhoneNumber.objects.filter(validation_attempted=False).exists())
+
+    def test_validation_endpoint_starts_external_lookup(self):
+        user = User.objects.create_user(email='lookupapi@example.com', username='lookupapi', password='testpass123')
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get(user=user).key}')
+
+        with mock.patch.object(lookup_phone_numbers_task, 'delay') as delay:
+            delay.return_value.id = 'lookup-task'
+            response = client.post(
+                '/api/phone-generator/validate-numbers-enhanced/',
+                {'user_id': user.user_id, 'source': 'external'}, format='json'
+            )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['data']['task_id'], 'lookup-task')
+        delay.assert_called_once_with(user_id=user.user_id, project_id=None, phone_ids=None)
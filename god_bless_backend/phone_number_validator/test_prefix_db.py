@@ -0,0 +1,93 @@
+"""
+Tests for the memory-mapped binary prefix database
+"""
+import os
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from phone_number_validator import prefix_db
+from phone_number_validator.models import PhonePrefix, get_phone_prefix
+from phone_number_validator.tasks import rebuild_prefix_db_task
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+RECORDS = [
+    {'prefix': '201555', 'carrier': 'Verizon', 'city': 'Newark', 'state': 'New Jersey', 'type': 'Mobile'},
+    {'prefix': '201200', 'carrier': 'Sprint', 'city': 'Newark', 'state': 'New Jersey', 'type': 'Landline'},
+    {'prefix': '917123', 'carrier': 'Verizon', 'city': 'New York', 'state': 'New York', 'type': 'Mobile'},
+    {'prefix': '12345', 'carrier': 'Skipped', 'city': '', 'state': '', 'type': ''},
+]
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class PrefixDatabaseTestCase(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'prefixes.bin')
+        prefix_db.reset_prefix_db()
+
+    def tearDown(self):
+        prefix_db.reset_prefix_db()
+        self.tmpdir.cleanup()
+
+    def test_build_and_lookup(self):
+        self.assertEqual(prefix_db.build_prefix_db(RECORDS, self.path), 3)
+
+        db = prefix_db.PrefixDatabase(self.path)
+        self.assertEqual(len(db), 3)
+        self.assertEqual(
+            db.lookup('201200'),
+            prefix_db.PrefixRecord('201200', 'Sprint', 'Newark', 'New Jersey', 'Landline')
+        )
+        self.assertEqual(db.lookup('917123').city, 'New York')
+        self.assertIsNone(db.lookup('201201'))
+        self.assertIsNone(db.lookup('100000'))
+        self.assertIsNone(db.lookup('999999'))
+        self.assertIsNone(db.lookup('20120'))
+        db.close()
+
+    def test_rejects_other_files(self):
+        with open(self.path, 'wb') as handle:
+            handle.write(b'not a prefix database')
+        with self.assertRaises(ValueError):
+            prefix_db.PrefixDatabase(self.path)
+
+    def test_get_phone_prefix_uses_binary_database(self):
+        PhonePrefix.objects.create(prefix='303555', carrier='AT&T', city='Denver', state='Colorado', line_type='Mobile')
+
+        with override_settings(PHONE_PREFIX_DB_PATH=self.path):
+            # Not built yet: the table answers
+            self.assertEqual(get_phone_prefix('303555').carrier, 'AT&T')
+
+            prefix_db.build_prefix_db(RECORDS, self.path)
+            prefix_db.reset_prefix_db()
+            with self.assertNumQueries(0):
+                self.assertEqual(get_phone_prefix('201555').carrier, 'Verizon')
+            # Rows missing from the file fall back to the table
+            self.assertEqual(get_phone_prefix('303555').carrier, 'AT&T')
+            with self.assertRaises(PhonePrefix.DoesNotExist):
+                get_phone_prefix('404555')
+
+    def test_prefix_changes_rebuild_binary_database(self):
+        with override_settings(PHONE_PREFIX_DB_PATH=self.path):
+            prefix_db.build_prefix_db(RECORDS, self.path)
+            prefix_db.reset_prefix_db()
+
+            with mock.patch.object(rebuild_prefix_db_task, 'apply_async') as apply_async:
+                with self.captureOnCommitCallbacks(execute=True):
+                    PhonePrefix.objects.create(
+                        prefix='201555', carrier='T-Mobile', city='Newark', state='New Jersey', line_type='Mobile'
+                    )
+                    PhonePrefix.objects.create(
+                        prefix='201556', carrier='T-Mobile', city='Newark', state='New Jersey', line_type='Mobile'
+                    )
+            # One rebuild for the whole burst of changes
+            apply_async.assert_called_once()
+
+            rebuild_prefix_db_task.apply().get()
+            prefix_db.reset_prefix_db()
+            with self.assertNumQueries(0):
+                self.assertEqual(get_phone_prefix('201555').carrier, 'T-Mobile')
+                self.assertEqual(get_phone_prefix('201556').carrier, 'T-Mobile')
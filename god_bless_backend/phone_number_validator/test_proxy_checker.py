@@ -0,0 +1,53 @@
+"""
+Tests for concurrent proxy validation against local fake proxies
+"""
+from django.test import TestCase
+
+from phone_number_validator.models import Proxy
+from phone_number_validator.proxy_checker import ProxyChecker, parse_proxy, validate_proxy_list
+from phone_number_validator.test_lookup_engine import FakeLookupServer, closed_port_address
+
+
+class ProxyCheckerTestCase(TestCase):
+    def test_parse_proxy(self):
+        check = parse_proxy('HTTPS://10.0.0.1:8080')
+        self.assertEqual((check.protocol, check.ip_address, check.port), ('https', '10.0.0.1', 8080))
+        self.assertEqual(parse_proxy('10.0.0.1:3128').protocol, 'http')
+        self.assertIsNone(parse_proxy('socks5://10.0.0.1:1080'))
+        self.assertIsNone(parse_proxy('10.0.0.1'))
+
+    def test_dead_proxies_fail_the_connect_precheck(self):
+        dead = closed_port_address()
+        with FakeLookupServer() as proxy:
+            checks = ProxyChecker(check_url='http://check.test/ip/1').check([proxy.address, dead, f'http://{dead}'])
+
+        self.assertEqual(len(checks), 2)
+        by_address = {f'{check.ip_address}:{check.port}': check for check in checks}
+        self.assertTrue(by_address[proxy.address].valid)
+        self.assertIsNotNone(by_address[proxy.address].latency)
+        self.assertFalse(by_address[dead].valid)
+        self.assertTrue(by_address[dead].error.startswith('connect'))
+
+    def test_proxy_answering_errors_is_invalid(self):
+        with FakeLookupServer() as proxy:
+            # The fake answers 404 for numbers ending 0000
+            checks = ProxyChecker(check_url='http://check.test/ip/0000').check([proxy.address])
+        self.assertFalse(checks[0].valid)
+        self.assertEqual(checks[0].error, 'HTTP 404')
+
+    def test_results_are_upserted(self):
+        dead = closed_port_address()
+        dead_ip, dead_port = dead.split(':')
+        Proxy.objects.create(ip_address=dead_ip, port=int(dead_port), valid=True)
+
+        with FakeLookupServer() as proxy:
+            summary = validate_proxy_list([proxy.address, dead], check_url='http://check.test/ip/1')
+            self.assertEqual((summary['checked'], summary['valid'], summary['updated'], summary['created']), (2, 1, 1, 1))
+
+            # A second run updates the stored rows instead of adding new ones
+            summary = validate_proxy_list([proxy.address, dead], check_url='http://check.test/ip/1')
+            self.assertEqual((summary['updated'], summary['created']), (2, 0))
+
+        self.assertEqual(Proxy.objects.count(), 2)
+        self.assertFalse(Proxy.objects.get(port=int(dead_port)).valid)
+        self.assertTrue(Proxy.objects.get(port=int(proxy.address.split(':')[1])).valid)
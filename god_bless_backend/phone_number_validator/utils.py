@@ -1,5 +1,4 @@
 # utils.py
-from phone_number_validator.models import Proxy
 
 import requests
 import logging
@@ -11,6 +10,8 @@ logger = logging.getLogger(__name__)
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from phone_number_validator.proxy_checker import validate_proxy_list
+
 def check_proxy_validity(proxy):
     ip_url = 'https://ipecho.net/plain/'
 
@@ -41,54 +42,15 @@ def download_and_validate_proxies3333():
     
     try:
         print("Downloading proxies...")
-        response = requests.get(url)
+        response = requests.get(url, timeout=30)
         proxies = response.text.strip().split('\n')  # Split by newline to get a list of proxies
-
-        # List to hold valid and invalid proxies
-        valid_proxies = []
-        invalid_proxies = []
-        
-        for proxy in proxies:
-            # Check if the proxy has the expected format
-            if "://" not in proxy:
-                print(f"Skipping invalid format proxy: {proxy}")
-                continue  # Skip this proxy if it's not in the correct format
-            
-            try:
-                protocol, ip_port = proxy.split("://")
-                ip, port = ip_port.split(":")
-                port = int(port)  # Ensure port is an integer
-                
-                is_valid, ip_address = check_proxy_validity(proxy)
-                if is_valid:
-                    print(f"Valid Proxy: {proxy} => IP: {ip_address}")
-                    valid_proxies.append(proxy)
-                    # Save valid proxy to the database
-                    Proxy.objects.get_or_create(
-                        ip_address=ip,
-                        port=port,
-                        valid=True
-                    )
-                else:
-                    print(f"Invalid Proxy: {proxy}")
-                    invalid_proxies.append(proxy)
-                    # Save invalid proxy to the database
-                    # Proxy.objects.get_or_create(
-                    #     ip_address=ip,
-                    #     port=port,
-                    #     valid=False
-                    # )
-
-            except ValueError:
-                print(f"Skipping proxy due to incorrect format (missing ':' or multiple ':'): {proxy}")
-                continue
-
-        # Output summary
-        print(f"{len(valid_proxies)} Valid proxies saved in the database.")
-        print(f"{len(invalid_proxies)} Invalid proxies saved in the database.")
-
     except requests.RequestException as e:
         print(f"Error downloading proxies: {e}")
+        return
+
+    # Check every proxy concurrently and save the results in one go
+    summary = validate_proxy_list(proxies)
+    print(f"{summary['valid']} of {summary['checked']} proxies valid, {summary['created']} new saved in the database.")
 
 
         
@@ -98,41 +60,14 @@ def download_and_validate_proxies22222():
     url = 'https://api.proxyscrape.com/v4/free-proxy-list/get?request=display_proxies&proxy_format=protocolipport&format=text'
     try:
         print("Downloading proxies...")
-        response = requests.get(url)
+        response = requests.get(url, timeout=30)
         proxies = response.text.strip().split("\r\n")  # Split proxies by line
-        
-        # List to hold valid and invalid proxies
-        valid_proxies = []
-        invalid_proxies = []
-        
-        for proxy in proxies:
-            ip, port = proxy.split(":")
-            is_valid, ip_address = check_proxy_validity(proxy)
-            if is_valid:
-                print(f"Valid Proxy: {proxy} => IP: {ip_address}")
-                valid_proxies.append(proxy)
-                # Save valid proxy to the database
-                Proxy.objects.get_or_create(
-                    ip_address=ip,
-                    port=port,
-                    valid=True
-                )
-            else:
-                print(f"Invalid Proxy: {proxy}")
-                invalid_proxies.append(proxy)
-                # Save invalid proxy to the database
-                #Proxy.objects.get_or_create(
-                #    ip_address=ip,
-                #    port=port,
-                #    valid=False
-                #)
-
-        # Output summary
-        print(f"{len(valid_proxies)} Valid proxies saved in the database.")
-        print(f"{len(invalid_proxies)} Invalid proxies saved in the database.")
-
     except requests.RequestException as e:
         print(f"Error downloading proxies: {e}")
+        return
+
+    summary = validate_proxy_list(proxies)
+    print(f"{summary['valid']} of {summary['checked']} proxies valid, {summary['created']} new saved in the database.")
 
 
 ########################################
@@ -181,49 +116,33 @@ def scrape_proxy_from_geonode(page):
 
 
 
-def download_and_validate_proxies():
-    valid_proxies = []
-    invalid_proxies = []
+def download_and_validate_proxies(**options):
+    proxies = []
     page = 1
 
+    # Collect the whole list first, then check it concurrently
     while True:
-        proxies = scrape_proxy_from_geonode(page)
-        if not proxies:
+        page_proxies = scrape_proxy_from_geonode(page)
+        if not page_proxies:
             break  # Exit the loop if no proxies are found
-        for proxy_data in proxies:
+        for proxy_data in page_proxies:
             # Extract protocol, IP, and port from the proxy data
             protocol = proxy_data.get('protocol', '').lower()  # Make sure the protocol is lowercase
             ip = proxy_data.get('ip', '')
             port = proxy_data.get('port', '')
 
-            # If the protocol is missing or invalid, default to 'http'
+            # Only HTTP(S) proxies can be used for lookups
             if not protocol or protocol not in ['http', 'https']:
                 print(f"Invalid Proxy Protocol: {protocol} for IP: {ip}")
                 continue  # Skip this proxy
 
-            # Combine the protocol and IP:PORT to form the proxy string
-            proxy = f"{protocol}://{ip}:{port}"
-
-            # Validate the proxy using the check_proxy_validity function
-            is_valid, ip_address = check_proxy_validity(proxy)
-
-            if is_valid:
-                print(f"Valid Proxy: {proxy} => IP: {ip_address}")
-                valid_proxies.append(proxy)
-                # Save valid proxy to the database
-                Proxy.objects.get_or_create(
-                    ip_address=ip,
-                    port=port,
-                    valid=True
-                )
-            else:
-                print(f"Invalid Proxy: {proxy}")
-                invalid_proxies.append(proxy)
-                # Optionally, save invalid proxies to the database if needed
-                # Proxy.objects.get_or_create(ip_address=ip, port=port, valid=False)
+            proxies.append(f"{protocol}://{ip}:{port}")
 
         page += 1  # Move to the next page
 
+    summary = validate_proxy_list(proxies, **options)
+
     # Output summary
-    print(f"{len(valid_proxies)} Valid proxies saved in the database.")
-    print(f"{len(invalid_proxies)} Invalid proxies identified.")
\ No newline at end of file
+    print(f"{summary['valid']} Valid proxies saved in the database ({summary['created']} new).")
+    print(f"{summary['checked'] - summary['valid']} Invalid proxies identified.")
+    return summary
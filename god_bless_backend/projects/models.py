@@ -1,6 +1,8 @@
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.db.models import Count, Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 
 User = get_user_model()
 
@@ -185,3 +187,10 @@ class ProjectActivity(models.Model):
 
     def __str__(self):
         return f"{self.activity_type} - {self.project.project_name}"
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def invalidate_cached_project_acl(sender, instance=None, **kwargs):
+    from god_bless_pro.auth_cache import invalidate_user
+    invalidate_user(instance.user_id)
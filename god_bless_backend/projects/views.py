@@ -1,7 +1,8 @@
 from django.shortcuts import render
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.authentication import TokenAuthentication
+from god_bless_pro.auth_backends import CachedTokenAuthentication
+from god_bless_pro.auth_cache import get_request_user
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth import get_user_model
@@ -23,7 +24,7 @@ User = get_user_model()
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def add_project_view(request):
     payload = {}
     data = {}
@@ -48,7 +49,7 @@ def add_project_view(request):
             errors["user_id"] = ["User ID is required."]
 
         try:
-            user = User.objects.get(user_id=user_id)
+            user = get_request_user(request, user_id)
         except:
             errors["user_id"] = ["User does not exist."]
 
@@ -90,7 +91,7 @@ def add_project_view(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def get_all_projects_view(request):
     payload = {}
     data = {}
@@ -107,7 +108,7 @@ def get_all_projects_view(request):
         errors["user_id"] = ["User ID is required."]
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except:
         errors["user_id"] = ["User does not exist."]
         
@@ -163,7 +164,7 @@ def get_all_projects_view(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def get_project_detail_view(request, project_id):
     payload = {}
     errors = {}
@@ -185,7 +186,7 @@ def get_project_detail_view(request, project_id):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def edit_project_view(request):
     payload = {}
     data = {}
@@ -284,7 +285,7 @@ def edit_project_view(request):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def archive_project(request):
     payload = {}
     data = {}
@@ -317,7 +318,7 @@ def archive_project(request):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def unarchive_project(request):
     payload = {}
     data = {}
@@ -350,7 +351,7 @@ def unarchive_project(request):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def delete_project(request):
     payload = {}
     data = {}
@@ -382,7 +383,7 @@ def delete_project(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def get_all_archived_projects_view(request):
     payload = {}
     data = {}
@@ -397,7 +398,7 @@ def get_all_archived_projects_view(request):
         errors["user_id"] = ["User ID is required."]
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except:
         errors["user_id"] = ["User does not exist."]
         
@@ -439,7 +440,7 @@ def get_all_archived_projects_view(request):
 # Task Management Views
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def add_task_view(request):
     payload = {}
     errors = {}
@@ -500,7 +501,7 @@ def add_task_view(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def get_project_tasks_view(request, project_id):
     payload = {}
     errors = {}
@@ -528,7 +529,7 @@ def get_project_tasks_view(request, project_id):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def update_task_view(request):
     payload = {}
     errors = {}
@@ -584,7 +585,7 @@ def update_task_view(request):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def delete_task_view(request):
     payload = {}
     errors = {}
@@ -615,7 +616,7 @@ def delete_task_view(request):
 # Note Management Views
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def add_note_view(request):
     payload = {}
     errors = {}
@@ -661,7 +662,7 @@ def add_note_view(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def get_project_notes_view(request, project_id):
     payload = {}
     errors = {}
@@ -686,7 +687,7 @@ def get_project_notes_view(request, project_id):
 # Analytics Views
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def get_project_analytics_view(request, project_id):
     payload = {}
     errors = {}
@@ -718,7 +719,7 @@ def get_project_analytics_view(request, project_id):
 # Collaboration Views
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def add_collaborator_view(request):
     payload = {}
     errors = {}
@@ -737,7 +738,7 @@ def add_collaborator_view(request):
         errors["project_id"] = ["Project does not exist."]
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except:
         errors["user_id"] = ["User does not exist."]
 
@@ -764,7 +765,7 @@ def add_collaborator_view(request):
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
-@authentication_classes([TokenAuthentication])
+@authentication_classes([CachedTokenAuthentication])
 def remove_collaborator_view(request):
     payload = {}
     errors = {}
@@ -783,7 +784,7 @@ def remove_collaborator_view(request):
         errors["project_id"] = ["Project does not exist."]
 
     try:
-        user = User.objects.get(user_id=user_id)
+        user = get_request_user(request, user_id)
     except:
         errors["user_id"] = ["User does not exist."]
 
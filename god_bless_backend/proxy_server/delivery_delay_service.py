@@ -4,7 +4,7 @@ Handles configurable delivery delays with random seeds
 """
 import random
 import time
-from .models import RotationSettings
+from .models import get_rotation_settings
 
 
 class DeliveryDelayService:
@@ -17,16 +17,12 @@ class DeliveryDelayService:
     
     def _get_or_create_settings(self):
         """Get or create rotation settings for user"""
-        settings, created = RotationSettings.objects.get_or_create(
-            user=self.user,
-            defaults={
-                'delivery_delay_enabled': True,
-                'delivery_delay_min': 1,
-                'delivery_delay_max': 5,
-                'delivery_delay_random_seed': None
-            }
-        )
-        return settings
+        return get_rotation_settings(self.user, defaults={
+            'delivery_delay_enabled': True,
+            'delivery_delay_min': 1,
+            'delivery_delay_max': 5,
+            'delivery_delay_random_seed': None
+        })
     
     def _initialize_random(self):
         """Initialize random generator with seed if configured"""
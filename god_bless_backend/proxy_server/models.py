@@ -1,7 +1,11 @@
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
+from god_bless_pro.cache import TwoTierCache
+
 User = get_user_model()
 
 
@@ -109,3 +113,21 @@ class RotationSettings(models.Model):
     
     def __str__(self):
         return f"Rotation Settings for {self.user.username}"
+
+
+# Read by every rotation and delay service instantiation
+rotation_settings_cache = TwoTierCache('rotation_settings')
+
+
+def get_rotation_settings(user, defaults=None):
+    """Get or create a user's RotationSettings through the two-tier cache"""
+    return rotation_settings_cache.get_or_set(
+        user.id,
+        lambda: RotationSettings.objects.get_or_create(user=user, defaults=defaults)[0]
+    )
+
+
+@receiver(post_save, sender=RotationSettings)
+@receiver(post_delete, sender=RotationSettings)
+def invalidate_rotation_settings(sender, instance, **kwargs):
+    rotation_settings_cache.delete(instance.user_id)
@@ -7,7 +7,7 @@ import requests
 from typing import Optional
 from django.utils import timezone
 from django.core.cache import cache
-from .models import ProxyServer, RotationSettings
+from .models import ProxyServer, get_rotation_settings
 
 
 class ProxyRotationService:
@@ -22,16 +22,12 @@ class ProxyRotationService:
     
     def _get_or_create_settings(self):
         """Get or create rotation settings for user"""
-        settings, created = RotationSettings.objects.get_or_create(
-            user=self.user,
-            defaults={
-                'proxy_rotation_enabled': True,
-                'proxy_rotation_strategy': 'round_robin',
-                'proxy_health_check_interval': 300,
-                'proxy_max_failures': 3
-            }
-        )
-        return settings
+        return get_rotation_settings(self.user, defaults={
+            'proxy_rotation_enabled': True,
+            'proxy_rotation_strategy': 'round_robin',
+            'proxy_health_check_interval': 300,
+            'proxy_max_failures': 3
+        })
     
     def get_next_proxy(self) -> Optional[ProxyServer]:
         """Get next proxy based on rotation strategy"""
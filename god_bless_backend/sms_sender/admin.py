@@ -1,7 +1,8 @@
 from django.contrib import admin
 from sms_sender.models import (
     SMSCampaign, SMSMessage, SentSMS, CampaignDeliverySettings, 
-    ServerUsageLog, CarrierPerformanceLog, RetryAttempt, CampaignTemplate
+    ServerUsageLog, CarrierPerformanceLog, RetryAttempt, CampaignTemplate,
+    DeliveryRollup
 )
 
 
@@ -159,6 +160,15 @@ class RetryAttemptAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(DeliveryRollup)
+class DeliveryRollupAdmin(admin.ModelAdmin):
+    list_display = ('campaign', 'carrier', 'server_id', 'hour', 'total_messages', 'sent_count', 'failed_count', 'delivered_count')
+    list_filter = ('carrier', 'hour')
+    search_fields = ('campaign__name', 'carrier')
+    readonly_fields = ('updated_at',)
+    date_hierarchy = 'hour'
+
+
 @admin.register(CampaignTemplate)
 class CampaignTemplateAdmin(admin.ModelAdmin):
     list_display = ('name', 'user', 'category', 'usage_count', 'average_success_rate', 'is_public', 'is_system_template')
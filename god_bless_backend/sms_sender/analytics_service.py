@@ -19,6 +19,7 @@ from .models import (
     SMSCampaign, SMSMessage, ServerUsageLog, CarrierPerformanceLog, 
     RetryAttempt, CampaignDeliverySettings
 )
+from . import delivery_rollup
 from proxy_server.models import ProxyServer
 from smtps.models import SmtpManager
 
@@ -249,8 +250,11 @@ class PredictiveAnalyticsService:
                     created_at__gte=timezone.now() - timedelta(days=7)
                 )
             
+            # Message totals come from the hourly rollup in one grouped query
+            rollup_totals = delivery_rollup.campaign_totals(campaign.id for campaign in campaigns)
+            
             for campaign in campaigns:
-                campaign_anomalies = self._detect_campaign_anomalies(campaign)
+                campaign_anomalies = self._detect_campaign_anomalies(campaign, rollup_totals.get(campaign.id))
                 anomalies.extend(campaign_anomalies)
             
             return anomalies
@@ -484,16 +488,21 @@ class PredictiveAnalyticsService:
         
         return suggestions
     
-    def _detect_campaign_anomalies(self, campaign: SMSCampaign) -> List[Dict[str, Any]]:
+    def _detect_campaign_anomalies(self, campaign: SMSCampaign,
+                                   totals: Optional[Dict[str, int]] = None) -> List[Dict[str, Any]]:
         """Detect anomalies in a specific campaign"""
         anomalies = []
         
         # Check for unusual failure patterns
-        messages = SMSMessage.objects.filter(campaign=campaign)
-        total_messages = messages.count()
+        if totals:
+            total_messages = totals['total']
+            failed_messages = totals['failed']
+        else:
+            messages = SMSMessage.objects.filter(campaign=campaign)
+            total_messages = messages.count()
+            failed_messages = messages.filter(delivery_status='failed').count() if total_messages else 0
         
         if total_messages > 0:
-            failed_messages = messages.filter(delivery_status='failed').count()
             failure_rate = failed_messages / total_messages
             
             # Compare with user's historical average
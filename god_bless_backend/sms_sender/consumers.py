@@ -11,7 +11,7 @@ from celery.result import AsyncResult
 from asgiref.sync import sync_to_async
 from django.contrib.auth import get_user_model
 from .models import SMSCampaign
-from .monitoring_service import CampaignMonitoringService, GlobalMonitoringService
+from .live_stats import CampaignStatsBroadcaster, SystemStatsBroadcaster
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -149,10 +149,10 @@ class CampaignMonitoringConsumer(AsyncWebsocketConsumer):
             return False
 
     async def send_initial_stats(self):
-        """Send initial campaign statistics"""
+        """Send initial campaign statistics from the shared cached snapshot"""
         try:
-            monitoring_service = await sync_to_async(CampaignMonitoringService)(self.campaign_id)
-            stats = await sync_to_async(monitoring_service.get_campaign_stats)()
+            broadcaster = CampaignStatsBroadcaster(int(self.campaign_id))
+            stats = await sync_to_async(broadcaster.get_snapshot)()
             
             await self.send(text_data=json.dumps({
                 'type': 'initial_stats',
@@ -162,10 +162,10 @@ class CampaignMonitoringConsumer(AsyncWebsocketConsumer):
             logger.error(f"Error sending initial stats: {e}")
 
     async def send_campaign_stats(self):
-        """Send current campaign statistics"""
+        """Send current campaign statistics from the shared cached snapshot"""
         try:
-            monitoring_service = await sync_to_async(CampaignMonitoringService)(self.campaign_id)
-            stats = await sync_to_async(monitoring_service.get_campaign_stats)()
+            broadcaster = CampaignStatsBroadcaster(int(self.campaign_id))
+            stats = await sync_to_async(broadcaster.get_snapshot)()
             
             await self.send(text_data=json.dumps({
                 'type': 'stats_update',
@@ -237,10 +237,10 @@ class SystemMonitoringConsumer(AsyncWebsocketConsumer):
         await self.send(text_data=json.dumps(message))
 
     async def send_initial_system_stats(self):
-        """Send initial system health statistics"""
+        """Send initial system health statistics from the shared cached snapshot"""
         try:
-            monitoring_service = await sync_to_async(GlobalMonitoringService)(self.user.id)
-            stats = await sync_to_async(monitoring_service.get_system_health_stats)()
+            broadcaster = SystemStatsBroadcaster(self.user.id)
+            stats = await sync_to_async(broadcaster.get_snapshot)()
             
             await self.send(text_data=json.dumps({
                 'type': 'initial_system_health',
@@ -250,10 +250,10 @@ class SystemMonitoringConsumer(AsyncWebsocketConsumer):
             logger.error(f"Error sending initial system stats: {e}")
 
     async def send_system_health(self):
-        """Send current system health statistics"""
+        """Send current system health statistics from the shared cached snapshot"""
         try:
-            monitoring_service = await sync_to_async(GlobalMonitoringService)(self.user.id)
-            stats = await sync_to_async(monitoring_service.get_system_health_stats)()
+            broadcaster = SystemStatsBroadcaster(self.user.id)
+            stats = await sync_to_async(broadcaster.get_snapshot)()
             
             await self.send(text_data=json.dumps({
                 'type': 'system_health_update',
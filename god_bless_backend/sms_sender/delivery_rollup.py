@@ -0,0 +1,265 @@
+"""
+Hourly delivery rollups for campaign and carrier analytics
+Maintained incrementally by the send pipeline and rebuilt by the
+backfill_delivery_rollup command, so reports read a few rollup rows
+instead of aggregating raw SMSMessage rows
+"""
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Sum
+from django.db.models.functions import Coalesce
+
+from .models import DeliveryRollup, SMSMessage
+
+logger = logging.getLogger(__name__)
+
+SENT_STATUSES = ('sent', 'delivered')
+FAILED_STATUSES = ('failed', 'bounced')
+OUTCOME_STATUSES = SENT_STATUSES + FAILED_STATUSES
+
+COUNTER_FIELDS = (
+    'total_messages', 'sent_count', 'failed_count', 'delivered_count',
+    'processing_time_sum', 'processing_time_count', 'smtp_time_sum', 'smtp_time_count',
+)
+
+
+def truncate_hour(value: datetime) -> datetime:
+    """Truncate a datetime to the start of its hour"""
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def categorize_error(error_message: str) -> str:
+    """Categorize an error message using ErrorAnalysisService patterns"""
+    from .error_analysis import ErrorAnalysisService
+    return ErrorAnalysisService()._categorize_error(error_message.lower())
+
+
+def _empty_delta() -> Dict[str, Any]:
+    delta = {field: 0 for field in COUNTER_FIELDS}
+    delta['error_categories'] = defaultdict(int)
+    return delta
+
+
+def _add_outcome(delta, status, processing_time=None, smtp_time=None, error_message='', count=1):
+    delta['total_messages'] += count
+    if status in SENT_STATUSES:
+        delta['sent_count'] += count
+    if status == 'delivered':
+        delta['delivered_count'] += count
+    if status in FAILED_STATUSES:
+        delta['failed_count'] += count
+        if error_message:
+            delta['error_categories'][categorize_error(error_message)] += count
+    if processing_time is not None:
+        delta['processing_time_sum'] += processing_time * count
+        delta['processing_time_count'] += count
+    if smtp_time is not None:
+        delta['smtp_time_sum'] += smtp_time * count
+        delta['smtp_time_count'] += count
+
+
+class DeliveryRollupBuffer:
+    """
+    Accumulates message outcomes in memory and applies them to the rollup
+    table in one locked upsert per (carrier, server, hour) key on flush().
+    """
+
+    def __init__(self, campaign):
+        self.campaign_id = campaign.id
+        self.user_id = campaign.user_id
+        self._deltas = defaultdict(_empty_delta)
+
+    def record(self, message: SMSMessage, when: Optional[datetime] = None, count: int = 1) -> None:
+        """Record the current outcome of a processed message; count=-1 retracts it"""
+        if message.delivery_status not in OUTCOME_STATUSES:
+            return
+        when = when or message.sent_at or message.last_attempt_at or message.created_at
+        key = (message.carrier or '', message.smtp_server_id or 0, truncate_hour(when))
+        _add_outcome(
+            self._deltas[key],
+            message.delivery_status,
+            processing_time=message.total_processing_time,
+            smtp_time=message.smtp_response_time,
+            error_message=message.error_message,
+            count=count,
+        )
+
+    def flush(self) -> int:
+        """Apply buffered increments; returns the number of rollup rows touched"""
+        deltas, self._deltas = self._deltas, defaultdict(_empty_delta)
+        for (carrier, server_id, hour), delta in deltas.items():
+            try:
+                apply_delta(self.user_id, self.campaign_id, carrier, server_id, hour, delta)
+            except Exception as e:
+                logger.error(f"Failed to update delivery rollup for campaign {self.campaign_id}: {e}")
+        return len(deltas)
+
+
+@contextmanager
+def outcome_change(message: SMSMessage):
+    """
+    Keep the rollup in step when a message is sent again, as on a retry:
+    the outcome recorded for it is retracted on entry and its new outcome
+    recorded on exit. Campaigns without rollup data are left alone, since
+    their reports read the raw messages.
+    """
+    campaign = message.campaign
+    if not has_rollup(campaign.id):
+        yield
+        return
+    buffer = DeliveryRollupBuffer(campaign)
+    buffer.record(message, count=-1)
+    yield
+    buffer.record(message)
+    buffer.flush()
+
+
+def apply_delta(user_id, campaign_id, carrier, server_id, hour, delta) -> None:
+    """Add a counter delta to a single rollup row, creating it if needed"""
+    with transaction.atomic():
+        row, _ = DeliveryRollup.objects.select_for_update().get_or_create(
+            campaign_id=campaign_id,
+            carrier=carrier,
+            server_id=server_id,
+            hour=hour,
+            defaults={'user_id': user_id},
+        )
+        for field in COUNTER_FIELDS:
+            setattr(row, field, getattr(row, field) + delta[field])
+        categories = dict(row.error_categories or {})
+        for category, count in delta['error_categories'].items():
+            categories[category] = categories.get(category, 0) + count
+        row.error_categories = categories
+        row.save()
+
+
+def backfill_campaign(campaign) -> int:
+    """
+    Rebuild the rollup rows for a campaign from its raw messages.
+    Returns the number of rollup rows written.
+    """
+    rows = (
+        SMSMessage.objects
+        .filter(campaign=campaign, delivery_status__in=OUTCOME_STATUSES)
+        .annotate(outcome_at=Coalesce('sent_at', 'last_attempt_at', 'created_at'))
+        .values_list(
+            'carrier', 'smtp_server_id', 'outcome_at', 'delivery_status',
+            'total_processing_time', 'smtp_response_time', 'error_message',
+        )
+        .iterator(chunk_size=5000)
+    )
+
+    deltas = defaultdict(_empty_delta)
+    for carrier, server_id, outcome_at, status, processing_time, smtp_time, error_message in rows:
+        key = (carrier or '', server_id or 0, truncate_hour(outcome_at))
+        _add_outcome(deltas[key], status, processing_time, smtp_time, error_message or '')
+
+    rollups = []
+    for (carrier, server_id, hour), delta in deltas.items():
+        rollups.append(DeliveryRollup(
+            user_id=campaign.user_id,
+            campaign_id=campaign.id,
+            carrier=carrier,
+            server_id=server_id,
+            hour=hour,
+            error_categories=dict(delta['error_categories']),
+            **{field: delta[field] for field in COUNTER_FIELDS},
+        ))
+
+    with transaction.atomic():
+        DeliveryRollup.objects.filter(campaign=campaign).delete()
+        DeliveryRollup.objects.bulk_create(rollups, batch_size=1000)
+    return len(rollups)
+
+
+def has_rollup(campaign_id: int) -> bool:
+    """Whether rollup data exists for a campaign"""
+    return DeliveryRollup.objects.filter(campaign_id=campaign_id).exists()
+
+
+def _success_rate(successful: int, total: int) -> float:
+    return (successful / total * 100) if total > 0 else 0
+
+
+def hourly_breakdown(rollups) -> List[Dict[str, Any]]:
+    """Per-hour totals from a rollup queryset, oldest first"""
+    stats = rollups.values('hour').annotate(
+        total=Sum('total_messages'),
+        successful=Sum('delivered_count'),
+        failed=Sum('failed_count'),
+    ).order_by('hour')
+
+    return [{
+        'hour': stat['hour'].isoformat(),
+        'total_messages': stat['total'],
+        'successful_messages': stat['successful'],
+        'failed_messages': stat['failed'],
+        'success_rate': _success_rate(stat['successful'], stat['total']),
+    } for stat in stats]
+
+
+def carrier_breakdown(rollups) -> List[Dict[str, Any]]:
+    """Per-carrier totals from a rollup queryset, busiest carrier first"""
+    stats = rollups.exclude(carrier='').values('carrier').annotate(
+        total=Sum('total_messages'),
+        successful=Sum('delivered_count'),
+        failed=Sum('failed_count'),
+        time_sum=Sum('processing_time_sum'),
+        time_count=Sum('processing_time_count'),
+    ).order_by('-total')
+
+    return [{
+        'carrier': stat['carrier'],
+        'total_messages': stat['total'],
+        'successful_messages': stat['successful'],
+        'failed_messages': stat['failed'],
+        'avg_processing_time': (stat['time_sum'] / stat['time_count']) if stat['time_count'] else None,
+        'success_rate': _success_rate(stat['successful'], stat['total']),
+    } for stat in stats]
+
+
+def error_breakdown(rollups) -> Dict[str, Any]:
+    """Error category totals overall, per SMTP server, per carrier and per hour"""
+    error_categories = defaultdict(int)
+    server_errors = {}
+    carrier_errors = {}
+    hourly_errors = {}
+
+    rows = rollups.filter(failed_count__gt=0).values_list(
+        'carrier', 'server_id', 'hour', 'error_categories'
+    )
+    for carrier, server_id, hour, categories in rows:
+        if not categories:
+            continue
+        buckets = [hourly_errors.setdefault(hour.isoformat(), {'total': 0, 'categories': {}})]
+        if server_id:
+            buckets.append(server_errors.setdefault(f"smtp_{server_id}", {'total': 0, 'categories': {}}))
+        if carrier:
+            buckets.append(carrier_errors.setdefault(carrier, {'total': 0, 'categories': {}}))
+
+        for category, count in categories.items():
+            error_categories[category] += count
+            for bucket in buckets:
+                bucket['total'] += count
+                bucket['categories'][category] = bucket['categories'].get(category, 0) + count
+
+    return {
+        'error_categories': dict(error_categories),
+        'server_specific_errors': server_errors,
+        'carrier_specific_errors': carrier_errors,
+        'hourly_errors': dict(sorted(hourly_errors.items())),
+    }
+
+
+def campaign_totals(campaign_ids: Iterable[int]) -> Dict[int, Dict[str, int]]:
+    """Total and failed message counts per campaign, for campaigns with rollups"""
+    totals = DeliveryRollup.objects.filter(campaign_id__in=list(campaign_ids)).values('campaign_id').annotate(
+        total=Sum('total_messages'),
+        failed=Sum('failed_count'),
+    )
+    return {row['campaign_id']: {'total': row['total'], 'failed': row['failed']} for row in totals}
@@ -10,6 +10,7 @@ import smtplib
 import ssl
 import requests
 from datetime import datetime
+from django.conf import settings
 from django.utils import timezone
 from django.db import transaction
 from celery import shared_task
@@ -21,8 +22,12 @@ from .rate_limiter import rate_limiter
 from .email_utils import format_provider_email_address
 from .monitoring_service import CampaignMonitoringService
 from .error_analysis import ErrorAnalysisService
+from .live_stats import CampaignStatsBroadcaster
+from .delivery_rollup import DeliveryRollupBuffer
 from proxy_server.models import ProxyServer
 from smtps.models import SmtpManager
+from tasks.progress import ProgressReporter, Throttle
+from god_bless_pro import metrics
 
 
 logger = logging.getLogger(__name__)
@@ -118,14 +123,54 @@ def process_enhanced_sms_campaign_task(self, campaign_id: int):
         'messages_failed': 0
     })
     
+    def publish_progress(instance, meta):
+        """Publish the latest coalesced progress to WebSocket and Celery"""
+        progress = meta.get('progress', instance.progress)
+        sent = meta.get('sent', sent_count)
+        failed = meta.get('failed', failed_count)
+        monitoring_service.send_progress_update({
+            'type': 'message_processed',
+            'progress': progress,
+            'messages_sent': sent,
+            'messages_failed': failed,
+            'total_messages': total_messages,
+            'current_message': meta.get('current_message'),
+            'processing_time': meta.get('processing_time'),
+            'success': meta.get('success')
+        })
+        self.update_state(
+            state='PROGRESS',
+            meta={
+                'progress': progress,
+                'sent': sent,
+                'failed': failed,
+                'total': total_messages,
+                'current_message': meta.get('current_message'),
+                'proxy_used': meta.get('proxy_used'),
+                'smtp_used': meta.get('smtp_used')
+            }
+        )
+    
+    # Progress writes and notifications run on a fixed cadence instead of per message
+    progress_reporter = ProgressReporter(campaign, publish=publish_progress)
+    stats_broadcaster = CampaignStatsBroadcaster(campaign_id)
+    stats_throttle = Throttle(stats_broadcaster.interval)
+    rollup_buffer = DeliveryRollupBuffer(campaign)
+    queue_depth = metrics.CAMPAIGN_QUEUE_DEPTH.labels(campaign=str(campaign_id))
+    queue_depth.set(total_messages)
+    
     for i in range(0, total_messages, batch_size):
         batch = messages[i:i + batch_size]
         
         for message in batch:
-            # Check if campaign was paused or cancelled
-            campaign.refresh_from_db()
+            # Check if campaign was paused or cancelled (status only, so the
+            # in-memory counters that have not been flushed yet are kept)
+            campaign.refresh_from_db(fields=['status'])
             if campaign.status in ['paused', 'cancelled']:
                 logger.info(f"Campaign {campaign_id} {campaign.status}, stopping processing")
+                progress_reporter.flush()
+                rollup_buffer.flush()
+                queue_depth.remove()
                 return {'status': campaign.status, 'sent': sent_count, 'failed': failed_count}
             
             # Apply rate limiting
@@ -142,10 +187,12 @@ def process_enhanced_sms_campaign_task(self, campaign_id: int):
             if not smtp:
                 logger.error(f"No SMTP server available for message {message.id}")
                 failed_count += 1
-                campaign.messages_failed += 1
+                progress_reporter.update(messages_failed=campaign.messages_failed + 1)
                 message.delivery_status = 'failed'
                 message.error_message = 'No SMTP server available'
+                message.last_attempt_at = timezone.now()
                 message.save()
+                rollup_buffer.record(message)
                 
                 # Send server unavailable notification
                 monitoring_service.send_server_status_update(
@@ -162,52 +209,46 @@ def process_enhanced_sms_campaign_task(self, campaign_id: int):
             success, processing_time = send_enhanced_sms_message(
                 message, smtp, proxy, campaign, rotation_manager, delay_applied, monitoring_service
             )
+            rollup_buffer.record(message)
             
             if success:
                 sent_count += 1
-                campaign.messages_sent += 1
+                counter_field = {'messages_sent': campaign.messages_sent + 1}
             else:
                 failed_count += 1
-                campaign.messages_failed += 1
+                counter_field = {'messages_failed': campaign.messages_failed + 1}
             
             # Record rate limit
             if message.carrier:
                 rate_limiter.record_send(message.carrier, str(campaign_id))
             
-            # Update progress
+            # Update progress (coalesced write + rate-limited publish)
             progress = ((sent_count + failed_count) / total_messages) * 100
-            campaign.progress = int(progress)
-            campaign.save()
-            
-            # Send real-time progress update
-            monitoring_service.send_progress_update({
-                'type': 'message_processed',
-                'progress': progress,
-                'messages_sent': sent_count,
-                'messages_failed': failed_count,
-                'total_messages': total_messages,
-                'current_message': message.phone_number,
-                'processing_time': processing_time,
-                'success': success
-            })
-            
-            # Update task state
-            self.update_state(
-                state='PROGRESS',
+            progress_reporter.update(
+                progress=int(progress),
                 meta={
                     'progress': progress,
                     'sent': sent_count,
                     'failed': failed_count,
-                    'total': total_messages,
                     'current_message': message.phone_number,
+                    'processing_time': processing_time,
+                    'success': success,
                     'proxy_used': proxy.host if proxy else None,
                     'smtp_used': f"{smtp.host}:{smtp.port}" if smtp else None
-                }
+                },
+                **counter_field
             )
+            queue_depth.set(total_messages - sent_count - failed_count)
             
-            # Send periodic statistics update (every 10 messages)
-            if (sent_count + failed_count) % 10 == 0:
-                monitoring_service.send_campaign_stats_update()
+            # Refresh the shared stats snapshot (at most once per interval across
+            # all producers; consumers read the cached copy)
+            if stats_throttle():
+                rollup_buffer.flush()
+                stats_broadcaster.refresh()
+    
+    progress_reporter.flush()
+    rollup_buffer.flush()
+    queue_depth.remove()
     
     # Mark campaign as completed
     campaign.status = 'completed'
@@ -233,7 +274,7 @@ def process_enhanced_sms_campaign_task(self, campaign_id: int):
     })
     
     # Send final statistics update
-    monitoring_service.send_campaign_stats_update()
+    stats_broadcaster.refresh(force=True)
     
     return {
         'status': 'completed',
@@ -284,6 +325,9 @@ def send_enhanced_sms_message(
     
     message.save()
     
+    server = message.smtp_server_legacy
+    carrier = message.carrier or campaign.target_carrier or 'unknown'
+    
     logger.debug(f"Sending message {message.id} to {message.phone_number} via SMTP {smtp} and proxy {proxy}")
     
     try:
@@ -315,7 +359,7 @@ def send_enhanced_sms_message(
                 
                 # Quick proxy test
                 test_response = requests.get(
-                    'https://httpbin.org/ip', 
+                    getattr(settings, 'PROXY_CHECK_URL', 'https://httpbin.org/ip'), 
                     proxies=proxies, 
                     timeout=5
                 )
@@ -343,9 +387,12 @@ def send_enhanced_sms_message(
                 # Continue without proxy
         
         # Send via SMTP
+        handshake_start_time = time.time()
         with smtplib.SMTP_SSL(smtp.host, int(smtp.port), context=ssl.create_default_context()) as email_conn:
             email_conn.login(smtp.username, smtp.password)
-            email_conn.sendmail(smtp.username, receiver_email, email_message.as_string())
+            metrics.SMTP_HANDSHAKE_SECONDS.labels(server=server).observe(time.time() - handshake_start_time)
+            with metrics.SMTP_SEND_SECONDS.labels(server=server).time():
+                email_conn.sendmail(smtp.username, receiver_email, email_message.as_string())
         
         smtp_response_time = time.time() - smtp_start_time
         message.smtp_response_time = smtp_response_time
@@ -358,6 +405,7 @@ def send_enhanced_sms_message(
         message.delivery_status = 'sent'
         message.sent_at = timezone.now()
         message.save()
+        metrics.SMS_MESSAGES_SENT.labels(carrier=carrier, server=server).inc()
         
         # Record success for servers
         rotation_manager.record_success('smtp', smtp.id, smtp_response_time, message.carrier)
@@ -383,6 +431,7 @@ def send_enhanced_sms_message(
         message.error_message = error_msg
         message.total_processing_time = time.time() - start_time
         message.save()
+        metrics.SMS_MESSAGES_FAILED.labels(carrier=carrier, server=server).inc()
         
         rotation_manager.record_failure('smtp', smtp.id, error_msg, 'authentication', message.carrier)
         
@@ -408,6 +457,7 @@ def send_enhanced_sms_message(
         message.error_message = error_msg
         message.total_processing_time = time.time() - start_time
         message.save()
+        metrics.SMS_MESSAGES_FAILED.labels(carrier=carrier, server=server).inc()
         
         rotation_manager.record_failure('smtp', smtp.id, error_msg, 'connection', message.carrier)
         
@@ -433,6 +483,7 @@ def send_enhanced_sms_message(
         message.error_message = error_msg
         message.total_processing_time = time.time() - start_time
         message.save()
+        metrics.SMS_MESSAGES_FAILED.labels(carrier=carrier, server=server).inc()
         
         rotation_manager.record_failure('smtp', smtp.id, error_msg, 'recipients_refused', message.carrier)
         
@@ -459,6 +510,7 @@ def send_enhanced_sms_message(
         message.error_message = error_msg
         message.total_processing_time = time.time() - start_time
         message.save()
+        metrics.SMS_MESSAGES_FAILED.labels(carrier=carrier, server=server).inc()
         
         rotation_manager.record_failure('smtp', smtp.id, error_msg, 'unknown', message.carrier)
         
@@ -7,7 +7,8 @@ from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.db.models import Count, Q
-from .models import SMSMessage, RetryAttempt, ServerUsageLog
+from .models import SMSMessage, RetryAttempt, ServerUsageLog, DeliveryRollup
+from . import delivery_rollup
 
 logger = logging.getLogger(__name__)
 
@@ -91,14 +92,31 @@ class ErrorAnalysisService:
         if not target_campaign_id:
             return {'error': 'No campaign ID provided'}
         
-        # Get all failed messages for the campaign
-        failed_messages = SMSMessage.objects.filter(
-            campaign_id=target_campaign_id,
-            delivery_status='failed'
-        ).exclude(error_message='')
-        
-        # Analyze error patterns
-        error_analysis = self._analyze_error_patterns(failed_messages)
+        if delivery_rollup.has_rollup(target_campaign_id):
+            # Categorized error counts are pre-aggregated per carrier/server/hour
+            breakdown = delivery_rollup.error_breakdown(
+                DeliveryRollup.objects.filter(campaign_id=target_campaign_id)
+            )
+            hourly_errors = breakdown.pop('hourly_errors')
+            error_analysis = breakdown
+            time_analysis = {
+                'hourly_breakdown': hourly_errors,
+                'peak_error_hour': max(hourly_errors.items(), key=lambda x: x[1]['total'])[0] if hourly_errors else None
+            } if hourly_errors else {}
+            total_failed = sum(error_analysis['error_categories'].values())
+        else:
+            # Get all failed messages for the campaign
+            failed_messages = SMSMessage.objects.filter(
+                campaign_id=target_campaign_id,
+                delivery_status='failed'
+            ).exclude(error_message='')
+            
+            # Analyze error patterns
+            error_analysis = self._analyze_error_patterns(failed_messages)
+            
+            # Time-based analysis
+            time_analysis = self._analyze_error_timeline(failed_messages)
+            total_failed = failed_messages.count()
         
         # Get retry analysis
         retry_analysis = self._analyze_retry_patterns(target_campaign_id)
@@ -106,9 +124,6 @@ class ErrorAnalysisService:
         # Server failure analysis
         server_analysis = self._analyze_server_failures(target_campaign_id)
         
-        # Time-based analysis
-        time_analysis = self._analyze_error_timeline(failed_messages)
-        
         # Generate overall recommendations
         overall_recommendations = self._generate_campaign_recommendations(
             error_analysis, retry_analysis, server_analysis
@@ -116,7 +131,7 @@ class ErrorAnalysisService:
         
         return {
             'campaign_id': target_campaign_id,
-            'total_failed_messages': failed_messages.count(),
+            'total_failed_messages': total_failed,
             'error_patterns': error_analysis,
             'retry_analysis': retry_analysis,
             'server_analysis': server_analysis,
@@ -130,38 +145,48 @@ class ErrorAnalysisService:
         end_date = timezone.now()
         start_date = end_date - timedelta(days=days)
         
-        # Get failed messages in the time period
+        rollups = DeliveryRollup.objects.filter(hour__gte=delivery_rollup.truncate_hour(start_date))
         failed_messages = SMSMessage.objects.filter(
             created_at__gte=start_date,
             delivery_status='failed'
         ).exclude(error_message='')
         
         if self.campaign_id:
+            rollups = rollups.filter(campaign_id=self.campaign_id)
             failed_messages = failed_messages.filter(campaign_id=self.campaign_id)
         
+        # Campaigns with rollup data are read from it, the rest from their raw messages
+        failed_messages = failed_messages.exclude(
+            campaign_id__in=DeliveryRollup.objects.values('campaign_id')
+        )
+        
         # Group by day and error category
         daily_errors = {}
         category_trends = {}
         
-        for message in failed_messages:
-            day = message.created_at.date().isoformat()
-            category = self._categorize_error(message.error_message.lower())
-            
+        def add_errors(day, category, count):
             if day not in daily_errors:
                 daily_errors[day] = {'total': 0, 'categories': {}}
             
-            daily_errors[day]['total'] += 1
-            daily_errors[day]['categories'][category] = daily_errors[day]['categories'].get(category, 0) + 1
+            daily_errors[day]['total'] += count
+            daily_errors[day]['categories'][category] = daily_errors[day]['categories'].get(category, 0) + count
             
-            category_trends[category] = category_trends.get(category, 0) + 1
+            category_trends[category] = category_trends.get(category, 0) + count
+        
+        for hour_key, hour_errors in delivery_rollup.error_breakdown(rollups)['hourly_errors'].items():
+            for category, count in hour_errors['categories'].items():
+                add_errors(hour_key[:10], category, count)
+        
+        for created_at, error_message in failed_messages.values_list('created_at', 'error_message').iterator():
+            add_errors(created_at.date().isoformat(), self._categorize_error(error_message.lower()), 1)
         
         return {
             'period_days': days,
             'start_date': start_date.isoformat(),
             'end_date': end_date.isoformat(),
-            'daily_breakdown': daily_errors,
+            'daily_breakdown': dict(sorted(daily_errors.items())),
             'category_trends': category_trends,
-            'total_errors': failed_messages.count()
+            'total_errors': sum(category_trends.values())
         }
     
     def _categorize_error(self, error_message: str) -> str:
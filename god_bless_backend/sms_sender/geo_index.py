@@ -0,0 +1,410 @@
+"""
+Shared area code index for carrier, timezone and state lookups
+Built once at import time so per-message lookups are a single dict access;
+local times use zoneinfo so offsets follow daylight saving time
+"""
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, NamedTuple, Optional
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# US carrier patterns for phone number detection
+CARRIER_PATTERNS = {
+    'verizon': [
+        # Verizon Wireless area codes (major ones)
+        '201', '202', '203', '205', '206', '207', '208', '209', '210',
+        '212', '213', '214', '215', '216', '217', '218', '219', '224',
+        '225', '228', '229', '231', '234', '239', '240', '248', '251',
+        '252', '253', '254', '256', '260', '262', '267', '269', '270',
+        '276', '281', '301', '302', '303', '304', '305', '307', '308',
+        '309', '310', '312', '313', '314', '315', '316', '317', '318',
+        '319', '320', '321', '323', '325', '330', '331', '334', '336',
+        '337', '339', '347', '351', '352', '360', '361', '386', '401',
+        '402', '404', '405', '406', '407', '408', '409', '410', '412',
+        '413', '414', '415', '417', '419', '423', '424', '425', '430',
+        '432', '434', '435', '440', '443', '445', '464', '469', '470',
+        '475', '478', '479', '480', '484', '501', '502', '503', '504',
+        '505', '507', '508', '509', '510', '512', '513', '515', '516',
+        '517', '518', '520', '530', '540', '541', '551', '559', '561',
+        '562', '563', '564', '567', '570', '571', '573', '574', '575',
+        '580', '585', '586', '601', '602', '603', '605', '606', '607',
+        '608', '609', '610', '612', '614', '615', '616', '617', '618',
+        '619', '620', '623', '626', '628', '629', '630', '631', '636',
+        '641', '646', '650', '651', '657', '660', '661', '662', '667',
+        '678', '681', '682', '701', '702', '703', '704', '706', '707',
+        '708', '712', '713', '714', '715', '716', '717', '718', '719',
+        '720', '724', '725', '727', '731', '732', '734', '737', '740',
+        '747', '754', '757', '760', '762', '763', '765', '770', '772',
+        '773', '774', '775', '781', '785', '786', '787', '801', '802',
+        '803', '804', '805', '806', '808', '810', '812', '813', '814',
+        '815', '816', '817', '818', '828', '830', '831', '832', '843',
+        '845', '847', '848', '850', '856', '857', '858', '859', '860',
+        '862', '863', '864', '865', '870', '872', '878', '901', '903',
+        '904', '906', '907', '908', '909', '910', '912', '913', '914',
+        '915', '916', '917', '918', '919', '920', '925', '928', '929',
+        '931', '934', '936', '937', '940', '941', '947', '949', '951',
+        '952', '954', '956', '959', '970', '971', '972', '973', '978',
+        '979', '980', '984', '985', '989'
+    ],
+    'att': [
+        # AT&T area codes (major ones)
+        '205', '251', '256', '334', '938', '907', '480', '520', '602',
+        '623', '928', '479', '501', '870', '209', '213', '310', '323',
+        '408', '415', '424', '442', '510', '530', '559', '562', '619',
+        '626', '628', '650', '657', '661', '669', '707', '714', '747',
+        '760', '805', '818', '831', '858', '909', '916', '925', '949',
+        '951', '303', '719', '720', '970', '203', '475', '860', '959',
+        '202', '302', '239', '305', '321', '352', '386', '407', '561',
+        '689', '727', '754', '772', '786', '813', '850', '863', '904',
+        '941', '954', '229', '404', '470', '478', '678', '706', '762',
+        '770', '912', '808', '208', '986', '217', '224', '309', '312',
+        '331', '618', '630', '708', '773', '815', '847', '872', '219',
+        '260', '317', '463', '574', '765', '812', '319', '515', '563',
+        '641', '712', '316', '620', '785', '913', '270', '364', '502',
+        '606', '859', '225', '318', '337', '504', '985', '207', '227',
+        '240', '301', '410', '443', '667', '339', '351', '413', '508',
+        '617', '774', '781', '857', '978', '231', '248', '269', '313',
+        '517', '586', '616', '679', '734', '810', '906', '947', '989',
+        '218', '320', '507', '612', '651', '763', '952', '228', '601',
+        '662', '769', '314', '417', '573', '636', '660', '816', '975',
+        '406', '308', '402', '531', '702', '725', '775', '603', '201',
+        '551', '609', '732', '848', '856', '862', '908', '973', '505',
+        '575', '212', '315', '347', '516', '518', '585', '607', '631',
+        '646', '680', '716', '718', '845', '914', '917', '929', '934',
+        '252', '336', '704', '828', '910', '919', '980', '984', '701',
+        '216', '220', '234', '330', '419', '440', '513', '567', '614',
+        '740', '937', '405', '539', '580', '918', '458', '503', '541',
+        '971', '215', '267', '272', '412', '484', '570', '610', '717',
+        '724', '814', '878', '401', '803', '843', '854', '864', '605',
+        '423', '615', '629', '731', '865', '901', '931', '214', '254',
+        '281', '409', '430', '432', '469', '512', '713', '737', '806',
+        '817', '832', '903', '915', '936', '940', '956', '972', '979',
+        '385', '435', '801', '802', '276', '434', '540', '571', '703',
+        '757', '804', '206', '253', '360', '425', '509', '564', '206',
+        '304', '681', '262', '414', '534', '608', '715', '920', '307'
+    ],
+    'tmobile': [
+        # T-Mobile area codes (major ones)
+        '205', '251', '256', '334', '659', '938', '907', '480', '520',
+        '602', '623', '928', '479', '501', '870', '209', '213', '279',
+        '310', '323', '408', '415', '424', '442', '510', '530', '559',
+        '562', '619', '626', '628', '650', '657', '661', '669', '707',
+        '714', '747', '760', '805', '818', '831', '858', '909', '916',
+        '925', '949', '951', '303', '719', '720', '970', '203', '475',
+        '860', '959', '202', '302', '239', '305', '321', '352', '386',
+        '407', '561', '689', '727', '754', '772', '786', '813', '850',
+        '863', '904', '941', '954', '229', '404', '470', '478', '678',
+        '706', '762', '770', '912', '808', '208', '986', '217', '224',
+        '309', '312', '331', '618', '630', '708', '773', '815', '847',
+        '872', '219', '260', '317', '463', '574', '765', '812', '319',
+        '515', '563', '641', '712', '316', '620', '785', '913', '270',
+        '364', '502', '606', '859', '225', '318', '337', '504', '985',
+        '207', '227', '240', '301', '410', '443', '667', '339', '351',
+        '413', '508', '617', '774', '781', '857', '978', '231', '248',
+        '269', '313', '517', '586', '616', '679', '734', '810', '906',
+        '947', '989', '218', '320', '507', '612', '651', '763', '952',
+        '228', '601', '662', '769', '314', '417', '573', '636', '660',
+        '816', '975', '406', '308', '402', '531', '702', '725', '775',
+        '603', '201', '551', '609', '732', '848', '856', '862', '908',
+        '973', '505', '575', '212', '315', '347', '516', '518', '585',
+        '607', '631', '646', '680', '716', '718', '845', '914', '917',
+        '929', '934', '252', '336', '704', '828', '910', '919', '980',
+        '984', '701', '216', '220', '234', '330', '419', '440', '513',
+        '567', '614', '740', '937', '405', '539', '580', '918', '458',
+        '503', '541', '971', '215', '267', '272', '412', '484', '570',
+        '610', '717', '724', '814', '878', '401', '803', '843', '854',
+        '864', '605', '423', '615', '629', '731', '865', '901', '931',
+        '214', '254', '281', '409', '430', '432', '469', '512', '713',
+        '737', '806', '817', '832', '903', '915', '936', '940', '956',
+        '972', '979', '385', '435', '801', '802', '276', '434', '540',
+        '571', '703', '757', '804', '206', '253', '360', '425', '509',
+        '564', '206', '304', '681', '262', '414', '534', '608', '715',
+        '920', '307'
+    ],
+    'sprint': [
+        # Sprint/T-Mobile (merged) area codes
+        '205', '251', '256', '334', '659', '938', '907', '480', '520',
+        '602', '623', '928', '479', '501', '870', '209', '213', '279',
+        '310', '323', '408', '415', '424', '442', '510', '530', '559',
+        '562', '619', '626', '628', '650', '657', '661', '669', '707',
+        '714', '747', '760', '805', '818', '831', '858', '909', '916',
+        '925', '949', '951'
+    ]
+}
+
+# Timezone mapping for US area codes (simplified)
+TIMEZONE_MAP = {
+    # Eastern Time
+    'eastern': [
+        '201', '202', '203', '207', '212', '215', '216', '217', '240',
+        '267', '301', '302', '304', '305', '315', '321', '339', '347',
+        '351', '352', '386', '401', '404', '407', '410', '412', '413',
+        '423', '443', '470', '478', '484', '508', '513', '516', '518',
+        '561', '567', '570', '571', '585', '607', '610', '614', '617',
+        '631', '646', '667', '678', '680', '689', '703', '706', '716',
+        '717', '718', '724', '727', '732', '734', '740', '754', '757',
+        '762', '770', '772', '774', '781', '786', '803', '804', '813',
+        '828', '843', '845', '848', '850', '854', '856', '857', '859',
+        '862', '863', '864', '878', '904', '908', '910', '912', '914',
+        '917', '919', '929', '934', '937', '941', '947', '954', '973',
+        '978', '980', '984'
+    ],
+    # Central Time
+    'central': [
+        '205', '214', '218', '224', '225', '228', '251', '254', '256',
+        '260', '262', '269', '270', '281', '309', '312', '314', '316',
+        '317', '318', '319', '320', '331', '334', '337', '361', '364',
+        '409', '414', '417', '430', '432', '434', '463', '469', '479',
+        '501', '502', '504', '507', '512', '515', '563', '573', '574',
+        '580', '601', '606', '608', '612', '615', '618', '620', '629',
+        '630', '636', '641', '651', '660', '662', '708', '712', '713',
+        '715', '731', '737', '763', '765', '769', '773', '785', '806',
+        '812', '815', '816', '817', '832', '847', '870', '872', '901',
+        '903', '913', '915', '918', '920', '931', '936', '940', '952',
+        '956', '972', '975', '979', '985', '989'
+    ],
+    # Mountain Time
+    'mountain': [
+        '208', '303', '307', '385', '406', '435', '480', '505', '520',
+        '575', '602', '623', '719', '720', '801', '928', '970', '986'
+    ],
+    # Pacific Time
+    'pacific': [
+        '206', '209', '213', '253', '279', '310', '323', '360', '408',
+        '415', '424', '442', '458', '503', '510', '530', '541', '559',
+        '562', '564', '619', '626', '628', '650', '657', '661', '669',
+        '702', '707', '714', '725', '747', '760', '775', '805', '818',
+        '831', '858', '909', '916', '925', '949', '951', '971'
+    ]
+}
+
+# US state to timezone mapping
+STATE_TIMEZONES = {
+    'AL': 'central', 'AK': 'alaska', 'AZ': 'mountain', 'AR': 'central',
+    'CA': 'pacific', 'CO': 'mountain', 'CT': 'eastern', 'DE': 'eastern',
+    'FL': 'eastern', 'GA': 'eastern', 'HI': 'hawaii', 'ID': 'mountain',
+    'IL': 'central', 'IN': 'eastern', 'IA': 'central', 'KS': 'central',
+    'KY': 'eastern', 'LA': 'central', 'ME': 'eastern', 'MD': 'eastern',
+    'MA': 'eastern', 'MI': 'eastern', 'MN': 'central', 'MS': 'central',
+    'MO': 'central', 'MT': 'mountain', 'NE': 'central', 'NV': 'pacific',
+    'NH': 'eastern', 'NJ': 'eastern', 'NM': 'mountain', 'NY': 'eastern',
+    'NC': 'eastern', 'ND': 'central', 'OH': 'eastern', 'OK': 'central',
+    'OR': 'pacific', 'PA': 'eastern', 'RI': 'eastern', 'SC': 'eastern',
+    'SD': 'central', 'TN': 'central', 'TX': 'central', 'UT': 'mountain',
+    'VT': 'eastern', 'VA': 'eastern', 'WA': 'pacific', 'WV': 'eastern',
+    'WI': 'central', 'WY': 'mountain'
+}
+
+# Area code to state mapping (simplified)
+AREA_CODE_STATES = {
+    '205': 'AL', '251': 'AL', '256': 'AL', '334': 'AL', '938': 'AL',
+    '907': 'AK',
+    '480': 'AZ', '520': 'AZ', '602': 'AZ', '623': 'AZ', '928': 'AZ',
+    '479': 'AR', '501': 'AR', '870': 'AR',
+    '209': 'CA', '213': 'CA', '279': 'CA', '310': 'CA', '323': 'CA',
+    '408': 'CA', '415': 'CA', '424': 'CA', '442': 'CA', '510': 'CA',
+    '530': 'CA', '559': 'CA', '562': 'CA', '619': 'CA', '626': 'CA',
+    '628': 'CA', '650': 'CA', '657': 'CA', '661': 'CA', '669': 'CA',
+    '707': 'CA', '714': 'CA', '747': 'CA', '760': 'CA', '805': 'CA',
+    '818': 'CA', '831': 'CA', '858': 'CA', '909': 'CA', '916': 'CA',
+    '925': 'CA', '949': 'CA', '951': 'CA',
+    '303': 'CO', '719': 'CO', '720': 'CO', '970': 'CO',
+    '203': 'CT', '475': 'CT', '860': 'CT', '959': 'CT',
+    '302': 'DE',
+    '202': 'DC',
+    '239': 'FL', '305': 'FL', '321': 'FL', '352': 'FL', '386': 'FL',
+    '407': 'FL', '561': 'FL', '689': 'FL', '727': 'FL', '754': 'FL',
+    '772': 'FL', '786': 'FL', '813': 'FL', '850': 'FL', '863': 'FL',
+    '904': 'FL', '941': 'FL', '954': 'FL',
+    # Add more mappings as needed...
+}
+
+# IANA zones for the timezone names used throughout the SMS sender
+ZONEINFO_NAMES = {
+    'eastern': 'America/New_York',
+    'central': 'America/Chicago',
+    'mountain': 'America/Denver',
+    'pacific': 'America/Los_Angeles',
+    'alaska': 'America/Anchorage',
+    'hawaii': 'Pacific/Honolulu',
+}
+
+# Full state names as stored on PhonePrefix
+STATE_ABBREVIATIONS = {
+    'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR',
+    'California': 'CA', 'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE',
+    'District of Columbia': 'DC', 'Florida': 'FL', 'Georgia': 'GA', 'Hawaii': 'HI',
+    'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
+    'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME',
+    'Maryland': 'MD', 'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN',
+    'Mississippi': 'MS', 'Missouri': 'MO', 'Montana': 'MT', 'Nebraska': 'NE',
+    'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ', 'New Mexico': 'NM',
+    'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH',
+    'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI',
+    'South Carolina': 'SC', 'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX',
+    'Utah': 'UT', 'Vermont': 'VT', 'Virginia': 'VA', 'Washington': 'WA',
+    'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY',
+}
+
+DEFAULT_TIMEZONE = 'eastern'
+UNKNOWN = 'unknown'
+
+
+class AreaCodeInfo(NamedTuple):
+    timezone: str
+    carrier: str
+    state: str
+
+
+DEFAULT_INFO = AreaCodeInfo(DEFAULT_TIMEZONE, UNKNOWN, UNKNOWN)
+
+# Deletes every ASCII character except digits
+_NON_DIGITS = {i: None for i in range(128) if not chr(i).isdigit()}
+
+_ZONES = {name: ZoneInfo(key) for name, key in ZONEINFO_NAMES.items()}
+
+
+def build_index(
+    carrier_patterns: Dict[str, list] = CARRIER_PATTERNS,
+    timezone_map: Dict[str, list] = TIMEZONE_MAP,
+    area_code_states: Dict[str, str] = AREA_CODE_STATES,
+) -> Dict[str, AreaCodeInfo]:
+    """
+    Merge the static tables into one area code -> AreaCodeInfo dict.
+
+    List order is preserved as precedence: the first carrier / timezone
+    listing an area code wins, matching the old linear scans. The state
+    table fills in timezones the timezone map does not cover.
+    """
+    carriers = {}
+    for carrier, area_codes in carrier_patterns.items():
+        for area_code in area_codes:
+            carriers.setdefault(area_code, carrier)
+
+    timezones = {}
+    for tz, area_codes in timezone_map.items():
+        for area_code in area_codes:
+            timezones.setdefault(area_code, tz)
+
+    index = {}
+    for area_code in set(carriers) | set(timezones) | set(area_code_states):
+        state = area_code_states.get(area_code, UNKNOWN)
+        index[area_code] = AreaCodeInfo(
+            timezone=timezones.get(area_code) or STATE_TIMEZONES.get(state, DEFAULT_TIMEZONE),
+            carrier=carriers.get(area_code, UNKNOWN),
+            state=state,
+        )
+    return index
+
+
+def normalize_carrier(name: str) -> str:
+    """Map a carrier name from PhonePrefix onto the keys used by CARRIER_PATTERNS"""
+    lowered = (name or '').lower()
+    if 'verizon' in lowered:
+        return 'verizon'
+    if 'at&t' in lowered or 'att' in lowered or 'cingular' in lowered:
+        return 'att'
+    if 't-mobile' in lowered or 'tmobile' in lowered or 'metropcs' in lowered:
+        return 'tmobile'
+    if 'sprint' in lowered:
+        return 'sprint'
+    return lowered or UNKNOWN
+
+
+def build_index_from_phone_prefixes(base: Optional[Dict[str, AreaCodeInfo]] = None) -> Dict[str, AreaCodeInfo]:
+    """
+    Derive the index from PhonePrefix rows, falling back to ``base``
+    (the static index by default) for area codes with no prefix data.
+
+    Each area code takes the most common carrier and state among its
+    NPA-NXX prefixes.
+    """
+    from phone_number_validator.models import PhonePrefix
+
+    carrier_votes = defaultdict(Counter)
+    state_votes = defaultdict(Counter)
+    rows = PhonePrefix.objects.values_list('prefix', 'carrier', 'state').iterator(chunk_size=5000)
+    for prefix, carrier, state in rows:
+        area_code = prefix[:3]
+        carrier_votes[area_code][normalize_carrier(carrier)] += 1
+        state = STATE_ABBREVIATIONS.get(state, state)
+        if state:
+            state_votes[area_code][state] += 1
+
+    index = dict(base if base is not None else AREA_CODE_INDEX)
+    for area_code, votes in carrier_votes.items():
+        fallback = index.get(area_code, DEFAULT_INFO)
+        state = state_votes[area_code].most_common(1)[0][0] if state_votes[area_code] else fallback.state
+        index[area_code] = AreaCodeInfo(
+            timezone=STATE_TIMEZONES.get(state, fallback.timezone),
+            carrier=votes.most_common(1)[0][0],
+            state=state,
+        )
+    return index
+
+
+AREA_CODE_INDEX: Dict[str, AreaCodeInfo] = build_index()
+_phone_prefixes_checked = False
+
+
+def load_phone_prefixes() -> int:
+    """
+    Replace the module index with one derived from PhonePrefix.
+    Returns the number of area codes in the new index.
+    """
+    global AREA_CODE_INDEX, _phone_prefixes_checked
+    _phone_prefixes_checked = True
+    try:
+        AREA_CODE_INDEX = build_index_from_phone_prefixes(build_index())
+    except Exception as e:
+        logger.error(f"Failed to build area code index from phone prefixes: {e}")
+    return len(AREA_CODE_INDEX)
+
+
+def extract_area_code(phone_number: str) -> str:
+    """Area code of a 10+ digit phone number, or '' if it is too short"""
+    digits = phone_number if phone_number.isdigit() else phone_number.translate(_NON_DIGITS)
+    if len(digits) >= 10:
+        return digits[-10:-7]
+    return ''
+
+
+def get_index() -> Dict[str, AreaCodeInfo]:
+    """
+    The active index. With GEO_INDEX_FROM_PHONE_PREFIXES enabled the
+    PhonePrefix table is loaded on first use (the database is not
+    available at import time).
+    """
+    global _phone_prefixes_checked
+    if not _phone_prefixes_checked:
+        _phone_prefixes_checked = True
+        if getattr(settings, 'GEO_INDEX_FROM_PHONE_PREFIXES', False):
+            load_phone_prefixes()
+    return AREA_CODE_INDEX
+
+
+def lookup(phone_number: str) -> AreaCodeInfo:
+    """Timezone, carrier hint and state for a phone number"""
+    return get_index().get(extract_area_code(phone_number), DEFAULT_INFO)
+
+
+def get_zone(timezone_name: str) -> ZoneInfo:
+    """ZoneInfo for a timezone name, defaulting to Eastern"""
+    return _ZONES.get(timezone_name) or _ZONES[DEFAULT_TIMEZONE]
+
+
+def localize(when: datetime, timezone_name: str) -> datetime:
+    """Convert a datetime to local time; naive datetimes are taken as UTC"""
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=dt_timezone.utc)
+    return when.astimezone(get_zone(timezone_name))
+
+
+def utc_offset_hours(timezone_name: str, when: datetime) -> float:
+    """UTC offset in hours for a timezone at a given moment, DST included"""
+    return localize(when, timezone_name).utcoffset().total_seconds() / 3600
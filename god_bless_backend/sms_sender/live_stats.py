@@ -0,0 +1,54 @@
+"""
+Shared campaign and system stats producers for SMS WebSocket consumers
+"""
+from typing import Any, Dict
+
+from django.utils import timezone
+
+from god_bless_pro.live_stats import LiveStatsBroadcaster
+from .monitoring_service import CampaignMonitoringService, GlobalMonitoringService
+
+
+class CampaignStatsBroadcaster(LiveStatsBroadcaster):
+    """Campaign statistics snapshot, fanned out to ``campaign_<id>``"""
+
+    kind = 'campaign'
+
+    def group_name(self) -> str:
+        return f"campaign_{self.object_id}"
+
+    def compute(self) -> Dict[str, Any]:
+        return CampaignMonitoringService(self.object_id).get_campaign_stats()
+
+    def build_event(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'type': 'campaign_message',
+            'message': {
+                'type': 'stats_update',
+                'campaign_id': self.object_id,
+                'timestamp': timezone.now().isoformat(),
+                'stats': snapshot
+            }
+        }
+
+
+class SystemStatsBroadcaster(LiveStatsBroadcaster):
+    """Per-user system health snapshot, fanned out to ``user_<id>_system``"""
+
+    kind = 'system'
+    interval = 10
+
+    def group_name(self) -> str:
+        return f"user_{self.object_id}_system"
+
+    def compute(self) -> Dict[str, Any]:
+        return GlobalMonitoringService(self.object_id).get_system_health_stats()
+
+    def build_event(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            'type': 'system_message',
+            'message': {
+                'type': 'system_health',
+                'stats': snapshot
+            }
+        }
@@ -0,0 +1,69 @@
+"""
+Management command to rebuild the hourly delivery rollup from raw messages.
+
+Use after deploying the rollup table, or to repair a campaign's rollup rows.
+Each campaign is rebuilt atomically, so it is safe to re-run.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from sms_sender.models import SMSCampaign
+from sms_sender.delivery_rollup import backfill_campaign
+
+
+class Command(BaseCommand):
+    help = 'Backfill the hourly delivery rollup table from SMS messages'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--campaign',
+            type=int,
+            action='append',
+            dest='campaign_ids',
+            help='Campaign ID to rebuild (can be repeated; default: all campaigns)'
+        )
+        
+        parser.add_argument(
+            '--user',
+            type=int,
+            dest='user_id',
+            help='Only rebuild campaigns owned by this user ID'
+        )
+        
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Only rebuild campaigns created in the last N days'
+        )
+    
+    def handle(self, *args, **options):
+        campaigns = SMSCampaign.objects.all().order_by('id')
+        
+        if options['campaign_ids']:
+            campaigns = campaigns.filter(id__in=options['campaign_ids'])
+        
+        if options['user_id']:
+            campaigns = campaigns.filter(user_id=options['user_id'])
+        
+        if options['days'] is not None:
+            if options['days'] < 1:
+                raise CommandError('Days must be a positive integer')
+            campaigns = campaigns.filter(created_at__gte=timezone.now() - timedelta(days=options['days']))
+        
+        total_rows = 0
+        total_campaigns = 0
+        
+        for campaign in campaigns.iterator():
+            rows = backfill_campaign(campaign)
+            total_rows += rows
+            total_campaigns += 1
+            self.stdout.write(f'Campaign {campaign.id} ({campaign.name}): {rows} rollup rows')
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Rebuilt delivery rollup for {total_campaigns} campaigns ({total_rows} rows)'
+            )
+        )
@@ -2,14 +2,16 @@
 Management command to clean up old retry attempts.
 
 This command removes completed retry attempts older than a specified number of days
-to keep the database clean while preserving recent data for analysis.
+to keep the database clean while preserving recent data for analysis. Once the
+table is partitioned, months holding only expired attempts are archived and
+dropped whole.
 """
 
 from django.core.management.base import BaseCommand, CommandError
-from django.utils import timezone
 from django.db import models
-from datetime import timedelta
-from sms_sender.models import RetryAttempt
+from sms_sender.partitioning import (
+    archive_dir, expired_retry_attempts, purge_old_retry_attempts, retry_attempt_purge_plan,
+)
 
 
 class Command(BaseCommand):
@@ -43,15 +45,9 @@ class Command(BaseCommand):
         if days < 1:
             raise CommandError('Days must be a positive integer')
         
-        cutoff_date = timezone.now() - timedelta(days=days)
-        
-        # Find old completed retry attempts
-        old_attempts = RetryAttempt.objects.filter(
-            completed=True,
-            completion_time__lt=cutoff_date
-        )
-        
-        count = old_attempts.count()
+        plan = retry_attempt_purge_plan(days)
+        cutoff_date = plan['cutoff']
+        count = plan['rows']
         
         if count == 0:
             self.stdout.write(
@@ -66,6 +62,10 @@ class Command(BaseCommand):
             f'Found {count} completed retry attempts older than {days} days '
             f'(before {cutoff_date.strftime("%Y-%m-%d %H:%M:%S")})'
         )
+        if plan['partitions']:
+            self.stdout.write(f'Monthly partitions to archive to {archive_dir()} and drop:')
+            for partition in plan['partitions']:
+                self.stdout.write(f"  {partition['partition']}: {partition['rows']} rows")
         
         if dry_run:
             self.stdout.write(
@@ -73,7 +73,7 @@ class Command(BaseCommand):
             )
             
             # Show breakdown by error type
-            error_breakdown = old_attempts.values('error_type').annotate(
+            error_breakdown = expired_retry_attempts(cutoff_date).values('error_type').annotate(
                 count=models.Count('id')
             ).order_by('-count')
             
@@ -86,8 +86,9 @@ class Command(BaseCommand):
         
         # Confirm deletion unless force is used
         if not force:
+            dropped = f" ({len(plan['partitions'])} whole partitions)" if plan['partitions'] else ''
             confirm = input(
-                f'Are you sure you want to delete {count} retry attempts? '
+                f'Are you sure you want to delete {count} retry attempts{dropped}? '
                 'This action cannot be undone. [y/N]: '
             )
             if confirm.lower() not in ['y', 'yes']:
@@ -96,10 +97,12 @@ class Command(BaseCommand):
         
         # Perform deletion
         try:
-            deleted_count, _ = old_attempts.delete()
+            result = purge_old_retry_attempts(days=days, plan=plan)
+            dropped = result.get('partitions')
             self.stdout.write(
                 self.style.SUCCESS(
-                    f'Successfully deleted {deleted_count} old retry attempts.'
+                    f'Successfully deleted {result["cleaned_up"]} old retry attempts'
+                    + (f' by dropping {dropped} monthly partitions.' if dropped is not None else '.')
                 )
             )
         except Exception as e:
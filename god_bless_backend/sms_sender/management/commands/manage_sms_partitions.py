@@ -0,0 +1,79 @@
+"""
+Management command for the monthly partitions of SMSMessage and RetryAttempt.
+
+Converts the tables to partitioned tables once (--convert), creates the
+partitions for upcoming months, and detaches expired months into gzip CSV
+archives (see sms_sender.partitioning). PostgreSQL only.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from sms_sender import partitioning
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming SMSMessage/RetryAttempt partitions and archive expired ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--convert',
+            action='store_true',
+            help='Rebuild the unpartitioned tables as monthly partitioned tables first (locks them while copying)'
+        )
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=partitioning.months_ahead(),
+            help='Months of partitions to create after the current one (default: SMS_PARTITION_MONTHS_AHEAD or 3)'
+        )
+        parser.add_argument(
+            '--archive-older-than',
+            type=int,
+            metavar='MONTHS',
+            help='Archive and drop partitions of months before the last MONTHS full months'
+        )
+        parser.add_argument(
+            '--archive-dir',
+            default=partitioning.archive_dir(),
+            help='Directory for partition archives (default: SMS_ARCHIVE_DIR)'
+        )
+        parser.add_argument(
+            '--no-archive',
+            action='store_true',
+            help='Drop expired partitions without writing archive files'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError(f'Table partitioning needs PostgreSQL; the database is {connection.vendor}')
+
+        try:
+            for model in partitioning.PARTITIONED_MODELS:
+                table = model._meta.db_table
+                if not partitioning.is_partitioned(model):
+                    if not options['convert']:
+                        self.stdout.write(self.style.WARNING(f'{table} is not partitioned; run with --convert'))
+                        continue
+                    moved = partitioning.convert_to_partitioned(
+                        model, ahead=options['months_ahead'], log=self.stdout.write
+                    )
+                    self.stdout.write(self.style.SUCCESS(f'Partitioned {table} ({moved} rows)'))
+
+                for name in partitioning.ensure_partitions(model, ahead=options['months_ahead']):
+                    self.stdout.write(f'Created partition {name}')
+
+                if options['archive_older_than'] is not None:
+                    cutoff = partitioning.add_months(
+                        partitioning.month_start(timezone.now()), -options['archive_older_than']
+                    )
+                    directory = None if options['no_archive'] else options['archive_dir']
+                    for result in partitioning.archive_expired(model, cutoff, directory):
+                        self.stdout.write(
+                            f"Archived {result['partition']} ({result['rows']} rows)"
+                            + (f" to {result['file']}" if result['file'] else '')
+                        )
+        except partitioning.PartitioningError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS('Partition maintenance complete'))
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sms_sender', '0006_abtestexperiment_abtestvariant_abtestresult_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeliveryRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('carrier', models.CharField(blank=True, default='', help_text='Carrier name (empty when unknown)', max_length=50)),
+                ('server_id', models.IntegerField(default=0, help_text='SMTP server ID (0 when no server was used)')),
+                ('hour', models.DateTimeField(help_text='Start of the hour the outcomes were recorded in')),
+                ('total_messages', models.IntegerField(default=0)),
+                ('sent_count', models.IntegerField(default=0)),
+                ('failed_count', models.IntegerField(default=0)),
+                ('delivered_count', models.IntegerField(default=0)),
+                ('processing_time_sum', models.FloatField(default=0.0, help_text='Sum of total processing time in seconds')),
+                ('processing_time_count', models.IntegerField(default=0)),
+                ('smtp_time_sum', models.FloatField(default=0.0, help_text='Sum of SMTP response time in seconds')),
+                ('smtp_time_count', models.IntegerField(default=0)),
+                ('error_categories', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('campaign', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='delivery_rollups', to='sms_sender.smscampaign')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='delivery_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'hour'], name='sms_sender__user_id_305ef1_idx'), models.Index(fields=['campaign', 'hour'], name='sms_sender__campaig_3ef022_idx'), models.Index(fields=['carrier', 'hour'], name='sms_sender__carrier_cd0898_idx')],
+                'unique_together': {('campaign', 'carrier', 'server_id', 'hour')},
+            },
+        ),
+    ]
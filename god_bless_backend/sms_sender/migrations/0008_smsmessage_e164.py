@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:29
+
+from django.db import migrations, models
+
+from god_bless_pro.phone_numbers import fill_e164
+
+
+def backfill_e164(apps, schema_editor):
+    fill_e164(apps.get_model('sms_sender', 'SMSMessage'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proxy_server', '0001_initial'),
+        ('sms_sender', '0007_deliveryrollup'),
+        ('smtps', '0003_add_performance_tracking'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='smsmessage',
+            name='sms_sender__phone_n_f58c53_idx',
+        ),
+        migrations.AddField(
+            model_name='smsmessage',
+            name='e164',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_e164, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='smsmessage',
+            index=models.Index(fields=['campaign', 'e164'], name='sms_msg_campaign_e164_idx'),
+        ),
+    ]
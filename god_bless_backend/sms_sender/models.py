@@ -1,7 +1,12 @@
 from django.db import models
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
+from god_bless_pro.cache import CacheNamespace, TwoTierCache
+from god_bless_pro.phone_numbers import E164QuerySet, to_e164
+
 User = get_user_model()
 
 
@@ -88,6 +93,8 @@ class SMSMessage(models.Model):
     
     # Message details
     phone_number = models.CharField(max_length=15)
+    # Normalized E.164 digits of phone_number, used for recipient lookups
+    e164 = models.BigIntegerField(null=True, blank=True, editable=False)
     message_content = models.TextField(help_text="Rendered message content with macros replaced")
     recipient_data = models.JSONField(default=dict, blank=True, help_text="Recipient-specific data for macro replacement")
     
@@ -127,16 +134,31 @@ class SMSMessage(models.Model):
         ordering = ['created_at']
         indexes = [
             models.Index(fields=['campaign', 'delivery_status']),
-            models.Index(fields=['phone_number']),
+            models.Index(fields=['campaign', 'e164'], name='sms_msg_campaign_e164_idx'),
             models.Index(fields=['delivery_status']),
             models.Index(fields=['proxy_server']),
             models.Index(fields=['smtp_server']),
         ]
     
+    objects = E164QuerySet.as_manager()
+    
+    def save(self, *args, **kwargs):
+        self.e164 = to_e164(self.phone_number)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'phone_number' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'e164'}
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.phone_number} - {self.delivery_status}"
 
 
+@receiver(post_save, sender=SMSCampaign)
+@receiver(post_delete, sender=SMSCampaign)
+def invalidate_campaign_cache(sender, instance, **kwargs):
+    CacheNamespace.bump(CacheNamespace.CAMPAIGNS, instance.user_id)
+
+
 class CampaignDeliverySettings(models.Model):
     """Per-campaign delivery optimization settings"""
     campaign = models.OneToOneField(SMSCampaign, on_delete=models.CASCADE, related_name='delivery_settings')
@@ -183,6 +205,24 @@ class CampaignDeliverySettings(models.Model):
         return f"Delivery Settings for {self.campaign.name}"
 
 
+# Read by the delivery engines for every campaign batch
+delivery_settings_cache = TwoTierCache('campaign_delivery_settings')
+
+
+def get_delivery_settings(campaign, defaults=None):
+    """Get or create a campaign's CampaignDeliverySettings through the two-tier cache"""
+    return delivery_settings_cache.get_or_set(
+        campaign.id,
+        lambda: CampaignDeliverySettings.objects.get_or_create(campaign=campaign, defaults=defaults)[0]
+    )
+
+
+@receiver(post_save, sender=CampaignDeliverySettings)
+@receiver(post_delete, sender=CampaignDeliverySettings)
+def invalidate_delivery_settings(sender, instance, **kwargs):
+    delivery_settings_cache.delete(instance.campaign_id)
+
+
 class ServerUsageLog(models.Model):
     """Track server usage during campaigns"""
     campaign = models.ForeignKey(SMSCampaign, on_delete=models.CASCADE, related_name='server_usage_logs')
@@ -309,6 +349,43 @@ class RetryAttempt(models.Model):
         self.save()
 
 
+class DeliveryRollup(models.Model):
+    """Hourly delivery counters per campaign, carrier and SMTP server for analytics"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='delivery_rollups')
+    campaign = models.ForeignKey(SMSCampaign, on_delete=models.CASCADE, related_name='delivery_rollups')
+    carrier = models.CharField(max_length=50, blank=True, default='', help_text="Carrier name (empty when unknown)")
+    server_id = models.IntegerField(default=0, help_text="SMTP server ID (0 when no server was used)")
+    hour = models.DateTimeField(help_text="Start of the hour the outcomes were recorded in")
+    
+    # Outcome counters
+    total_messages = models.IntegerField(default=0)
+    sent_count = models.IntegerField(default=0)
+    failed_count = models.IntegerField(default=0)
+    delivered_count = models.IntegerField(default=0)
+    
+    # Latency sums (divide by the matching count for averages)
+    processing_time_sum = models.FloatField(default=0.0, help_text="Sum of total processing time in seconds")
+    processing_time_count = models.IntegerField(default=0)
+    smtp_time_sum = models.FloatField(default=0.0, help_text="Sum of SMTP response time in seconds")
+    smtp_time_count = models.IntegerField(default=0)
+    
+    # Error category -> count (categories from ErrorAnalysisService)
+    error_categories = models.JSONField(default=dict, blank=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['campaign', 'carrier', 'server_id', 'hour']
+        indexes = [
+            models.Index(fields=['user', 'hour']),
+            models.Index(fields=['campaign', 'hour']),
+            models.Index(fields=['carrier', 'hour']),
+        ]
+    
+    def __str__(self):
+        return f"Rollup {self.campaign_id} {self.carrier or '-'} server {self.server_id} @ {self.hour:%Y-%m-%d %H:00}"
+
+
 class CampaignTemplate(models.Model):
     """Pre-configured campaign templates"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='campaign_templates')
@@ -406,7 +483,20 @@ class RoutingRule(models.Model):
         self.match_count += 1
         if success:
             self.success_count += 1
-        self.save()
+        self.save(update_fields=['match_count', 'success_count', 'updated_at'])
+
+
+# Saves that only touch usage counters do not change how rules match
+ROUTING_RULE_STAT_FIELDS = frozenset(['match_count', 'success_count', 'updated_at'])
+
+
+@receiver(post_save, sender=RoutingRule)
+@receiver(post_delete, sender=RoutingRule)
+def invalidate_routing_rule_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields and ROUTING_RULE_STAT_FIELDS.issuperset(update_fields):
+        return
+    from .routing_rules_engine import invalidate_rule_index
+    invalidate_rule_index(instance.user_id)
 
 
 class ServerCapacityWeight(models.Model):
@@ -12,8 +12,9 @@ from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from .models import (
     SMSCampaign, SMSMessage, ServerUsageLog, 
-    CarrierPerformanceLog, RetryAttempt
+    CarrierPerformanceLog, RetryAttempt, DeliveryRollup
 )
+from . import delivery_rollup
 
 logger = logging.getLogger(__name__)
 
@@ -281,6 +282,18 @@ class CampaignMonitoringService:
     
     def _get_carrier_performance(self) -> Dict[str, Any]:
         """Get carrier performance statistics"""
+        if delivery_rollup.has_rollup(self.campaign_id):
+            carrier_stats = delivery_rollup.carrier_breakdown(
+                DeliveryRollup.objects.filter(campaign_id=self.campaign_id)
+            )
+            for stat in carrier_stats:
+                stat['avg_response_time'] = stat.pop('avg_processing_time')
+            
+            return {
+                'carrier_breakdown': carrier_stats,
+                'total_carriers': len(carrier_stats)
+            }
+        
         messages = self.campaign.messages.exclude(carrier__isnull=True)
         
         carrier_stats = messages.values('carrier').annotate(
@@ -0,0 +1,379 @@
+"""
+Monthly range partitioning of SMSMessage and RetryAttempt on PostgreSQL
+The tables are converted once (manage_sms_partitions --convert) into
+tables partitioned by created_at, one partition per calendar month (UTC)
+plus a default partition. Upcoming months are created ahead of time, and
+expired months are detached, optionally written to a gzip CSV archive,
+and dropped, so retention costs one DROP TABLE instead of a row-by-row
+delete.
+
+A partitioned table's primary key has to include the partition key, so
+the converted tables use (id, created_at), and foreign keys pointing at
+them are dropped. Django still cascades deletes in the ORM; partitions
+dropped here remove their dependent rows explicitly.
+
+On other databases, and before conversion, every function here reports
+the tables as unpartitioned and cleanup falls back to ORM deletes.
+
+An archive is restored with:
+    COPY <table> FROM PROGRAM 'gzip -dc <file>' WITH (FORMAT csv, HEADER)
+
+Settings:
+    SMS_PARTITION_MONTHS_AHEAD: months of partitions created ahead (default 3)
+    SMS_PARTITION_RETENTION_MONTHS: full months kept before the current one
+        by the maintenance task; None disables archival (default None)
+    SMS_ARCHIVE_DIR: directory for partition archives (default BASE_DIR/archives/sms)
+"""
+import gzip
+import logging
+import os
+import re
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from .models import RetryAttempt, SMSMessage
+
+logger = logging.getLogger(__name__)
+
+PARTITION_KEY = 'created_at'
+
+# Children first, so their partitions are archived before their parents'
+PARTITIONED_MODELS = (RetryAttempt, SMSMessage)
+
+
+class PartitioningError(Exception):
+    """A table cannot be partitioned or a partition operation failed"""
+
+
+def months_ahead() -> int:
+    return getattr(settings, 'SMS_PARTITION_MONTHS_AHEAD', 3)
+
+
+def archive_dir() -> str:
+    return str(getattr(settings, 'SMS_ARCHIVE_DIR', settings.BASE_DIR / 'archives' / 'sms'))
+
+
+def month_start(value: datetime) -> datetime:
+    """The first instant of value's month in UTC"""
+    value = value.astimezone(dt_timezone.utc) if timezone.is_aware(value) else value.replace(tzinfo=dt_timezone.utc)
+    return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(model, month: datetime) -> str:
+    return f"{model._meta.db_table}_p{month:%Y%m}"
+
+
+def months_ending_before(months: List[datetime], before: datetime) -> List[datetime]:
+    """The months whose whole range lies before `before`"""
+    return sorted(month for month in months if add_months(month, 1) <= before)
+
+
+def is_partitioned(model) -> bool:
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)",
+            [connection.ops.quote_name(model._meta.db_table)]
+        )
+        return cursor.fetchone() is not None
+
+
+def monthly_partitions(model) -> Dict[datetime, str]:
+    """The model's monthly partitions by month; the default partition is not included"""
+    pattern = re.compile(rf"^{re.escape(model._meta.db_table)}_p(\d{{4}})(\d{{2}})$")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [connection.ops.quote_name(model._meta.db_table)]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = {}
+    for name in names:
+        match = pattern.match(name)
+        if match:
+            partitions[datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=dt_timezone.utc)] = name
+    return partitions
+
+
+def _create_partition(cursor, model, month: datetime, parent: Optional[str] = None) -> str:
+    name = partition_name(model, month)
+    cursor.execute(
+        "CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES FROM ('{}') TO ('{}')".format(
+            connection.ops.quote_name(name),
+            connection.ops.quote_name(parent or model._meta.db_table),
+            month.isoformat(), add_months(month, 1).isoformat(),
+        )
+    )
+    return name
+
+
+def _split_from_default(cursor, model, month: datetime) -> Optional[str]:
+    """
+    Create the month's partition from the rows the default partition holds
+    for it, or return None if it holds none. PostgreSQL refuses to create
+    a partition whose range already has rows in the default partition.
+    """
+    quote = connection.ops.quote_name
+    table = model._meta.db_table
+    default = f"{table}_default"
+    bounds = [month, add_months(month, 1)]
+
+    cursor.execute("SELECT to_regclass(%s)", [quote(default)])
+    if cursor.fetchone()[0] is None:
+        return None
+    cursor.execute(
+        f"SELECT 1 FROM {quote(default)} WHERE {quote(PARTITION_KEY)} >= %s AND {quote(PARTITION_KEY)} < %s LIMIT 1",
+        bounds
+    )
+    if cursor.fetchone() is None:
+        return None
+
+    # Hold off writers so no new row for the month lands in default mid-move
+    cursor.execute(f"LOCK TABLE {quote(table)} IN SHARE ROW EXCLUSIVE MODE")
+    name = partition_name(model, month)
+    cursor.execute(f"CREATE TABLE {quote(name)} (LIKE {quote(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+    cursor.execute(
+        f"WITH moved AS (DELETE FROM {quote(default)} WHERE {quote(PARTITION_KEY)} >= %s "
+        f"AND {quote(PARTITION_KEY)} < %s RETURNING *) INSERT INTO {quote(name)} SELECT * FROM moved",
+        bounds
+    )
+    logger.warning(f"Moved {cursor.rowcount} rows from {default} into new partition {name}")
+    cursor.execute(
+        "ALTER TABLE {} ATTACH PARTITION {} FOR VALUES FROM ('{}') TO ('{}')".format(
+            quote(table), quote(name), bounds[0].isoformat(), bounds[1].isoformat(),
+        )
+    )
+    return name
+
+
+def ensure_partitions(model, ahead: Optional[int] = None, now: Optional[datetime] = None) -> List[str]:
+    """
+    Create the partitions for the current month and `ahead` months after it;
+    returns the new ones. Rows that landed in the default partition because
+    a month was missing are moved into that month's new partition.
+    """
+    ahead = months_ahead() if ahead is None else ahead
+    current = month_start(now or timezone.now())
+    existing = monthly_partitions(model)
+
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for offset in range(ahead + 1):
+            month = add_months(current, offset)
+            if month not in existing:
+                created.append(
+                    _split_from_default(cursor, model, month) or _create_partition(cursor, model, month)
+                )
+    return created
+
+
+def convert_to_partitioned(model, ahead: Optional[int] = None, log: Optional[Callable[[str], None]] = None) -> int:
+    """
+    Rebuild the model's table as a partitioned table with the same columns,
+    indexes and outgoing foreign keys, and return the number of rows moved.
+    Runs in one transaction and locks the table until it finishes, so stop
+    the workers that write to it first.
+    """
+    log = log or logger.info
+    if connection.vendor != 'postgresql':
+        raise PartitioningError(f"Partitioning needs PostgreSQL, not {connection.vendor}")
+    if is_partitioned(model):
+        raise PartitioningError(f"{model._meta.db_table} is already partitioned")
+
+    quote = connection.ops.quote_name
+    table = model._meta.db_table
+    staging = f"{table}_partitioned"
+    columns = ', '.join(quote(field.column) for field in model._meta.concrete_fields)
+    pk = model._meta.pk.column
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_get_indexdef(indexrelid), indisunique FROM pg_index "
+            "WHERE indrelid = %s::regclass AND NOT indisprimary",
+            [quote(table)]
+        )
+        indexes = cursor.fetchall()
+        if any(unique for _, unique in indexes):
+            raise PartitioningError(f"{table} has unique indexes without {PARTITION_KEY} and cannot be partitioned")
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+            [quote(table)]
+        )
+        foreign_keys = cursor.fetchall()
+
+        # A foreign key needs a unique target, and the primary key now includes created_at
+        cursor.execute(
+            "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+            "WHERE confrelid = %s::regclass AND contype = 'f' AND conrelid <> confrelid",
+            [quote(table)]
+        )
+        for referencing, name in cursor.fetchall():
+            log(f"Dropping foreign key {name} on {referencing}")
+            cursor.execute(f"ALTER TABLE {referencing} DROP CONSTRAINT {quote(name)}")
+
+        cursor.execute(
+            f"CREATE TABLE {quote(staging)} (LIKE {quote(table)} INCLUDING DEFAULTS INCLUDING IDENTITY "
+            f"INCLUDING CONSTRAINTS) PARTITION BY RANGE ({quote(PARTITION_KEY)})"
+        )
+        cursor.execute(f"ALTER TABLE {quote(staging)} ADD PRIMARY KEY ({quote(pk)}, {quote(PARTITION_KEY)})")
+
+        cursor.execute(f"SELECT MIN({quote(PARTITION_KEY)}) FROM {quote(table)}")
+        oldest = cursor.fetchone()[0]
+        current = month_start(timezone.now())
+        month = month_start(oldest) if oldest else current
+        last = add_months(current, months_ahead() if ahead is None else ahead)
+        while month <= last:
+            _create_partition(cursor, model, month, parent=staging)
+            month = add_months(month, 1)
+        cursor.execute(f"CREATE TABLE {quote(table + '_default')} PARTITION OF {quote(staging)} DEFAULT")
+
+        cursor.execute(f"INSERT INTO {quote(staging)} ({columns}) SELECT {columns} FROM {quote(table)}")
+        moved = cursor.rowcount
+        log(f"{table}: moved {moved} rows into monthly partitions")
+
+        # A serial column's sequence belongs to the old table and would be dropped with it
+        cursor.execute(
+            "SELECT attidentity FROM pg_attribute WHERE attrelid = %s::regclass AND attname = %s",
+            [quote(table), pk]
+        )
+        if not cursor.fetchone()[0]:
+            cursor.execute("SELECT pg_get_serial_sequence(%s, %s)", [quote(table), pk])
+            sequence = cursor.fetchone()[0]
+            if sequence:
+                cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {quote(staging)}.{quote(pk)}")
+
+        cursor.execute(f"DROP TABLE {quote(table)}")
+        cursor.execute(f"ALTER TABLE {quote(staging)} RENAME TO {quote(table)}")
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} RENAME CONSTRAINT {quote(staging + '_pkey')} TO {quote(table + '_pkey')}"
+        )
+        # The saved definitions name the original table, which is now the partitioned one
+        for definition, _ in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}")
+        for statement in connection.ops.sequence_reset_sql(no_style(), [model]):
+            cursor.execute(statement)
+    return moved
+
+
+def _remove_dependents(cursor, model, partition: str) -> None:
+    """Apply on_delete for rows that point at the partition's rows"""
+    quote = connection.ops.quote_name
+    selected = f"SELECT {quote(model._meta.pk.column)} FROM {quote(partition)}"
+    for relation in model._meta.related_objects:
+        if relation.many_to_many:
+            continue
+        related_table = quote(relation.related_model._meta.db_table)
+        column = quote(relation.field.column)
+        if relation.on_delete is models.CASCADE:
+            cursor.execute(f"DELETE FROM {related_table} WHERE {column} IN ({selected})")
+        elif relation.on_delete is models.SET_NULL:
+            cursor.execute(f"UPDATE {related_table} SET {column} = NULL WHERE {column} IN ({selected})")
+
+
+def archive_partition(model, month: datetime, directory: Optional[str] = None) -> dict:
+    """
+    Detach a monthly partition, write it to <directory>/<partition>.csv.gz
+    when a directory is given, and drop it.
+    """
+    name = partition_name(model, month)
+    quote = connection.ops.quote_name
+    path = None
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {quote(model._meta.db_table)} DETACH PARTITION {quote(name)}")
+        cursor.execute(f"SELECT COUNT(*) FROM {quote(name)}")
+        rows = cursor.fetchone()[0]
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"{name}.csv.gz")
+            with gzip.open(path, 'wt', encoding='utf-8') as archive:
+                cursor.cursor.copy_expert(f"COPY {quote(name)} TO STDOUT WITH (FORMAT csv, HEADER)", archive)
+        _remove_dependents(cursor, model, name)
+        cursor.execute(f"DROP TABLE {quote(name)}")
+
+    logger.info(f"Archived partition {name} ({rows} rows){f' to {path}' if path else ''}")
+    return {'partition': name, 'rows': rows, 'file': path}
+
+
+def archive_expired(model, before: datetime, directory: Optional[str] = None) -> List[dict]:
+    """Archive and drop every monthly partition that ends before `before`"""
+    if not is_partitioned(model):
+        return []
+    return [
+        archive_partition(model, month, directory)
+        for month in months_ending_before(list(monthly_partitions(model)), before)
+    ]
+
+
+def expired_retry_attempts(cutoff: datetime):
+    """The retry attempts retention removes: completed before cutoff"""
+    return RetryAttempt.objects.filter(completed=True, completion_time__lt=cutoff)
+
+
+def retry_attempt_purge_plan(days: int = 30) -> dict:
+    """
+    What purge_old_retry_attempts(days) removes: every completed attempt
+    older than `days` ('rows'). On a partitioned table, monthly partitions
+    that end before the cutoff and hold nothing else are dropped whole
+    ('partitions', with their row counts); months that still hold
+    incomplete or recent attempts are kept and cleaned row by row.
+    """
+    cutoff = timezone.now() - timedelta(days=days)
+    plan = {
+        'cutoff': cutoff,
+        'partitioned': is_partitioned(RetryAttempt),
+        'partitions': [],
+        'rows': expired_retry_attempts(cutoff).count(),
+    }
+    if not plan['partitioned']:
+        return plan
+
+    quote = connection.ops.quote_name
+    partitions = monthly_partitions(RetryAttempt)
+    with connection.cursor() as cursor:
+        for month in months_ending_before(list(partitions), cutoff):
+            cursor.execute(
+                f"SELECT COUNT(*), COUNT(*) FILTER (WHERE NOT completed OR completion_time IS NULL "
+                f"OR completion_time >= %s) FROM {quote(partitions[month])}",
+                [cutoff]
+            )
+            rows, retained = cursor.fetchone()
+            if retained:
+                logger.info(f"Keeping partition {partitions[month]}: {retained} attempts are not expired")
+                continue
+            plan['partitions'].append({'partition': partitions[month], 'month': month, 'rows': rows})
+    return plan
+
+
+def purge_old_retry_attempts(days: int = 30, plan: Optional[dict] = None) -> dict:
+    """
+    Retention cleanup for RetryAttempt, following retry_attempt_purge_plan.
+    Whole partitions are archived to archive_dir() before they are dropped;
+    the remaining expired attempts are deleted.
+    """
+    plan = plan or retry_attempt_purge_plan(days)
+    dropped = [
+        archive_partition(RetryAttempt, partition['month'], archive_dir())
+        for partition in plan['partitions']
+    ]
+    deleted, _ = expired_retry_attempts(plan['cutoff']).delete()
+
+    result = {'cleaned_up': deleted + sum(partition['rows'] for partition in dropped)}
+    if plan['partitioned']:
+        result['partitions'] = len(dropped)
+    return result
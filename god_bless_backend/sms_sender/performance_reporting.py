@@ -10,8 +10,10 @@ from django.db.models import Count, Avg, Sum, Q, F, Max, Min
 from django.db.models.functions import TruncHour, TruncDay
 from .models import (
     SMSCampaign, SMSMessage, ServerUsageLog, 
-    CarrierPerformanceLog, RetryAttempt, CampaignDeliverySettings
+    CarrierPerformanceLog, RetryAttempt, CampaignDeliverySettings,
+    DeliveryRollup
 )
+from . import delivery_rollup
 
 logger = logging.getLogger(__name__)
 
@@ -270,6 +272,17 @@ class PerformanceReportingService:
     
     def _get_time_analysis(self, campaign: SMSCampaign) -> Dict[str, Any]:
         """Get time-based analysis of campaign performance"""
+        if delivery_rollup.has_rollup(campaign.id):
+            hourly_stats = delivery_rollup.hourly_breakdown(
+                DeliveryRollup.objects.filter(campaign=campaign)
+            )
+            return {
+                'hourly_breakdown': hourly_stats,
+                'peak_performance_hour': max(hourly_stats, key=lambda x: x['total_messages']),
+                'total_hours_active': len(hourly_stats)
+            }
+        
+        # No rollup yet (campaign not backfilled): aggregate raw messages
         messages = campaign.messages.filter(created_at__isnull=False)
         
         if not messages.exists():
@@ -304,20 +317,25 @@ class PerformanceReportingService:
     
     def _get_carrier_analysis(self, campaign: SMSCampaign) -> Dict[str, Any]:
         """Get carrier-specific performance analysis"""
-        messages = campaign.messages.exclude(carrier__isnull=True)
-        
-        carrier_stats = messages.values('carrier').annotate(
-            total_messages=Count('id'),
-            successful_messages=Count('id', filter=Q(delivery_status='delivered')),
-            failed_messages=Count('id', filter=Q(delivery_status='failed')),
-            avg_processing_time=Avg('total_processing_time')
-        ).order_by('-total_messages')
-        
-        # Calculate success rates
-        for stat in carrier_stats:
-            total = stat['total_messages']
-            successful = stat['successful_messages']
-            stat['success_rate'] = (successful / total * 100) if total > 0 else 0
+        if delivery_rollup.has_rollup(campaign.id):
+            carrier_stats = delivery_rollup.carrier_breakdown(
+                DeliveryRollup.objects.filter(campaign=campaign)
+            )
+        else:
+            messages = campaign.messages.exclude(carrier__isnull=True)
+            
+            carrier_stats = list(messages.values('carrier').annotate(
+                total_messages=Count('id'),
+                successful_messages=Count('id', filter=Q(delivery_status='delivered')),
+                failed_messages=Count('id', filter=Q(delivery_status='failed')),
+                avg_processing_time=Avg('total_processing_time')
+            ).order_by('-total_messages'))
+            
+            # Calculate success rates
+            for stat in carrier_stats:
+                total = stat['total_messages']
+                successful = stat['successful_messages']
+                stat['success_rate'] = (successful / total * 100) if total > 0 else 0
         
         # Best and worst performing carriers
         best_carrier = None
@@ -329,8 +347,8 @@ class PerformanceReportingService:
             worst_carrier = carriers_by_success[-1] if carriers_by_success else None
         
         return {
-            'carrier_breakdown': list(carrier_stats),
-            'total_carriers': carrier_stats.count(),
+            'carrier_breakdown': carrier_stats,
+            'total_carriers': len(carrier_stats),
             'best_performing_carrier': best_carrier,
             'worst_performing_carrier': worst_carrier
         }
@@ -8,6 +8,8 @@ from datetime import datetime, timedelta
 from collections import defaultdict
 import time
 
+from god_bless_pro import metrics
+
 
 # Carrier-specific rate limits (messages per minute)
 CARRIER_RATE_LIMITS = {
@@ -130,6 +132,7 @@ class RateLimiter:
             campaign_id: Optional campaign ID for tracking
         """
         wait_time = self.get_wait_time(carrier, campaign_id)
+        metrics.RATE_LIMIT_WAIT_SECONDS.labels(carrier=carrier).observe(max(wait_time, 0))
         if wait_time > 0:
             time.sleep(wait_time)
     
@@ -457,6 +457,7 @@ def retry_sms_message_task(self, message_id: int, retry_attempt_id: int):
         return {'status': 'error', 'message': str(e)}
     
     # Import here to avoid circular imports
+    from .delivery_rollup import outcome_change
     from .rotation_manager import RotationManager
     from .tasks import send_enhanced_sms_message_simple
     
@@ -488,10 +489,11 @@ def retry_sms_message_task(self, message_id: int, retry_attempt_id: int):
     # Apply delivery delay
     delay_applied = rotation_manager.apply_delivery_delay()
     
-    # Attempt to send the message
-    success = send_enhanced_sms_message_simple(
-        message, smtp, proxy, campaign, rotation_manager, delay_applied
-    )
+    # Attempt to send the message, replacing its failed outcome in the rollup
+    with outcome_change(message):
+        success = send_enhanced_sms_message_simple(
+            message, smtp, proxy, campaign, rotation_manager, delay_applied
+        )
     
     # Mark retry attempt as completed
     retry_attempt.mark_completed(success=success)
@@ -537,17 +539,9 @@ def cleanup_old_retry_attempts():
     Periodic task to clean up old completed retry attempts.
     Keeps retry attempts for 30 days for reporting purposes.
     """
-    from django.db import models
-    
-    cutoff_date = timezone.now() - timedelta(days=30)
-    
-    old_attempts = RetryAttempt.objects.filter(
-        completed=True,
-        completion_time__lt=cutoff_date
-    )
+    from .partitioning import purge_old_retry_attempts
     
-    count = old_attempts.count()
-    old_attempts.delete()
+    result = purge_old_retry_attempts(days=30)
     
-    logger.info(f"Cleaned up {count} old retry attempts")
-    return {'cleaned_up': count}
\ No newline at end of file
+    logger.info(f"Cleaned up {result['cleaned_up']} old retry attempts")
+    return result
\ No newline at end of file
@@ -13,7 +13,7 @@ from proxy_server.delivery_delay_service import DeliveryDelayService
 from smtps.rotation_service import SMTPRotationService
 from proxy_server.models import ProxyServer
 from smtps.models import SmtpManager
-from .models import CampaignDeliverySettings, ServerUsageLog, CarrierPerformanceLog
+from .models import CampaignDeliverySettings, ServerUsageLog, CarrierPerformanceLog, get_delivery_settings
 from .smart_delivery_engine import SmartDeliveryEngine
 
 
@@ -41,26 +41,18 @@ class RotationManager:
     
     def _get_delivery_settings(self) -> CampaignDeliverySettings:
         """Get or create delivery settings for the campaign"""
-        settings, created = CampaignDeliverySettings.objects.get_or_create(
-            campaign=self.campaign,
-            defaults={
-                'use_proxy_rotation': self.campaign.use_proxy_rotation,
-                'use_smtp_rotation': self.campaign.use_smtp_rotation,
-                'proxy_rotation_strategy': 'round_robin',
-                'smtp_rotation_strategy': 'round_robin',
-                'custom_delay_enabled': False,
-                'custom_delay_min': 1,
-                'custom_delay_max': 5,
-                'adaptive_optimization_enabled': False,
-                'carrier_optimization_enabled': False,
-                'timezone_optimization_enabled': False
-            }
-        )
-        
-        if created:
-            self.logger.info(f"Created default delivery settings for campaign {self.campaign.id}")
-        
-        return settings
+        return get_delivery_settings(self.campaign, defaults={
+            'use_proxy_rotation': self.campaign.use_proxy_rotation,
+            'use_smtp_rotation': self.campaign.use_smtp_rotation,
+            'proxy_rotation_strategy': 'round_robin',
+            'smtp_rotation_strategy': 'round_robin',
+            'custom_delay_enabled': False,
+            'custom_delay_min': 1,
+            'custom_delay_max': 5,
+            'adaptive_optimization_enabled': False,
+            'carrier_optimization_enabled': False,
+            'timezone_optimization_enabled': False
+        })
     
     def get_next_proxy(self) -> Optional[ProxyServer]:
         """Get next proxy server based on campaign settings"""
@@ -4,7 +4,7 @@ Advanced routing logic based on phone number patterns, carrier detection, and ge
 """
 import re
 import logging
-from typing import Optional, Dict, Any, List, Tuple
+from typing import Optional, Dict, Any, List, Tuple, FrozenSet, Callable
 from django.db import models
 from django.db.models import Q, F, Case, When, IntegerField
 from django.core.cache import cache
@@ -13,6 +13,7 @@ from django.utils import timezone
 from proxy_server.models import ProxyServer
 from smtps.models import SmtpManager
 from .models import SMSMessage, CampaignDeliverySettings
+from . import geo_index
 
 
 logger = logging.getLogger(__name__)
@@ -27,14 +28,28 @@ class RoutingRule:
         self.actions = actions
         self.priority = priority
         self.enabled = True
+        
+        # Compiled once so per-message matching does no parsing
+        pattern = conditions.get('phone_pattern')
+        self.phone_pattern = re.compile(pattern) if pattern else None
+        self.hours = self._compile_hours(conditions.get('time_range'))
+    
+    @staticmethod
+    def _compile_hours(time_range) -> Optional[FrozenSet[int]]:
+        """Hours of the day a time_range covers; ranges like (22, 6) wrap past midnight"""
+        if not time_range:
+            return None
+        start_hour, end_hour = time_range
+        if start_hour <= end_hour:
+            return frozenset(range(start_hour, end_hour + 1))
+        return frozenset(range(start_hour, 24)) | frozenset(range(0, end_hour + 1))
     
     def matches(self, phone_number: str, carrier: str, geographic_info: Dict[str, Any]) -> bool:
         """Check if this rule matches the given criteria"""
         
         # Check phone number pattern conditions
-        if 'phone_pattern' in self.conditions:
-            pattern = self.conditions['phone_pattern']
-            if not re.match(pattern, phone_number):
+        if self.phone_pattern is not None:
+            if not self.phone_pattern.match(phone_number):
                 return False
         
         # Check area code conditions
@@ -64,21 +79,15 @@ class RoutingRule:
                 return False
         
         # Check time-based conditions
-        if 'time_range' in self.conditions:
-            time_range = self.conditions['time_range']
-            current_hour = timezone.now().hour
-            start_hour, end_hour = time_range
-            if not (start_hour <= current_hour <= end_hour):
+        if self.hours is not None:
+            if timezone.now().hour not in self.hours:
                 return False
         
         return True
     
     def _extract_area_code(self, phone_number: str) -> str:
         """Extract area code from phone number"""
-        cleaned_number = re.sub(r'[^\d]', '', phone_number)
-        if len(cleaned_number) >= 10:
-            return cleaned_number[-10:-7]  # Extract area code from 10-digit number
-        return ''
+        return geo_index.extract_area_code(phone_number)
 
 
 class LoadBalancingWeights:
@@ -178,63 +187,129 @@ class LoadBalancingWeights:
         return load_dict
 
 
+class CompiledRuleIndex:
+    """
+    Routing rules compiled into hash indexes.
+
+    Area codes, carriers, states and timezones map to the set of rule
+    positions that accept that value, and time ranges are bucketed by hour.
+    Rules without a condition on a dimension sit in that dimension's
+    wildcard set, so matching a message is a handful of small set
+    intersections instead of evaluating every rule.
+    """
+    
+    DIMENSIONS = (
+        ('area_codes', 'area_code'),
+        ('carriers', 'carrier'),
+        ('states', 'state'),
+        ('timezones', 'timezone'),
+    )
+    
+    def __init__(self, rules: List[RoutingRule]):
+        # Priority order (stable for equal priorities); positions index into this list
+        self.rules = sorted((r for r in rules if r.enabled), key=lambda r: r.priority, reverse=True)
+        all_positions = frozenset(range(len(self.rules)))
+        
+        self.indexes = {}
+        self.wildcards = {}
+        for condition, _ in self.DIMENSIONS:
+            index = {}
+            wildcard = set()
+            for position, rule in enumerate(self.rules):
+                if condition in rule.conditions:
+                    for value in rule.conditions[condition]:
+                        index.setdefault(value, set()).add(position)
+                else:
+                    wildcard.add(position)
+            self.indexes[condition] = {value: frozenset(positions) for value, positions in index.items()}
+            self.wildcards[condition] = frozenset(wildcard)
+        
+        self.hour_buckets = [
+            frozenset(p for p in all_positions if self.rules[p].hours is None or hour in self.rules[p].hours)
+            for hour in range(24)
+        ]
+        self.pattern_positions = frozenset(
+            p for p in all_positions if self.rules[p].phone_pattern is not None
+        )
+    
+    def match(self, phone_number: str, carrier: str, geographic_info: Dict[str, Any],
+              hour: Optional[int] = None) -> List[RoutingRule]:
+        """Rules matching a message, highest priority first"""
+        if hour is None:
+            hour = timezone.now().hour
+        values = {
+            'area_code': geographic_info.get('area_code') or geo_index.extract_area_code(phone_number),
+            'carrier': carrier,
+            'state': geographic_info.get('state', ''),
+            'timezone': geographic_info.get('timezone', ''),
+        }
+        
+        candidates = self.hour_buckets[hour]
+        for condition, key in self.DIMENSIONS:
+            if not candidates:
+                return []
+            accepted = self.indexes[condition].get(values[key])
+            wildcard = self.wildcards[condition]
+            candidates = candidates & ((wildcard | accepted) if accepted else wildcard)
+        
+        return [
+            self.rules[p] for p in sorted(candidates)
+            if p not in self.pattern_positions or self.rules[p].phone_pattern.match(phone_number)
+        ]
+
+
+_compiled_rule_indexes: Dict[int, Tuple[Any, CompiledRuleIndex]] = {}
+
+
+def _rule_version_key(user_id: int) -> str:
+    return f"routing_rules:version:{user_id}"
+
+
+def get_rule_index(user_id: int, loader: Callable[[], List[RoutingRule]]) -> CompiledRuleIndex:
+    """
+    Compiled rule index for a user, rebuilt with ``loader`` only when the
+    user's rule version in the shared cache has changed since it was built.
+    """
+    version = cache.get(_rule_version_key(user_id))
+    if version is None:
+        version = timezone.now().timestamp()
+        cache.add(_rule_version_key(user_id), version, timeout=None)
+        version = cache.get(_rule_version_key(user_id), version)
+    
+    cached = _compiled_rule_indexes.get(user_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    
+    rule_index = CompiledRuleIndex(loader())
+    _compiled_rule_indexes[user_id] = (version, rule_index)
+    return rule_index
+
+
+def invalidate_rule_index(user_id: int) -> None:
+    """Force every process to recompile a user's rules on next use"""
+    cache.set(_rule_version_key(user_id), timezone.now().timestamp(), timeout=None)
+    _compiled_rule_indexes.pop(user_id, None)
+
+
 class GeographicRouter:
     """Handle geographic routing preferences"""
     
-    # US state to timezone mapping
-    STATE_TIMEZONES = {
-        'AL': 'central', 'AK': 'alaska', 'AZ': 'mountain', 'AR': 'central',
-        'CA': 'pacific', 'CO': 'mountain', 'CT': 'eastern', 'DE': 'eastern',
-        'FL': 'eastern', 'GA': 'eastern', 'HI': 'hawaii', 'ID': 'mountain',
-        'IL': 'central', 'IN': 'eastern', 'IA': 'central', 'KS': 'central',
-        'KY': 'eastern', 'LA': 'central', 'ME': 'eastern', 'MD': 'eastern',
-        'MA': 'eastern', 'MI': 'eastern', 'MN': 'central', 'MS': 'central',
-        'MO': 'central', 'MT': 'mountain', 'NE': 'central', 'NV': 'pacific',
-        'NH': 'eastern', 'NJ': 'eastern', 'NM': 'mountain', 'NY': 'eastern',
-        'NC': 'eastern', 'ND': 'central', 'OH': 'eastern', 'OK': 'central',
-        'OR': 'pacific', 'PA': 'eastern', 'RI': 'eastern', 'SC': 'eastern',
-        'SD': 'central', 'TN': 'central', 'TX': 'central', 'UT': 'mountain',
-        'VT': 'eastern', 'VA': 'eastern', 'WA': 'pacific', 'WV': 'eastern',
-        'WI': 'central', 'WY': 'mountain'
-    }
-    
-    # Area code to state mapping (simplified)
-    AREA_CODE_STATES = {
-        '205': 'AL', '251': 'AL', '256': 'AL', '334': 'AL', '938': 'AL',
-        '907': 'AK',
-        '480': 'AZ', '520': 'AZ', '602': 'AZ', '623': 'AZ', '928': 'AZ',
-        '479': 'AR', '501': 'AR', '870': 'AR',
-        '209': 'CA', '213': 'CA', '279': 'CA', '310': 'CA', '323': 'CA',
-        '408': 'CA', '415': 'CA', '424': 'CA', '442': 'CA', '510': 'CA',
-        '530': 'CA', '559': 'CA', '562': 'CA', '619': 'CA', '626': 'CA',
-        '628': 'CA', '650': 'CA', '657': 'CA', '661': 'CA', '669': 'CA',
-        '707': 'CA', '714': 'CA', '747': 'CA', '760': 'CA', '805': 'CA',
-        '818': 'CA', '831': 'CA', '858': 'CA', '909': 'CA', '916': 'CA',
-        '925': 'CA', '949': 'CA', '951': 'CA',
-        '303': 'CO', '719': 'CO', '720': 'CO', '970': 'CO',
-        '203': 'CT', '475': 'CT', '860': 'CT', '959': 'CT',
-        '302': 'DE',
-        '202': 'DC',
-        '239': 'FL', '305': 'FL', '321': 'FL', '352': 'FL', '386': 'FL',
-        '407': 'FL', '561': 'FL', '689': 'FL', '727': 'FL', '754': 'FL',
-        '772': 'FL', '786': 'FL', '813': 'FL', '850': 'FL', '863': 'FL',
-        '904': 'FL', '941': 'FL', '954': 'FL',
-        # Add more mappings as needed...
-    }
+    # Area code tables live in geo_index; kept here for existing callers
+    STATE_TIMEZONES = geo_index.STATE_TIMEZONES
+    AREA_CODE_STATES = geo_index.AREA_CODE_STATES
     
     def __init__(self):
         self.logger = logging.getLogger(f"{__name__}.GeographicRouter")
     
     def get_geographic_info(self, phone_number: str) -> Dict[str, str]:
         """Get geographic information from phone number"""
-        area_code = self._extract_area_code(phone_number)
-        state = self.AREA_CODE_STATES.get(area_code, 'unknown')
-        timezone = self.STATE_TIMEZONES.get(state, 'eastern')
+        area_code = geo_index.extract_area_code(phone_number)
+        info = geo_index.get_index().get(area_code, geo_index.DEFAULT_INFO)
         
         return {
             'area_code': area_code,
-            'state': state,
-            'timezone': timezone
+            'state': info.state,
+            'timezone': info.timezone
         }
     
     def find_geographically_preferred_servers(self, phone_number: str, available_servers: List, server_type: str) -> List:
@@ -259,10 +334,7 @@ class GeographicRouter:
     
     def _extract_area_code(self, phone_number: str) -> str:
         """Extract area code from phone number"""
-        cleaned_number = re.sub(r'[^\d]', '', phone_number)
-        if len(cleaned_number) >= 10:
-            return cleaned_number[-10:-7]
-        return ''
+        return geo_index.extract_area_code(phone_number)
     
     def _get_server_timezone(self, server) -> str:
         """Get server timezone (would be configured in server settings)"""
@@ -287,8 +359,9 @@ class RoutingRulesEngine:
         self.load_balancer = LoadBalancingWeights(user)
         self.geographic_router = GeographicRouter()
         
-        # Load routing rules
-        self.routing_rules = self._load_routing_rules()
+        # Load routing rules (compiled and cached per user)
+        self.rule_index = get_rule_index(user.id, self._load_routing_rules)
+        self.routing_rules = self.rule_index.rules
     
     def get_optimal_servers(self, phone_number: str, carrier: str) -> Tuple[Optional[ProxyServer], Optional[SmtpManager]]:
         """Get optimal servers based on routing rules and preferences"""
@@ -395,18 +468,27 @@ class RoutingRulesEngine:
             ),
         ]
         
-        return default_rules
+        return default_rules + self._load_user_rules()
+    
+    def _load_user_rules(self) -> List[RoutingRule]:
+        """Load the user's enabled routing rules from the database"""
+        from .models import RoutingRule as RoutingRuleModel
+        
+        rows = RoutingRuleModel.objects.filter(user=self.user, enabled=True).values_list(
+            'name', 'conditions', 'actions', 'priority'
+        )
+        rules = []
+        for name, conditions, actions, priority in rows:
+            try:
+                rules.append(RoutingRule(name, conditions or {}, actions or {}, priority))
+            except (re.error, TypeError, ValueError) as e:
+                self.logger.warning(f"Skipping invalid routing rule '{name}': {e}")
+        return rules
     
     def _find_matching_rules(self, phone_number: str, carrier: str, geographic_info: Dict[str, Any]) -> List[RoutingRule]:
         """Find routing rules that match the given criteria"""
-        matching_rules = []
-        
-        for rule in self.routing_rules:
-            if rule.enabled and rule.matches(phone_number, carrier, geographic_info):
-                matching_rules.append(rule)
-        
-        # Sort by priority (higher priority first)
-        matching_rules.sort(key=lambda r: r.priority, reverse=True)
+        # Already in priority order (higher priority first)
+        matching_rules = self.rule_index.match(phone_number, carrier, geographic_info)
         
         self.logger.debug(f"Found {len(matching_rules)} matching rules for {phone_number}")
         return matching_rules
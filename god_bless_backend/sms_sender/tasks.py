@@ -13,6 +13,7 @@ from sms_sender.macro_processor import process_message
 from sms_sender.rate_limiter import rate_limiter
 from sms_sender.email_utils import format_provider_email_address
 from smtps.models import SmtpManager
+from god_bless_pro import metrics
 
 
 @shared_task(bind=True)
@@ -60,6 +61,7 @@ def process_sms_campaign_task(self, campaign_id: int):
     """
     # Import here to avoid circular imports
     from .rotation_manager import RotationManager
+    from .delivery_rollup import DeliveryRollupBuffer
     
     try:
         campaign = SMSCampaign.objects.get(id=campaign_id)
@@ -95,6 +97,9 @@ def process_sms_campaign_task(self, campaign_id: int):
     
     sent_count = 0
     failed_count = 0
+    rollup_buffer = DeliveryRollupBuffer(campaign)
+    queue_depth = metrics.CAMPAIGN_QUEUE_DEPTH.labels(campaign=str(campaign_id))
+    queue_depth.set(total_messages)
     
     # Process messages in batches
     batch_size = campaign.batch_size
@@ -106,6 +111,8 @@ def process_sms_campaign_task(self, campaign_id: int):
             # Check if campaign was paused or cancelled
             campaign.refresh_from_db()
             if campaign.status in ['paused', 'cancelled']:
+                rollup_buffer.flush()
+                queue_depth.remove()
                 return {'status': campaign.status, 'sent': sent_count, 'failed': failed_count}
             
             # Apply rate limiting
@@ -121,7 +128,9 @@ def process_sms_campaign_task(self, campaign_id: int):
                 campaign.messages_failed += 1
                 message.delivery_status = 'failed'
                 message.error_message = 'No SMTP server available'
+                message.last_attempt_at = timezone.now()
                 message.save()
+                rollup_buffer.record(message)
                 continue
             
             # Apply delivery delay
@@ -129,6 +138,7 @@ def process_sms_campaign_task(self, campaign_id: int):
             
             # Send the message with enhanced tracking
             success = send_enhanced_sms_message_simple(message, smtp, proxy, campaign, rotation_manager, delay_applied)
+            rollup_buffer.record(message)
             
             if success:
                 sent_count += 1
@@ -145,6 +155,7 @@ def process_sms_campaign_task(self, campaign_id: int):
             progress = ((sent_count + failed_count) / total_messages) * 100
             campaign.progress = int(progress)
             campaign.save()
+            queue_depth.set(total_messages - sent_count - failed_count)
             
             # Update task state
             self.update_state(
@@ -158,6 +169,11 @@ def process_sms_campaign_task(self, campaign_id: int):
                     'smtp_used': f"{smtp.host}:{smtp.port}" if smtp else None
                 }
             )
+        
+        # Apply the batch's delivery outcomes to the hourly rollup
+        rollup_buffer.flush()
+    
+    queue_depth.remove()
     
     # Mark campaign as completed
     campaign.status = 'completed'
@@ -207,6 +223,9 @@ def send_enhanced_sms_message_simple(message: SMSMessage, smtp: SmtpManager, pro
     
     message.save()
     
+    server = message.smtp_server_legacy
+    carrier = message.carrier or campaign.target_carrier or 'unknown'
+    
     try:
         # Format receiver email
         receiver_email = format_provider_email_address(
@@ -226,7 +245,9 @@ def send_enhanced_sms_message_simple(message: SMSMessage, smtp: SmtpManager, pro
         # Send via SMTP
         with smtplib.SMTP_SSL(smtp.host, int(smtp.port), context=ssl.create_default_context()) as email_conn:
             email_conn.login(smtp.username, smtp.password)
-            email_conn.sendmail(smtp.username, receiver_email, email_message.as_string())
+            metrics.SMTP_HANDSHAKE_SECONDS.labels(server=server).observe(time.time() - smtp_start_time)
+            with metrics.SMTP_SEND_SECONDS.labels(server=server).time():
+                email_conn.sendmail(smtp.username, receiver_email, email_message.as_string())
         
         smtp_response_time = time.time() - smtp_start_time
         message.smtp_response_time = smtp_response_time
@@ -236,6 +257,7 @@ def send_enhanced_sms_message_simple(message: SMSMessage, smtp: SmtpManager, pro
         message.delivery_status = 'sent'
         message.sent_at = timezone.now()
         message.save()
+        metrics.SMS_MESSAGES_SENT.labels(carrier=carrier, server=server).inc()
         
         # Record success
         rotation_manager.record_success('smtp', smtp.id, smtp_response_time, message.carrier)
@@ -250,6 +272,7 @@ def send_enhanced_sms_message_simple(message: SMSMessage, smtp: SmtpManager, pro
         message.error_message = str(e)
         message.total_processing_time = time.time() - start_time
         message.save()
+        metrics.SMS_MESSAGES_FAILED.labels(carrier=carrier, server=server).inc()
         
         # Record failure
         rotation_manager.record_failure('smtp', smtp.id, str(e), 'unknown', message.carrier)
@@ -279,12 +302,25 @@ def send_single_sms_message(message: SMSMessage, smtp: SmtpManager, campaign: SM
     Returns:
         True if successful, False otherwise
     """
+    from .delivery_rollup import outcome_change
+    
+    # A resend replaces the outcome the rollup already has for this message
+    with outcome_change(message):
+        return _send_single_sms_message(message, smtp, campaign)
+
+
+def _send_single_sms_message(message: SMSMessage, smtp: SmtpManager, campaign: SMSCampaign) -> bool:
+    import time
+    
     message.delivery_status = 'sending'
     message.send_attempts += 1
     message.last_attempt_at = timezone.now()
     message.smtp_server = f"{smtp.host}:{smtp.port}"
     message.save()
     
+    server = f"{smtp.host}:{smtp.port}"
+    carrier = message.carrier or campaign.target_carrier or 'unknown'
+    
     try:
         # Format receiver email
         receiver_email = format_provider_email_address(
@@ -299,14 +335,18 @@ def send_single_sms_message(message: SMSMessage, smtp: SmtpManager, campaign: SM
         email_message["To"] = receiver_email
         
         # Send via SMTP
+        smtp_start_time = time.time()
         with smtplib.SMTP_SSL(smtp.host, int(smtp.port), context=ssl.create_default_context()) as email_conn:
             email_conn.login(smtp.username, smtp.password)
-            email_conn.sendmail(smtp.username, receiver_email, email_message.as_string())
+            metrics.SMTP_HANDSHAKE_SECONDS.labels(server=server).observe(time.time() - smtp_start_time)
+            with metrics.SMTP_SEND_SECONDS.labels(server=server).time():
+                email_conn.sendmail(smtp.username, receiver_email, email_message.as_string())
         
         # Update message status
         message.delivery_status = 'sent'
         message.sent_at = timezone.now()
         message.save()
+        metrics.SMS_MESSAGES_SENT.labels(carrier=carrier, server=server).inc()
         
         return True
         
@@ -315,6 +355,7 @@ def send_single_sms_message(message: SMSMessage, smtp: SmtpManager, campaign: SM
         message.delivery_status = 'failed'
         message.error_message = str(e)
         message.save()
+        metrics.SMS_MESSAGES_FAILED.labels(carrier=carrier, server=server).inc()
         
         return False
 
@@ -357,6 +398,7 @@ def retry_sms_message_task(self, message_id: int, retry_attempt_id: int):
     """
     from .models import RetryAttempt
     from .rotation_manager import RotationManager
+    from .delivery_rollup import outcome_change
     
     try:
         message = SMSMessage.objects.get(id=message_id)
@@ -390,10 +432,11 @@ def retry_sms_message_task(self, message_id: int, retry_attempt_id: int):
     # Apply delivery delay
     delay_applied = rotation_manager.apply_delivery_delay()
     
-    # Attempt to send the message
-    success = send_enhanced_sms_message_simple(
-        message, smtp, proxy, campaign, rotation_manager, delay_applied
-    )
+    # Attempt to send the message, replacing its failed outcome in the rollup
+    with outcome_change(message):
+        success = send_enhanced_sms_message_simple(
+            message, smtp, proxy, campaign, rotation_manager, delay_applied
+        )
     
     # Mark retry attempt as completed
     retry_attempt.mark_completed(success=success)
@@ -434,18 +477,61 @@ def cleanup_old_retry_attempts():
     """
     Periodic task to clean up old completed retry attempts.
     Keeps retry attempts for 30 days for reporting purposes.
+    Drops whole monthly partitions once the table is partitioned.
     """
-    from datetime import timedelta
-    from .models import RetryAttempt
-    
-    cutoff_date = timezone.now() - timedelta(days=30)
+    from .partitioning import purge_old_retry_attempts
     
-    old_attempts = RetryAttempt.objects.filter(
-        completed=True,
-        completion_time__lt=cutoff_date
+    return purge_old_retry_attempts(days=30)
+
+
+@shared_task
+def maintain_sms_partitions():
+    """
+    Periodic task for partitioned SMSMessage and RetryAttempt tables.
+    Creates the upcoming monthly partitions and, when
+    SMS_PARTITION_RETENTION_MONTHS is set, archives and drops the
+    partitions that fall outside the retention window.
+    """
+    from django.conf import settings
+    from .partitioning import (
+        PARTITIONED_MODELS, add_months, archive_dir, archive_expired, ensure_partitions,
+        is_partitioned, month_start,
     )
     
-    count = old_attempts.count()
-    old_attempts.delete()
+    retention = getattr(settings, 'SMS_PARTITION_RETENTION_MONTHS', None)
+    cutoff = add_months(month_start(timezone.now()), -retention) if retention else None
+    
+    created = []
+    archived = []
+    for model in PARTITIONED_MODELS:
+        if not is_partitioned(model):
+            continue
+        created.extend(ensure_partitions(model))
+        if cutoff is not None:
+            archived.extend(result['partition'] for result in archive_expired(model, cutoff, archive_dir()))
+    
+    return {'created': created, 'archived': archived}
+
+
+@shared_task
+def broadcast_live_campaign_stats():
+    """
+    Periodic producer for live campaign and system stats.
+    Refreshes the shared snapshot once per interval for every running
+    campaign and its owner, so connected consumers never query themselves.
+    """
+    from .live_stats import CampaignStatsBroadcaster, SystemStatsBroadcaster
+    
+    active = SMSCampaign.objects.filter(status='in_progress').values_list('id', 'user_id')
+    
+    campaigns = 0
+    users = set()
+    for campaign_id, user_id in active:
+        if CampaignStatsBroadcaster(campaign_id).refresh() is not None:
+            campaigns += 1
+        users.add(user_id)
+    
+    for user_id in users:
+        SystemStatsBroadcaster(user_id).refresh()
     
-    return {'cleaned_up': count}
+    return {'campaigns': campaigns, 'users': len(users)}
@@ -352,7 +352,7 @@ class ConsumerIntegrationTest(TestCase):
             status='in_progress'
         )
     
-    @patch('sms_sender.consumers.CampaignMonitoringService')
+    @patch('sms_sender.live_stats.CampaignMonitoringService')
     async def test_consumer_with_mocked_monitoring_service(self, mock_monitoring_service):
         """Test consumer with mocked monitoring service"""
         # Mock the monitoring service
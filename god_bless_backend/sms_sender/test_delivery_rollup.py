@@ -0,0 +1,175 @@
+"""
+Unit tests for the hourly delivery rollup
+"""
+from datetime import timedelta
+from unittest import mock
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from .models import SMSCampaign, SMSMessage, DeliveryRollup
+from .delivery_rollup import DeliveryRollupBuffer, backfill_campaign, outcome_change, truncate_hour
+from .error_analysis import ErrorAnalysisService
+from .performance_reporting import PerformanceReportingService
+from .rotation_manager import RotationManager
+from .tasks import process_sms_campaign_task
+
+User = get_user_model()
+
+
+class DeliveryRollupTest(TestCase):
+    """Test incremental and backfilled rollup maintenance"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.campaign = SMSCampaign.objects.create(
+            user=self.user,
+            name='Test Campaign',
+            message_template='Hello!',
+            status='in_progress'
+        )
+        self.now = timezone.now()
+
+    def _message(self, status, carrier='Verizon', error='', processing_time=1.0, sent_at=None):
+        return SMSMessage.objects.create(
+            campaign=self.campaign,
+            phone_number='5550001111',
+            message_content='Hello!',
+            carrier=carrier,
+            delivery_status=status,
+            error_message=error,
+            total_processing_time=processing_time,
+            sent_at=sent_at or self.now
+        )
+
+    def test_buffer_accumulates_and_flushes(self):
+        buffer = DeliveryRollupBuffer(self.campaign)
+        buffer.record(self._message('sent', processing_time=1.0))
+        buffer.record(self._message('sent', processing_time=3.0))
+        buffer.record(self._message('failed', error='Connection timeout'))
+        buffer.record(self._message('pending'))
+
+        self.assertEqual(DeliveryRollup.objects.count(), 0)
+        self.assertEqual(buffer.flush(), 1)
+
+        row = DeliveryRollup.objects.get()
+        self.assertEqual(row.hour, truncate_hour(self.now))
+        self.assertEqual(row.total_messages, 3)
+        self.assertEqual(row.sent_count, 2)
+        self.assertEqual(row.failed_count, 1)
+        self.assertEqual(row.processing_time_sum, 5.0)
+        self.assertEqual(row.error_categories, {'network': 1})
+
+        # A second flush adds to the existing row
+        buffer.record(self._message('failed', error='Connection refused'))
+        buffer.flush()
+        row.refresh_from_db()
+        self.assertEqual(row.failed_count, 2)
+        self.assertEqual(row.error_categories, {'network': 2})
+
+    def test_backfill_matches_raw_messages(self):
+        earlier = self.now - timedelta(hours=2)
+        self._message('delivered', carrier='AT&T', sent_at=earlier)
+        self._message('sent', carrier='AT&T')
+        self._message('failed', carrier='Verizon', error='Authentication failed')
+        self._message('pending')
+
+        self.assertEqual(backfill_campaign(self.campaign), 3)
+        # Re-running rebuilds rather than double counting
+        self.assertEqual(backfill_campaign(self.campaign), 3)
+
+        rows = DeliveryRollup.objects.filter(campaign=self.campaign)
+        self.assertEqual(sum(r.total_messages for r in rows), 3)
+        self.assertEqual(sum(r.delivered_count for r in rows), 1)
+        self.assertEqual(sum(r.failed_count for r in rows), 1)
+
+    def test_retry_replaces_recorded_outcome(self):
+        message = self._message('failed', error='Connection timeout')
+        backfill_campaign(self.campaign)
+
+        with outcome_change(message):
+            message.delivery_status = 'sent'
+            message.error_message = ''
+            message.save()
+
+        row = DeliveryRollup.objects.get()
+        self.assertEqual((row.total_messages, row.sent_count, row.failed_count), (1, 1, 0))
+        self.assertEqual(row.error_categories, {'network': 0})
+
+        # Campaigns without rollup data are left to the raw-message reports
+        other = SMSCampaign.objects.create(user=self.user, name='Other', message_template='Hi')
+        retried = SMSMessage.objects.create(
+            campaign=other, phone_number='5550002222', message_content='Hi', delivery_status='failed'
+        )
+        with outcome_change(retried):
+            retried.delivery_status = 'sent'
+        self.assertFalse(DeliveryRollup.objects.filter(campaign=other).exists())
+
+    def test_retry_after_no_smtp_failure_stays_in_its_hour(self):
+        message = SMSMessage.objects.create(
+            campaign=self.campaign, phone_number='5550001111', message_content='Hello!', delivery_status='pending'
+        )
+        # Queued well before the campaign ran, as for a scheduled campaign
+        SMSMessage.objects.filter(pk=message.pk).update(created_at=self.now - timedelta(hours=3))
+
+        with mock.patch.object(RotationManager, 'get_next_smtp', side_effect=[object(), None]), \
+                mock.patch.object(RotationManager, 'get_next_proxy', return_value=None):
+            process_sms_campaign_task.apply(args=[self.campaign.id]).get()
+
+        message.refresh_from_db()
+        self.assertEqual(message.error_message, 'No SMTP server available')
+        self.assertIsNotNone(message.last_attempt_at)
+
+        SMSCampaign.objects.filter(pk=self.campaign.pk).update(status='in_progress')
+        with outcome_change(message):
+            message.delivery_status = 'sent'
+            message.sent_at = timezone.now()
+            message.save()
+
+        rows = DeliveryRollup.objects.filter(campaign=self.campaign)
+        for row in rows:
+            self.assertGreaterEqual(min(row.total_messages, row.sent_count, row.failed_count), 0)
+        self.assertEqual(sum(row.total_messages for row in rows), 1)
+        self.assertEqual(sum(row.sent_count for row in rows), 1)
+        self.assertEqual(sum(row.failed_count for row in rows), 0)
+
+    def test_error_trends_fall_back_per_campaign(self):
+        self._message('failed', error='Connection timeout')
+        backfill_campaign(self.campaign)
+        other = SMSCampaign.objects.create(user=self.user, name='Other', message_template='Hi')
+        SMSMessage.objects.create(
+            campaign=other, phone_number='5550002222', message_content='Hi',
+            delivery_status='failed', error_message='Authentication failed'
+        )
+
+        trends = ErrorAnalysisService().get_error_trends(days=7)
+        self.assertEqual(trends['total_errors'], 2)
+        self.assertEqual(trends['category_trends'], {'network': 1, 'authentication': 1})
+
+    def test_reports_read_from_rollup(self):
+        self._message('delivered', carrier='AT&T')
+        self._message('failed', carrier='AT&T', error='Connection timeout')
+        self._message('failed', carrier='Verizon', error='Message rejected as spam')
+        backfill_campaign(self.campaign)
+
+        reporting = PerformanceReportingService(self.campaign.id)
+        carriers = reporting._get_carrier_analysis(self.campaign)
+        self.assertEqual(carriers['total_carriers'], 2)
+        self.assertEqual(carriers['carrier_breakdown'][0]['carrier'], 'AT&T')
+        self.assertEqual(carriers['carrier_breakdown'][0]['success_rate'], 50)
+
+        time_analysis = reporting._get_time_analysis(self.campaign)
+        self.assertEqual(time_analysis['total_hours_active'], 1)
+        self.assertEqual(time_analysis['hourly_breakdown'][0]['total_messages'], 3)
+
+        errors = ErrorAnalysisService(self.campaign.id).analyze_campaign_errors()
+        self.assertEqual(errors['total_failed_messages'], 2)
+        self.assertEqual(
+            errors['error_patterns']['error_categories'],
+            {'network': 1, 'carrier_rejection': 1}
+        )
+        self.assertEqual(errors['error_patterns']['carrier_specific_errors']['AT&T']['total'], 1)
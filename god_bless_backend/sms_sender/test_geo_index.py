@@ -0,0 +1,52 @@
+"""
+Unit tests for the shared area code index
+"""
+from datetime import datetime, timezone as dt_timezone
+from django.test import SimpleTestCase, TestCase
+
+from phone_number_validator.models import PhonePrefix
+from . import geo_index
+
+
+class GeoIndexTest(SimpleTestCase):
+    """Test static index lookups and DST-aware local times"""
+
+    def test_lookup_matches_table_precedence(self):
+        info = geo_index.lookup('+1 (201) 555-1234')
+        self.assertEqual(info.carrier, 'verizon')
+        self.assertEqual(info.timezone, 'eastern')
+
+        info = geo_index.lookup('213-555-1234')
+        self.assertEqual(info.timezone, 'pacific')
+        self.assertEqual(info.state, 'CA')
+
+    def test_unknown_and_short_numbers_use_defaults(self):
+        self.assertEqual(geo_index.lookup('999-555-1234'), geo_index.DEFAULT_INFO)
+        self.assertEqual(geo_index.lookup('555-1234'), geo_index.DEFAULT_INFO)
+        self.assertEqual(geo_index.extract_area_code('555-1234'), '')
+
+    def test_state_fills_missing_timezone(self):
+        index = geo_index.build_index(carrier_patterns={}, timezone_map={}, area_code_states={'907': 'AK'})
+        self.assertEqual(index['907'], geo_index.AreaCodeInfo('alaska', 'unknown', 'AK'))
+
+    def test_offsets_follow_daylight_saving(self):
+        summer = datetime(2023, 7, 1, 12, tzinfo=dt_timezone.utc)
+        winter = datetime(2023, 1, 1, 12, tzinfo=dt_timezone.utc)
+        self.assertEqual(geo_index.utc_offset_hours('eastern', summer), -4)
+        self.assertEqual(geo_index.utc_offset_hours('eastern', winter), -5)
+        self.assertEqual(geo_index.localize(datetime(2023, 7, 1, 12), 'pacific').hour, 5)
+
+
+class PhonePrefixIndexTest(TestCase):
+    """Test deriving the index from PhonePrefix rows"""
+
+    def test_majority_carrier_and_state(self):
+        PhonePrefix.objects.create(prefix='201200', carrier='Sprint Spectrum', city='Newark', state='New Jersey', line_type='Mobile')
+        PhonePrefix.objects.create(prefix='201201', carrier='Sprint Spectrum', city='Newark', state='New Jersey', line_type='Mobile')
+        PhonePrefix.objects.create(prefix='201202', carrier='Verizon Wireless', city='Newark', state='New Jersey', line_type='Mobile')
+
+        index = geo_index.build_index_from_phone_prefixes(geo_index.build_index())
+
+        self.assertEqual(index['201'], geo_index.AreaCodeInfo('eastern', 'sprint', 'NJ'))
+        # Area codes without prefix rows keep the static entry
+        self.assertEqual(index['213'], geo_index.AREA_CODE_INDEX['213'])
@@ -0,0 +1,63 @@
+"""
+Unit tests for shared live stats producers
+"""
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+
+from .models import SMSCampaign
+from .live_stats import CampaignStatsBroadcaster
+
+User = get_user_model()
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class CampaignStatsBroadcasterTest(TestCase):
+    """Test single-producer snapshot caching"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.campaign = SMSCampaign.objects.create(
+            user=self.user,
+            name='Test Campaign',
+            message_template='Hello!',
+            status='in_progress'
+        )
+        self.broadcaster = CampaignStatsBroadcaster(self.campaign.id)
+    
+    @patch('sms_sender.live_stats.CampaignMonitoringService')
+    def test_snapshot_computed_once_for_many_readers(self, mock_service):
+        mock_service.return_value.get_campaign_stats.return_value = {'total_messages': 3}
+        
+        for _ in range(5):
+            self.assertEqual(self.broadcaster.get_snapshot(), {'total_messages': 3})
+        
+        self.assertEqual(mock_service.return_value.get_campaign_stats.call_count, 1)
+    
+    @patch('god_bless_pro.live_stats.get_channel_layer')
+    @patch('sms_sender.live_stats.CampaignMonitoringService')
+    def test_refresh_is_gated_by_lease(self, mock_service, mock_layer):
+        mock_layer.return_value = None
+        mock_service.return_value.get_campaign_stats.return_value = {'total_messages': 1}
+        
+        self.assertIsNotNone(self.broadcaster.refresh())
+        self.assertIsNone(self.broadcaster.refresh())
+        self.assertIsNone(CampaignStatsBroadcaster(self.campaign.id).refresh())
+        
+        mock_service.return_value.get_campaign_stats.return_value = {'total_messages': 2}
+        self.assertEqual(self.broadcaster.refresh(force=True), {'total_messages': 2})
+        self.assertEqual(self.broadcaster.get_snapshot(), {'total_messages': 2})
+    
+    def test_build_event_matches_consumer_handler(self):
+        event = self.broadcaster.build_event({'total_messages': 1})
+        
+        self.assertEqual(event['type'], 'campaign_message')
+        self.assertEqual(event['message']['type'], 'stats_update')
+        self.assertEqual(event['message']['stats'], {'total_messages': 1})
+        self.assertEqual(self.broadcaster.group_name(), f'campaign_{self.campaign.id}')
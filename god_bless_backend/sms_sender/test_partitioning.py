@@ -0,0 +1,92 @@
+"""
+Tests for SMSMessage/RetryAttempt partition helpers and retention cleanup
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from . import partitioning
+from .models import RetryAttempt, SMSCampaign, SMSMessage
+from .tasks import cleanup_old_retry_attempts, maintain_sms_partitions
+
+User = get_user_model()
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class PartitionHelperTests(SimpleTestCase):
+    """Test month arithmetic and partition selection"""
+
+    def test_month_arithmetic(self):
+        self.assertEqual(partitioning.month_start(utc(2025, 3, 31, 23, 59)), utc(2025, 3, 1))
+        self.assertEqual(partitioning.add_months(utc(2025, 11, 1), 3), utc(2026, 2, 1))
+        self.assertEqual(partitioning.add_months(utc(2025, 1, 1), -1), utc(2024, 12, 1))
+        self.assertEqual(partitioning.partition_name(SMSMessage, utc(2025, 2, 1)), 'sms_sender_smsmessage_p202502')
+
+    def test_months_ending_before(self):
+        months = [utc(2025, 3, 1), utc(2025, 1, 1), utc(2025, 2, 1)]
+        self.assertEqual(
+            partitioning.months_ending_before(months, utc(2025, 3, 1)),
+            [utc(2025, 1, 1), utc(2025, 2, 1)]
+        )
+        # A month that is only partly expired stays
+        self.assertEqual(partitioning.months_ending_before(months, utc(2025, 2, 15)), [utc(2025, 1, 1)])
+
+
+class RetentionFallbackTests(TestCase):
+    """Without PostgreSQL partitions, cleanup falls back to ORM deletes"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='partuser', email='part@example.com', password='testpass123')
+        campaign = SMSCampaign.objects.create(user=self.user, name='Partition Campaign', message_template='Hi')
+        self.message = SMSMessage.objects.create(campaign=campaign, phone_number='12015550100', message_content='Hi')
+
+    def make_attempt(self, completed, age_days):
+        return RetryAttempt.objects.create(
+            message=self.message, attempt_number=1, error_type='timeout', error_message='timeout',
+            retry_delay=60, scheduled_retry_time=timezone.now(), completed=completed,
+            completion_time=timezone.now() - timedelta(days=age_days),
+        )
+
+    def test_cleanup_deletes_old_completed_attempts(self):
+        old = self.make_attempt(completed=True, age_days=45)
+        recent = self.make_attempt(completed=True, age_days=5)
+        pending = self.make_attempt(completed=False, age_days=45)
+
+        result = cleanup_old_retry_attempts.apply().get()
+
+        self.assertEqual(result, {'cleaned_up': 1})
+        self.assertEqual(
+            set(RetryAttempt.objects.values_list('id', flat=True)), {recent.id, pending.id}
+        )
+        self.assertFalse(RetryAttempt.objects.filter(id=old.id).exists())
+
+    def test_cleanup_command_reports_what_is_purged(self):
+        self.make_attempt(completed=True, age_days=45)
+        self.make_attempt(completed=False, age_days=45)
+
+        plan = partitioning.retry_attempt_purge_plan(30)
+        self.assertEqual((plan['partitioned'], plan['partitions'], plan['rows']), (False, [], 1))
+
+        out = StringIO()
+        call_command('cleanup_retry_attempts', '--dry-run', stdout=out)
+        self.assertIn('Found 1 completed retry attempts', out.getvalue())
+        self.assertIn('timeout: 1', out.getvalue())
+        self.assertEqual(RetryAttempt.objects.count(), 2)
+
+        call_command('cleanup_retry_attempts', '--force', stdout=out)
+        self.assertIn('Successfully deleted 1 old retry attempts.', out.getvalue())
+        self.assertEqual(RetryAttempt.objects.count(), 1)
+
+    def test_partition_maintenance_is_a_no_op(self):
+        self.assertFalse(partitioning.is_partitioned(SMSMessage))
+        self.assertEqual(maintain_sms_partitions.apply().get(), {'created': [], 'archived': []})
+        with self.assertRaises(CommandError):
+            call_command('manage_sms_partitions', '--convert')
@@ -0,0 +1,83 @@
+"""
+Unit tests for the compiled routing rule index
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .models import SMSCampaign, RoutingRule as RoutingRuleModel
+from .routing_rules_engine import CompiledRuleIndex, RoutingRule, RoutingRulesEngine
+
+User = get_user_model()
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class CompiledRuleIndexTest(SimpleTestCase):
+    """Test that indexed matching agrees with RoutingRule.matches"""
+
+    def setUp(self):
+        self.rules = [
+            RoutingRule('verizon', {'carriers': ['verizon']}, {}, priority=10),
+            RoutingRule('west', {'states': ['CA', 'OR']}, {}, priority=5),
+            RoutingRule('la', {'area_codes': ['213', '310'], 'carriers': ['att', 'verizon']}, {}, priority=7),
+            RoutingRule('pattern', {'phone_pattern': r'^\+?1?213'}, {}, priority=1),
+            RoutingRule('night', {'time_range': (22, 6)}, {}, priority=3),
+            RoutingRule('day', {'time_range': (9, 17)}, {}, priority=3),
+        ]
+        self.index = CompiledRuleIndex(self.rules)
+
+    def _names(self, rules):
+        return [rule.name for rule in rules]
+
+    def test_matches_in_priority_order(self):
+        geo = {'area_code': '213', 'state': 'CA', 'timezone': 'pacific'}
+        matched = self.index.match('2135551234', 'verizon', geo, hour=12)
+        self.assertEqual(self._names(matched), ['verizon', 'la', 'west', 'day', 'pattern'])
+
+    def test_non_matching_dimensions_are_excluded(self):
+        geo = {'area_code': '201', 'state': 'NJ', 'timezone': 'eastern'}
+        matched = self.index.match('2015551234', 'tmobile', geo, hour=12)
+        self.assertEqual(self._names(matched), ['day'])
+
+    def test_time_ranges_wrap_past_midnight(self):
+        geo = {'area_code': '201', 'state': 'NJ', 'timezone': 'eastern'}
+        self.assertEqual(self._names(self.index.match('2015551234', 'tmobile', geo, hour=23)), ['night'])
+        self.assertEqual(self._names(self.index.match('2015551234', 'tmobile', geo, hour=3)), ['night'])
+        self.assertEqual(self.index.match('2015551234', 'tmobile', geo, hour=20), [])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RuleIndexCacheTest(TestCase):
+    """Test per-user caching and invalidation on RoutingRule changes"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.campaign = SMSCampaign.objects.create(
+            user=self.user,
+            name='Test Campaign',
+            message_template='Hello!'
+        )
+
+    def test_index_is_reused_until_rules_change(self):
+        first = RoutingRulesEngine(self.user, self.campaign).rule_index
+        self.assertIs(RoutingRulesEngine(self.user, self.campaign).rule_index, first)
+
+        rule = RoutingRuleModel.objects.create(
+            user=self.user, name='Custom', conditions={'carriers': ['sprint']}, priority=20
+        )
+        rebuilt = RoutingRulesEngine(self.user, self.campaign).rule_index
+        self.assertIsNot(rebuilt, first)
+        self.assertEqual(rebuilt.rules[0].name, 'Custom')
+
+        # Usage counter updates do not invalidate the index
+        rule.increment_match(success=True)
+        self.assertIs(RoutingRulesEngine(self.user, self.campaign).rule_index, rebuilt)
+
+        rule.delete()
+        self.assertNotIn('Custom', [r.name for r in RoutingRulesEngine(self.user, self.campaign).routing_rules])
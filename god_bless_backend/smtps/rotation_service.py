@@ -12,7 +12,7 @@ from django.utils import timezone
 from django.core.cache import cache
 from django.db import transaction
 from .models import SmtpManager
-from proxy_server.models import RotationSettings
+from proxy_server.models import get_rotation_settings
 
 # Import Docker configuration if available
 try:
@@ -45,16 +45,12 @@ class SMTPRotationService:
     
     def _get_or_create_settings(self):
         """Get or create rotation settings for user"""
-        settings, created = RotationSettings.objects.get_or_create(
-            user=self.user,
-            defaults={
-                'smtp_rotation_enabled': True,
-                'smtp_rotation_strategy': 'round_robin',
-                'smtp_health_check_interval': 300,
-                'smtp_max_failures': 3
-            }
-        )
-        return settings
+        return get_rotation_settings(self.user, defaults={
+            'smtp_rotation_enabled': True,
+            'smtp_rotation_strategy': 'round_robin',
+            'smtp_health_check_interval': 300,
+            'smtp_max_failures': 3
+        })
     
     def get_next_smtp(self) -> Optional[SmtpManager]:
         """Get next SMTP server based on rotation strategy with enhanced selection logic"""
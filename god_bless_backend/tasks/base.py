@@ -3,6 +3,7 @@ from celery.utils.log import get_task_logger
 from django.utils import timezone
 from datetime import timedelta
 from .models import TaskProgress, TaskStatus, TaskCategory
+from .progress import ProgressReporter
 
 logger = get_task_logger(__name__)
 
@@ -13,9 +14,12 @@ class ProgressTrackingTask(Task):
     def __init__(self):
         super().__init__()
         self.task_progress = None
+        self.progress_reporter = None
     
     def before_start(self, task_id, args, kwargs):
         """Called before task execution"""
+        self.task_progress = None
+        self.progress_reporter = None
         user_id = kwargs.get('user_id')
         category = kwargs.get('category', TaskCategory.GENERAL)
         
@@ -39,12 +43,14 @@ class ProgressTrackingTask(Task):
     
     def on_success(self, retval, task_id, args, kwargs):
         """Called when task succeeds"""
+        self.flush_progress()
         if self.task_progress:
             self.task_progress.mark_success(result_data=retval)
             logger.info(f"Task {task_id} completed successfully")
     
     def on_failure(self, exc, task_id, args, kwargs, einfo):
         """Called when task fails"""
+        self.flush_progress()
         if self.task_progress:
             self.task_progress.mark_failure(str(exc))
             logger.error(f"Task {task_id} failed: {exc}")
@@ -68,37 +74,68 @@ class ProgressTrackingTask(Task):
             pass
     
     def update_progress(self, progress, current_step=None, processed_items=None, total_items=None):
-        """Update task progress"""
+        """
+        Update task progress.
+
+        Updates are coalesced by the progress reporter: only changed fields are
+        written, on a time/percentage cadence, and the WebSocket notification is
+        rate limited. Call flush_progress() to force the latest state out.
+        """
         if self.task_progress:
-            self.task_progress.progress = min(100, max(0, progress))
+            fields = {'progress': min(100, max(0, progress))}
             
             if current_step:
-                self.task_progress.current_step = current_step
+                fields['current_step'] = current_step
             
             if processed_items is not None:
-                self.task_progress.processed_items = processed_items
+                fields['processed_items'] = processed_items
             
             if total_items is not None:
-                self.task_progress.total_items = total_items
+                fields['total_items'] = total_items
             
             # Estimate completion time
             if self.task_progress.started_at and progress > 0:
                 elapsed = (timezone.now() - self.task_progress.started_at).total_seconds()
                 estimated_total = (elapsed / progress) * 100
                 remaining = estimated_total - elapsed
-                self.task_progress.estimated_completion = timezone.now() + timedelta(seconds=remaining)
+                fields['estimated_completion'] = timezone.now() + timedelta(seconds=remaining)
             
-            self.task_progress.save()
-            
-            # Send WebSocket notification
-            self._send_progress_notification()
+            self._get_progress_reporter().update(**fields)
+    
+    def flush_progress(self):
+        """Write any pending progress fields and publish the latest state"""
+        if self.progress_reporter:
+            self.progress_reporter.flush()
+    
+    def _get_progress_reporter(self):
+        """Return the reporter bound to the current TaskProgress row"""
+        if self.progress_reporter is None or self.progress_reporter.instance is not self.task_progress:
+            self.progress_reporter = ProgressReporter(
+                self.task_progress,
+                publish=lambda instance, meta: self._send_progress_notification()
+            )
+        return self.progress_reporter
     
     def mark_started(self):
         """Mark task as started"""
         if self.task_progress:
             self.task_progress.mark_started()
             self._send_progress_notification()
-    
+
+    def mark_completed(self, result_data=None):
+        """Mark task as completed with its result"""
+        self.flush_progress()
+        if self.task_progress:
+            self.task_progress.mark_success(result_data=result_data)
+            self._send_progress_notification()
+
+    def mark_failed(self, error_message):
+        """Mark task as failed"""
+        self.flush_progress()
+        if self.task_progress:
+            self.task_progress.mark_failure(error_message)
+            self._send_progress_notification()
+
     def _send_progress_notification(self):
         """Send progress update via WebSocket"""
         if self.task_progress:
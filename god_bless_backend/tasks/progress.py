@@ -0,0 +1,132 @@
+"""
+Coalesced progress reporting for long-running tasks
+Batches model writes and WebSocket publishes into a fixed cadence
+"""
+import time
+
+from django.conf import settings
+
+
+class Throttle:
+    """Gate that opens at most once per interval (seconds)"""
+
+    def __init__(self, interval, clock=time.monotonic):
+        self.interval = interval
+        self.clock = clock
+        self.last = None
+
+    def ready(self):
+        """Return True if the interval has elapsed since the last trigger"""
+        return self.last is None or self.clock() - self.last >= self.interval
+
+    def trigger(self):
+        """Mark the throttle as just fired"""
+        self.last = self.clock()
+
+    def __call__(self):
+        """Fire if ready and report whether it fired"""
+        if self.ready():
+            self.trigger()
+            return True
+        return False
+
+
+class ProgressReporter:
+    """
+    Coalesce progress updates for a model instance.
+
+    ``update()`` applies values to the instance immediately but only persists
+    the changed fields once ``save_interval`` seconds have passed or the
+    progress field moved by ``min_progress_delta``. The ``publish`` callback
+    receives the latest instance state at most every ``publish_interval``
+    seconds. ``flush()`` forces both and must be called when the work ends.
+    """
+
+    def __init__(self, instance, publish=None, save_interval=None,
+                 publish_interval=None, min_progress_delta=None,
+                 progress_field='progress', clock=time.monotonic):
+        self.instance = instance
+        self.publish = publish
+        self.progress_field = progress_field
+        self.min_progress_delta = (
+            min_progress_delta if min_progress_delta is not None
+            else getattr(settings, 'PROGRESS_MIN_DELTA', 1)
+        )
+        self._save_throttle = Throttle(
+            save_interval if save_interval is not None
+            else getattr(settings, 'PROGRESS_SAVE_INTERVAL', 1.0),
+            clock=clock,
+        )
+        self._publish_throttle = Throttle(
+            publish_interval if publish_interval is not None
+            else getattr(settings, 'PROGRESS_PUBLISH_INTERVAL', 0.3),
+            clock=clock,
+        )
+        self._dirty = set()
+        self._saved_progress = getattr(instance, progress_field, None) or 0
+        self._unpublished = False
+        self.meta = {}
+        self.saves = 0
+        self.publishes = 0
+
+    def update(self, meta=None, force=False, **fields):
+        """
+        Apply field values and persist/publish if the cadence allows.
+
+        Returns True if the changed fields were written to the database.
+        """
+        for name, value in fields.items():
+            if getattr(self.instance, name) != value:
+                setattr(self.instance, name, value)
+                self._dirty.add(name)
+        if meta is not None:
+            self.meta = meta
+        self._unpublished = True
+
+        saved = False
+        if force or self._should_save():
+            saved = self._save()
+        if force or self._publish_throttle.ready():
+            self._publish()
+        return saved
+
+    def flush(self, meta=None):
+        """Persist any pending fields and publish the final state"""
+        if meta is not None:
+            self.meta = meta
+        self._save()
+        self._publish()
+
+    @property
+    def has_pending(self):
+        """Whether there are fields not yet written to the database"""
+        return bool(self._dirty)
+
+    def _should_save(self):
+        if not self._dirty:
+            return False
+        if self._save_throttle.ready():
+            return True
+        progress = getattr(self.instance, self.progress_field, None)
+        if progress is None or self.min_progress_delta is None:
+            return False
+        return abs(progress - self._saved_progress) >= self.min_progress_delta
+
+    def _save(self):
+        if not self._dirty:
+            return False
+        self.instance.save(update_fields=sorted(self._dirty))
+        self._dirty.clear()
+        self._saved_progress = getattr(self.instance, self.progress_field, None) or 0
+        self._save_throttle.trigger()
+        self.saves += 1
+        return True
+
+    def _publish(self):
+        if not self._unpublished:
+            return
+        self._unpublished = False
+        self._publish_throttle.trigger()
+        if self.publish:
+            self.publish(self.instance, self.meta)
+            self.publishes += 1
@@ -0,0 +1,99 @@
+"""
+Unit tests for coalesced progress reporting
+"""
+from django.test import SimpleTestCase
+
+from tasks.progress import ProgressReporter, Throttle
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeInstance:
+    def __init__(self):
+        self.progress = 0
+        self.processed_items = 0
+        self.current_step = ''
+        self.saved_fields = []
+
+    def save(self, update_fields=None):
+        self.saved_fields.append(update_fields)
+
+
+class ThrottleTests(SimpleTestCase):
+    """Test the interval gate"""
+
+    def test_fires_once_per_interval(self):
+        clock = FakeClock()
+        throttle = Throttle(1.0, clock=clock)
+
+        self.assertTrue(throttle())
+        self.assertFalse(throttle())
+        clock.now = 0.5
+        self.assertFalse(throttle())
+        clock.now = 1.0
+        self.assertTrue(throttle())
+
+
+class ProgressReporterTests(SimpleTestCase):
+    """Test write coalescing and publish rate limiting"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.instance = FakeInstance()
+        self.published = []
+        self.reporter = ProgressReporter(
+            self.instance,
+            publish=lambda instance, meta: self.published.append((instance.progress, meta)),
+            save_interval=1.0,
+            publish_interval=0.3,
+            min_progress_delta=10,
+            clock=self.clock,
+        )
+
+    def test_writes_only_changed_fields(self):
+        self.reporter.update(progress=1, processed_items=1)
+        self.assertEqual(self.instance.saved_fields, [['processed_items', 'progress']])
+
+        self.clock.now = 2.0
+        self.reporter.update(progress=1, current_step='step 2')
+        self.assertEqual(self.instance.saved_fields[-1], ['current_step'])
+
+    def test_coalesces_updates_within_interval(self):
+        for i in range(1, 1000):
+            self.clock.now = i * 0.001
+            self.reporter.update(progress=i // 100, processed_items=i)
+
+        # Only the first update is written; the rest stay pending until flush
+        self.assertEqual(self.reporter.saves, 1)
+        # Publishes are capped by the 0.3s cadence over the 1s window
+        self.assertLessEqual(self.reporter.publishes, 5)
+        self.assertTrue(self.reporter.has_pending)
+
+    def test_percentage_delta_forces_write(self):
+        self.reporter.update(progress=1)
+        self.clock.now = 0.1
+        self.assertFalse(self.reporter.update(progress=5))
+        self.clock.now = 0.2
+        self.assertTrue(self.reporter.update(progress=11))
+
+    def test_flush_writes_and_publishes_latest_state(self):
+        self.reporter.update(progress=1, meta={'n': 1})
+        self.clock.now = 0.1
+        self.reporter.update(progress=2, processed_items=2, meta={'n': 2})
+
+        self.reporter.flush()
+
+        self.assertFalse(self.reporter.has_pending)
+        self.assertEqual(self.instance.saved_fields[-1], ['processed_items', 'progress'])
+        self.assertEqual(self.published[-1], (2, {'n': 2}))
+
+    def test_flush_without_changes_is_noop(self):
+        self.reporter.flush()
+        self.assertEqual(self.instance.saved_fields, [])
+        self.assertEqual(self.published, [])
@@ -0,0 +1,50 @@
+"""
+Smoke run of the end-to-end benchmark harness on a small data set
+"""
+import pytest
+
+from god_bless_pro import benchmarks
+from phone_generator.models import PhoneNumber
+from sms_sender.models import SMSMessage
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.django_db
+class TestBenchmarkHarness:
+    """Test every stage runs and reports throughput and latency"""
+
+    def test_all_stages(self):
+        pytest.importorskip('aiosmtpd')
+
+        with benchmarks.isolated_services():
+            report = benchmarks.run_benchmarks(numbers=200, messages=10, iterations=2)
+
+        results = report['results']
+        assert list(results) == list(benchmarks.STAGES)
+        assert results['generate']['items'] == 400
+        assert results['validate']['items'] == 400
+        assert results['export']['items'] == 400
+        assert results['import']['items'] == 400
+        assert results['campaign']['items'] == 20
+        for result in results.values():
+            assert result['throughput_per_sec'] > 0
+            assert result['latency_ms']['p50'] <= result['latency_ms']['p99']
+
+        # The benchmark user and everything it owned is removed
+        assert PhoneNumber.objects.count() == 0
+        assert SMSMessage.objects.count() == 0
+
+    def test_compare_reports(self):
+        baseline = {'results': {'import': {'throughput_per_sec': 100.0, 'latency_ms': {'p99': 50.0}}}}
+        current = {'results': {'import': {'throughput_per_sec': 150.0, 'latency_ms': {'p99': 40.0}}}}
+
+        assert benchmarks.compare_reports(baseline, current) == {
+            'import': {'throughput_change_pct': 50.0, 'p99_change_pct': -20.0}
+        }
+
+    def test_percentile(self):
+        samples = [float(value) for value in range(1, 101)]
+        assert benchmarks.percentile(samples, 0.50) == 50.0
+        assert benchmarks.percentile(samples, 0.99) == 99.0
+        assert benchmarks.percentile([], 0.5) is None
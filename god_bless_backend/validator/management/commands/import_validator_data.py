@@ -1,14 +1,59 @@
-import json
 import os
 from datetime import datetime
 from django.core.management.base import BaseCommand
 from django.core import serializers
 from django.db import transaction
+from god_bless_pro.json_stream import iter_json_items
+from god_bless_pro.query_optimization import bulk_upsert
 from validator.models import Proxy, PhoneNumber
-from phone_number_validator.models import PhonePrefix, Proxy as ValidatorProxy
+from phone_number_validator.models import PhonePrefix, Proxy as ValidatorProxy, prefix_cache
+from phone_number_validator.prefix_db import build_prefix_db
 from client.models import Client
 
 
+def _created_at(item):
+    return datetime.fromisoformat(item['created_at']) if item.get('created_at') else None
+
+
+# model name -> (field values for one simple-format item, fields identifying a row)
+SIMPLE_FORMATS = {
+    'proxy': (lambda item: {
+        'ip_address': item['ip_address'],
+        'port': item['port'],
+        'is_active': item.get('is_active', True),
+    }, ['ip_address', 'port']),
+    'phonenumber': (lambda item: {
+        'number': item['number'],
+        'status': item.get('status', 'PENDING'),
+        'carrier': item.get('carrier'),
+    }, ['number']),
+    'phoneprefix': (lambda item: {
+        'prefix': item['prefix'],
+        'carrier': item.get('carrier'),
+        'city': item.get('city'),
+        'state': item.get('state'),
+        'line_type': item.get('line_type'),
+    }, ['prefix']),
+    'validatorproxy': (lambda item: {
+        'ip_address': item['ip_address'],
+        'port': item['port'],
+        'country': item.get('country'),
+        'ssl': item.get('ssl', False),
+        'anonymity': item.get('anonymity'),
+        'valid': item.get('valid', False),
+        'created_at': _created_at(item),
+    }, ['ip_address', 'port']),
+    'client': (lambda item: {
+        'phone': item['phone'],
+        'full_name': item.get('full_name'),
+        'carrier': item.get('carrier'),
+        'location': item.get('location'),
+        'country': item.get('country'),
+        'created_at': _created_at(item),
+    }, ['phone']),
+}
+
+
 class Command(BaseCommand):
     help = 'Import validator data from JSON files'
 
@@ -60,10 +105,7 @@ class Command(BaseCommand):
         model_class = model_mapping[model_name]
         
         try:
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            with transaction.atomic():
+            with open(json_file, 'r', encoding='utf-8') as f, transaction.atomic():
                 if clear_existing:
                     deleted_count = model_class.objects.count()
                     model_class.objects.all().delete()
@@ -71,91 +113,47 @@ class Command(BaseCommand):
                         self.style.WARNING(f'Deleted {deleted_count} existing {model_name} records')
                     )
                 
+                # Items are parsed and written a batch at a time, never all at once
+                items = iter_json_items(f)
                 if json_format == 'django':
-                    self.import_django_format(data, model_class, model_name)
+                    self.import_django_format(items, model_class, model_name)
                 else:
-                    self.import_simple_format(data, model_class, model_name)
+                    self.import_simple_format(items, model_class, model_name)
+            
+            if model_class is PhonePrefix:
+                self.refresh_prefix_lookups()
                 
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'Import failed: {str(e)}')
             )
 
-    def import_django_format(self, data, model_class, model_name):
-        """Import Django serialized format"""
-        # Convert JSON string back to objects if needed
-        if isinstance(data, str):
-            objects = serializers.deserialize('json', data)
-        else:
-            objects = serializers.deserialize('json', json.dumps(data))
-        
-        imported_count = 0
-        for obj in objects:
-            obj.save()
-            imported_count += 1
+    def import_django_format(self, items, model_class, model_name):
+        """Import Django serialized format, upserting on the primary key"""
+        objects = (
+            deserialized.object for deserialized in serializers.deserialize('python', items)
+            if isinstance(deserialized.object, model_class)
+        )
+        imported_count = bulk_upsert(model_class, objects, unique_fields=[model_class._meta.pk.name])
         
         self.stdout.write(
             self.style.SUCCESS(f'Successfully imported {imported_count} {model_name} records')
         )
 
-    def import_simple_format(self, data, model_class, model_name):
-        """Import simplified JSON format"""
-        imported_count = 0
-        
-        for item in data:
-            if model_name == 'proxy':
-                obj, created = model_class.objects.get_or_create(
-                    ip_address=item['ip_address'],
-                    port=item['port'],
-                    defaults={
-                        'is_active': item.get('is_active', True)
-                    }
-                )
-            elif model_name == 'phonenumber':
-                obj, created = model_class.objects.get_or_create(
-                    number=item['number'],
-                    defaults={
-                        'status': item.get('status', 'PENDING'),
-                        'carrier': item.get('carrier')
-                    }
-                )
-            elif model_name == 'phoneprefix':
-                obj, created = model_class.objects.get_or_create(
-                    prefix=item['prefix'],
-                    defaults={
-                        'carrier': item.get('carrier'),
-                        'city': item.get('city'),
-                        'state': item.get('state'),
-                        'line_type': item.get('line_type')
-                    }
-                )
-            elif model_name == 'validatorproxy':
-                obj, created = model_class.objects.get_or_create(
-                    ip_address=item['ip_address'],
-                    port=item['port'],
-                    defaults={
-                        'country': item.get('country'),
-                        'ssl': item.get('ssl', False),
-                        'anonymity': item.get('anonymity'),
-                        'valid': item.get('valid', False),
-                        'created_at': datetime.fromisoformat(item['created_at']) if item.get('created_at') else None
-                    }
-                )
-            elif model_name == 'client':
-                obj, created = model_class.objects.get_or_create(
-                    phone=item['phone'],
-                    defaults={
-                        'full_name': item.get('full_name'),
-                        'carrier': item.get('carrier'),
-                        'location': item.get('location'),
-                        'country': item.get('country'),
-                        'created_at': datetime.fromisoformat(item['created_at']) if item.get('created_at') else None
-                    }
-                )
-            
-            if created:
-                imported_count += 1
+    def import_simple_format(self, items, model_class, model_name):
+        """Import simplified JSON format, upserting on each model's natural key"""
+        build, unique_fields = SIMPLE_FORMATS[model_name]
+        objects = (model_class(**build(item)) for item in items)
+        imported_count = bulk_upsert(model_class, objects, unique_fields=unique_fields)
         
         self.stdout.write(
-            self.style.SUCCESS(f'Successfully imported {imported_count} new {model_name} records')
-        )
\ No newline at end of file
+            self.style.SUCCESS(f'Successfully imported {imported_count} {model_name} records')
+        )
+
+    def refresh_prefix_lookups(self):
+        """Bulk writes skip signals, so drop cached prefixes and recompile the binary database"""
+        prefix_cache.clear()
+        count = build_prefix_db(
+            PhonePrefix.objects.values('prefix', 'carrier', 'city', 'state', 'line_type').iterator()
+        )
+        self.stdout.write(f'Rebuilt binary prefix database ({count} prefixes)')
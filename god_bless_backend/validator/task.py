@@ -1,35 +1,22 @@
 # utils/tasks.py
-import time
-import requests
 from celery import shared_task
-from django.core.files.storage import FileSystemStorage
-from .proxy_utils import save_validated_number
+
+from phone_number_validator.lookup_cache import lookup_cache
+from phone_number_validator.lookup_engine import load_proxy_file, run_lookups
+from validator.utils import save_validated_numbers
 
 @shared_task
 def validate_phone_numbers_task(file_path):
     with open(file_path, 'r') as file:
-        phone_numbers = [line.strip() for line in file.readlines()]
+        phone_numbers = [line.strip() for line in file if line.strip()]
 
     # Read valid proxies
-    with open("valid_proxies.txt", "r") as f:
-        proxies = [line.strip() for line in f.readlines()]
-
-    for number in phone_numbers:
-        for proxy in proxies:
-            try:
-                url = f'https://api.telnyx.com/anonymous/v2/number_lookup/{number}'
-                response = requests.get(url, proxies={"http": f"http://{proxy}", "https": f"http://{proxy}"}, timeout=5)
+    proxies = load_proxy_file("valid_proxies.txt")
 
-                if response.status_code == 200:
-                    result = response.json()
-                    carrier = result.get('data', {}).get('carrier', {}).get('name', 'Unknown')
-                    print(f"Valid phone number: {number} | Carrier: {carrier}")
-                    # Save validated numbers
-                    save_validated_number(number, carrier)
-                    break
-                else:
-                    continue
-            except requests.RequestException:
-                continue
+    # Numbers the lookup cache knows skip the API; the rest are looked up
+    # concurrently, and validated numbers are saved a batch at a time
+    stats = run_lookups(phone_numbers, proxies, save_validated_numbers, cache=lookup_cache)
 
-    print("Phone number validation task completed.")
+    print(f"Phone number validation task completed: {stats['valid']} valid, "
+          f"{stats['invalid']} invalid, {stats['unresolved']} unresolved, {stats['cached']} from cache "
+          f"in {stats['seconds']}s")
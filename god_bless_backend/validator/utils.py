@@ -60,35 +60,18 @@ def validate_proxies():
 
 
 # utils/proxy_utils.py
-import requests
-import os
+from phone_number_validator.lookup_cache import lookup_cache
+from phone_number_validator.lookup_engine import load_proxy_file, run_lookups
 
 def validate_phone_numbers(file_path):
     with open(file_path, 'r') as file:
-        phone_numbers = [line.strip() for line in file.readlines()]
-
-    # Read valid proxies
-    with open("valid_proxies.txt", "r") as f:
-        proxies = [line.strip() for line in f.readlines()]
-
-    for number in phone_numbers:
-        for proxy in proxies:
-            try:
-                url = f'https://api.telnyx.com/anonymous/v2/number_lookup/{number}'
-                response = requests.get(url, proxies={"http": f"http://{proxy}", "https": f"http://{proxy}"}, timeout=5)
+        phone_numbers = [line.strip() for line in file if line.strip()]
 
-                if response.status_code == 200:
-                    result = response.json()
-                    carrier = result.get('data', {}).get('carrier', {}).get('name', 'Unknown')
-                    print(f"Valid phone number: {number} | Carrier: {carrier}")
-                    # Save validated numbers
-                    save_validated_number(number, carrier)
-                    break
-                else:
-                    continue
-            except requests.RequestException:
-                continue
+    # Look the numbers up concurrently through the valid proxies
+    proxies = load_proxy_file("valid_proxies.txt")
+    return run_lookups(phone_numbers, proxies, save_validated_numbers, cache=lookup_cache)
 
-def save_validated_number(number, carrier):
+def save_validated_numbers(results):
+    lines = [f"{result.number} | {result.carrier}\n" for result in results if result.valid]
     with open('validated_numbers.txt', 'a') as file:
-        file.write(f"{number} | {carrier}\n")
+        file.writelines(lines)